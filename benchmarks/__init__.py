@@ -0,0 +1 @@
+"""Orchestration benchmarks driven by the mock provider."""
@@ -0,0 +1,485 @@
+"""Benchmark harness for the workflow orchestration layer.
+
+Runs synthetic graphs and every ``yaml_instance/*.yaml`` design with all agent
+nodes switched to the ``mock`` provider and memory stores to the ``mock``
+embedding. Human nodes are answered with ``HUMAN_REPLY`` and MCP tool servers
+are dropped from agent tooling. It records wall time, scheduler overhead per
+node, peak extra threads, peak traced memory and node throughput, then
+compares the results with a stored baseline.
+
+Designs that still cannot run offline are skipped and designs that fail to
+validate are recorded as ``invalid``; a design that raises while running fails the
+whole harness, so such errors never end up in the baseline. Each design runs
+inside a temporary working directory, so the logs, memory files and project
+output it writes never land in the repository.
+
+Usage:
+    python -m benchmarks.harness                     # all suites vs. baseline
+    python -m benchmarks.harness --suite synthetic --only wide_dag
+    python -m benchmarks.harness --update-baseline   # record a new baseline
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import chdir, contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import yaml
+
+from benchmarks.synthetic import SYNTHETIC_SUITE
+from check.check import DesignError, load_config
+from entity.configs import ConfigError
+from entity.graph_config import GraphConfig
+from utils.human_prompt import CliPromptChannel
+from utils.metrics import MODEL_CALL_DURATION, NODE_DURATION, MetricScope, metric_scope
+from workflow.graph import GraphExecutor
+from workflow.graph_context import GraphContext
+from workflow.subgraph_loader import subgraph_root
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+DEFAULT_BASELINE = BENCHMARK_DIR / "baseline.json"
+INSTANCE_DIR = BENCHMARK_DIR.parent / "yaml_instance"
+TASK_PROMPT = "Benchmark task: produce a short answer."
+DEFAULT_TIMEOUT = 30.0
+# How long a timed-out design gets to notice the cancel flag before it is abandoned
+CANCEL_GRACE_SECONDS = 5.0
+
+# Tooling stripped from agents, and memory stores that need an external service
+EXTERNAL_TOOLING_TYPES = {"mcp_local", "mcp_remote"}
+EXTERNAL_MEMORY_TYPES = {"mem0"}
+# Answer to every human prompt; review loops in the designs end on ACCEPT
+HUMAN_REPLY = "ACCEPT"
+
+# Designs reference ${BASE_URL}/${API_KEY}/${MODEL_NAME}; the mock ignores them but they must resolve
+MOCK_ENVIRONMENT = {
+    "BASE_URL": "http://mock.invalid/v1",
+    "API_KEY": "mock",
+    "MODEL_NAME": "mock-model",
+}
+
+# Metrics compared against the baseline, with the absolute slack that absorbs
+# timer noise on very small values.
+COMPARED_METRICS = {
+    "wall_seconds": 0.05,
+    "peak_memory_kb": 512.0,
+    "peak_threads": 2.0,
+}
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    status: str
+    wall_seconds: float = 0.0
+    nodes_executed: int = 0
+    model_calls: int = 0
+    overhead_ms_per_node: float = 0.0
+    nodes_per_second: float = 0.0
+    peak_threads: int = 0
+    peak_memory_kb: float = 0.0
+    error: Optional[str] = None
+    samples: List[float] = field(default_factory=list)
+
+
+class _ThreadSampler:
+    """Track the peak number of threads above the starting count."""
+
+    def __init__(self, interval: float = 0.002) -> None:
+        self.interval = interval
+        self.baseline = threading.active_count()
+        self.peak = self.baseline
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="bench-thread-sampler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, threading.active_count())
+
+    def __enter__(self) -> "_ThreadSampler":
+        # Exclude the sampler and the harness worker thread from the peak
+        self.baseline += 2
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    @property
+    def extra_threads(self) -> int:
+        return max(0, self.peak - self.baseline)
+
+
+def patch_design_for_mock(data: Any, mock_params: Dict[str, Any]) -> Any:
+    """Point agents and memory stores at the mocks, drop MCP tooling and silence per-node logging."""
+    if isinstance(data, list):
+        return [patch_design_for_mock(item, mock_params) for item in data]
+    if not isinstance(data, dict):
+        return data
+
+    patched = {key: patch_design_for_mock(value, mock_params) for key, value in data.items()}
+    if patched.get("type") == "agent" and isinstance(patched.get("config"), dict):
+        config = dict(patched["config"])
+        config["provider"] = "mock"
+        # Some designs leave the model name for the user to fill in
+        config["name"] = config.get("name") or MOCK_ENVIRONMENT["MODEL_NAME"]
+        config.pop("base_url", None)
+        config.pop("api_key", None)
+        config["params"] = dict(mock_params)
+        tooling = config.get("tooling")
+        if isinstance(tooling, list):
+            config["tooling"] = [
+                entry for entry in tooling if not (isinstance(entry, dict) and entry.get("type") in EXTERNAL_TOOLING_TYPES)
+            ]
+        patched["config"] = config
+    embedding = patched.get("embedding")
+    if isinstance(embedding, dict):
+        patched["embedding"] = {"provider": "mock", "model": embedding.get("model") or "mock-embedding"}
+    if "nodes" in patched and "log_level" in patched:
+        patched["log_level"] = "ERROR"
+    return patched
+
+
+def _iter_mappings(data: Any) -> Iterable[Dict[str, Any]]:
+    if isinstance(data, dict):
+        yield data
+        for value in data.values():
+            yield from _iter_mappings(value)
+    elif isinstance(data, list):
+        for item in data:
+            yield from _iter_mappings(item)
+
+
+def unsupported_reason(data: Any) -> Optional[str]:
+    """Explain why a design cannot run offline against the mock, if it cannot."""
+    for mapping in _iter_mappings(data):
+        kind = mapping.get("type")
+        if kind in EXTERNAL_MEMORY_TYPES:
+            return f"{kind} memory needs an external service"
+        config = mapping.get("config")
+        template = config.get("template") if isinstance(config, dict) else None
+        if kind == "template" and isinstance(template, str) and "fromjson" in template:
+            return "template parses model output as JSON, which mock replies are not"
+    return None
+
+
+class _AutoReplyHook:
+    """Workspace hook that only supplies a prompt channel answering every human prompt."""
+
+    def __init__(self) -> None:
+        self.prompt_channel = CliPromptChannel(input_func=lambda _prompt: HUMAN_REPLY)
+
+    def before_node(self, node: Any, workspace: Path) -> None:
+        pass
+
+    def after_node(self, node: Any, workspace: Path, *, success: bool) -> None:
+        pass
+
+
+@contextmanager
+def mock_environment() -> Iterator[None]:
+    """Provide placeholder values for the variables designs expect, restoring the environment after."""
+    missing = {key: value for key, value in MOCK_ENVIRONMENT.items() if key not in os.environ}
+    os.environ.update(missing)
+    try:
+        yield
+    finally:
+        for key in missing:
+            os.environ.pop(key, None)
+
+
+def _execute_design(path: Path, output_root: Path, timeout: float) -> MetricScope:
+    """Run the design once and return the metric tallies of that run alone."""
+    design = load_config(path)
+    graph_config = GraphConfig.from_definition(
+        design.graph,
+        name=path.stem,
+        output_root=output_root,
+        source_path=str(path),
+        vars=design.vars,
+    )
+    context = GraphContext(config=graph_config)
+    cancel_event = threading.Event()
+    outcome: Dict[str, Any] = {}
+
+    def _run() -> None:
+        # Opened in the worker so only this run's nodes and model calls are counted
+        with metric_scope() as scope:
+            outcome["scope"] = scope
+            try:
+                executor = GraphExecutor(
+                    context, cancel_event=cancel_event, workspace_hook_factory=lambda _runtime: _AutoReplyHook()
+                )
+                executor._execute(TASK_PROMPT)
+            except BaseException as exc:
+                outcome["error"] = exc
+
+    # Mock replies never satisfy keyword exits, so open-ended loops are cut off
+    worker = threading.Thread(target=_run, name=f"bench-{path.stem}", daemon=True)
+    worker.start()
+    worker.join(timeout)
+    if worker.is_alive():
+        cancel_event.set()
+        worker.join(CANCEL_GRACE_SECONDS)
+        if worker.is_alive():
+            # The daemon thread is left behind; the harness moves on without it
+            raise TimeoutError(f"did not finish within {timeout:g}s and ignored cancellation")
+        raise TimeoutError(f"did not finish within {timeout:g}s")
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["scope"]
+
+
+def run_design_file(
+    path: Path,
+    *,
+    name: Optional[str] = None,
+    repeat: int = 1,
+    measure_memory: bool = True,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> BenchmarkResult:
+    """Execute one (already mock-patched) design and collect measurements."""
+    path = path.resolve()
+    name = name or path.stem
+    raw = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+    reason = unsupported_reason(raw)
+    if reason:
+        return BenchmarkResult(name=name, status="skipped", error=reason)
+
+    output_root = Path(tempfile.mkdtemp(prefix="bench-out-"))
+    result = BenchmarkResult(name=name, status="ok")
+    try:
+        # Relative log, memory and WareHouse paths resolve inside the temporary directory
+        with chdir(output_root):
+            for _ in range(max(1, repeat)):
+                with _ThreadSampler() as sampler:
+                    started = time.perf_counter()
+                    scope = _execute_design(path, output_root, timeout)
+                    elapsed = time.perf_counter() - started
+                result.samples.append(elapsed)
+                result.nodes_executed = scope.count(NODE_DURATION)
+                result.model_calls = scope.count(MODEL_CALL_DURATION)
+                result.peak_threads = max(result.peak_threads, sampler.extra_threads)
+
+            if measure_memory:
+                # Separate pass: tracemalloc overhead would distort the timings above
+                tracemalloc.start()
+                try:
+                    _execute_design(path, output_root, timeout)
+                    _, peak = tracemalloc.get_traced_memory()
+                finally:
+                    tracemalloc.stop()
+                result.peak_memory_kb = round(peak / 1024, 1)
+    except TimeoutError as exc:
+        result.status = "timeout"
+        result.error = str(exc)
+        return result
+    except Exception as exc:
+        # Validation errors are the design's fault, not the scheduler's
+        result.status = "invalid" if isinstance(exc, (ConfigError, DesignError)) else "error"
+        # Keep messages stable across runs: drop the temporary copy's location
+        first_line = str(exc).splitlines()[0] if str(exc) else ""
+        result.error = f"{exc.__class__.__name__}: {first_line.replace(str(path.parent) + os.sep, '')}"
+        return result
+    finally:
+        shutil.rmtree(output_root, ignore_errors=True)
+
+    result.wall_seconds = round(statistics.median(result.samples), 4)
+    if result.nodes_executed:
+        result.overhead_ms_per_node = round(result.wall_seconds * 1000 / result.nodes_executed, 3)
+    if result.wall_seconds > 0:
+        result.nodes_per_second = round(result.nodes_executed / result.wall_seconds, 1)
+    return result
+
+
+def _write_design(directory: Path, name: str, data: Dict[str, Any]) -> Path:
+    path = directory / f"{name}.yaml"
+    path.write_text(yaml.safe_dump(data, sort_keys=False, allow_unicode=True), encoding="utf-8")
+    return path
+
+
+def run_synthetic_suite(
+    mock_params: Dict[str, Any],
+    *,
+    only: Optional[List[str]] = None,
+    repeat: int = 1,
+    measure_memory: bool = True,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> List[BenchmarkResult]:
+    results = []
+    with tempfile.TemporaryDirectory(prefix="bench-synthetic-") as tmp, mock_environment():
+        for name, factory in SYNTHETIC_SUITE.items():
+            if only and name not in only:
+                continue
+            path = _write_design(Path(tmp), name, factory(mock_params=mock_params))
+            results.append(
+                run_design_file(
+                    path, name=f"synthetic/{name}", repeat=repeat, measure_memory=measure_memory, timeout=timeout
+                )
+            )
+    return results
+
+
+def run_instance_suite(
+    mock_params: Dict[str, Any],
+    *,
+    only: Optional[List[str]] = None,
+    repeat: int = 1,
+    measure_memory: bool = True,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> List[BenchmarkResult]:
+    """Run every top-level ``yaml_instance`` design against a mock-patched copy."""
+    results = []
+    with tempfile.TemporaryDirectory(prefix="bench-instances-") as tmp, mock_environment():
+        # Copy the whole tree and resolve subgraph file references against it,
+        # so subgraph agents run against the mock as well
+        instance_root = Path(tmp) / "yaml_instance"
+        shutil.copytree(INSTANCE_DIR, instance_root)
+        for path in instance_root.rglob("*.yaml"):
+            raw = yaml.safe_load(path.read_text(encoding="utf-8"))
+            path.write_text(
+                yaml.safe_dump(patch_design_for_mock(raw, mock_params), sort_keys=False, allow_unicode=True),
+                encoding="utf-8",
+            )
+        with subgraph_root(instance_root):
+            for path in sorted(instance_root.glob("*.yaml")):
+                if only and path.stem not in only:
+                    continue
+                results.append(
+                    run_design_file(
+                        path,
+                        name=f"instance/{path.stem}",
+                        repeat=repeat,
+                        measure_memory=measure_memory,
+                        timeout=timeout,
+                    )
+                )
+    return results
+
+
+def compare_with_baseline(
+    results: List[BenchmarkResult],
+    baseline: Dict[str, Dict[str, Any]],
+    tolerance: float,
+) -> List[str]:
+    """Return human-readable regression descriptions."""
+    regressions = []
+    for result in results:
+        previous = baseline.get(result.name)
+        if not previous:
+            continue
+        if previous.get("status") == "ok" and result.status != "ok":
+            regressions.append(f"{result.name}: now {result.status} ({result.error})")
+            continue
+        if result.status != "ok":
+            continue
+        for metric, slack in COMPARED_METRICS.items():
+            old = previous.get(metric)
+            new = getattr(result, metric)
+            if not old:
+                continue
+            if new > old * (1 + tolerance) and new - old > slack:
+                regressions.append(f"{result.name}: {metric} {old} -> {new} (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def load_baseline(path: Path) -> Dict[str, Dict[str, Any]]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8")).get("results", {})
+
+
+def save_baseline(path: Path, results: List[BenchmarkResult], mock_params: Dict[str, Any]) -> None:
+    payload = {
+        "python": sys.version.split()[0],
+        "mock_params": mock_params,
+        "results": {
+            result.name: {key: value for key, value in asdict(result).items() if key not in ("name", "samples")}
+            for result in results
+        },
+    }
+    path.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def _print_table(results: List[BenchmarkResult]) -> None:
+    header = f"{'benchmark':<48} {'status':<8} {'wall s':>8} {'nodes':>6} {'ms/node':>8} {'nodes/s':>9} {'threads':>7} {'peak KB':>9}"
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        print(
+            f"{result.name:<48} {result.status:<8} {result.wall_seconds:>8.3f} {result.nodes_executed:>6} "
+            f"{result.overhead_ms_per_node:>8.2f} {result.nodes_per_second:>9.1f} {result.peak_threads:>7} "
+            f"{result.peak_memory_kb:>9.0f}"
+        )
+        if result.error:
+            print(f"    {result.error}")
+
+
+def parse_arguments(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the workflow orchestration layer")
+    parser.add_argument("--suite", choices=("synthetic", "instances", "all"), default="all")
+    parser.add_argument("--only", action="append", default=[], help="Benchmark name to run (repeatable)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark; the median is reported")
+    parser.add_argument("--latency", type=float, default=0.0, help="Constant mock latency per model call in seconds")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="Overwrite the baseline with this run")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown before flagging")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Per-run limit in seconds")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_arguments(argv)
+    mock_params = {"latency": args.latency, "seed": 0}
+    only = args.only or None
+    options = {
+        "only": only,
+        "repeat": args.repeat,
+        "measure_memory": not args.no_memory,
+        "timeout": args.timeout,
+    }
+
+    results: List[BenchmarkResult] = []
+    if args.suite in ("synthetic", "all"):
+        results.extend(run_synthetic_suite(mock_params, **options))
+    if args.suite in ("instances", "all"):
+        results.extend(run_instance_suite(mock_params, **options))
+
+    _print_table(results)
+
+    failures = [result for result in results if result.status == "error"]
+    if failures:
+        # A run that raised measures nothing; never compare or record it
+        print("\nBenchmarks failed:", file=sys.stderr)
+        for result in failures:
+            print(f"  - {result.name}: {result.error}", file=sys.stderr)
+        return 2
+
+    if args.update_baseline:
+        save_baseline(args.baseline, results, mock_params)
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    regressions = compare_with_baseline(results, load_baseline(args.baseline), args.tolerance)
+    if regressions:
+        print("\nRegressions against baseline:")
+        for line in regressions:
+            print(f"  - {line}")
+        return 1
+    print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""Micro-benchmark for keyword edge routing.
+
+Compares evaluating every keyword edge of a router node one by one (each
+manager lowers and scans the text itself) with evaluating them through a
+shared ``KeywordRouter``. Texts contain none of the keywords, the worst case
+for both, since every keyword has to be searched for over the whole text.
+
+Usage:
+    python -m benchmarks.keyword_routing
+    python -m benchmarks.keyword_routing --repeat 10
+"""
+
+import argparse
+import sys
+import time
+from typing import Callable, List, Optional, Tuple
+
+from entity.configs.edge.edge_condition import KeywordEdgeConditionConfig
+from runtime.edge.conditions import KeywordEdgeConditionManager, KeywordRouter
+
+# (edges, keywords per edge, text size in bytes)
+SCENARIOS: List[Tuple[int, int, int]] = [
+    (10, 3, 10_000),
+    (30, 3, 100_000),
+    (50, 3, 1_000_000),
+]
+
+
+def build_configs(edges: int, keywords: int, case_sensitive: bool) -> List[KeywordEdgeConditionConfig]:
+    return [
+        KeywordEdgeConditionConfig.from_dict(
+            {
+                "any": [f"Verdict{edge}-{idx}" for idx in range(keywords)],
+                "none": ["ABORT"],
+                "case_sensitive": case_sensitive,
+            },
+            path=f"edges[{edge}].condition",
+        )
+        for edge in range(edges)
+    ]
+
+
+def build_text(size: int) -> str:
+    sentence = "The reviewers discussed the dosage and the follow-up plan at length. "
+    return (sentence * (size // len(sentence) + 1))[:size]
+
+
+def _best_of(repeat: int, func: Callable[[], object]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run_scenario(edges: int, keywords: int, size: int, case_sensitive: bool, repeat: int) -> Tuple[float, float]:
+    """Return the best per-edge and routed timings, in seconds, for one output."""
+    configs = build_configs(edges, keywords, case_sensitive)
+    text = build_text(size)
+    managers = [KeywordEdgeConditionManager(config, None, None) for config in configs]
+
+    def per_edge() -> List[bool]:
+        return [manager._evaluate(text) for manager in managers]
+
+    def routed() -> List[bool]:
+        # A fresh router per output, as a new text always misses the router's cache
+        router = KeywordRouter(configs)
+        return [router.evaluate(idx, text) for idx in range(len(router))]
+
+    if per_edge() != routed():
+        raise AssertionError("router and per-edge evaluation disagree")
+    return _best_of(repeat, per_edge), _best_of(repeat, routed)
+
+
+def parse_arguments(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark keyword edge routing")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per scenario; the best is reported")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_arguments(argv)
+    header = f"{'edges':>5} {'kw/edge':>7} {'text KB':>8} {'case':<11} {'per-edge ms':>11} {'router ms':>10} {'speedup':>8}"
+    print(header)
+    print("-" * len(header))
+    for edges, keywords, size in SCENARIOS:
+        for case_sensitive in (False, True):
+            per_edge, routed = run_scenario(edges, keywords, size, case_sensitive, args.repeat)
+            print(
+                f"{edges:>5} {keywords:>7} {size / 1000:>8.0f} {'sensitive' if case_sensitive else 'insensitive':<11} "
+                f"{per_edge * 1000:>11.2f} {routed * 1000:>10.2f} {per_edge / routed:>7.1f}x"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
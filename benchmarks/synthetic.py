@@ -0,0 +1,186 @@
+"""Synthetic workflow designs that stress specific scheduler paths.
+
+Each generator returns a design mapping in the same shape as the files under
+``yaml_instance/``. Agent nodes use the ``mock`` provider with the supplied
+``mock_params``, so the designs run offline and the harness measures
+orchestration cost rather than model latency.
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+
+MOCK_MODEL = "mock-model"
+
+
+def _agent(node_id: str, mock_params: Optional[Dict[str, Any]] = None, **extra: Any) -> Dict[str, Any]:
+    node = {
+        "id": node_id,
+        "type": "agent",
+        "config": {
+            "provider": "mock",
+            "name": MOCK_MODEL,
+            "role": f"You are benchmark agent {node_id}.",
+            "params": dict(mock_params or {}),
+        },
+    }
+    node.update(extra)
+    return node
+
+
+def _literal(node_id: str, content: str) -> Dict[str, Any]:
+    return {"id": node_id, "type": "literal", "config": {"content": content, "role": "user"}}
+
+
+def _edge(source: str, target: str, **extra: Any) -> Dict[str, Any]:
+    edge = {"from": source, "to": target}
+    edge.update(extra)
+    return edge
+
+
+def _design(graph_id: str, nodes: List[Dict[str, Any]], edges: List[Dict[str, Any]], start: List[str]) -> Dict[str, Any]:
+    return {
+        "version": "0.4.0",
+        "vars": {},
+        "graph": {
+            "id": graph_id,
+            "description": f"Synthetic benchmark graph {graph_id}",
+            "log_level": "ERROR",
+            "is_majority_voting": False,
+            "start": start,
+            "nodes": nodes,
+            "edges": edges,
+        },
+    }
+
+
+def wide_dag(width: int = 64, mock_params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """One source fanning out to ``width`` agents that all join into a sink."""
+    nodes = [_agent("source", mock_params), _agent("sink", mock_params)]
+    edges = []
+    for idx in range(width):
+        worker = f"worker_{idx}"
+        nodes.append(_agent(worker, mock_params))
+        edges.append(_edge("source", worker))
+        edges.append(_edge(worker, "sink"))
+    return _design(f"wide_dag_{width}", nodes, edges, ["source"])
+
+
+def deep_chain(depth: int = 128, mock_params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """A single path of ``depth`` agents."""
+    nodes = [_agent(f"step_{idx}", mock_params) for idx in range(depth)]
+    edges = [_edge(f"step_{idx}", f"step_{idx + 1}") for idx in range(depth - 1)]
+    return _design(f"deep_chain_{depth}", nodes, edges, ["step_0"])
+
+
+def nested_cycles(
+    outer_iterations: int = 4,
+    inner_iterations: int = 4,
+    mock_params: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """An inner writer/critic loop nested inside an outer review loop."""
+    nodes = [
+        _agent("writer", mock_params),
+        _agent("critic", mock_params),
+        {
+            "id": "inner_gate",
+            "type": "loop_counter",
+            "config": {"max_iterations": inner_iterations, "reset_on_emit": True},
+        },
+        _agent("reviewer", mock_params),
+        {
+            "id": "outer_gate",
+            "type": "loop_counter",
+            "config": {"max_iterations": outer_iterations, "reset_on_emit": True},
+        },
+        _agent("final", mock_params),
+    ]
+    edges = [
+        _edge("writer", "critic"),
+        _edge("critic", "writer"),
+        _edge("critic", "inner_gate"),
+        _edge("inner_gate", "reviewer"),
+        _edge("reviewer", "writer"),
+        _edge("reviewer", "outer_gate"),
+        _edge("outer_gate", "final"),
+    ]
+    return _design(f"nested_cycles_{outer_iterations}x{inner_iterations}", nodes, edges, ["writer"])
+
+
+def _fanout(graph_id: str, units: int, dynamic: Dict[str, Any], mock_params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    nodes = [{"id": "collect", "type": "passthrough", "config": {"only_last_message": False}}]
+    edges = []
+    start = []
+    for idx in range(units):
+        source = f"item_{idx}"
+        nodes.append(_literal(source, f"Benchmark work item {idx}"))
+        edges.append(_edge(source, "collect"))
+        start.append(source)
+    nodes.append(_agent("fan", mock_params))
+    nodes.append(_agent("sink", mock_params))
+    edges.append(_edge("collect", "fan", dynamic=dynamic))
+    edges.append(_edge("fan", "sink"))
+    return _design(graph_id, nodes, edges, start)
+
+
+def map_fanout(units: int = 64, max_parallel: int = 16, mock_params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """``units`` messages mapped over one agent with a dynamic map edge."""
+    dynamic = {"type": "map", "split": {"type": "message"}, "config": {"max_parallel": max_parallel}}
+    return _fanout(f"map_fanout_{units}", units, dynamic, mock_params)
+
+
+def tree_fanout(
+    units: int = 64,
+    group_size: int = 4,
+    max_parallel: int = 16,
+    mock_params: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """``units`` messages reduced by a dynamic tree edge."""
+    dynamic = {
+        "type": "tree",
+        "split": {"type": "message"},
+        "config": {"group_size": group_size, "max_parallel": max_parallel},
+    }
+    return _fanout(f"tree_fanout_{units}", units, dynamic, mock_params)
+
+
+def subgraph_heavy(
+    count: int = 16,
+    inner_depth: int = 3,
+    mock_params: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """A chain of ``count`` inline subgraphs, each an ``inner_depth`` agent chain."""
+    nodes = []
+    edges = []
+    for idx in range(count):
+        inner_nodes = [_agent(f"inner_{step}", mock_params) for step in range(inner_depth)]
+        inner_edges = [_edge(f"inner_{step}", f"inner_{step + 1}") for step in range(inner_depth - 1)]
+        nodes.append(
+            {
+                "id": f"sub_{idx}",
+                "type": "subgraph",
+                "config": {
+                    "type": "config",
+                    "config": {
+                        "id": f"sub_{idx}",
+                        "description": "Synthetic subgraph",
+                        "log_level": "ERROR",
+                        "is_majority_voting": False,
+                        "start": ["inner_0"],
+                        "nodes": inner_nodes,
+                        "edges": inner_edges,
+                    },
+                },
+            }
+        )
+        if idx:
+            edges.append(_edge(f"sub_{idx - 1}", f"sub_{idx}"))
+    return _design(f"subgraph_heavy_{count}", nodes, edges, ["sub_0"])
+
+
+SYNTHETIC_SUITE: Dict[str, Callable[..., Dict[str, Any]]] = {
+    "wide_dag": wide_dag,
+    "deep_chain": deep_chain,
+    "nested_cycles": nested_cycles,
+    "map_fanout": map_fanout,
+    "tree_fanout": tree_fanout,
+    "subgraph_heavy": subgraph_heavy,
+}
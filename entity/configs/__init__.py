@@ -13,7 +13,7 @@ from .edge.edge_processor import (
     RegexEdgeProcessorConfig,
     FunctionEdgeProcessorConfig,
 )
-from .graph import DesignConfig, GraphDefinition
+from .graph import DesignConfig, GraphDefinition, MajorityVoteConfig
 from .node.memory import (
     BlackboardMemoryConfig,
     EmbeddingConfig,
@@ -24,7 +24,7 @@ from .node.memory import (
     MemoryStoreConfig,
     SimpleMemoryConfig,
 )
-from .node.agent import AgentConfig, AgentRetryConfig
+from .node.agent import AgentConfig, AgentContextConfig, AgentRetryConfig
 from .node.human import HumanConfig
 from .node.subgraph import SubgraphConfig
 from .node.node import EdgeLink, Node
@@ -41,6 +41,7 @@ from .node.tooling import (
 
 __all__ = [
     "AgentConfig",
+    "AgentContextConfig",
     "AgentRetryConfig",
     "AgentSkillsConfig",
     "BaseConfig",
@@ -54,6 +55,7 @@ __all__ = [
     "FunctionEdgeProcessorConfig",
     "FunctionEdgeConditionConfig",
     "KeywordEdgeConditionConfig",
+    "MajorityVoteConfig",
     "BlackboardMemoryConfig",
     "EmbeddingConfig",
     "FileMemoryConfig",
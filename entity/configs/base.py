@@ -274,3 +274,20 @@ def extend_path(path: str, suffix: str) -> str:
     if suffix.startswith("["):
         return f"{path}{suffix}"
     return f"{path}.{suffix}"
+
+
+def config_fingerprint(value: Any) -> Any:
+    """Reduce a config tree to JSON-friendly data covering only declared fields.
+
+    Equal fingerprints mean equal configs, so callers can key caches on the
+    content of a config instead of its identity.
+    """
+    if isinstance(value, BaseConfig):
+        return {name: config_fingerprint(getattr(value, name, None)) for name in sorted(value.field_specs())}
+    if isinstance(value, Mapping):
+        return {str(key): config_fingerprint(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [config_fingerprint(item) for item in value]
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
@@ -370,6 +370,9 @@ class SplitConfig(BaseConfig):
         return None
 
 
+MAP_FAILURE_POLICIES = ("fail_fast", "skip_failed")
+
+
 @dataclass
 class MapDynamicConfig(BaseConfig):
     """Configuration for Map dynamic mode (fan-out only).
@@ -378,8 +381,16 @@ class MapDynamicConfig(BaseConfig):
     
     Attributes:
         max_parallel: Maximum concurrent executions
+        failure_policy: ``fail_fast`` aborts the map on the first failed unit;
+            ``skip_failed`` drops failed units and keeps the rest
+        retry_n: Extra attempts per unit before the failure policy applies
+        resume: Persist unit outputs under the session directory and reuse
+            them when the node runs again with identical unit inputs
     """
     max_parallel: int = 10
+    failure_policy: str = "fail_fast"
+    retry_n: int = 0
+    resume: bool = False
 
     FIELD_SPECS = {
         "max_parallel": ConfigFieldSpec(
@@ -390,6 +401,42 @@ class MapDynamicConfig(BaseConfig):
             default=10,
             description="Maximum number of parallel executions",
         ),
+        "failure_policy": ConfigFieldSpec(
+            name="failure_policy",
+            display_name="Failure Policy",
+            type_hint="str",
+            required=False,
+            default="fail_fast",
+            advance=True,
+            description="What to do when a unit still fails after its retries",
+            enum=list(MAP_FAILURE_POLICIES),
+            enum_options=enum_options_from_values(
+                list(MAP_FAILURE_POLICIES),
+                {
+                    "fail_fast": "Stop the map and raise the first unit error",
+                    "skip_failed": "Drop failed units and continue with the successful ones",
+                },
+            ),
+        ),
+        "retry_n": ConfigFieldSpec(
+            name="retry_n",
+            display_name="Unit Retries",
+            type_hint="int",
+            required=False,
+            default=0,
+            advance=True,
+            description="Number of extra attempts for a failing unit before the failure policy applies",
+        ),
+        "resume": ConfigFieldSpec(
+            name="resume",
+            display_name="Resume Completed Units",
+            type_hint="bool",
+            required=False,
+            default=False,
+            advance=True,
+            description="Save each unit's outputs in the session directory and reuse them when the "
+            "node reruns with the same unit inputs, so a rerun only pays for failed units",
+        ),
     }
 
     @classmethod
@@ -398,7 +445,23 @@ class MapDynamicConfig(BaseConfig):
             return cls(path=path)
         mapping = require_mapping(data, path)
         max_parallel = int(mapping.get("max_parallel", 10))
-        return cls(max_parallel=max_parallel, path=path)
+        failure_policy = str(mapping.get("failure_policy", "fail_fast"))
+        if failure_policy not in MAP_FAILURE_POLICIES:
+            raise ConfigError(
+                f"failure_policy must be one of {list(MAP_FAILURE_POLICIES)}",
+                extend_path(path, "failure_policy"),
+            )
+        retry_n = int(mapping.get("retry_n", 0))
+        if retry_n < 0:
+            raise ConfigError("retry_n must be >= 0", extend_path(path, "retry_n"))
+        resume = bool(optional_bool(mapping, "resume", path, default=False))
+        return cls(
+            max_parallel=max_parallel,
+            failure_policy=failure_policy,
+            retry_n=retry_n,
+            resume=resume,
+            path=path,
+        )
 
 
 @dataclass
@@ -408,9 +471,12 @@ class TreeDynamicConfig(BaseConfig):
     Attributes:
         group_size: Number of items per group in reduction
         max_parallel: Maximum concurrent executions per layer
+        eager: Launch a reducer as soon as ``group_size`` results are ready
+            instead of waiting for the whole layer
     """
     group_size: int = 3
     max_parallel: int = 10
+    eager: bool = False
 
     FIELD_SPECS = {
         "group_size": ConfigFieldSpec(
@@ -429,6 +495,17 @@ class TreeDynamicConfig(BaseConfig):
             default=10,
             description="Maximum concurrent executions per layer",
         ),
+        "eager": ConfigFieldSpec(
+            name="eager",
+            display_name="Eager Reduction",
+            type_hint="bool",
+            required=False,
+            default=False,
+            advance=True,
+            description="Start reducing as soon as group_size results are ready from any layer "
+            "instead of waiting for each layer to finish. Combine with the edge's ordered flag "
+            "to only merge adjacent results.",
+        ),
     }
 
     @classmethod
@@ -440,4 +517,5 @@ class TreeDynamicConfig(BaseConfig):
         if group_size < 2:
             raise ConfigError("group_size must be at least 2", extend_path(path, "group_size"))
         max_parallel = int(mapping.get("max_parallel", 10))
-        return cls(group_size=group_size, max_parallel=max_parallel, path=path)
+        eager = bool(optional_bool(mapping, "eager", path, default=False))
+        return cls(group_size=group_size, max_parallel=max_parallel, eager=eager, path=path)
@@ -9,6 +9,7 @@ from entity.configs.base import (
     ConfigFieldSpec,
     ChildKey,
     extend_path,
+    optional_bool,
     require_mapping,
     require_str,
 )
@@ -63,10 +64,18 @@ class DynamicEdgeConfig(BaseConfig):
         type: Dynamic mode type (map or tree)
         split: How to split the payload passing through this edge
         config: Mode-specific configuration (MapDynamicConfig or TreeDynamicConfig)
+        stream: Map mode only. Forward each unit's outputs downstream as soon
+            as the unit finishes, and start the target's units on items from an
+            upstream streaming map while its stragglers are still running.
+        ordered: Keep split order. Streaming maps release outputs in split
+            order (buffering early finishers); eager trees only merge adjacent
+            results. When false, completion order is used.
     """
     type: str
     split: SplitConfig = field(default_factory=lambda: SplitConfig())
     config: BaseConfig | None = None
+    stream: bool = False
+    ordered: bool = True
 
     FIELD_SPECS = {
         "type": ConfigFieldSpec(
@@ -91,6 +100,27 @@ class DynamicEdgeConfig(BaseConfig):
             required=False,
             description="Mode-specific configuration",
         ),
+        "stream": ConfigFieldSpec(
+            name="stream",
+            display_name="Stream Results",
+            type_hint="bool",
+            required=False,
+            default=False,
+            advance=True,
+            description="Map mode only: pass each unit's outputs to downstream edges as soon as it completes. "
+            "A downstream map edge that also streams starts its units on early items; any other edge "
+            "acts as a barrier and waits for the whole map.",
+        ),
+        "ordered": ConfigFieldSpec(
+            name="ordered",
+            display_name="Preserve Order",
+            type_hint="bool",
+            required=False,
+            default=True,
+            advance=True,
+            description="Keep split order: streaming maps emit outputs in split order and eager trees only "
+            "merge adjacent results (true), or both follow completion order (false)",
+        ),
     }
 
     @classmethod
@@ -140,8 +170,20 @@ class DynamicEdgeConfig(BaseConfig):
         config_path = extend_path(path, "config")
         
         config = config_cls.from_dict(config_data, path=config_path)
-        
-        return cls(type=dynamic_type, split=split, config=config, path=path)
+
+        stream = bool(optional_bool(mapping, "stream", path, default=False))
+        if stream and dynamic_type != "map":
+            raise ConfigError("stream is only supported for map edges", extend_path(path, "stream"))
+        ordered = bool(optional_bool(mapping, "ordered", path, default=True))
+
+        return cls(
+            type=dynamic_type,
+            split=split,
+            config=config,
+            stream=stream,
+            ordered=ordered,
+            path=path,
+        )
 
     def is_map(self) -> bool:
         return self.type == "map"
@@ -5,7 +5,7 @@ from collections import Counter
 from typing import Any, Dict, List, Mapping
 
 from entity.enums import LogLevel
-from entity.enum_options import enum_options_for
+from entity.enum_options import enum_options_for, enum_options_from_values
 
 from .base import (
     BaseConfig,
@@ -19,17 +19,166 @@ from .base import (
     extend_path,
 )
 from .edge import EdgeConfig
-from entity.configs.node.memory import MemoryStoreConfig
+from entity.configs.node.memory import EmbeddingConfig, MemoryStoreConfig
 from entity.configs.node.agent import AgentConfig
 from entity.configs.node.node import Node
 
 
+VOTE_CLUSTERING = ("exact", "normalized", "embedding")
+
+
+def _optional_positive_int(mapping: Mapping[str, Any], key: str, path: str) -> int | None:
+    value = mapping.get(key)
+    if value is None:
+        return None
+    if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+        raise ConfigError(f"{key} must be a positive integer", extend_path(path, key))
+    return value
+
+
+@dataclass
+class MajorityVoteConfig(BaseConfig):
+    """Tallying options for majority-voting graphs.
+
+    Attributes:
+        early_stop: Stop waiting for voters once the winner can no longer change
+            (or ``quorum`` voters agree); queued voters are cancelled and
+            voters still running stop before their next model or tool step
+        quorum: Number of agreeing votes that settles the vote early. Defaults
+            to, and must be at least, a strict majority of the voters, so a
+            quorum always means no other answer can still win
+        max_parallel: Voters run at the same time; later voters only start
+            when an earlier one finishes, so an early stop never pays for them.
+            Defaults to all voters at once, where an early stop saves latency
+            but only the tokens of steps the running voters have not reached
+        clustering: How answers are grouped before counting
+        similarity_threshold: Cosine similarity at which two answers count as
+            the same vote when ``clustering`` is ``embedding``
+        embedding: Embedding model used by ``embedding`` clustering
+    """
+
+    early_stop: bool = False
+    quorum: int | None = None
+    max_parallel: int | None = None
+    clustering: str = "exact"
+    similarity_threshold: float = 0.9
+    embedding: EmbeddingConfig | None = None
+
+    FIELD_SPECS = {
+        "early_stop": ConfigFieldSpec(
+            name="early_stop",
+            display_name="Early Stop",
+            type_hint="bool",
+            required=False,
+            default=False,
+            description="Return as soon as the vote is decided instead of waiting for every voter",
+        ),
+        "quorum": ConfigFieldSpec(
+            name="quorum",
+            display_name="Quorum",
+            type_hint="int",
+            required=False,
+            description="Agreeing votes that settle the vote early (a strict majority or more; defaults to a strict majority)",
+            advance=True,
+        ),
+        "max_parallel": ConfigFieldSpec(
+            name="max_parallel",
+            display_name="Max Parallel Voters",
+            type_hint="int",
+            required=False,
+            description="Maximum number of voters running at once (defaults to all of them, which limits what an early stop saves in tokens)",
+            advance=True,
+        ),
+        "clustering": ConfigFieldSpec(
+            name="clustering",
+            display_name="Answer Clustering",
+            type_hint="str",
+            required=False,
+            default="exact",
+            description="How answers are grouped into votes",
+            enum=list(VOTE_CLUSTERING),
+            enum_options=enum_options_from_values(
+                list(VOTE_CLUSTERING),
+                {
+                    "exact": "Identical output text",
+                    "normalized": "Same text after case folding and whitespace/punctuation cleanup",
+                    "embedding": "Embedding cosine similarity above the threshold",
+                },
+            ),
+            advance=True,
+        ),
+        "similarity_threshold": ConfigFieldSpec(
+            name="similarity_threshold",
+            display_name="Similarity Threshold",
+            type_hint="float",
+            required=False,
+            default=0.9,
+            description="Cosine similarity at which two answers are the same vote (embedding clustering)",
+            advance=True,
+        ),
+        "embedding": ConfigFieldSpec(
+            name="embedding",
+            display_name="Embedding",
+            type_hint="EmbeddingConfig",
+            required=False,
+            description="Embedding model for embedding clustering",
+            child=EmbeddingConfig,
+            advance=True,
+        ),
+    }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any] | None, *, path: str) -> "MajorityVoteConfig":
+        if data is None:
+            return cls(path=path)
+        mapping = require_mapping(data, path)
+        early_stop = bool(optional_bool(mapping, "early_stop", path, default=False))
+
+        quorum = _optional_positive_int(mapping, "quorum", path)
+        max_parallel = _optional_positive_int(mapping, "max_parallel", path)
+
+        clustering = str(mapping.get("clustering", "exact"))
+        if clustering not in VOTE_CLUSTERING:
+            raise ConfigError(
+                f"clustering must be one of {list(VOTE_CLUSTERING)}",
+                extend_path(path, "clustering"),
+            )
+        similarity_threshold = mapping.get("similarity_threshold", 0.9)
+        if (
+            not isinstance(similarity_threshold, (int, float))
+            or isinstance(similarity_threshold, bool)
+            or not 0.0 < similarity_threshold <= 1.0
+        ):
+            raise ConfigError(
+                "similarity_threshold must be in (0, 1]",
+                extend_path(path, "similarity_threshold"),
+            )
+        embedding = None
+        if mapping.get("embedding") is not None:
+            embedding = EmbeddingConfig.from_dict(mapping["embedding"], path=extend_path(path, "embedding"))
+        if clustering == "embedding" and embedding is None:
+            raise ConfigError(
+                "embedding clustering requires an embedding config",
+                extend_path(path, "embedding"),
+            )
+        return cls(
+            early_stop=early_stop,
+            quorum=quorum,
+            max_parallel=max_parallel,
+            clustering=clustering,
+            similarity_threshold=float(similarity_threshold),
+            embedding=embedding,
+            path=path,
+        )
+
+
 @dataclass
 class GraphDefinition(BaseConfig):
     id: str | None
     description: str | None
     log_level: LogLevel
     is_majority_voting: bool
+    majority_vote: MajorityVoteConfig | None = None
     nodes: List[Node] = field(default_factory=list)
     edges: List[EdgeConfig] = field(default_factory=list)
     memory: List[MemoryStoreConfig] | None = None
@@ -73,6 +222,15 @@ class GraphDefinition(BaseConfig):
             description="Whether this is a majority voting graph",
             advance=True,
         ),
+        "majority_vote": ConfigFieldSpec(
+            name="majority_vote",
+            display_name="Majority Vote Options",
+            type_hint="MajorityVoteConfig",
+            required=False,
+            description="Early stopping and answer clustering for majority voting graphs",
+            child=MajorityVoteConfig,
+            advance=True,
+        ),
         "nodes": ConfigFieldSpec(
             name="nodes",
             display_name="Node List",
@@ -155,6 +313,16 @@ class GraphDefinition(BaseConfig):
             ) from exc
 
         is_majority = optional_bool(mapping, "is_majority_voting", path, default=False)
+        majority_vote = None
+        if mapping.get("majority_vote") is not None:
+            if not is_majority:
+                raise ConfigError(
+                    "majority_vote requires is_majority_voting: true",
+                    extend_path(path, "majority_vote"),
+                )
+            majority_vote = MajorityVoteConfig.from_dict(
+                mapping["majority_vote"], path=extend_path(path, "majority_vote")
+            )
         organization = optional_str(mapping, "organization", path)
         initial_instruction = optional_str(mapping, "initial_instruction", path)
 
@@ -216,6 +384,7 @@ class GraphDefinition(BaseConfig):
             description=description,
             log_level=log_level,
             is_majority_voting=bool(is_majority) if is_majority is not None else False,
+            majority_vote=majority_vote,
             nodes=nodes,
             edges=edges,
             memory=memory_cfg,
@@ -237,6 +406,18 @@ class GraphDefinition(BaseConfig):
             raise ConfigError(f"duplicate node ids detected: {dup_list}", extend_path(self.path, "nodes"))
 
         node_set = set(node_ids)
+        if self.majority_vote and self.majority_vote.quorum:
+            quorum, voters = self.majority_vote.quorum, len(node_ids)
+            if quorum > voters:
+                raise ConfigError(
+                    f"quorum {quorum} exceeds the number of voters ({voters})",
+                    extend_path(self.path, "majority_vote.quorum"),
+                )
+            if quorum < voters // 2 + 1:
+                raise ConfigError(
+                    f"quorum {quorum} is below a strict majority of the {voters} voters ({voters // 2 + 1})",
+                    extend_path(self.path, "majority_vote.quorum"),
+                )
         for start_node in self.start_nodes:
             if start_node not in node_set:
                 raise ConfigError(
@@ -1,6 +1,6 @@
 """Node config conveniences."""
 
-from .agent import AgentConfig, AgentRetryConfig
+from .agent import AgentConfig, AgentContextConfig, AgentRetryConfig
 from .human import HumanConfig
 from .subgraph import SubgraphConfig
 from .passthrough import PassthroughConfig
@@ -11,6 +11,7 @@ from .literal import LiteralNodeConfig
 
 __all__ = [
     "AgentConfig",
+    "AgentContextConfig",
     "AgentRetryConfig",
     "AgentSkillsConfig",
     "HumanConfig",
@@ -30,6 +30,7 @@ from .thinking import ThinkingConfig
 from entity.configs.node.tooling import ToolingConfig
 
 
+CONTEXT_STRATEGIES = ("summarize", "digest")
 DEFAULT_RETRYABLE_STATUS_CODES = [408, 409, 425, 429, 500, 502, 503, 504]
 DEFAULT_RETRYABLE_EXCEPTION_TYPES = [
     "RateLimitError",
@@ -363,6 +364,96 @@ class AgentRetryConfig(BaseConfig):
             stack.extend(linked)
 
 
+@dataclass
+class AgentContextConfig(BaseConfig):
+    max_tokens: int
+    keep_recent: int = 4
+    strategy: str = "summarize"
+    summary_tokens: int = 512
+
+    FIELD_SPECS = {
+        "max_tokens": ConfigFieldSpec(
+            name="max_tokens",
+            display_name="Token Budget",
+            type_hint="int",
+            required=True,
+            description="Prompt size (in tokens) above which older turns are compacted",
+        ),
+        "keep_recent": ConfigFieldSpec(
+            name="keep_recent",
+            display_name="Keep Recent Turns",
+            type_hint="int",
+            required=False,
+            default=4,
+            description="Newest turns (a message, or a tool call with its results) that are never compacted",
+            advance=True,
+        ),
+        "strategy": ConfigFieldSpec(
+            name="strategy",
+            display_name="Compaction Strategy",
+            type_hint="str",
+            required=False,
+            default="summarize",
+            description="How compacted turns are condensed",
+            enum=list(CONTEXT_STRATEGIES),
+            enum_options=[
+                EnumOption(
+                    value="summarize",
+                    label="Summarize",
+                    description="Ask the node's model for a summary of the compacted turns",
+                ),
+                EnumOption(
+                    value="digest",
+                    label="Digest",
+                    description="Keep the first line of each compacted turn, without a model call",
+                ),
+            ],
+            advance=True,
+        ),
+        "summary_tokens": ConfigFieldSpec(
+            name="summary_tokens",
+            display_name="Summary Tokens",
+            type_hint="int",
+            required=False,
+            default=512,
+            description="Approximate size limit of the running summary",
+            advance=True,
+        ),
+    }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any], *, path: str) -> "AgentContextConfig":
+        mapping = require_mapping(data, path)
+        max_tokens = _coerce_positive_int(
+            mapping.get("max_tokens"), field_path=extend_path(path, "max_tokens")
+        )
+        keep_recent = _coerce_positive_int(
+            mapping.get("keep_recent", 4), field_path=extend_path(path, "keep_recent")
+        )
+        strategy = optional_str(mapping, "strategy", path) or "summarize"
+        if strategy not in CONTEXT_STRATEGIES:
+            raise ConfigError(
+                f"strategy must be one of: {', '.join(CONTEXT_STRATEGIES)}",
+                extend_path(path, "strategy"),
+            )
+        summary_tokens = _coerce_positive_int(
+            mapping.get("summary_tokens", 512),
+            field_path=extend_path(path, "summary_tokens"),
+        )
+        if summary_tokens >= max_tokens:
+            raise ConfigError(
+                "summary_tokens must be smaller than max_tokens",
+                extend_path(path, "summary_tokens"),
+            )
+        return cls(
+            max_tokens=max_tokens,
+            keep_recent=keep_recent,
+            strategy=strategy,
+            summary_tokens=summary_tokens,
+            path=path,
+        )
+
+
 @dataclass
 class AgentConfig(BaseConfig):
     provider: str
@@ -377,6 +468,7 @@ class AgentConfig(BaseConfig):
     thinking: ThinkingConfig | None = None
     memories: List[MemoryAttachmentConfig] = field(default_factory=list)
     skills: AgentSkillsConfig | None = None
+    context: AgentContextConfig | None = None
 
     # Runtime attributes (attached dynamically)
     token_tracker: Any | None = field(default=None, init=False, repr=False)
@@ -457,6 +549,12 @@ class AgentConfig(BaseConfig):
         if "skills" in mapping and mapping["skills"] is not None:
             skills_cfg = AgentSkillsConfig.from_dict(mapping["skills"], path=extend_path(path, "skills"))
 
+        context_cfg = None
+        if "context" in mapping and mapping["context"] is not None:
+            context_cfg = AgentContextConfig.from_dict(
+                mapping["context"], path=extend_path(path, "context")
+            )
+
         return cls(
             provider=provider,
             base_url=base_url,
@@ -469,6 +567,7 @@ class AgentConfig(BaseConfig):
             memories=memories_cfg,
             skills=skills_cfg,
             retry=retry_cfg,
+            context=context_cfg,
             input_mode=input_mode,
             path=path,
         )
@@ -579,6 +678,15 @@ class AgentConfig(BaseConfig):
             child=AgentRetryConfig,
             advance=True,
         ),
+        "context": ConfigFieldSpec(
+            name="context",
+            display_name="Context Budget",
+            type_hint="AgentContextConfig",
+            required=False,
+            description="Token budget for the prompt; older turns are compacted into a running summary",
+            child=AgentContextConfig,
+            advance=True,
+        ),
     }
 
     @classmethod
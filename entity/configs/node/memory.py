@@ -16,6 +16,7 @@ from entity.configs.base import (
     ConfigError,
     ConfigFieldSpec,
     ChildKey,
+    EnumOption,
     ensure_list,
     optional_dict,
     optional_str,
@@ -24,6 +25,8 @@ from entity.configs.base import (
     extend_path,
 )
 
+MEMORY_DURABILITY_MODES = ("async", "sync", "on_finish")
+
 
 @dataclass
 class EmbeddingConfig(BaseConfig):
@@ -391,6 +394,7 @@ class MemoryStoreConfig(BaseConfig):
     name: str
     type: str
     config: BaseConfig | None = None
+    durability: str = "async"
 
     @classmethod
     def from_dict(cls, data: Mapping[str, Any], *, path: str) -> "MemoryStoreConfig":
@@ -413,7 +417,20 @@ class MemoryStoreConfig(BaseConfig):
         config_obj = schema.config_cls.from_dict(
             mapping["config"], path=extend_path(path, "config")
         )
-        return cls(name=name, type=store_type, config=config_obj, path=path)
+
+        durability = optional_str(mapping, "durability", path) or "async"
+        if durability not in MEMORY_DURABILITY_MODES:
+            raise ConfigError(
+                f"durability must be one of: {', '.join(MEMORY_DURABILITY_MODES)}",
+                extend_path(path, "durability"),
+            )
+        return cls(
+            name=name,
+            type=store_type,
+            config=config_obj,
+            durability=durability,
+            path=path,
+        )
 
     def require_payload(self) -> BaseConfig:
         if not self.config:
@@ -444,6 +461,33 @@ class MemoryStoreConfig(BaseConfig):
             required=True,
             description="Schema required by the selected store type (simple/file/blackboard/etc.), following that type's required keys.",
         ),
+        "durability": ConfigFieldSpec(
+            name="durability",
+            display_name="Write Durability",
+            type_hint="str",
+            required=False,
+            default="async",
+            description="When agent writes reach the store. Updates run on a background queue unless set to 'sync'.",
+            enum=list(MEMORY_DURABILITY_MODES),
+            enum_options=[
+                EnumOption(
+                    value="async",
+                    label="Async",
+                    description="Update and save in the background after each write",
+                ),
+                EnumOption(
+                    value="sync",
+                    label="Sync",
+                    description="Update and save before the node finishes",
+                ),
+                EnumOption(
+                    value="on_finish",
+                    label="On Finish",
+                    description="Update in the background, save when the workflow finishes",
+                ),
+            ],
+            advance=True,
+        ),
     }
 
     @classmethod
@@ -43,7 +43,6 @@ class EdgeLink:
     condition_config: EdgeConditionConfig | None = None
     condition_type: str | None = None
     condition_metadata: Dict[str, Any] = field(default_factory=dict)
-    triggered: bool = False
     carry_data: bool = True
     keep_message: bool = False
     clear_context: bool = False
@@ -54,10 +53,28 @@ class EdgeLink:
     process_metadata: Dict[str, Any] = field(default_factory=dict)
     payload_processor: Any = None
     dynamic_config: DynamicEdgeConfig | None = None
+    source: Optional["Node"] = field(default=None, repr=False)
+    # Trigger state: a slot in the target's trigger array once the target has
+    # indexed its incoming edges, otherwise the plain flag below
+    _trigger_slot: int = field(default=-1, repr=False)
+    _triggered: bool = field(default=False, repr=False)
 
     def __post_init__(self) -> None:
         self.config = dict(self.config or {})
 
+    @property
+    def triggered(self) -> bool:
+        if self._trigger_slot >= 0:
+            return bool(self.target._trigger_flags[self._trigger_slot])
+        return self._triggered
+
+    @triggered.setter
+    def triggered(self, value: bool) -> None:
+        if self._trigger_slot >= 0:
+            self.target._trigger_flags[self._trigger_slot] = 1 if value else 0
+        else:
+            self._triggered = bool(value)
+
 
 @dataclass
 class Node(BaseConfig):
@@ -78,6 +95,11 @@ class Node(BaseConfig):
     predecessors: List["Node"] = field(default_factory=list, repr=False)
     successors: List["Node"] = field(default_factory=list, repr=False)
     _outgoing_edges: List[EdgeLink] = field(default_factory=list, repr=False)
+    # Incoming-edge index built by index_incoming_edges(); None means stale
+    _incoming_edges: Tuple[EdgeLink, ...] | None = field(default=None, repr=False)
+    _passive_incoming_edges: Tuple[EdgeLink, ...] = field(default=(), repr=False)
+    _trigger_flags: bytearray = field(default_factory=bytearray, repr=False)
+    _incoming_dynamic_config: DynamicEdgeConfig | None = field(default=None, repr=False)
 
     FIELD_SPECS = {
         "id": ConfigFieldSpec(
@@ -358,6 +380,7 @@ class Node(BaseConfig):
             self.successors.append(node)
         payload = dict(edge_config or {})
         existing = next((link for link in self._outgoing_edges if link.target is node), None)
+        node._invalidate_incoming_edges()
         trigger = bool(payload.get("trigger", True)) if payload else True
         carry_data = bool(payload.get("carry_data", True)) if payload else True
         keep_message = bool(payload.get("keep_message", False)) if payload else False
@@ -421,6 +444,7 @@ class Node(BaseConfig):
             self._outgoing_edges.append(
                 EdgeLink(
                     target=node,
+                    source=self,
                     config=payload,
                     trigger=trigger,
                     condition=condition_label,
@@ -439,6 +463,7 @@ class Node(BaseConfig):
     def add_predecessor(self, node: "Node") -> None:
         if node not in self.predecessors:
             self.predecessors.append(node)
+            self._invalidate_incoming_edges()
 
     def iter_outgoing_edges(self) -> Iterable[EdgeLink]:
         return tuple(self._outgoing_edges)
@@ -449,21 +474,66 @@ class Node(BaseConfig):
                 return link
         return None
 
+    def incoming_edges(self) -> Tuple[EdgeLink, ...]:
+        """Return the edges from predecessors into this node."""
+        if self._incoming_edges is None:
+            self.index_incoming_edges()
+        return self._incoming_edges
+
+    def incoming_dynamic_config(self) -> DynamicEdgeConfig | None:
+        """Return the dynamic config of the first dynamic incoming edge, if any."""
+        if self._incoming_edges is None:
+            self.index_incoming_edges()
+        return self._incoming_dynamic_config
+
+    def index_incoming_edges(self) -> None:
+        """Materialize the incoming-edge tuple and the trigger array.
+
+        Triggering edges get one byte each in ``_trigger_flags`` so trigger
+        checks and resets do not have to walk every predecessor's edges.
+        """
+        self._invalidate_incoming_edges()
+        links = tuple(
+            link
+            for predecessor in self.predecessors
+            for link in predecessor._outgoing_edges
+            if link.target is self
+        )
+        trigger_links = [link for link in links if link.trigger]
+        flags = bytearray(len(trigger_links))
+        for slot, link in enumerate(trigger_links):
+            flags[slot] = 1 if link._triggered else 0
+        self._trigger_flags = flags
+        for slot, link in enumerate(trigger_links):
+            link._trigger_slot = slot
+        self._passive_incoming_edges = tuple(link for link in links if not link.trigger)
+        self._incoming_dynamic_config = next(
+            (link.dynamic_config for link in links if link.dynamic_config is not None), None
+        )
+        self._incoming_edges = links
+
+    def _invalidate_incoming_edges(self) -> None:
+        if self._incoming_edges is None:
+            return
+        for link in self._incoming_edges:
+            link._triggered = link.triggered
+            link._trigger_slot = -1
+        self._incoming_edges = None
+
     def is_triggered(self) -> bool:
         if self.start_triggered:
             return True
-        for predecessor in self.predecessors:
-            for edge_link in predecessor.iter_outgoing_edges():
-                if edge_link.target is self and edge_link.trigger and edge_link.triggered:
-                    return True
-        return False
+        if self._incoming_edges is None:
+            self.index_incoming_edges()
+        return 1 in self._trigger_flags
 
     def reset_triggers(self) -> None:
         self.start_triggered = False
-        for predecessor in self.predecessors:
-            for edge_link in predecessor.iter_outgoing_edges():
-                if edge_link.target is self:
-                    edge_link.triggered = False
+        if self._incoming_edges is None:
+            self.index_incoming_edges()
+        self._trigger_flags[:] = bytes(len(self._trigger_flags))
+        for edge_link in self._passive_incoming_edges:
+            edge_link._triggered = False
 
     def merge_vars(self, parent_vars: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         merged = dict(parent_vars or {})
@@ -9,6 +9,7 @@ from entity.configs.base import (
     ConfigError,
     ConfigFieldSpec,
     ensure_list,
+    optional_bool,
     optional_dict,
     optional_str,
     require_mapping,
@@ -26,6 +27,9 @@ class PythonRunnerConfig(BaseConfig):
     env: Dict[str, str] = field(default_factory=dict)
     timeout_seconds: int = 60
     encoding: str = "utf-8"
+    worker_pool: bool = False
+    preload_modules: List[str] = field(default_factory=list)
+    memory_limit_mb: int | None = None
 
     @classmethod
     def from_dict(cls, data: Mapping[str, Any], *, path: str) -> "PythonRunnerConfig":
@@ -40,12 +44,21 @@ class PythonRunnerConfig(BaseConfig):
         encoding = optional_str(mapping, "encoding", path) or "utf-8"
         if not encoding:
             raise ConfigError("encoding cannot be empty", f"{path}.encoding")
+        worker_pool = optional_bool(mapping, "worker_pool", path, default=False)
+        preload_raw = mapping.get("preload_modules")
+        preload_modules = [str(item) for item in ensure_list(preload_raw)] if preload_raw is not None else []
+        memory_limit = mapping.get("memory_limit_mb")
+        if memory_limit is not None and (not isinstance(memory_limit, int) or memory_limit <= 0):
+            raise ConfigError("memory_limit_mb must be a positive integer", f"{path}.memory_limit_mb")
         return cls(
             interpreter=interpreter,
             args=args,
             env={str(key): str(value) for key, value in env.items()},
             timeout_seconds=timeout_value,
             encoding=encoding,
+            worker_pool=bool(worker_pool),
+            preload_modules=preload_modules,
+            memory_limit_mb=memory_limit,
             path=path,
         )
 
@@ -94,4 +107,31 @@ class PythonRunnerConfig(BaseConfig):
             description="Encoding used to parse stdout/stderr",
             advance=True,
         ),
+        "worker_pool": ConfigFieldSpec(
+            name="worker_pool",
+            display_name="Use Warm Worker Pool",
+            type_hint="bool",
+            required=False,
+            default=False,
+            description="Fork each run from a warm interpreter instead of starting a new one; falls back to a fresh process when unavailable",
+            advance=True,
+        ),
+        "preload_modules": ConfigFieldSpec(
+            name="preload_modules",
+            display_name="Preloaded Modules",
+            type_hint="list[str]",
+            required=False,
+            default=[],
+            description="Modules imported once by warm workers (e.g. numpy, pandas)",
+            advance=True,
+        ),
+        "memory_limit_mb": ConfigFieldSpec(
+            name="memory_limit_mb",
+            display_name="Memory Limit (MB)",
+            type_hint="int",
+            required=False,
+            default=None,
+            description="Address space limit for each script run (POSIX only)",
+            advance=True,
+        ),
     }
@@ -5,7 +5,7 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 from entity.enums import LogLevel
-from entity.configs import GraphDefinition, MemoryStoreConfig, Node, EdgeConfig
+from entity.configs import GraphDefinition, MajorityVoteConfig, MemoryStoreConfig, Node, EdgeConfig
 
 
 @dataclass
@@ -83,6 +83,10 @@ class GraphConfig:
     def is_majority_voting(self) -> bool:
         return self.definition.is_majority_voting
 
+    @property
+    def majority_vote(self) -> MajorityVoteConfig | None:
+        return self.definition.majority_vote
+
     def to_dict(self) -> Dict[str, Any]:
         return {
             "name": self.name,
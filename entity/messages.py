@@ -1,10 +1,19 @@
-"""Core message abstractions used across providers and executors."""
+"""Core message abstractions used across providers and executors.
+
+``AttachmentRef`` and ``MessageBlock`` are immutable, so clones of a message
+share them instead of copying attachment payloads. ``Message`` itself stays
+mutable: its content list, metadata and tool calls are shared copy-on-write
+between a message and its clones.
+"""
 
 import copy
+import dataclasses
 from dataclasses import dataclass, field
 import json
+import threading
 from enum import Enum
-from typing import Any, Dict, List, Optional, Union
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
 
 
 class MessageRole(str, Enum):
@@ -40,7 +49,7 @@ class MessageBlockType(str, Enum):
         return MessageBlockType.FILE
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class AttachmentRef:
     """Metadata for a payload stored locally or uploaded to a provider."""
 
@@ -87,20 +96,15 @@ class AttachmentRef:
         )
 
     def copy(self) -> "AttachmentRef":
-        return AttachmentRef(
-            attachment_id=self.attachment_id,
-            mime_type=self.mime_type,
-            name=self.name,
-            size=self.size,
-            sha256=self.sha256,
-            local_path=self.local_path,
-            remote_file_id=self.remote_file_id,
-            data_uri=self.data_uri,
-            metadata=dict(self.metadata),
-        )
+        """References are immutable, so copies share the same instance."""
+        return self
 
+    def replace(self, **changes: Any) -> "AttachmentRef":
+        """Return a new reference with the given fields changed."""
+        return dataclasses.replace(self, **changes)
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class MessageBlock:
     """Single block of multimodal content."""
 
@@ -118,7 +122,7 @@ class MessageBlock:
         if self.attachment:
             payload["attachment"] = self.attachment.to_dict(include_data=include_data)
         if self.data:
-            payload["data"] = self.data
+            payload["data"] = dict(self.data)
         return payload
 
     @classmethod
@@ -157,12 +161,12 @@ class MessageBlock:
         return f"[{self.type.value} block]"
 
     def copy(self) -> "MessageBlock":
-        return MessageBlock(
-            type=self.type,
-            text=self.text,
-            attachment=self.attachment.copy() if self.attachment else None,
-            data=dict(self.data),
-        )
+        """Blocks are immutable, so copies share the same instance."""
+        return self
+
+    def replace(self, **changes: Any) -> "MessageBlock":
+        """Return a new block with the given fields changed."""
+        return dataclasses.replace(self, **changes)
 
 
 @dataclass
@@ -233,51 +237,181 @@ class FunctionCallOutputEvent:
 MessageContent = Union[str, List[MessageBlock], List[Dict[str, Any]]]
 
 
-@dataclass
+_SHARED_CONTENT = 1
+_SHARED_METADATA = 2
+_SHARED_TOOL_CALLS = 4
+_SHARED_CONTAINERS = _SHARED_METADATA | _SHARED_TOOL_CALLS
+
+# Guards the share flags and the swap of a shared container for its copy
+_SHARE_LOCK = threading.Lock()
+
+
 class Message:
-    """Unified message structure shared by executors and providers."""
+    """Unified message structure shared by executors and providers.
+
+    Copies made by ``clone``, ``with_content`` and ``with_role`` do not copy
+    anything up front. The content list, ``metadata`` and ``tool_calls`` stay
+    shared until one of the messages is about to change that container: the
+    ``content``, ``metadata`` and ``tool_calls`` attributes hand out a
+    container the caller may mutate, so they take a shallow copy of a shared
+    one first. Code that only reads should use ``metadata_view``,
+    ``get_metadata`` and ``tool_calls_view``, which never copy. Blocks are
+    immutable and never copied.
+    """
+
+    __slots__ = (
+        "role",
+        "name",
+        "tool_call_id",
+        "keep",
+        "preserve_role",
+        "_content",
+        "_metadata",
+        "_tool_calls",
+        "_shared",
+    )
+
+    def __init__(
+        self,
+        role: MessageRole,
+        content: MessageContent,
+        name: Optional[str] = None,
+        tool_call_id: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        tool_calls: Optional[List[ToolCallPayload]] = None,
+        keep: bool = False,
+        preserve_role: bool = False,
+    ) -> None:
+        self.role = role
+        self.name = name
+        self.tool_call_id = tool_call_id
+        self.keep = keep
+        self.preserve_role = preserve_role
+        self._content = content
+        self._metadata = metadata if metadata is not None else {}
+        self._tool_calls = tool_calls if tool_calls is not None else []
+        self._shared = 0
+
+    def _detach(self, flag: int) -> None:
+        with _SHARE_LOCK:
+            if not self._shared & flag:
+                return
+            if flag == _SHARED_CONTENT:
+                self._content = _copy_content(self._content)
+            elif flag == _SHARED_METADATA:
+                self._metadata = dict(self._metadata)
+            else:
+                self._tool_calls = list(self._tool_calls)
+            self._shared &= ~flag
 
-    role: MessageRole
-    content: MessageContent
-    name: Optional[str] = None
-    tool_call_id: Optional[str] = None
-    metadata: Dict[str, Any] = field(default_factory=dict)
-    tool_calls: List[ToolCallPayload] = field(default_factory=list)
-    keep: bool = False
-    preserve_role: bool = False
+    @property
+    def content(self) -> MessageContent:
+        if self._shared & _SHARED_CONTENT:
+            self._detach(_SHARED_CONTENT)
+        return self._content
+
+    @content.setter
+    def content(self, value: MessageContent) -> None:
+        with _SHARE_LOCK:
+            self._content = value
+            self._shared &= ~_SHARED_CONTENT
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        if self._shared & _SHARED_METADATA:
+            self._detach(_SHARED_METADATA)
+        return self._metadata
+
+    @metadata.setter
+    def metadata(self, value: Dict[str, Any]) -> None:
+        with _SHARE_LOCK:
+            self._metadata = value
+            self._shared &= ~_SHARED_METADATA
+
+    @property
+    def metadata_view(self) -> Mapping[str, Any]:
+        """Read-only view of ``metadata``; never copies a shared dict."""
+        return MappingProxyType(self._metadata or {})
+
+    def get_metadata(self, key: str, default: Any = None) -> Any:
+        """Read one ``metadata`` entry without copying a shared dict."""
+        metadata = self._metadata
+        return metadata.get(key, default) if metadata else default
+
+    @property
+    def tool_calls(self) -> List[ToolCallPayload]:
+        if self._shared & _SHARED_TOOL_CALLS:
+            self._detach(_SHARED_TOOL_CALLS)
+        return self._tool_calls
+
+    @tool_calls.setter
+    def tool_calls(self, value: List[ToolCallPayload]) -> None:
+        with _SHARE_LOCK:
+            self._tool_calls = value
+            self._shared &= ~_SHARED_TOOL_CALLS
+
+    @property
+    def tool_calls_view(self) -> Tuple[ToolCallPayload, ...]:
+        """Tuple snapshot of ``tool_calls`` for reading; leaves a shared list shared."""
+        return tuple(self._tool_calls or ())
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (
+            self.role == other.role
+            and self._content == other._content
+            and self.name == other.name
+            and self.tool_call_id == other.tool_call_id
+            and self._metadata == other._metadata
+            and self._tool_calls == other._tool_calls
+            and self.keep == other.keep
+            and self.preserve_role == other.preserve_role
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return (
+            f"Message(role={self.role!r}, content={self._content!r}, name={self.name!r}, "
+            f"tool_call_id={self.tool_call_id!r}, metadata={self._metadata!r}, "
+            f"tool_calls={self._tool_calls!r}, keep={self.keep!r}, preserve_role={self.preserve_role!r})"
+        )
+
+    def _share(self, role: MessageRole, content: Optional[MessageContent], keep_content: bool) -> "Message":
+        copied = Message.__new__(Message)
+        copied.role = role
+        copied.name = self.name
+        copied.tool_call_id = self.tool_call_id
+        copied.keep = self.keep
+        copied.preserve_role = self.preserve_role
+        shared = _SHARED_CONTAINERS
+        with _SHARE_LOCK:
+            if keep_content:
+                content = self._content
+                if isinstance(content, list):
+                    shared |= _SHARED_CONTENT
+            copied._content = content
+            copied._metadata = self._metadata
+            copied._tool_calls = self._tool_calls
+            copied._shared = shared
+            self._shared |= shared
+        return copied
 
     def with_content(self, content: MessageContent) -> "Message":
         """Return a shallow copy with updated content."""
-        return Message(
-            role=self.role,
-            content=content,
-            name=self.name,
-            tool_call_id=self.tool_call_id,
-            metadata=dict(self.metadata),
-            tool_calls=list(self.tool_calls),
-            keep=self.keep,
-            preserve_role=self.preserve_role,
-        )
+        return self._share(self.role, content, False)
 
     def with_role(self, role: MessageRole) -> "Message":
         """Return a shallow copy with updated role."""
-        return Message(
-            role=role,
-            content=self.content,
-            name=self.name,
-            tool_call_id=self.tool_call_id,
-            metadata=dict(self.metadata),
-            tool_calls=list(self.tool_calls),
-            keep=self.keep,
-            preserve_role=self.preserve_role,
-        )
+        return self._share(role, None, True)
 
     def text_content(self) -> str:
         """Best-effort string representation of the content."""
-        if self.content is None:
+        if self._content is None:
             return ""
-        if isinstance(self.content, str):
-            return self.content
+        if isinstance(self._content, str):
+            return self._content
         # Some providers (e.g., multimodal) return list content; join textual parts.
         parts = []
         for block in self.blocks():
@@ -288,12 +422,12 @@ class Message:
 
     def blocks(self) -> List[MessageBlock]:
         """Return content as a list of MessageBlock items."""
-        if self.content is None:
+        if self._content is None:
             return []
-        if isinstance(self.content, str):
-            return [MessageBlock.text_block(self.content)]
+        if isinstance(self._content, str):
+            return [MessageBlock.text_block(self._content)]
         blocks: List[MessageBlock] = []
-        for block in self.content:
+        for block in self._content:
             if isinstance(block, MessageBlock):
                 blocks.append(block)
             elif isinstance(block, dict):
@@ -306,37 +440,30 @@ class Message:
         return blocks
 
     def clone(self) -> "Message":
-        """Deep copy of the message, preserving content blocks."""
-        return Message(
-            role=self.role,
-            content=_copy_content(self.content),
-            name=self.name,
-            tool_call_id=self.tool_call_id,
-            metadata=dict(self.metadata),
-            tool_calls=list(self.tool_calls),
-            keep=self.keep,
-            preserve_role=self.preserve_role,
-        )
+        """Independent copy of the message; containers are copied on first write."""
+        return self.with_role(self.role)
+
+    __copy__ = clone
 
     def to_dict(self, include_data: bool = True) -> Dict[str, Any]:
         """Return a JSON-serializable representation."""
         payload = {
             "role": self.role.value,
         }
-        if isinstance(self.content, list):
+        if isinstance(self._content, list):
             payload["content"] = [
-                block.to_dict(include_data=include_data) if isinstance(block, MessageBlock) else block for block in self.content
+                block.to_dict(include_data=include_data) if isinstance(block, MessageBlock) else block for block in self._content
             ]
         else:
-            payload["content"] = self.content
+            payload["content"] = self._content
         if self.name:
             payload["name"] = self.name
         if self.tool_call_id:
             payload["tool_call_id"] = self.tool_call_id
-        if self.metadata:
-            payload["metadata"] = self.metadata
-        if self.tool_calls:
-            payload["tool_calls"] = [call.to_openai_dict() for call in self.tool_calls]
+        if self._metadata:
+            payload["metadata"] = dict(self._metadata)
+        if self._tool_calls:
+            payload["tool_calls"] = [call.to_openai_dict() for call in self._tool_calls]
         if self.keep:
             payload["keep"] = self.keep
         if self.preserve_role:
@@ -416,10 +543,5 @@ def _copy_content(content: MessageContent) -> MessageContent:
         return None
     if isinstance(content, str):
         return content
-    copied: List[Any] = []
-    for block in content:
-        if isinstance(block, MessageBlock):
-            copied.append(block.copy())
-        else:
-            copied.append(copy.deepcopy(block))
-    return copied
+    # Blocks are immutable and shared; raw dict blocks are still copied
+    return [block if isinstance(block, MessageBlock) else copy.deepcopy(block) for block in content]
@@ -38,6 +38,22 @@ def execute_code(code: str, time_out: int = 60) -> str:
         cmd = [__default_interpreter(), str(script_path.resolve())]
 
         try:
+            if os.getenv('CODE_EXECUTOR_WORKER_POOL', '').strip().lower() in ('1', 'true', 'yes'):
+                from utils.python_worker_pool import WorkerUnavailable, get_worker_pool
+
+                preload = [name.strip() for name in os.getenv('CODE_EXECUTOR_PRELOAD', '').split(',') if name.strip()]
+                try:
+                    result = get_worker_pool(cmd[0], preload).run(cmd[1], cwd=workspace, timeout=time_out)
+                except WorkerUnavailable:
+                    pass
+                else:
+                    stderr = result.stderr
+                    if result.timed_out:
+                        stderr += f"\nError: Execution timed out after {time_out} seconds."
+                    elif result.error:
+                        stderr += f"\nExecution error: {result.error}"
+                    return result.stdout + stderr
+
             completed = subprocess.run(
                 cmd,
                 cwd=str(workspace),
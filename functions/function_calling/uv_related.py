@@ -6,6 +6,13 @@ import subprocess
 from pathlib import Path
 from typing import Any, Dict, List, Mapping, Sequence
 
+from utils.uv_env_cache import (
+    environment_key,
+    get_uv_env_cache,
+    read_workspace_state,
+    write_workspace_state,
+)
+
 _SAFE_PACKAGE_RE = re.compile(r"^[A-Za-z0-9_.\-+=<>!\[\],@:/]+$")
 _DEFAULT_TIMEOUT = float(os.getenv("LIB_INSTALL_TIMEOUT", "120"))
 _OUTPUT_SNIPPET_LIMIT = 240
@@ -217,8 +224,26 @@ def install_python_packages(
     #     cmd.extend(flags)
 
     cmd.extend(safe_packages)
+
+    # Only workspaces set up by init_python_env have a known dependency set to key on
+    state = read_workspace_state(ctx.workspace_root)
+    requested = sorted(set(state["packages"]) | set(safe_packages)) if state else []
+    key = environment_key(requested, state["python"]) if state else None
+    cache = get_uv_env_cache()
+    if key and not upgrade and cache.attach(key, ctx.workspace_root):
+        # The cached lock already pins the set; uv installs it from its own cache
+        synced = _run_uv_command(["uv", "sync", "--frozen"], ctx.workspace_root, step="uv sync")
+        if synced["returncode"] == 0:
+            write_workspace_state(ctx.workspace_root, python_version=state["python"], packages=requested)
+            synced["stdout"] = f"Reused cached resolution {key[:12]}\n{synced['stdout']}"
+            synced["cached_env"] = True
+            return synced
+
     result = _run_uv_command(cmd, ctx.workspace_root, step="uv add")
     # result["workspace_root"] = str(ctx.workspace_root)
+    if key and result["returncode"] == 0:
+        write_workspace_state(ctx.workspace_root, python_version=state["python"], packages=requested)
+        cache.store(key, ctx.workspace_root, packages=requested, python_version=state["python"])
     return result
 
 
@@ -261,6 +286,13 @@ def init_python_env(
     init_cmd: List[str] = ["uv", "init", "--bare", "--no-workspace"]
     init_result = _run_uv_command(init_cmd, ctx.workspace_root, step="uv init")
     steps.append(init_result)
+    if venv_result["returncode"] == 0:
+        previous = read_workspace_state(ctx.workspace_root)
+        write_workspace_state(
+            ctx.workspace_root,
+            python_version=python_version.strip() if python_version else None,
+            packages=previous["packages"] if previous else [],
+        )
 
     return {
         "workspace_root": str(ctx.workspace_root),
@@ -9,6 +9,7 @@ from check.check import load_config
 from entity.graph_config import GraphConfig
 from entity.messages import Message
 from utils.attachments import AttachmentStore
+from utils.blob_store import get_blob_store
 from utils.schema_exporter import build_schema_response, SchemaResolutionError
 from utils.task_input import TaskInputBuilder
 from workflow.graph_context import GraphContext
@@ -31,7 +32,7 @@ def build_task_input_payload(
     code_workspace = graph_context.directory / "code_workspace"
     attachments_dir = code_workspace / "attachments"
     attachments_dir.mkdir(parents=True, exist_ok=True)
-    store = AttachmentStore(attachments_dir)
+    store = AttachmentStore(attachments_dir, blob_store=get_blob_store())
     builder = TaskInputBuilder(store)
     return builder.build_from_file_paths(prompt, attachment_paths)
 
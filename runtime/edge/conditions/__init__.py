@@ -1,10 +1,14 @@
 """Edge condition registry utilities."""
 
 from .base import EdgeConditionManager, ConditionFactoryContext
+from .keyword_manager import KeywordEdgeConditionManager
+from .keyword_router import KeywordRouter
 from .registry import build_edge_condition_manager
 
 __all__ = [
     "ConditionFactoryContext",
     "EdgeConditionManager",
+    "KeywordEdgeConditionManager",
+    "KeywordRouter",
     "build_edge_condition_manager",
 ]
@@ -155,7 +155,7 @@ class EdgeConditionManager(Generic[TConfig], ABC):
             
             # Tag message with dynamic edge info for later processing
             if edge_link.dynamic_config is not None:
-                metadata = dict(payload.metadata)
+                metadata = dict(payload.metadata_view)
                 metadata["_from_dynamic_edge"] = True
                 metadata["_dynamic_edge_source"] = from_node.id
                 payload.metadata = metadata
@@ -194,7 +194,7 @@ class EdgeConditionManager(Generic[TConfig], ABC):
         if not cloned.preserve_role:
             cloned_role = MessageRole.ASSISTANT if from_node.id == target_node.id else MessageRole.USER
             cloned.role = cloned_role
-        metadata = dict(cloned.metadata)
+        metadata = dict(cloned.metadata_view)
         metadata["source"] = from_node.id
         cloned.metadata = metadata
         if keep:
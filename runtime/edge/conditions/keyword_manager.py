@@ -1,10 +1,12 @@
 """KeywordEdgeManager implements declarative keyword conditions."""
 
 import re
+from typing import Optional
 
 from entity.configs.edge.edge_condition import KeywordEdgeConditionConfig
 from .base import ConditionFactoryContext
 from .base import EdgeConditionManager
+from .keyword_router import KeywordRouter
 from ...node.executor import ExecutionContext
 
 
@@ -32,8 +34,17 @@ class KeywordEdgeConditionManager(EdgeConditionManager[KeywordEdgeConditionConfi
             "case_sensitive": self.case_sensitive,
             "default": self.default_value,
         }
+        self.router: Optional[KeywordRouter] = None
+        self.router_index = 0
+
+    def attach_router(self, router: KeywordRouter, index: int) -> None:
+        """Evaluate through ``router``, shared with the other keyword edges of the node."""
+        self.router = router
+        self.router_index = index
 
     def _evaluate(self, data: str) -> bool:
+        if self.router is not None:
+            return self.router.evaluate(self.router_index, data)
         haystack = data if self.case_sensitive else data.lower()
         for keyword in self.processed_none:
             if keyword and keyword in haystack:
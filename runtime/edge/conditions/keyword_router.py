@@ -0,0 +1,87 @@
+"""KeywordRouter evaluates all keyword edges of a node against one shared scan state."""
+
+import re
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from entity.configs.edge.edge_condition import KeywordEdgeConditionConfig
+
+
+class KeywordRouter:
+    """Routes one output through every keyword edge of a node at once.
+
+    Keyword managers of the same source node share a router. The first edge
+    evaluated for a text computes the result of every edge; the remaining
+    edges read the cached results. The text is lowered at most once for all
+    case-insensitive edges, and each distinct keyword is tested with ``in``
+    at most once, lazily and in the same order as a single edge would test
+    it, so routing never scans more than evaluating the edges one by one.
+    Regex patterns cannot be merged safely (flags, groups, backreferences),
+    so each distinct pattern is searched at most once per text and only for
+    edges that no keyword has decided.
+    """
+
+    def __init__(self, configs: Sequence[KeywordEdgeConditionConfig]) -> None:
+        self._edges: List[Tuple[KeywordEdgeConditionConfig, List[str], List[str]]] = []
+        for config in configs:
+            fold = (lambda keyword: keyword) if config.case_sensitive else str.lower
+            any_keywords = [fold(keyword) for keyword in config.any_keywords if keyword]
+            none_keywords = [fold(keyword) for keyword in config.none_keywords if keyword]
+            self._edges.append((config, any_keywords, none_keywords))
+        self._regex: Dict[Tuple[str, bool], re.Pattern] = {}
+        for config in configs:
+            flags = 0 if config.case_sensitive else re.IGNORECASE
+            for pattern in config.regex_patterns:
+                key = (pattern, config.case_sensitive)
+                if key not in self._regex:
+                    self._regex[key] = re.compile(pattern, flags)
+        self._lock = threading.Lock()
+        self._last_text: Optional[str] = None
+        self._last_results: Tuple[bool, ...] = ()
+
+    def __len__(self) -> int:
+        return len(self._edges)
+
+    def evaluate(self, index: int, data: str) -> bool:
+        """Return the condition result of edge ``index`` for ``data``."""
+        with self._lock:
+            if self._last_text is not data and self._last_text != data:
+                self._last_results = self._route(data)
+                self._last_text = data
+            return self._last_results[index]
+
+    def _route(self, data: str) -> Tuple[bool, ...]:
+        haystacks: Dict[bool, str] = {}
+        keyword_hits: Dict[Tuple[str, bool], bool] = {}
+        regex_hits: Dict[Tuple[str, bool], bool] = {}
+
+        def contains(keyword: str, case_sensitive: bool) -> bool:
+            key = (keyword, case_sensitive)
+            hit = keyword_hits.get(key)
+            if hit is None:
+                haystack = haystacks.get(case_sensitive)
+                if haystack is None:
+                    haystack = haystacks[case_sensitive] = data if case_sensitive else data.lower()
+                hit = keyword_hits[key] = keyword in haystack
+            return hit
+
+        results = []
+        for config, any_keywords, none_keywords in self._edges:
+            case_sensitive = config.case_sensitive
+            if any(contains(keyword, case_sensitive) for keyword in none_keywords):
+                results.append(False)
+            elif any(contains(keyword, case_sensitive) for keyword in any_keywords):
+                results.append(True)
+            elif config.regex_patterns:
+                matched = False
+                for pattern in config.regex_patterns:
+                    key = (pattern, case_sensitive)
+                    if key not in regex_hits:
+                        regex_hits[key] = self._regex[key].search(data) is not None
+                    if regex_hits[key]:
+                        matched = True
+                        break
+                results.append(matched)
+            else:
+                results.append(not config.any_keywords)
+        return tuple(results)
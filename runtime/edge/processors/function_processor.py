@@ -68,7 +68,7 @@ class FunctionEdgePayloadProcessor(EdgePayloadProcessor[FunctionEdgeProcessorCon
                 return None
             if "content" in result:
                 cloned.content = result["content"]
-            metadata = dict(cloned.metadata)
+            metadata = dict(cloned.metadata_view)
             metadata.update(result.get("metadata") or {})
             cloned.metadata = metadata
             return cloned
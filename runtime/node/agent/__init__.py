@@ -1,5 +1,5 @@
 from .memory import MemoryBase, MemoryFactory, MemoryManager
-from .providers import ModelProvider, ModelResponse, ProviderRegistry
+from .providers import ModelDelta, ModelProvider, ModelResponse, ProviderRegistry
 from .skills import AgentSkillManager, SkillMetadata, SkillValidationError, parse_skill_file
 from .thinking import ThinkingManagerBase, ThinkingManagerFactory, ThinkingPayload
 from .tool import ToolManager
@@ -8,6 +8,7 @@ __all__ = [
     "MemoryBase",
     "MemoryFactory",
     "MemoryManager",
+    "ModelDelta",
     "ModelProvider",
     "ModelResponse",
     "ProviderRegistry",
@@ -0,0 +1,318 @@
+"""Token budget for agent prompts.
+
+Node inputs accumulate across loop iterations and the tool loop keeps
+appending calls and results, so without a limit every model call resends the
+whole history. :class:`ContextBudget` measures the prompt with the local token
+counter before each call and, once it exceeds ``context.max_tokens``,
+compacts it (against 80% of the budget when tiktoken is not installed and
+counts are only estimated):
+
+- the leading system messages are never touched;
+- the prompt is split into turns (a message, or an assistant tool call
+  together with its results) and the newest ``keep_recent`` turns are kept;
+- older turns are folded into one running summary message placed right after
+  the system messages, until the prompt is down to half the budget.
+
+The summary key is the sequence of compacted turn hashes. Summaries are
+cached per node, so the next execution of the same node (e.g. the next loop
+iteration, whose inputs start with the same turns) reuses the summary instead
+of condensing again, and the prompt prefix stays byte-identical between
+compactions for provider-side prompt caching. Compacting to half the budget
+means a new summary is only produced after another half-budget of turns.
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from entity.configs.node.agent import AgentContextConfig
+from entity.messages import FunctionCallOutputEvent, Message, MessageBlockType, MessageRole
+from utils.token_counter import CHARS_PER_TOKEN, count_tokens, counts_are_exact
+
+logger = logging.getLogger(__name__)
+
+CONTEXT_SUMMARY_KEY = "context_summary"
+COMPACT_TARGET_RATIO = 0.5
+# Share of ``max_tokens`` used when token counts are estimated (no tiktoken)
+ESTIMATED_BUDGET_RATIO = 0.8
+MESSAGE_OVERHEAD_TOKENS = 4
+ATTACHMENT_TOKENS = 256
+SUMMARY_HEADER = "[Summary of earlier conversation]"
+_DIGEST_LINE_CHARS = 200
+_CACHE_SIZE = 32
+
+# (previous summary, transcript of the newly compacted turns) -> new summary
+Summarizer = Callable[[str, str], str]
+
+
+class SummaryCache:
+    """Bounded LRU of compactions for one node, keyed by compacted turn hashes."""
+
+    def __init__(self, max_entries: int = _CACHE_SIZE) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, ...], str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, ...]) -> Optional[str]:
+        with self._lock:
+            summary = self._entries.get(key)
+            if summary is not None:
+                self._entries.move_to_end(key)
+            return summary
+
+    def put(self, key: Tuple[str, ...], summary: str) -> None:
+        with self._lock:
+            self._entries[key] = summary
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def longest_prefix(self, hashes: Sequence[str], limit: int) -> Optional[Tuple[Tuple[str, ...], str]]:
+        """Return the cached compaction covering the most leading turns, up to ``limit``."""
+        best: Optional[Tuple[Tuple[str, ...], str]] = None
+        with self._lock:
+            for key, summary in self._entries.items():
+                if len(key) > limit or (best is not None and len(key) <= len(best[0])):
+                    continue
+                if tuple(hashes[: len(key)]) == key:
+                    best = (key, summary)
+            if best is not None:
+                self._entries.move_to_end(best[0])
+        return best
+
+
+@dataclass
+class CompactionResult:
+    compacted_turns: int
+    tokens_before: int
+    tokens_after: int
+    source: str  # "cache", "model" or "digest"
+
+
+class ContextBudget:
+    """Keeps one prompt list (conversation or provider timeline) within budget."""
+
+    def __init__(
+        self,
+        config: AgentContextConfig,
+        *,
+        cache: SummaryCache,
+        model: Optional[str] = None,
+        summarizer: Optional[Summarizer] = None,
+        node_id: Optional[str] = None,
+    ) -> None:
+        self.config = config
+        self.cache = cache
+        self.model = model
+        self.summarizer = summarizer if config.strategy == "summarize" else None
+        self.node_id = node_id
+        self.max_tokens = config.max_tokens
+        if not counts_are_exact(model):
+            self.max_tokens = int(config.max_tokens * ESTIMATED_BUDGET_RATIO)
+
+    def measure(self, items: Sequence[Any]) -> int:
+        return sum(self._item_tokens(item) for item in items)
+
+    def fit(self, items: List[Any]) -> Optional[CompactionResult]:
+        """Compact ``items`` in place when over budget; None when nothing changed."""
+        tokens_before = self.measure(items)
+        if tokens_before <= self.max_tokens:
+            return None
+
+        prefix_end = 0
+        while prefix_end < len(items) and _is_system(items[prefix_end]):
+            prefix_end += 1
+        body_start = prefix_end
+        summary_key: Tuple[str, ...] = ()
+        summary_text = ""
+        if body_start < len(items) and _summary_state(items[body_start]) is not None:
+            summary_key, summary_text = _summary_state(items[body_start])
+            body_start += 1
+
+        units = _split_turns(items[body_start:])
+        hashes = [_turn_hash(unit) for unit in units]
+        unit_tokens = [self.measure(unit) for unit in units]
+        evictable = max(0, len(units) - self.config.keep_recent)
+        fixed_tokens = self.measure(items[:prefix_end])
+
+        reused = 0
+        source = None
+        if not summary_key:
+            hit = self.cache.longest_prefix(hashes, evictable)
+            if hit is not None:
+                summary_key, summary_text = hit
+                reused = len(summary_key)
+                source = "cache"
+
+        def _kept(count: int) -> int:
+            return fixed_tokens + self.config.summary_tokens + sum(unit_tokens[count:])
+
+        compacted = reused
+        if _kept(compacted) > self.max_tokens:
+            target = int(self.max_tokens * COMPACT_TARGET_RATIO)
+            while compacted < evictable and _kept(compacted) > target:
+                compacted += 1
+
+        if compacted > reused:
+            new_key = summary_key + tuple(hashes[reused:compacted])
+            cached = self.cache.get(new_key)
+            if cached is not None:
+                summary_text, source = cached, "cache"
+            else:
+                summary_text, source = self._condense(summary_text, units[reused:compacted])
+                self.cache.put(new_key, summary_text)
+            summary_key = new_key
+        elif reused == 0:
+            return None
+
+        remaining = [item for unit in units[compacted:] for item in unit]
+        items[prefix_end:] = [self._summary_message(summary_key, summary_text)] + remaining
+        return CompactionResult(
+            compacted_turns=compacted,
+            tokens_before=tokens_before,
+            tokens_after=self.measure(items),
+            source=source or "cache",
+        )
+
+    # ------------------------------------------------------------------
+
+    def _condense(self, previous: str, units: Sequence[Sequence[Any]]) -> Tuple[str, str]:
+        if self.summarizer is not None:
+            try:
+                summary = previous
+                for batch in self._batches(units):
+                    summary = self.summarizer(summary, batch).strip()
+                return self._clip(summary), "model"
+            except Exception:
+                logger.exception("Context summary failed for node %s; falling back to digest", self.node_id)
+        return self._digest(previous, units), "digest"
+
+    def _batches(self, units: Sequence[Sequence[Any]]) -> List[str]:
+        """Transcripts of at most half the budget each, folded into the summary one by one."""
+        limit = max(1, self.max_tokens // 2)
+        batches: List[str] = []
+        current: List[str] = []
+        current_tokens = 0
+        for unit in units:
+            text = _turn_text(unit)
+            tokens = count_tokens(text, self.model)
+            if tokens > limit:
+                text = text[: limit * CHARS_PER_TOKEN]
+                tokens = limit
+            if current and current_tokens + tokens > limit:
+                batches.append("\n\n".join(current))
+                current, current_tokens = [], 0
+            current.append(text)
+            current_tokens += tokens
+        if current:
+            batches.append("\n\n".join(current))
+        return batches
+
+    def _digest(self, previous: str, units: Sequence[Sequence[Any]]) -> str:
+        lines = [line for line in previous.splitlines() if line.strip()]
+        for unit in units:
+            first_line = next((line for line in _turn_text(unit).splitlines() if line.strip()), "")
+            if first_line:
+                lines.append(f"- {first_line[:_DIGEST_LINE_CHARS]}")
+        while len(lines) > 1 and count_tokens("\n".join(lines), self.model) > self.config.summary_tokens:
+            lines.pop(0)
+        return self._clip("\n".join(lines))
+
+    def _clip(self, summary: str) -> str:
+        limit = self.config.summary_tokens * CHARS_PER_TOKEN
+        return summary if len(summary) <= limit else summary[:limit]
+
+    def _summary_message(self, key: Tuple[str, ...], summary: str) -> Message:
+        metadata = {CONTEXT_SUMMARY_KEY: {"key": list(key), "text": summary}}
+        if self.node_id:
+            metadata["source"] = self.node_id
+        return Message(role=MessageRole.USER, content=f"{SUMMARY_HEADER}\n{summary}", metadata=metadata)
+
+    def _item_tokens(self, item: Any) -> int:
+        tokens = MESSAGE_OVERHEAD_TOKENS + count_tokens(_item_text(item), self.model)
+        blocks = None
+        if isinstance(item, Message):
+            blocks = item.blocks()
+        elif isinstance(item, FunctionCallOutputEvent):
+            blocks = item.output_blocks
+        for block in blocks or ():
+            if block.type is not MessageBlockType.TEXT:
+                tokens += ATTACHMENT_TOKENS
+        return tokens
+
+
+def _summary_state(item: Any) -> Optional[Tuple[Tuple[str, ...], str]]:
+    if not isinstance(item, Message):
+        return None
+    state = item.get_metadata(CONTEXT_SUMMARY_KEY)
+    if not isinstance(state, dict):
+        return None
+    return tuple(state.get("key") or ()), str(state.get("text") or "")
+
+
+def _is_system(item: Any) -> bool:
+    return isinstance(item, Message) and item.role is MessageRole.SYSTEM
+
+
+def _kind(item: Any) -> str:
+    if isinstance(item, FunctionCallOutputEvent):
+        return "result"
+    if isinstance(item, Message):
+        return "result" if item.role is MessageRole.TOOL else "message"
+    return "output"  # raw provider items (Responses output, Gemini content)
+
+
+def _split_turns(items: Sequence[Any]) -> List[List[Any]]:
+    """Group items so tool results stay with the call that produced them."""
+    units: List[List[Any]] = []
+    previous = None
+    for item in items:
+        kind = _kind(item)
+        joins = units and (kind == "result" or (kind == "output" and previous == "output"))
+        if joins:
+            units[-1].append(item)
+        else:
+            units.append([item])
+        previous = kind
+    return units
+
+
+def _turn_text(unit: Sequence[Any]) -> str:
+    return "\n".join(text for text in (_item_text(item) for item in unit) if text)
+
+
+def _turn_hash(unit: Sequence[Any]) -> str:
+    return hashlib.sha256(_turn_text(unit).encode("utf-8")).hexdigest()[:16]
+
+
+def _field(item: Any, name: str) -> Any:
+    if isinstance(item, dict):
+        return item.get(name)
+    return getattr(item, name, None)
+
+
+def _item_text(item: Any) -> str:
+    if isinstance(item, Message):
+        lines = []
+        text = item.text_content()
+        if text:
+            lines.append(f"{item.role.value}: {text}")
+        for call in item.tool_calls_view:
+            lines.append(f"-> {call.function_name}({call.arguments})")
+        return "\n".join(lines)
+    if isinstance(item, FunctionCallOutputEvent):
+        return f"tool: {item.output_text or ''}"
+    kind = _field(item, "type")
+    if kind == "function_call":
+        return f"-> {_field(item, 'name')}({_field(item, 'arguments') or ''})"
+    if kind == "message":
+        texts = [_field(part, "text") for part in _field(item, "content") or ()]
+        return f"{_field(item, 'role') or 'assistant'}: {' '.join(t for t in texts if isinstance(t, str))}"
+    parts = _field(item, "parts")
+    if parts:
+        texts = [_field(part, "text") for part in parts]
+        return " ".join(t for t in texts if isinstance(t, str))
+    return str(item)
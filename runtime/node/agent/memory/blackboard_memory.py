@@ -52,10 +52,10 @@ class BlackboardMemory(MemoryBase):
         if not self.memory_path:
             return
 
-        os.makedirs(os.path.dirname(self.memory_path), exist_ok=True)
-        payload = [item.to_dict() for item in self.contents[-self.max_items :]]
-        with open(self.memory_path, "w", encoding="utf-8") as file:
-            json.dump(payload, file, ensure_ascii=False, indent=2)
+        self._write_json(
+            self.memory_path,
+            lambda: [item.to_dict() for item in self.contents[-self.max_items :]],
+        )
 
     # -------- Memory operations --------
     def retrieve(
@@ -65,13 +65,14 @@ class BlackboardMemory(MemoryBase):
         top_k: int,
         similarity_threshold: float,
     ) -> List[MemoryItem]:
-        if not self.contents:
+        items = self.contents
+        if not items:
             return []
 
-        if top_k <= 0 or top_k >= len(self.contents):
-            return list(self.contents)
+        if top_k <= 0 or top_k >= len(items):
+            return list(items)
 
-        return list(self.contents[-top_k:])
+        return list(items[-top_k:])
 
     def update(self, payload: MemoryWritePayload) -> None:
         snapshot = payload.output_snapshot or payload.input_snapshot
@@ -94,6 +95,4 @@ class BlackboardMemory(MemoryBase):
             output_snapshot=payload.output_snapshot,
         )
 
-        self.contents.append(memory_item)
-        if len(self.contents) > self.max_items:
-            self.contents = self.contents[-self.max_items :]
+        self._append_items([memory_item], max_items=self.max_items)
@@ -1,6 +1,9 @@
 from abc import ABC, abstractmethod
+import hashlib
+import math
 import re
 import logging
+import time
 from typing import List
 
 import openai
@@ -11,6 +14,7 @@ from tenacity import (
 )
 
 from entity.configs import EmbeddingConfig
+from utils.metrics import EMBEDDING_DURATION
 
 logger = logging.getLogger(__name__)
 
@@ -74,6 +78,8 @@ class EmbeddingFactory:
             return OpenAIEmbedding(embedding_config)
         elif model == 'local':
             return LocalEmbedding(embedding_config)
+        elif model == 'mock':
+            return MockEmbedding(embedding_config)
         else:
             raise ValueError(f"Unsupported embedding model: {model}")
 
@@ -109,12 +115,14 @@ class OpenAIEmbedding(EmbeddingBase):
         # Truncate text
         truncated_text = processed_text[:self.max_length]
         
+        started = time.perf_counter()
         try:
             response = self.client.embeddings.create(
                 input=truncated_text, 
                 model=self.model_name,
                 encoding_format="float"
             )
+            EMBEDDING_DURATION.observe(time.perf_counter() - started, backend="openai")
             embedding = response.data[0].embedding
             self._fallback_dim = len(embedding)
             return embedding
@@ -184,11 +192,34 @@ class LocalEmbedding(EmbeddingBase):
         if not processed_text:
             return [0.0] * self._fallback_dim
         
+        started = time.perf_counter()
         try:
             embedding = self.model.encode(processed_text, convert_to_tensor=False)
+            EMBEDDING_DURATION.observe(time.perf_counter() - started, backend="local")
             result = embedding.tolist()
             self._fallback_dim = len(result)
             return result
         except Exception as e:
             logger.error(f"Error getting local embedding: {e}")
             return [0.0] * self._fallback_dim
+
+
+class MockEmbedding(EmbeddingBase):
+    """Deterministic offline embedding for tests and benchmarks.
+
+    Words are hashed into ``params.dimensions`` buckets (64 by default) and
+    the counts normalized, so texts sharing words score as similar without a
+    model or network access.
+    """
+
+    def __init__(self, embedding_config: EmbeddingConfig):
+        super().__init__(embedding_config)
+        self.dimensions = int(embedding_config.params.get('dimensions', 64))
+
+    def get_embedding(self, text):
+        vector = [0.0] * self.dimensions
+        for word in self._preprocess_text(text).lower().split():
+            digest = hashlib.blake2b(word.encode('utf-8'), digest_size=8).digest()
+            vector[int.from_bytes(digest, 'big') % self.dimensions] += 1.0
+        norm = math.sqrt(sum(value * value for value in vector))
+        return [value / norm for value in vector] if norm else vector
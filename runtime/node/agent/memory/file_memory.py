@@ -75,24 +75,21 @@ class FileMemory(MemoryBase):
             logger.warning("No index_path specified, skipping save")
             return
 
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
-
-        # Prepare data for serialization
-        data = {
-            "file_metadata": self.file_metadata,
-            "contents": [item.to_dict() for item in self.contents],
-            "config": {
-                "chunk_size": self.chunk_size,
-                "chunk_overlap": self.chunk_overlap,
+        items = self.contents
+
+        def _payload() -> Dict[str, Any]:
+            return {
+                "file_metadata": dict(self.file_metadata),
+                "contents": [item.to_dict() for item in items],
+                "config": {
+                    "chunk_size": self.chunk_size,
+                    "chunk_overlap": self.chunk_overlap,
+                }
             }
-        }
 
-        # Save to JSON
-        with open(self.index_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        self._write_json(self.index_path, _payload)
 
-        logger.info(f"Index saved to {self.index_path} ({len(self.contents)} chunks)")
+        logger.info(f"Index saved to {self.index_path} ({len(items)} chunks)")
 
     def retrieve(
         self,
@@ -113,7 +110,8 @@ class FileMemory(MemoryBase):
         Returns:
             List of MemoryItem with file chunks
         """
-        if self.count_memories() == 0:
+        items = self.contents
+        if not items:
             return []
 
         # Generate query embedding
@@ -128,7 +126,7 @@ class FileMemory(MemoryBase):
         # Collect embeddings from memory items
         memory_embeddings = []
         valid_items = []
-        for item in self.contents:
+        for item in items:
             if item.embedding is not None:
                 if len(item.embedding) != expected_dim:
                     logger.warning(
@@ -468,17 +466,18 @@ class FileMemory(MemoryBase):
         chunks = self._read_and_chunk_file(file_path, encoding)
         if chunks:
             new_items = self._build_embeddings(chunks)
-            self.contents.extend(new_items)
+            self._append_items(new_items)
 
     def _remove_files_from_index(self, file_paths: List[str]) -> None:
         """Remove chunks from deleted files"""
         file_paths_set = set(file_paths)
 
         # Filter out chunks from deleted files
-        self.contents = [
-            item for item in self.contents
-            if item.metadata.get("file_path") not in file_paths_set
-        ]
+        with self.write_lock:
+            self.contents = [
+                item for item in self.contents
+                if item.metadata.get("file_path") not in file_paths_set
+            ]
 
         # Remove from metadata
         for file_path in file_paths:
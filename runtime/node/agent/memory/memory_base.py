@@ -1,7 +1,11 @@
 """Base memory abstractions with multimodal snapshots."""
 
+import concurrent.futures
+import json
+import os
+import threading
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Tuple
 import time
 
 from entity.configs import MemoryAttachmentConfig, MemoryStoreConfig
@@ -9,6 +13,10 @@ from entity.configs.node.memory import FileMemoryConfig, SimpleMemoryConfig
 from entity.enums import AgentExecFlowStage
 from entity.messages import Message, MessageBlock
 from runtime.node.agent.memory.embedding import EmbeddingBase, EmbeddingFactory
+from utils.metrics import submit_tracked
+
+if TYPE_CHECKING:
+    from runtime.node.agent.memory.write_behind import MemoryWriter
 
 
 @dataclass
@@ -190,11 +198,31 @@ class MemoryRetrievalResult:
         return attachments
 
 
+@dataclass(frozen=True)
+class MemorySnapshot:
+    """Immutable view of a store's items at one version."""
+
+    version: int
+    items: Tuple[MemoryItem, ...] = ()
+
+
 class MemoryBase:
+    """Base class for memory stores shared by every attached agent.
+
+    Items are published as immutable :class:`MemorySnapshot` versions. Readers
+    take the current snapshot without locking and never wait for writers;
+    writers build the next version under ``write_lock``, so appends and trims
+    from parallel nodes cannot interleave. Subclasses change items through
+    :meth:`_append_items` / :meth:`_replace_items` (assigning ``contents``
+    replaces them too) rather than mutating a list in place.
+    """
+
     def __init__(self, store: MemoryStoreConfig):
         self.store = store
         self.name = store.name
-        self.contents: List[MemoryItem] = []
+        self.write_lock = threading.RLock()
+        self._save_lock = threading.Lock()
+        self._snapshot = MemorySnapshot(version=0)
 
         embedding_cfg = None
         simple_cfg = store.as_config(SimpleMemoryConfig)
@@ -208,8 +236,45 @@ class MemoryBase:
             EmbeddingFactory.create_embedding(embedding_cfg) if embedding_cfg else None
         )
 
+    @property
+    def contents(self) -> Tuple[MemoryItem, ...]:
+        return self._snapshot.items
+
+    @contents.setter
+    def contents(self, items: Iterable[MemoryItem]) -> None:
+        self._replace_items(items)
+
+    def snapshot(self) -> MemorySnapshot:
+        return self._snapshot
+
     def count_memories(self) -> int:
-        return len(self.contents)
+        return len(self._snapshot.items)
+
+    def _replace_items(self, items: Iterable[MemoryItem]) -> MemorySnapshot:
+        with self.write_lock:
+            self._snapshot = MemorySnapshot(self._snapshot.version + 1, tuple(items))
+            return self._snapshot
+
+    def _append_items(self, items: Iterable[MemoryItem], *, max_items: int | None = None) -> MemorySnapshot:
+        """Publish a new version with ``items`` appended, keeping the newest ``max_items``."""
+        with self.write_lock:
+            merged = self._snapshot.items + tuple(items)
+            if max_items is not None and len(merged) > max_items:
+                merged = merged[-max_items:]
+            self._snapshot = MemorySnapshot(self._snapshot.version + 1, merged)
+            return self._snapshot
+
+    def _write_json(self, path: str, build_payload: Callable[[], Any]) -> None:
+        """Atomically write the payload built from the latest snapshot to ``path``."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._save_lock:
+            payload = build_payload()
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump(payload, file, indent=2, ensure_ascii=False)
+            os.replace(temp_path, path)
 
     def load(self) -> None:  # pragma: no cover - implemented by subclasses
         raise NotImplementedError
@@ -230,8 +295,23 @@ class MemoryBase:
         raise NotImplementedError
 
 
+class MemoryWriteError(RuntimeError):
+    """One or more background memory writes failed."""
+
+    def __init__(self, failures: List[Tuple[str, BaseException]]) -> None:
+        self.failures = failures
+        details = "; ".join(f"{name}: {exc.__class__.__name__}: {exc}" for name, exc in failures)
+        super().__init__(f"{len(failures)} memory write(s) failed ({details})")
+        self.__cause__ = failures[0][1]
+
+
 class MemoryManager:
-    def __init__(self, attachments: List[MemoryAttachmentConfig], stores: Dict[str, MemoryBase]):
+    def __init__(
+        self,
+        attachments: List[MemoryAttachmentConfig],
+        stores: Dict[str, MemoryBase],
+        writer: "MemoryWriter | None" = None,
+    ):
         self.attachments = attachments
         self.memories: Dict[str, MemoryBase] = {}
         for attachment in attachments:
@@ -239,6 +319,13 @@ class MemoryManager:
             if not memory:
                 raise ValueError(f"memory store {attachment.name} not found")
             self.memories[attachment.name] = memory
+        # Updates go through the write-behind queues when a writer is shared in;
+        # tickets of this manager's writes give it read-your-writes. Map units
+        # share one manager, so the bookkeeping is guarded by a lock
+        self.writer = writer
+        self._pending_lock = threading.Lock()
+        self._pending_writes: Dict[str, List[int]] = {}
+        self._failed_writes: List[Tuple[str, BaseException]] = []
 
     def retrieve(
         self,
@@ -246,7 +333,7 @@ class MemoryManager:
         query: MemoryContentSnapshot,
         current_stage: AgentExecFlowStage,
     ) -> MemoryRetrievalResult | None:
-        results: List[tuple[str, MemoryItem, float]] = []
+        selected: List[tuple[MemoryAttachmentConfig, MemoryBase]] = []
         for attachment in self.attachments:
             if attachment.retrieve_stage and current_stage not in attachment.retrieve_stage:
                 continue
@@ -255,7 +342,10 @@ class MemoryManager:
             memory = self.memories.get(attachment.name)
             if not memory:
                 continue
-            items = memory.retrieve(agent_role, query, attachment.top_k, attachment.similarity_threshold)
+            selected.append((attachment, memory))
+
+        results: List[tuple[str, MemoryItem, float]] = []
+        for (attachment, _), items in zip(selected, self._retrieve_from_stores(selected, agent_role, query)):
             for item in items:
                 combined_score = self._score_memory(item, query.text)
                 results.append((attachment.name, item, combined_score))
@@ -277,6 +367,27 @@ class MemoryManager:
         ordered_items = [item for _, item, _ in results]
         return MemoryRetrievalResult(formatted_text="\n".join(formatted), items=ordered_items)
 
+    def _retrieve_from_stores(
+        self,
+        selected: List[tuple[MemoryAttachmentConfig, MemoryBase]],
+        agent_role: str,
+        query: MemoryContentSnapshot,
+    ) -> List[List[MemoryItem]]:
+        """Query the selected stores, concurrently when there is more than one."""
+
+        def _retrieve(attachment: MemoryAttachmentConfig, memory: MemoryBase) -> List[MemoryItem]:
+            self._wait_for_own_writes(attachment.name)
+            return memory.retrieve(agent_role, query, attachment.top_k, attachment.similarity_threshold)
+
+        if len(selected) <= 1:
+            return [_retrieve(attachment, memory) for attachment, memory in selected]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(selected)) as pool:
+            futures = [
+                submit_tracked(pool, "memory_retrieve", _retrieve, attachment, memory)
+                for attachment, memory in selected
+            ]
+            return [future.result() for future in futures]
+
     def update(self, payload: MemoryWritePayload) -> None:
         for attachment in self.attachments:
             if not attachment.write:
@@ -284,9 +395,41 @@ class MemoryManager:
             memory = self.memories.get(attachment.name)
             if not memory:
                 continue
+            if self.writer is not None:
+                ticket = self.writer.submit(attachment.name, payload)
+                if ticket:
+                    with self._pending_lock:
+                        self._pending_writes.setdefault(attachment.name, []).append(ticket)
+                continue
             memory.update(payload)
             memory.save()
 
+    def wait_for_writes(self) -> None:
+        """Block until every update submitted through this manager was applied.
+
+        Raises ``MemoryWriteError`` when any of those updates failed.
+        """
+        with self._pending_lock:
+            names = list(self._pending_writes)
+        for name in names:
+            self._wait_for_own_writes(name)
+        with self._pending_lock:
+            failed, self._failed_writes = self._failed_writes, []
+        if failed:
+            raise MemoryWriteError(failed)
+
+    def _wait_for_own_writes(self, name: str) -> None:
+        """Wait for this manager's writes to ``name``; failures are kept for ``wait_for_writes``."""
+        with self._pending_lock:
+            tickets = self._pending_writes.pop(name, [])
+        if not tickets or self.writer is None:
+            return
+        self.writer.wait_for(name, max(tickets))
+        failed = self.writer.failures(name, tickets)
+        if failed:
+            with self._pending_lock:
+                self._failed_writes.extend((name, exc) for exc in failed)
+
     def _score_memory(self, memory_item: MemoryItem, query: str) -> float:
         current_time = time.time()
         age_hours = (current_time - (memory_item.timestamp or current_time)) / 3600
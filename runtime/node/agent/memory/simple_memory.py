@@ -4,7 +4,7 @@ import logging
 import os
 import re
 import time
-from typing import List
+from typing import List, Sequence
 
 from entity.configs import MemoryStoreConfig
 from entity.configs.node.memory import SimpleMemoryConfig
@@ -86,9 +86,7 @@ class SimpleMemory(MemoryBase):
 
     def save(self) -> None:
         if self.memory_path and self.memory_path.endswith(".json"):
-            os.makedirs(os.path.dirname(self.memory_path), exist_ok=True)
-            with open(self.memory_path, "w") as file:
-                json.dump([item.to_dict() for item in self.contents], file, indent=2, ensure_ascii=False)
+            self._write_json(self.memory_path, lambda: [item.to_dict() for item in self.contents])
 
     def retrieve(
         self,
@@ -97,7 +95,8 @@ class SimpleMemory(MemoryBase):
         top_k: int,
         similarity_threshold: float,
     ) -> List[MemoryItem]:
-        if self.count_memories() == 0 or not self.embedding:
+        items = self.contents
+        if not items or not self.embedding:
             return []
         
         # Build an optimized query for retrieval
@@ -114,7 +113,7 @@ class SimpleMemory(MemoryBase):
 
         memory_embeddings = []
         valid_items = []
-        for item in self.contents:
+        for item in items:
             if item.embedding is not None:
                 if len(item.embedding) != expected_dim:
                     logger.warning(
@@ -258,10 +257,8 @@ class SimpleMemory(MemoryBase):
             return
 
         content_hash = self._generate_content_hash(extracted_content)
-        for existing_item in self.contents:
-            existing_hash = self._generate_content_hash(existing_item.content_summary)
-            if existing_hash == content_hash:
-                return
+        if self._has_content_hash(self.contents, content_hash):
+            return
 
         embedding_vector = self.embedding.get_embedding(extracted_content)
         if isinstance(embedding_vector, list):
@@ -287,8 +284,13 @@ class SimpleMemory(MemoryBase):
             output_snapshot=snapshot,
         )
 
-        self.contents.append(memory_item)
+        with self.write_lock:
+            # Another writer may have stored the same content while we were embedding
+            if self._has_content_hash(self.contents, content_hash):
+                return
+            self._append_items([memory_item], max_items=1000)
 
-        max_memories = 1000
-        if len(self.contents) > max_memories:
-            self.contents = self.contents[-max_memories:]
+    def _has_content_hash(self, items: Sequence[MemoryItem], content_hash: str) -> bool:
+        return any(
+            self._generate_content_hash(item.content_summary) == content_hash for item in items
+        )
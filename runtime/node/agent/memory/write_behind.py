@@ -0,0 +1,205 @@
+"""Write-behind queue for memory store updates.
+
+``MemoryManager.update`` used to run ``memory.update`` (dedup, embedding) and
+``memory.save`` inline, so every agent turn waited for an embedding call and
+a JSON dump before its output moved downstream. With a :class:`MemoryWriter`
+the update is handed to a per-store queue instead:
+
+- each store has one worker thread, so writes to a store are applied in the
+  order they were submitted and never concurrently with each other;
+- :meth:`MemoryWriter.submit` returns a ticket; a reader that needs its own
+  writes (the same node's next retrieval) waits for that ticket only;
+- :meth:`MemoryWriter.flush` drains every queue and saves deferred stores; the
+  graph executor calls it when the workflow finishes.
+
+A write that fails in the background is logged and kept until it is reported:
+:meth:`MemoryWriter.flush` and :meth:`MemoryWriter.close` raise
+:class:`MemoryWriteError` for every failure since the previous flush, and
+``MemoryManager.wait_for_writes`` raises for the failed writes it submitted.
+
+How soon a write reaches disk follows the store's ``durability`` setting:
+``sync`` keeps the old inline behaviour, ``async`` saves in the background
+after each update and ``on_finish`` only saves when the writer is flushed.
+"""
+
+import logging
+import threading
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+from runtime.node.agent.memory.memory_base import MemoryBase, MemoryWriteError, MemoryWritePayload
+
+logger = logging.getLogger(__name__)
+
+DURABILITY_SYNC = "sync"
+DURABILITY_ASYNC = "async"
+DURABILITY_ON_FINISH = "on_finish"
+DURABILITY_MODES = (DURABILITY_SYNC, DURABILITY_ASYNC, DURABILITY_ON_FINISH)
+
+_SAVE = object()
+
+
+class MemoryWriteQueue:
+    """Ordered background writer for one memory store."""
+
+    def __init__(self, name: str, memory: MemoryBase, durability: str = DURABILITY_ASYNC) -> None:
+        self.name = name
+        self.memory = memory
+        self.durability = durability if durability in DURABILITY_MODES else DURABILITY_ASYNC
+        self._tasks: Deque[Tuple[int, object]] = deque()
+        self._cond = threading.Condition()
+        self._submitted = 0
+        self._completed = 0
+        self._dirty = False
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self.last_error: Optional[BaseException] = None
+        # Failed tickets not yet reported by a flush
+        self._failed: Dict[int, BaseException] = {}
+
+    @property
+    def pending(self) -> int:
+        with self._cond:
+            return self._submitted - self._completed
+
+    def submit(self, payload: MemoryWritePayload) -> int:
+        """Queue ``payload`` and return the ticket to wait on for it."""
+        if self.durability == DURABILITY_SYNC:
+            self.memory.update(payload)
+            self.memory.save()
+            return 0
+        return self._enqueue(payload)
+
+    def wait_for(self, ticket: int, timeout: Optional[float] = None) -> bool:
+        """Block until the write behind ``ticket`` was applied."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._completed >= ticket, timeout)
+
+    def failures(self, tickets: Iterable[int]) -> List[BaseException]:
+        """Errors of the failed writes among ``tickets``."""
+        with self._cond:
+            return [self._failed[ticket] for ticket in tickets if ticket in self._failed]
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Apply every queued write and save the store.
+
+        Raises :class:`MemoryWriteError` when a write failed since the last flush.
+        """
+        if self.durability == DURABILITY_SYNC:
+            return True
+        drained = self.wait_for(self._enqueue(_SAVE), timeout)
+        with self._cond:
+            failed = [(self.name, exc) for _, exc in sorted(self._failed.items())]
+            self._failed.clear()
+        if failed:
+            raise MemoryWriteError(failed)
+        return drained
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        with self._cond:
+            if self._closed:
+                return True
+        try:
+            return self.flush(timeout)
+        finally:
+            with self._cond:
+                self._closed = True
+                self._cond.notify_all()
+                thread = self._thread
+            if thread is not None:
+                thread.join(timeout)
+
+    def _enqueue(self, task: object) -> int:
+        with self._cond:
+            if self._closed:
+                raise RuntimeError(f"memory write queue '{self.name}' is closed")
+            self._submitted += 1
+            ticket = self._submitted
+            self._tasks.append((ticket, task))
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name=f"memory-writer-{self.name}", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify_all()
+            return ticket
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._tasks or self._closed)
+                if not self._tasks:
+                    return
+                ticket, task = self._tasks.popleft()
+            try:
+                self._apply(task)
+            except Exception as exc:
+                logger.exception("Memory write to store '%s' failed", self.name)
+                with self._cond:
+                    self.last_error = exc
+                    self._failed[ticket] = exc
+            finally:
+                with self._cond:
+                    self._completed = ticket
+                    self._cond.notify_all()
+
+    def _apply(self, task: object) -> None:
+        if task is _SAVE:
+            if self._dirty:
+                self._dirty = False
+                self.memory.save()
+            return
+        self.memory.update(task)
+        if self.durability == DURABILITY_ASYNC:
+            self.memory.save()
+        else:
+            self._dirty = True
+
+
+class MemoryWriter:
+    """Per-store write-behind queues shared by every memory manager of a run."""
+
+    def __init__(self, stores: Dict[str, MemoryBase]) -> None:
+        self._queues: Dict[str, MemoryWriteQueue] = {}
+        for name, memory in stores.items():
+            durability = getattr(memory.store, "durability", DURABILITY_ASYNC)
+            self._queues[name] = MemoryWriteQueue(name, memory, durability)
+
+    def queue(self, name: str) -> Optional[MemoryWriteQueue]:
+        return self._queues.get(name)
+
+    def submit(self, name: str, payload: MemoryWritePayload) -> int:
+        queue = self._queues.get(name)
+        if queue is None:
+            raise KeyError(f"memory store {name} has no write queue")
+        return queue.submit(payload)
+
+    def wait_for(self, name: str, ticket: int, timeout: Optional[float] = None) -> bool:
+        queue = self._queues.get(name)
+        return True if queue is None else queue.wait_for(ticket, timeout)
+
+    def failures(self, name: str, tickets: Iterable[int]) -> List[BaseException]:
+        queue = self._queues.get(name)
+        return [] if queue is None else queue.failures(tickets)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Drain every queue; False when ``timeout`` expired on any of them.
+
+        Raises :class:`MemoryWriteError` after draining when any write failed.
+        """
+        return self._drain_all(lambda queue: queue.flush(timeout))
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        return self._drain_all(lambda queue: queue.close(timeout))
+
+    def _drain_all(self, drain) -> bool:
+        drained = True
+        failed: List[Tuple[str, BaseException]] = []
+        for queue in self._queues.values():
+            try:
+                drained = drain(queue) and drained
+            except MemoryWriteError as exc:
+                failed.extend(exc.failures)
+        if failed:
+            raise MemoryWriteError(failed)
+        return drained
@@ -1,8 +1,9 @@
 from .base import ModelProvider, ProviderRegistry
-from .response import ModelResponse
+from .response import ModelDelta, ModelResponse
 
 __all__ = [
     "ModelProvider",
     "ProviderRegistry",
+    "ModelDelta",
     "ModelResponse",
 ]
\ No newline at end of file
@@ -1,33 +1,77 @@
 """Abstract base classes for agent providers."""
+import hashlib
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 from entity.configs import AgentConfig
 from entity.messages import Message
 from schema_registry import register_model_provider_schema
 from entity.tool_spec import ToolSpec
-from runtime.node.agent.providers.response import ModelResponse
+from runtime.node.agent.providers.response import ModelDelta, ModelResponse
 from utils.token_tracker import TokenUsage
 from utils.registry import Registry
 
 
 class ModelProvider(ABC):
     """Abstract base class for all agent providers."""
+
+    UPLOAD_MIN_BYTES = 1024 * 1024  # smaller attachments are cheaper to inline
     
-    def __init__(self, config: AgentConfig):
+    def __init__(
+        self,
+        config: AgentConfig,
+        *,
+        tool_payload_cache: Optional[Dict[Any, Any]] = None,
+        attachment_store: Any = None,
+    ):
         """
         Initialize the agent provider with configuration.
         
         Args:
             config: Agent configuration instance
+            tool_payload_cache: Node-wide cache of serialized tool payloads
+            attachment_store: Workspace attachment store that records uploaded file ids
         """
         self.config = config
+        self.tool_payload_cache = tool_payload_cache
+        self.attachment_store = attachment_store
         self.base_url = config.base_url
         self.api_key = config.api_key
         self.model_name = config.name if isinstance(config.name, str) else str(config.name)
         self.provider = config.provider
         self.params = config.params or {}
 
+    def _serialized_tools(
+        self,
+        form: str,
+        tool_specs: List[ToolSpec],
+        build: Callable[[List[ToolSpec]], Any],
+    ) -> Any:
+        """Return ``build(tool_specs)``, reusing the node's cached result for the same tools.
+
+        The agent executor shares one cache per node across turns and
+        executions; callers must treat the returned payload as read-only.
+        """
+        cache = self.tool_payload_cache
+        if cache is None:
+            return build(tool_specs)
+        key = (self.provider, form, tuple(spec.name for spec in tool_specs))
+        payload = cache.get(key)
+        if payload is None:
+            payload = build(tool_specs)
+            cache[key] = payload
+        return payload
+
+    def _upload_scope(self) -> str:
+        """Scope of uploaded file ids: only the endpoint and account that uploaded a file can reference it."""
+        account = hashlib.sha256((self.api_key or "").encode("utf-8")).hexdigest()[:16]
+        return f"{self.provider}:{self.base_url or ''}:{account}"
+
+    def _upload_min_bytes(self) -> int:
+        """Attachments smaller than this are sent inline even when uploads are enabled."""
+        value = self.params.get("upload_min_bytes")
+        return int(value) if value is not None else self.UPLOAD_MIN_BYTES
+
     @abstractmethod
     def create_client(self):
         """
@@ -61,6 +105,29 @@ class ModelProvider(ABC):
         """
         pass
 
+    def stream_model(
+        self,
+        client,
+        conversation: List[Message],
+        timeline: List[Any],
+        tool_specs: Optional[List[ToolSpec]] = None,
+        *,
+        on_delta: Callable[[ModelDelta], None],
+        **kwargs,
+    ) -> ModelResponse:
+        """
+        Call the model, reporting output through ``on_delta`` as it is generated.
+
+        Takes the same arguments as :meth:`call_model` and returns the same
+        assembled response. Providers without a streaming API inherit this
+        fallback, which reports the complete text as a single delta.
+        """
+        response = self.call_model(client, conversation, timeline, tool_specs, **kwargs)
+        text = response.message.text_content()
+        if text:
+            on_delta(ModelDelta(text=text))
+        return response
+
     @abstractmethod
     def extract_token_usage(self, response: Any) -> TokenUsage:
         """
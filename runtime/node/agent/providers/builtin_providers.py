@@ -2,6 +2,7 @@
 
 from runtime.node.agent.providers.base import ProviderRegistry
 
+from runtime.node.agent.providers.mock_provider import MockProvider
 from runtime.node.agent.providers.openai_provider import OpenAIProvider
 
 ProviderRegistry.register(
@@ -11,6 +12,13 @@ ProviderRegistry.register(
     summary="OpenAI models via the official OpenAI SDK (responses API)",
 )
 
+ProviderRegistry.register(
+    "mock",
+    MockProvider,
+    label="Mock",
+    summary="Deterministic offline responses for tests and benchmarks (no network)",
+)
+
 try:
     from runtime.node.agent.providers.gemini_provider import GeminiProvider
 except ImportError:
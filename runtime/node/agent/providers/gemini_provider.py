@@ -1,11 +1,13 @@
 """Gemini provider implementation."""
 
 import base64
-import binascii
+import io
 import json
+import logging
 import os
+import time
 import uuid
-from typing import Any, Dict, List, Optional, Sequence, Tuple
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
 from google import genai
 from google.genai import types as genai_types
@@ -22,15 +24,22 @@ from entity.messages import (
 )
 from entity.tool_spec import ToolSpec
 from runtime.node.agent import ModelProvider
-from runtime.node.agent import ModelResponse
+from runtime.node.agent import ModelDelta, ModelResponse
+from utils.attachment_cache import attachment_size, get_attachment_cache
+from utils.attachments import REMOTE_FILE_SCOPE_KEY
+from utils.metrics import ATTACHMENT_UPLOADS
 from utils.token_tracker import TokenUsage
 
+logger = logging.getLogger(__name__)
+
 
 class GeminiProvider(ModelProvider):
     """Gemini provider implementation."""
 
     CSV_INLINE_CHAR_LIMIT = 200_000
     CSV_INLINE_SIZE_THRESHOLD_BYTES = 3 * 1024 * 1024  # 3 MB
+    UPLOADED_FILE_TTL = 46 * 3600  # the file service deletes uploads after 48 hours
+    UPLOAD_ACTIVE_TIMEOUT = 120.0
 
     def create_client(self):
         """
@@ -58,24 +67,116 @@ class GeminiProvider(ModelProvider):
         """
         Call the Gemini model using the unified conversation timeline.
         """
-        contents, system_instruction = self._build_contents(timeline)
-        config = self._build_generation_config(system_instruction, tool_specs, kwargs)
-        # print(contents)
-        # print(config)
+        return self._call(client, timeline, tool_specs, kwargs, None)
 
-        response: GenerateContentResponse = client.models.generate_content(
-            model=self.model_name,
-            contents=contents,
-            config=config,
-        )
+    def stream_model(
+        self,
+        client,
+        conversation: List[Message],
+        timeline: List[Any],
+        tool_specs: Optional[List[ToolSpec]] = None,
+        *,
+        on_delta: Callable[[ModelDelta], None],
+        **kwargs,
+    ) -> ModelResponse:
+        """
+        Stream the Gemini model output; the assembled response matches ``call_model``.
+        """
+        return self._call(client, timeline, tool_specs, kwargs, on_delta)
 
-        # print(response)
+    def _call(
+        self,
+        client,
+        timeline: List[Any],
+        tool_specs: Optional[List[ToolSpec]],
+        kwargs: Dict[str, Any],
+        on_delta: Optional[Callable[[ModelDelta], None]],
+    ) -> ModelResponse:
+        file_client = client if self.params.get("upload_attachments") else None
+        contents, system_instruction = self._build_contents(timeline, file_client)
+        config = self._build_generation_config(system_instruction, tool_specs, kwargs)
+
+        if on_delta is None:
+            response: GenerateContentResponse = client.models.generate_content(
+                model=self.model_name,
+                contents=contents,
+                config=config,
+            )
+        else:
+            response = self._stream_content(client, contents, config, on_delta)
 
         self._track_token_usage(response)
         self._append_response_contents(timeline, response)
         message = self._deserialize_response(response)
         return ModelResponse(message=message, raw_response=response)
 
+    def _stream_content(
+        self,
+        client,
+        contents: List[genai_types.Content],
+        config: genai_types.GenerateContentConfig,
+        on_delta: Callable[[ModelDelta], None],
+    ) -> GenerateContentResponse:
+        """Consume ``generate_content_stream`` into a single response.
+
+        Text parts are merged as they arrive; function calls are streamed
+        whole by Gemini and are reported as one delta each.
+        """
+        parts: List[genai_types.Part] = []
+        last_chunk = None
+        finish_reason = None
+        tool_calls = 0
+        for chunk in client.models.generate_content_stream(
+            model=self.model_name,
+            contents=contents,
+            config=config,
+        ):
+            last_chunk = chunk
+            candidate = self._select_primary_candidate(chunk)
+            if candidate is None:
+                continue
+            finish_reason = getattr(candidate, "finish_reason", None) or finish_reason
+            content = getattr(candidate, "content", None)
+            for part in getattr(content, "parts", None) or []:
+                text = getattr(part, "text", None)
+                function_call = getattr(part, "function_call", None)
+                if text is not None and not getattr(part, "thought", None):
+                    on_delta(ModelDelta(text=text))
+                elif function_call:
+                    on_delta(
+                        ModelDelta(
+                            tool_call_index=tool_calls,
+                            tool_call_id=getattr(function_call, "name", None),
+                            tool_name=getattr(function_call, "name", None),
+                            arguments=json.dumps(getattr(function_call, "args", None) or {}, ensure_ascii=False),
+                        )
+                    )
+                    tool_calls += 1
+                previous = parts[-1] if parts else None
+                if (
+                    text is not None
+                    and previous is not None
+                    and previous.text is not None
+                    and bool(previous.thought) == bool(getattr(part, "thought", None))
+                    and not getattr(part, "thought_signature", None)
+                ):
+                    parts[-1] = previous.model_copy(update={"text": previous.text + text})
+                else:
+                    parts.append(part)
+
+        if last_chunk is None:
+            return GenerateContentResponse(candidates=[])
+        return GenerateContentResponse(
+            candidates=[
+                genai_types.Candidate(
+                    content=genai_types.Content(role="model", parts=parts),
+                    finish_reason=finish_reason,
+                )
+            ],
+            usage_metadata=getattr(last_chunk, "usage_metadata", None),
+            model_version=getattr(last_chunk, "model_version", None),
+        )
+
     def extract_token_usage(self, response: Any) -> TokenUsage:
         """Extract token usage from Gemini usage metadata."""
         usage_metadata = getattr(response, "usage_metadata", None)
@@ -110,7 +211,9 @@ class GeminiProvider(ModelProvider):
     def _build_contents(
         self,
         timeline: List[Any],
+        file_client: Any = None,
     ) -> Tuple[List[genai_types.Content], Optional[str]]:
+        """Build request contents; attachments are uploaded through ``file_client`` when one is given."""
         contents: List[genai_types.Content] = []
         system_prompts: List[str] = []
 
@@ -121,11 +224,11 @@ class GeminiProvider(ModelProvider):
                     if text:
                         system_prompts.append(text)
                     continue
-                contents.append(self._message_to_content(item))
+                contents.append(self._message_to_content(item, file_client))
                 continue
 
             if isinstance(item, FunctionCallOutputEvent):
-                contents.append(self._function_output_event_to_content(item))
+                contents.append(self._function_output_event_to_content(item, file_client))
                 continue
 
             if isinstance(item, genai_types.Content):
@@ -151,15 +254,15 @@ class GeminiProvider(ModelProvider):
             if content:
                 timeline.append(content)
 
-    def _message_to_content(self, message: Message) -> genai_types.Content:
+    def _message_to_content(self, message: Message, file_client: Any = None) -> genai_types.Content:
         role = self._map_role(message.role)
         if message.role is MessageRole.TOOL:
-            part = self._build_tool_response_part(message)
+            part = self._build_tool_response_part(message, file_client)
             return genai_types.Content(role="user", parts=[part])
 
         parts: List[genai_types.Part] = []
         for block in message.blocks():
-            parts.extend(self._block_to_parts(block))
+            parts.extend(self._block_to_parts(block, file_client))
         if not parts:
             text = message.text_content()
             parts.append(genai_types.Part(text=text))
@@ -168,6 +271,7 @@ class GeminiProvider(ModelProvider):
     def _function_output_event_to_content(
         self,
         event: FunctionCallOutputEvent,
+        file_client: Any = None,
     ) -> genai_types.Content:
         function_name = event.function_name or event.call_id or "tool"
         payload: Dict[str, Any] = {}
@@ -190,7 +294,7 @@ class GeminiProvider(ModelProvider):
                         continue
 
                     # Otherwise treat as binary part
-                    general_parts = self._block_to_parts(block)
+                    general_parts = self._block_to_parts(block, file_client)
                     function_result_parts.extend(self._general_parts_to_function_response_parts(general_parts))
         else:
             if event.output_text:
@@ -236,10 +340,10 @@ class GeminiProvider(ModelProvider):
                 )
         return function_response_parts
 
-    def _build_tool_response_part(self, message: Message) -> genai_types.Part:
-        tool_name = message.metadata.get("tool_name") if isinstance(message.metadata, dict) else None
+    def _build_tool_response_part(self, message: Message, file_client: Any = None) -> genai_types.Part:
+        tool_name = message.get_metadata("tool_name")
         tool_name = tool_name or message.tool_call_id or "tool"
-        payload, block_parts = self._serialize_tool_message_payload(message)
+        payload, block_parts = self._serialize_tool_message_payload(message, file_client)
         return genai_types.Part(
             function_response=genai_types.FunctionResponse(
                 name=tool_name,
@@ -251,7 +355,11 @@ class GeminiProvider(ModelProvider):
     def _block_has_attachment(self, block: Any) -> bool:
         return isinstance(block, MessageBlock) and block.attachment is not None
 
-    def _serialize_tool_message_payload(self, message: Message) -> Tuple[Dict[str, Any], List[genai_types.FunctionResponsePart]]:
+    def _serialize_tool_message_payload(
+        self,
+        message: Message,
+        file_client: Any = None,
+    ) -> Tuple[Dict[str, Any], List[genai_types.FunctionResponsePart]]:
         content = message.content
         blocks: List[MessageBlock] = []
         if isinstance(content, str):
@@ -277,10 +385,10 @@ class GeminiProvider(ModelProvider):
                         blocks.append(MessageBlock.from_dict(block))
                     except Exception:
                         continue
-            parts = self._blocks_to_function_parts(blocks)
+            parts = self._blocks_to_function_parts(blocks, file_client)
             return {"blocks": blocks_payload, "result": message.text_content()}, parts
 
-        parts = self._blocks_to_function_parts(blocks)
+        parts = self._blocks_to_function_parts(blocks, file_client)
         return {"result": message.text_content()}, parts
 
     def _describe_block(self, block: Any) -> str:
@@ -292,7 +400,7 @@ class GeminiProvider(ModelProvider):
                 return str(text)
         return str(block)
 
-    def _block_to_parts(self, block: MessageBlock) -> List[genai_types.Part]:
+    def _block_to_parts(self, block: MessageBlock, file_client: Any = None) -> List[genai_types.Part]:
         if block.type is MessageBlockType.TEXT:
             return [genai_types.Part(text=block.text or "")]
 
@@ -307,7 +415,7 @@ class GeminiProvider(ModelProvider):
             MessageBlockType.VIDEO,
             MessageBlockType.FILE,
         ):
-            media_part = self._attachment_block_to_part(block)
+            media_part = self._attachment_block_to_part(block, file_client)
             return [media_part] if media_part else []
 
         if block.type is MessageBlockType.DATA:
@@ -375,14 +483,13 @@ class GeminiProvider(ModelProvider):
         except UnicodeDecodeError:
             return data_bytes.decode("utf-8", errors="replace")
 
-    def _attachment_block_to_part(self, block: MessageBlock) -> Optional[genai_types.Part]:
+    def _attachment_block_to_part(self, block: MessageBlock, file_client: Any = None) -> Optional[genai_types.Part]:
         attachment = block.attachment
         if not attachment:
             return None
 
-        metadata = attachment.metadata or {}
-        gemini_file_uri = metadata.get("gemini_file_uri") or attachment.remote_file_id
         mime_type = attachment.mime_type or self._guess_mime_from_block(block)
+        gemini_file_uri = self._known_file_uri(attachment) or self._resolve_file_uri(attachment, mime_type, file_client)
 
         if gemini_file_uri:
             return genai_types.Part(
@@ -408,6 +515,7 @@ class GeminiProvider(ModelProvider):
     def _blocks_to_function_parts(
         self,
         blocks: Optional[Sequence[Any]],
+        file_client: Any = None,
     ) -> List[genai_types.FunctionResponsePart]:
         if not blocks:
             return []
@@ -425,7 +533,7 @@ class GeminiProvider(ModelProvider):
             if not attachment:
                 continue
             mime_type = attachment.mime_type or self._guess_mime_from_block(block)
-            file_uri = (attachment.metadata or {}).get("gemini_file_uri") or attachment.remote_file_id
+            file_uri = self._known_file_uri(attachment) or self._resolve_file_uri(attachment, mime_type, file_client)
             if file_uri:
                 parts.append(
                     genai_types.FunctionResponsePart(
@@ -476,30 +584,94 @@ class GeminiProvider(ModelProvider):
             return None
 
     def _read_attachment_bytes(self, attachment: AttachmentRef) -> Optional[bytes]:
-        if attachment.data_uri:
-            decoded = self._decode_data_uri(attachment.data_uri)
-            if decoded is not None:
-                return decoded
-        if attachment.local_path and os.path.exists(attachment.local_path):
-            try:
-                with open(attachment.local_path, "rb") as handle:
-                    return handle.read()
-            except OSError:
-                return None
-        return None
+        return get_attachment_cache().read_bytes(attachment)
 
-    def _decode_data_uri(self, data_uri: str) -> Optional[bytes]:
-        if not data_uri.startswith("data:"):
+    def _resolve_file_uri(self, attachment: AttachmentRef, mime_type: Optional[str], client: Any = None) -> Optional[str]:
+        """Return a file service URI for ``attachment``, uploading it once through ``client``."""
+        if client is None:
             return None
-        header, _, data = data_uri.partition(",")
-        if not _:
+        cache = get_attachment_cache()
+        scope = self._upload_scope()
+        file_uri = cache.remote_file_id(scope, attachment, max_age=self.UPLOADED_FILE_TTL)
+        if file_uri:
+            return file_uri
+        store = self.attachment_store
+        record = store.find(attachment) if store is not None else None
+        if record is not None:
+            stored = record.ref.metadata or {}
+            if stored.get("gemini_file_uri") and stored.get("gemini_file_expires_at", 0) > time.time():
+                file_uri = self._known_file_uri(record.ref)
+                if file_uri:
+                    return file_uri
+        if attachment_size(attachment) < self._upload_min_bytes():
             return None
-        if ";base64" in header:
-            try:
-                return base64.b64decode(data)
-            except (ValueError, binascii.Error):
+
+        def _upload() -> str:
+            if attachment.local_path and os.path.exists(attachment.local_path):
+                source: Any = attachment.local_path
+            else:
+                data = cache.read_bytes(attachment, cache=False)
+                if data is None:
+                    raise ValueError("attachment payload is not readable")
+                source = io.BytesIO(data)
+            uploaded = client.files.upload(
+                file=source,
+                config=genai_types.UploadFileConfig(
+                    mime_type=mime_type or "application/octet-stream",
+                    display_name=attachment.name,
+                ),
+            )
+            uploaded = self._wait_until_active(client, uploaded)
+            ATTACHMENT_UPLOADS.inc(provider="gemini")
+            return uploaded.uri
+
+        try:
+            file_uri = cache.upload_once(scope, attachment, _upload, max_age=self.UPLOADED_FILE_TTL)
+        except Exception as exc:
+            logger.warning("Uploading attachment %s failed, sending it inline: %s", attachment.attachment_id, exc)
+            return None
+        if file_uri and record is not None:
+            store.update_metadata(
+                record.ref.attachment_id,
+                {
+                    "gemini_file_uri": file_uri,
+                    "gemini_file_scope": scope,
+                    "gemini_file_expires_at": time.time() + self.UPLOADED_FILE_TTL,
+                },
+            )
+        return file_uri
+
+    def _known_file_uri(self, attachment: AttachmentRef) -> Optional[str]:
+        """Return a previously uploaded URI, but only one this endpoint and key can read."""
+        metadata = attachment.metadata or {}
+        scope = self._upload_scope()
+        file_uri = metadata.get("gemini_file_uri")
+        if file_uri:
+            owner = metadata.get("gemini_file_scope")
+            expires_at = metadata.get("gemini_file_expires_at")
+            if owner is not None and owner != scope:
                 return None
-        return data.encode("utf-8")
+            if expires_at is not None and expires_at <= time.time():
+                return None
+            return file_uri
+        if attachment.remote_file_id and metadata.get(REMOTE_FILE_SCOPE_KEY) in (None, scope):
+            return attachment.remote_file_id
+        return None
+
+    def _wait_until_active(self, client: Any, uploaded: Any) -> Any:
+        """Video uploads are processed asynchronously; poll until they can be referenced."""
+        deadline = time.monotonic() + self.UPLOAD_ACTIVE_TIMEOUT
+        while True:
+            state = getattr(uploaded, "state", None)
+            state_name = getattr(state, "name", state)
+            if state_name in (None, "ACTIVE", "STATE_UNSPECIFIED"):
+                return uploaded
+            if state_name == "FAILED":
+                raise RuntimeError(f"file service rejected upload {uploaded.name}")
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"upload {uploaded.name} still processing")
+            time.sleep(1.0)
+            uploaded = client.files.get(name=uploaded.name)
 
     def _guess_mime_from_block(self, block: MessageBlock) -> str:
         if block.attachment and block.attachment.mime_type:
@@ -625,7 +797,10 @@ class GeminiProvider(ModelProvider):
     def _build_tools(self, tool_specs: List[ToolSpec]) -> List[genai_types.Tool]:
         if not tool_specs:
             return []
+        return self._serialized_tools("function_declarations", tool_specs, self._build_function_declarations)
 
+    @staticmethod
+    def _build_function_declarations(tool_specs: List[ToolSpec]) -> List[genai_types.Tool]:
         declarations = []
         for spec in tool_specs:
             fn_payload = spec.to_gemini_function()
@@ -788,13 +963,19 @@ class GeminiProvider(ModelProvider):
         mime_type = getattr(file_data, "mime_type", None)
         file_uri = getattr(file_data, "file_uri", None) or getattr(file_data, "file", None)
         block_type = self._block_type_from_mime(mime_type or "")
+        scope = self._upload_scope()
         return MessageBlock(
             type=block_type,
             attachment=AttachmentRef(
                 attachment_id=uuid.uuid4().hex,
                 mime_type=mime_type,
                 remote_file_id=file_uri,
-                metadata={"gemini_file_uri": file_uri, "source": "gemini_file"},
+                metadata={
+                    "gemini_file_uri": file_uri,
+                    "gemini_file_scope": scope,
+                    REMOTE_FILE_SCOPE_KEY: scope,
+                    "source": "gemini_file",
+                },
             ),
         )
 
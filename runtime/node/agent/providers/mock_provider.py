@@ -0,0 +1,200 @@
+"""Deterministic mock provider for offline runs, tests and benchmarks.
+
+Every behaviour is driven by the agent's ``params`` mapping:
+
+``response``
+    Reply template. ``{model}``, ``{node_id}``, ``{call}`` and ``{input}``
+    (the last message, truncated) are substituted; any other braces are kept
+    as written, so JSON replies need no escaping.
+``latency``
+    Seconds to sleep per call: a number for a constant delay, or a mapping
+    ``{distribution: constant|uniform|normal|lognormal|exponential, mean,
+    stddev, min, max}``.
+``input_tokens`` / ``output_tokens``
+    Fixed token counts reported to the token tracker; omitted values are
+    estimated from text length (about four characters per token).
+``tool_calls``
+    ``{probability, tool, arguments}``. With the given probability the mock
+    requests a tool (the named one, else the first available) instead of
+    answering. It never requests a tool right after a tool result, so tool
+    loops always terminate.
+``failure_rate`` / ``failure_status_code`` / ``failure_message``
+    Raise ``MockProviderError`` with that probability; the default 503 status
+    is retryable under the standard agent retry policy.
+``seed``
+    Base seed. Randomness is derived from the seed, node id, call index and
+    conversation content, so identical runs behave identically.
+"""
+
+import hashlib
+import json
+import math
+import random
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+from entity.messages import Message, MessageRole, ToolCallPayload
+from entity.tool_spec import ToolSpec
+from runtime.node.agent import ModelProvider
+from runtime.node.agent import ModelResponse
+from utils.token_tracker import TokenUsage
+
+DEFAULT_RESPONSE = "Mock response from {model} for {node_id} (call {call})."
+INPUT_PREVIEW_CHARS = 200
+TEMPLATE_FIELDS = re.compile(r"\{(model|node_id|call|input)\}")
+CHARS_PER_TOKEN = 4
+
+
+class MockProviderError(RuntimeError):
+    """Injected provider failure carrying an HTTP-like status code."""
+
+    def __init__(self, message: str, status_code: int) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class MockProvider(ModelProvider):
+    """Provider that fabricates responses locally without any network access."""
+
+    def __init__(self, config, **kwargs) -> None:
+        super().__init__(config, **kwargs)
+        self._calls = 0
+
+    def create_client(self):
+        return None
+
+    def call_model(
+        self,
+        client,
+        conversation: List[Message],
+        timeline: List[Any],
+        tool_specs: Optional[List[ToolSpec]] = None,
+        **kwargs,
+    ) -> ModelResponse:
+        self._calls += 1
+        node_id = getattr(self.config, "node_id", None) or "ALL"
+        rng = self._rng(node_id, conversation)
+
+        delay = self._sample_latency(rng)
+        if delay > 0:
+            time.sleep(delay)
+
+        failure_rate = float(self.params.get("failure_rate", 0.0) or 0.0)
+        if failure_rate > 0 and rng.random() < failure_rate:
+            status_code = int(self.params.get("failure_status_code", 503))
+            message = self.params.get("failure_message") or "Mock provider injected failure"
+            raise MockProviderError(f"{message} (status {status_code})", status_code)
+
+        last_text = conversation[-1].text_content() if conversation else ""
+        tool_call = self._maybe_tool_call(rng, conversation, tool_specs)
+        if tool_call is not None:
+            message = Message(role=MessageRole.ASSISTANT, content="", tool_calls=[tool_call])
+        else:
+            template = str(self.params.get("response") or DEFAULT_RESPONSE)
+            values = {
+                "model": self.model_name,
+                "node_id": node_id,
+                "call": self._calls,
+                "input": last_text[:INPUT_PREVIEW_CHARS],
+            }
+            content = TEMPLATE_FIELDS.sub(lambda match: str(values[match.group(1)]), template)
+            message = Message(role=MessageRole.ASSISTANT, content=content)
+
+        raw_response = {"usage": self._usage_payload(conversation, message)}
+        self._track_token_usage(raw_response)
+        timeline.append(message)
+        return ModelResponse(message=message, raw_response=raw_response)
+
+    def extract_token_usage(self, response: Any) -> TokenUsage:
+        usage = (response or {}).get("usage") if isinstance(response, dict) else None
+        if not usage:
+            return TokenUsage()
+        return TokenUsage(
+            input_tokens=usage["input_tokens"],
+            output_tokens=usage["output_tokens"],
+            total_tokens=usage["input_tokens"] + usage["output_tokens"],
+            metadata=dict(usage),
+        )
+
+    def _rng(self, node_id: str, conversation: List[Message]) -> random.Random:
+        digest = hashlib.sha256()
+        digest.update(f"{self.params.get('seed', 0)}:{node_id}:{self._calls}".encode("utf-8"))
+        for message in conversation:
+            digest.update(message.text_content().encode("utf-8", errors="ignore"))
+        return random.Random(int.from_bytes(digest.digest()[:8], "big"))
+
+    def _sample_latency(self, rng: random.Random) -> float:
+        spec = self.params.get("latency", 0)
+        if isinstance(spec, (int, float)):
+            return max(0.0, float(spec))
+        if not isinstance(spec, dict):
+            return 0.0
+
+        distribution = str(spec.get("distribution", "constant")).lower()
+        mean = float(spec.get("mean", 0.0))
+        stddev = float(spec.get("stddev", 0.0))
+        if distribution == "uniform":
+            value = rng.uniform(float(spec.get("min", 0.0)), float(spec.get("max", mean * 2)))
+        elif distribution == "normal":
+            value = rng.gauss(mean, stddev)
+        elif distribution == "lognormal":
+            # Parameterised by the mean/stddev of the resulting delay, not of log(delay)
+            if mean <= 0:
+                value = 0.0
+            else:
+                sigma2 = math.log(1 + (stddev / mean) ** 2)
+                value = rng.lognormvariate(math.log(mean) - sigma2 / 2, math.sqrt(sigma2))
+        elif distribution == "exponential":
+            value = rng.expovariate(1 / mean) if mean > 0 else 0.0
+        else:
+            value = mean
+
+        if "min" in spec:
+            value = max(value, float(spec["min"]))
+        if "max" in spec:
+            value = min(value, float(spec["max"]))
+        return max(0.0, value)
+
+    def _maybe_tool_call(
+        self,
+        rng: random.Random,
+        conversation: List[Message],
+        tool_specs: Optional[List[ToolSpec]],
+    ) -> Optional[ToolCallPayload]:
+        spec = self.params.get("tool_calls")
+        if not isinstance(spec, dict) or not tool_specs:
+            return None
+        if conversation and conversation[-1].role is MessageRole.TOOL:
+            return None
+        if rng.random() >= float(spec.get("probability", 1.0)):
+            return None
+
+        wanted = spec.get("tool")
+        names = [tool.name for tool in tool_specs]
+        name = wanted if wanted in names else names[0]
+        arguments = json.dumps(spec.get("arguments") or {})
+        return ToolCallPayload(id=f"mock_call_{self._calls}", function_name=name, arguments=arguments)
+
+    def _usage_payload(self, conversation: List[Message], reply: Message) -> Dict[str, int]:
+        input_tokens = self.params.get("input_tokens")
+        if input_tokens is None:
+            input_chars = sum(len(message.text_content()) for message in conversation)
+            input_tokens = max(1, input_chars // CHARS_PER_TOKEN)
+        output_tokens = self.params.get("output_tokens")
+        if output_tokens is None:
+            output_tokens = max(1, len(reply.text_content()) // CHARS_PER_TOKEN)
+        return {"input_tokens": int(input_tokens), "output_tokens": int(output_tokens)}
+
+    def _track_token_usage(self, response: Dict[str, Any]) -> None:
+        token_tracker = getattr(self.config, "token_tracker", None)
+        if not token_tracker:
+            return
+
+        usage = self.extract_token_usage(response)
+        node_id = getattr(self.config, "node_id", "ALL")
+        usage.node_id = node_id
+        usage.model_name = self.model_name
+        usage.workflow_id = token_tracker.workflow_id
+        usage.provider = "mock"
+        token_tracker.record_usage(node_id, self.model_name, usage, provider="mock")
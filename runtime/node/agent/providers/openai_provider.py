@@ -1,13 +1,12 @@
 """OpenAI provider implementation."""
 
-import base64
 import hashlib
+import logging
 import re
 
-import binascii
 import os
-from typing import Any, Dict, List, Optional, Union
-from urllib.parse import unquote_to_bytes
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Union
 
 import openai
 from openai import OpenAI
@@ -23,9 +22,14 @@ from entity.messages import (
 )
 from entity.tool_spec import ToolSpec
 from runtime.node.agent import ModelProvider
-from runtime.node.agent import ModelResponse
+from runtime.node.agent import ModelDelta, ModelResponse
+from utils.attachment_cache import attachment_size, get_attachment_cache
+from utils.attachments import REMOTE_FILE_SCOPE_KEY
+from utils.metrics import ATTACHMENT_UPLOADS
 from utils.token_tracker import TokenUsage
 
+logger = logging.getLogger(__name__)
+
 
 class OpenAIProvider(ModelProvider):
     """OpenAI provider implementation."""
@@ -33,6 +37,7 @@ class OpenAIProvider(ModelProvider):
     CSV_INLINE_CHAR_LIMIT = 200_000  # safeguard large attachments
     TEXT_INLINE_CHAR_LIMIT = 200_000  # safeguard large text/* attachments
     MAX_INLINE_FILE_BYTES = 50 * 1024 * 1024  # OpenAI function output limit (~50 MB)
+    CLIENT_PARAMS = frozenset({"upload_attachments", "upload_min_bytes", "stream_usage"})  # never sent to the API
 
     def create_client(self):
         """
@@ -62,32 +67,198 @@ class OpenAIProvider(ModelProvider):
         """
         Call the OpenAI model with the given messages and parameters.
         """
+        return self._call(client, conversation, timeline, tool_specs, kwargs, None)
+
+    def stream_model(
+        self,
+        client: openai.Client,
+        conversation: List[Message],
+        timeline: List[Any],
+        tool_specs: Optional[List[ToolSpec]] = None,
+        *,
+        on_delta: Callable[[ModelDelta], None],
+        **kwargs,
+    ) -> ModelResponse:
+        """
+        Stream the OpenAI model output; the assembled response matches ``call_model``.
+        """
+        return self._call(client, conversation, timeline, tool_specs, kwargs, on_delta)
+
+    def _call(
+        self,
+        client: openai.Client,
+        conversation: List[Message],
+        timeline: List[Any],
+        tool_specs: Optional[List[ToolSpec]],
+        kwargs: Dict[str, Any],
+        on_delta: Optional[Callable[[ModelDelta], None]],
+    ) -> ModelResponse:
         # 1. Determine if we should use Chat Completions directly
-        is_chat = self._is_chat_completions_mode(client)
-        
-        if is_chat:
-            request_payload = self._build_chat_payload(conversation, tool_specs, kwargs)
-            response = client.chat.completions.create(**request_payload)
-            self._track_token_usage(response)
-            self._append_chat_response_output(timeline, response)
-            message = self._deserialize_chat_response(response)
-            return ModelResponse(message=message, raw_response=response)
+        if self._is_chat_completions_mode(client):
+            return self._call_chat(client, conversation, timeline, tool_specs, kwargs, on_delta)
 
         # 2. Try Responses API with fallback
-        request_payload = self._build_request_payload(timeline, tool_specs, kwargs)
+        file_client = client if self.params.get("upload_attachments") else None
+        request_payload = self._build_request_payload(timeline, tool_specs, kwargs, file_client=file_client)
         try:
-            response = client.responses.create(**request_payload)
+            if on_delta is None:
+                response = client.responses.create(**request_payload)
+            else:
+                response = self._stream_responses(client, request_payload, on_delta)
             self._track_token_usage(response)
             self._append_response_output(timeline, response)
             message = self._deserialize_response(response)
             return ModelResponse(message=message, raw_response=response)
         except Exception:
-            new_request_payload = self._build_chat_payload(conversation, tool_specs, kwargs)
-            response = client.chat.completions.create(**new_request_payload)
-            self._track_token_usage(response)
-            self._append_chat_response_output(timeline, response)
-            message = self._deserialize_chat_response(response)
-            return ModelResponse(message=message, raw_response=response)
+            if on_delta is not None:
+                on_delta(ModelDelta(reset=True))
+            return self._call_chat(client, conversation, timeline, tool_specs, kwargs, on_delta)
+
+    def _call_chat(
+        self,
+        client: openai.Client,
+        conversation: List[Message],
+        timeline: List[Any],
+        tool_specs: Optional[List[ToolSpec]],
+        kwargs: Dict[str, Any],
+        on_delta: Optional[Callable[[ModelDelta], None]],
+    ) -> ModelResponse:
+        request_payload = self._build_chat_payload(conversation, tool_specs, kwargs)
+        if on_delta is None:
+            response = client.chat.completions.create(**request_payload)
+        else:
+            response = self._stream_chat(client, request_payload, on_delta)
+        self._track_token_usage(response)
+        self._append_chat_response_output(timeline, response)
+        message = self._deserialize_chat_response(response)
+        return ModelResponse(message=message, raw_response=response)
+
+    def _stream_chat(
+        self,
+        client: openai.Client,
+        request_payload: Dict[str, Any],
+        on_delta: Callable[[ModelDelta], None],
+    ) -> Any:
+        """Consume a streamed chat completion into an object shaped like a non-streamed one."""
+        stream = self._open_chat_stream(client, request_payload)
+        text = ""
+        shown = ""
+        calls: Dict[int, Dict[str, str]] = {}
+        usage = None
+        finish_reason = None
+        response_id = None
+        model = None
+        for chunk in stream:
+            usage = self._get_attr(chunk, "usage") or usage
+            response_id = response_id or self._get_attr(chunk, "id")
+            model = model or self._get_attr(chunk, "model")
+            for choice in self._get_attr(chunk, "choices") or []:
+                if (self._get_attr(choice, "index") or 0) != 0:
+                    continue
+                finish_reason = self._get_attr(choice, "finish_reason") or finish_reason
+                delta = self._get_attr(choice, "delta")
+                if delta is None:
+                    continue
+                content = self._get_attr(delta, "content")
+                if content:
+                    text += content
+                    visible = self._visible_stream_text(text)
+                    if len(visible) > len(shown) and visible.startswith(shown):
+                        on_delta(ModelDelta(text=visible[len(shown):]))
+                        shown = visible
+                for tc in self._get_attr(delta, "tool_calls") or []:
+                    index = self._get_attr(tc, "index")
+                    index = len(calls) if index is None else index
+                    entry = calls.setdefault(index, {"id": "", "name": "", "arguments": ""})
+                    function = self._get_attr(tc, "function")
+                    call_id = self._get_attr(tc, "id") or ""
+                    name = (self._get_attr(function, "name") if function is not None else None) or ""
+                    arguments = (self._get_attr(function, "arguments") if function is not None else None) or ""
+                    entry["id"] = call_id or entry["id"]
+                    entry["name"] = name or entry["name"]
+                    entry["arguments"] += arguments
+                    on_delta(
+                        ModelDelta(
+                            tool_call_index=index,
+                            tool_call_id=call_id or None,
+                            tool_name=name or None,
+                            arguments=arguments,
+                        )
+                    )
+
+        tool_calls = [
+            SimpleNamespace(
+                id=entry["id"] or None,
+                type="function",
+                function=SimpleNamespace(name=entry["name"], arguments=entry["arguments"]),
+            )
+            for _, entry in sorted(calls.items())
+        ]
+        message = SimpleNamespace(role="assistant", content=text, tool_calls=tool_calls or None)
+        return SimpleNamespace(
+            id=response_id,
+            model=model,
+            choices=[SimpleNamespace(index=0, message=message, finish_reason=finish_reason)],
+            usage=usage,
+        )
+
+    def _open_chat_stream(self, client: openai.Client, request_payload: Dict[str, Any]) -> Any:
+        """Start a chat stream, asking for usage unless ``params.stream_usage`` is false.
+
+        Some OpenAI-compatible servers reject ``stream_options``; the request is
+        then repeated without it and usage is simply not reported.
+        """
+        if self.params.get("stream_usage", True) is False:
+            return client.chat.completions.create(**request_payload, stream=True)
+        try:
+            return client.chat.completions.create(
+                **request_payload,
+                stream=True,
+                stream_options={"include_usage": True},
+            )
+        except openai.BadRequestError as exc:
+            logger.info("Chat stream rejected with stream_options, retrying without usage: %s", exc)
+            return client.chat.completions.create(**request_payload, stream=True)
+
+    def _stream_responses(
+        self,
+        client: openai.Client,
+        request_payload: Dict[str, Any],
+        on_delta: Callable[[ModelDelta], None],
+    ) -> Any:
+        """Consume a streamed Responses call and return its final response object."""
+        final = None
+        call_indexes: Dict[str, int] = {}
+        for event in client.responses.create(**request_payload, stream=True):
+            kind = self._get_attr(event, "type")
+            if kind == "response.output_text.delta":
+                text = self._get_attr(event, "delta")
+                if text:
+                    on_delta(ModelDelta(text=text))
+            elif kind == "response.output_item.added":
+                item = self._get_attr(event, "item")
+                if self._get_attr(item, "type") == "function_call":
+                    index = len(call_indexes)
+                    call_indexes[self._get_attr(item, "id")] = index
+                    on_delta(
+                        ModelDelta(
+                            tool_call_index=index,
+                            tool_call_id=self._get_attr(item, "call_id"),
+                            tool_name=self._get_attr(item, "name"),
+                        )
+                    )
+            elif kind == "response.function_call_arguments.delta":
+                index = call_indexes.get(self._get_attr(event, "item_id"))
+                arguments = self._get_attr(event, "delta")
+                if index is not None and arguments:
+                    on_delta(ModelDelta(tool_call_index=index, arguments=arguments))
+            elif kind in ("response.completed", "response.incomplete"):
+                final = self._get_attr(event, "response")
+            elif kind in ("response.failed", "error"):
+                raise RuntimeError(f"Streamed response failed: {event}")
+        if final is None:
+            raise RuntimeError("Response stream ended without a final response")
+        return final
 
     def _is_chat_completions_mode(self, client: Any) -> bool:
         """Determine if we should use standard chat completions instead of responses API."""
@@ -170,9 +341,15 @@ class OpenAIProvider(ModelProvider):
         timeline: List[Any],
         tool_specs: Optional[List[ToolSpec]],
         raw_params: Dict[str, Any],
+        *,
+        file_client: Any = None,
     ) -> Dict[str, Any]:
-        """Construct the Responses API payload from event timeline."""
-        params = dict(raw_params)
+        """Construct the Responses API payload from event timeline.
+
+        Attachments are uploaded through ``file_client`` when one is given;
+        otherwise they are sent inline.
+        """
+        params = {key: value for key, value in raw_params.items() if key not in self.CLIENT_PARAMS}
         max_tokens = params.pop("max_tokens", None)
         max_output_tokens = params.pop("max_output_tokens", None)
         if max_output_tokens is None and max_tokens is not None:
@@ -180,7 +357,7 @@ class OpenAIProvider(ModelProvider):
 
         input_messages: List[Any] = []
         for item in timeline:
-            serialized = self._serialize_timeline_item(item)
+            serialized = self._serialize_timeline_item(item, file_client)
             if serialized is not None:
                 input_messages.append(serialized)
 
@@ -211,7 +388,7 @@ class OpenAIProvider(ModelProvider):
             raise ValueError("params.tools must be a list when provided")
 
         if tool_specs:
-            merged_tools.extend(spec.to_openai_dict() for spec in tool_specs)
+            merged_tools.extend(self._serialized_tools("responses", tool_specs, self._build_response_tools))
 
         if merged_tools:
             payload["tools"] = merged_tools
@@ -233,7 +410,7 @@ class OpenAIProvider(ModelProvider):
         raw_params: Dict[str, Any],
     ) -> Dict[str, Any]:
         """Construct standard Chat Completions API payload."""
-        params = dict(raw_params)
+        params = {key: value for key, value in raw_params.items() if key not in self.CLIENT_PARAMS}
         max_output_tokens = params.pop("max_output_tokens", None)
         max_tokens = params.pop("max_tokens", None)
         if max_tokens is None and max_output_tokens is not None:
@@ -264,15 +441,7 @@ class OpenAIProvider(ModelProvider):
             merged_tools.extend(user_tools)
 
         if tool_specs:
-            for spec in tool_specs:
-                merged_tools.append({
-                    "type": "function",
-                    "function": {
-                        "name": spec.name,
-                        "description": spec.description,
-                        "parameters": spec.parameters or {"type": "object", "properties": {}},
-                    }
-                })
+            merged_tools.extend(self._serialized_tools("chat", tool_specs, self._build_chat_tools))
 
         if merged_tools:
             payload["tools"] = merged_tools
@@ -286,6 +455,24 @@ class OpenAIProvider(ModelProvider):
         payload.update(params)
         return payload
 
+    @staticmethod
+    def _build_response_tools(tool_specs: List[ToolSpec]) -> List[Dict[str, Any]]:
+        return [spec.to_openai_dict() for spec in tool_specs]
+
+    @staticmethod
+    def _build_chat_tools(tool_specs: List[ToolSpec]) -> List[Dict[str, Any]]:
+        return [
+            {
+                "type": "function",
+                "function": {
+                    "name": spec.name,
+                    "description": spec.description,
+                    "parameters": spec.parameters or {"type": "object", "properties": {}},
+                },
+            }
+            for spec in tool_specs
+        ]
+
     def _serialize_timeline_item_for_chat(self, item: Any) -> Optional[Any]:
         if isinstance(item, Message):
             return self._serialize_message_for_chat(item)
@@ -321,8 +508,9 @@ class OpenAIProvider(ModelProvider):
             payload["name"] = message.name
         if message.tool_call_id:
             payload["tool_call_id"] = message.tool_call_id
-        if message.tool_calls:
-            payload["tool_calls"] = [tc.to_openai_dict() for tc in message.tool_calls]
+        tool_calls = message.tool_calls_view
+        if tool_calls:
+            payload["tool_calls"] = [tc.to_openai_dict() for tc in tool_calls]
         return payload
 
     def _serialize_function_call_output_event_for_chat(self, event: FunctionCallOutputEvent) -> Dict[str, Any]:
@@ -393,6 +581,7 @@ class OpenAIProvider(ModelProvider):
             tool_calls=tool_calls
         )
 
+    _THINK_OPEN = "<think>"
     _THINK_PATTERN = re.compile(r"<think>.*?</think>\s*", re.DOTALL)
 
     @classmethod
@@ -402,6 +591,21 @@ class OpenAIProvider(ModelProvider):
             return text
         return cls._THINK_PATTERN.sub("", text).strip()
 
+    @classmethod
+    def _visible_stream_text(cls, text: str) -> str:
+        """Streamed text that is safe to show: think blocks removed, an unfinished one held back."""
+        visible = text
+        if cls._THINK_OPEN in text:
+            visible = cls._THINK_PATTERN.sub("", text)
+            open_at = visible.find(cls._THINK_OPEN)
+            if open_at != -1:
+                visible = visible[:open_at]
+            visible = visible.lstrip()
+        for size in range(len(cls._THINK_OPEN) - 1, 0, -1):
+            if visible.endswith(cls._THINK_OPEN[:size]):
+                return visible[:-size]
+        return visible
+
     def _append_chat_response_output(self, timeline: List[Any], response: Any) -> None:
         """Add chat response to timeline, preserving tool_calls (Chat API compatible)."""
         msg = response.choices[0].message
@@ -430,17 +634,17 @@ class OpenAIProvider(ModelProvider):
 
         timeline.append(assistant_msg)
 
-    def _serialize_timeline_item(self, item: Any) -> Optional[Any]:
+    def _serialize_timeline_item(self, item: Any, file_client: Any = None) -> Optional[Any]:
         if isinstance(item, Message):
-            return self._serialize_message_for_responses(item)
+            return self._serialize_message_for_responses(item, file_client)
         if isinstance(item, FunctionCallOutputEvent):
-            return self._serialize_function_call_output_event(item)
+            return self._serialize_function_call_output_event(item, file_client)
         return item
 
-    def _serialize_message_for_responses(self, message: Message) -> Dict[str, Any]:
+    def _serialize_message_for_responses(self, message: Message, file_client: Any = None) -> Dict[str, Any]:
         """Convert internal Message to Responses input schema."""
         role_value = message.role.value
-        content_blocks = self._serialize_content_blocks(message)
+        content_blocks = self._serialize_content_blocks(message, file_client)
         payload: Dict[str, Any] = {
             "role": role_value,
             "content": content_blocks,
@@ -451,22 +655,27 @@ class OpenAIProvider(ModelProvider):
             payload["tool_call_id"] = message.tool_call_id
         return payload
 
-    def _serialize_content_blocks(self, message: Message) -> List[Dict[str, Any]]:
+    def _serialize_content_blocks(self, message: Message, file_client: Any = None) -> List[Dict[str, Any]]:
         blocks = message.blocks()
         if not blocks:
             text = message.text_content()
             block_type = "output_text" if message.role is MessageRole.ASSISTANT else "input_text"
             return [{"type": block_type, "text": text}]
 
-        return self._serialize_blocks(blocks, message.role)
+        return self._serialize_blocks(blocks, message.role, file_client)
 
-    def _serialize_blocks(self, blocks: List[MessageBlock], role: MessageRole) -> List[Dict[str, Any]]:
+    def _serialize_blocks(
+        self,
+        blocks: List[MessageBlock],
+        role: MessageRole,
+        file_client: Any = None,
+    ) -> List[Dict[str, Any]]:
         serialized: List[Dict[str, Any]] = []
         for block in blocks:
-            serialized.append(self._serialize_block(block, role))
+            serialized.append(self._serialize_block(block, role, file_client))
         return serialized
 
-    def _serialize_block(self, block: MessageBlock, role: MessageRole) -> Dict[str, Any]:
+    def _serialize_block(self, block: MessageBlock, role: MessageRole, file_client: Any = None) -> Dict[str, Any]:
         if block.type is MessageBlockType.TEXT:
             content_type = "output_text" if role is MessageRole.ASSISTANT else "input_text"
             return {
@@ -477,13 +686,13 @@ class OpenAIProvider(ModelProvider):
         attachment = block.attachment
         if block.type is MessageBlockType.IMAGE:
             media_type = "output_image" if role is MessageRole.ASSISTANT else "input_image"
-            return self._serialize_media_block(media_type, attachment)
+            return self._serialize_media_block(media_type, attachment, file_client)
         if block.type is MessageBlockType.AUDIO:
             media_type = "output_audio" if role is MessageRole.ASSISTANT else "input_audio"
-            return self._serialize_media_block(media_type, attachment)
+            return self._serialize_media_block(media_type, attachment, file_client)
         if block.type is MessageBlockType.VIDEO:
             media_type = "output_video" if role is MessageRole.ASSISTANT else "input_video"
-            return self._serialize_media_block(media_type, attachment)
+            return self._serialize_media_block(media_type, attachment, file_client)
         if block.type is MessageBlockType.FILE:
             inline_text = self._maybe_inline_text_file(block)
             if inline_text is not None:
@@ -492,7 +701,7 @@ class OpenAIProvider(ModelProvider):
                     "type": content_type,
                     "text": inline_text,
                 }
-            return self._serialize_file_block(attachment, block)
+            return self._serialize_file_block(attachment, block, file_client)
 
         # Fallback: treat as text/data
         return {
@@ -504,6 +713,7 @@ class OpenAIProvider(ModelProvider):
         self,
         media_type: str,
         attachment: Optional[AttachmentRef],
+        file_client: Any = None,
     ) -> Dict[str, Any]:
         payload: Dict[str, Any] = {"type": media_type}
         if not attachment:
@@ -518,27 +728,31 @@ class OpenAIProvider(ModelProvider):
             "output_video": "video_url",
         }.get(media_type)
 
-        if attachment.remote_file_id:
-            payload["file_id"] = attachment.remote_file_id
+        # Only images accept a file_id among the media inputs
+        file_id = self._resolve_remote_file_id(attachment, file_client if media_type == "input_image" else None)
+        if file_id:
+            payload["file_id"] = file_id
         elif attachment.data_uri and url_key:
             payload[url_key] = attachment.data_uri
         elif attachment.local_path and url_key:
-            payload[url_key] = self._make_data_uri_from_path(attachment.local_path, attachment.mime_type)
+            payload[url_key] = self._attachment_data_uri(attachment)
         return payload
 
     def _serialize_file_block(
         self,
         attachment: Optional[AttachmentRef],
         block: MessageBlock,
+        file_client: Any = None,
     ) -> Dict[str, Any]:
         payload: Dict[str, Any] = {"type": "input_file"}
         if attachment:
-            if attachment.remote_file_id:
-                payload["file_id"] = attachment.remote_file_id
+            file_id = self._resolve_remote_file_id(attachment, file_client)
+            if file_id:
+                payload["file_id"] = file_id
             else:
                 data_uri = attachment.data_uri
                 if not data_uri and attachment.local_path:
-                    data_uri = self._make_data_uri_from_path(attachment.local_path, attachment.mime_type)
+                    data_uri = self._attachment_data_uri(attachment)
                 if data_uri:
                     payload["file_data"] = data_uri
                 else:
@@ -594,34 +808,7 @@ class OpenAIProvider(ModelProvider):
         return self._maybe_inline_text_file(block)
 
     def _read_attachment_text(self, attachment: AttachmentRef) -> Optional[str]:
-        data_bytes: Optional[bytes] = None
-        if attachment.data_uri:
-            data_bytes = self._decode_data_uri(attachment.data_uri)
-        elif attachment.local_path and os.path.exists(attachment.local_path):
-            try:
-                with open(attachment.local_path, "rb") as handle:
-                    data_bytes = handle.read()
-            except OSError:
-                return None
-        if data_bytes is None:
-            return None
-        try:
-            return data_bytes.decode("utf-8")
-        except UnicodeDecodeError:
-            return data_bytes.decode("utf-8", errors="replace")
-
-    def _decode_data_uri(self, data_uri: str) -> Optional[bytes]:
-        if not data_uri.startswith("data:"):
-            return None
-        header, _, data = data_uri.partition(",")
-        if not _:
-            return None
-        if ";base64" in header:
-            try:
-                return base64.b64decode(data)
-            except (ValueError, binascii.Error):
-                return None
-        return unquote_to_bytes(data)
+        return get_attachment_cache().text(attachment)
 
     def _deserialize_response(self, response: Any) -> Message:
         """Convert Responses API output to internal Message."""
@@ -771,27 +958,76 @@ class OpenAIProvider(ModelProvider):
             return payload
         return {}
 
-    def _make_data_uri_from_path(self, path: str, mime_type: Optional[str]) -> str:
-        mime = mime_type or "application/octet-stream"
-        file_size = os.path.getsize(path)
+    def _attachment_data_uri(self, attachment: AttachmentRef) -> Optional[str]:
+        path = attachment.local_path
+        file_size = os.path.getsize(path) if path and not attachment.data_uri else 0
         if file_size > self.MAX_INLINE_FILE_BYTES:
             raise ValueError(
                 f"Attachment '{path}' is {file_size} bytes; exceeds inline limit of {self.MAX_INLINE_FILE_BYTES} bytes"
             )
-        with open(path, "rb") as handle:
-            encoded = base64.b64encode(handle.read()).decode("utf-8")
-        return f"data:{mime};base64,{encoded}"
+        return get_attachment_cache().data_uri(attachment, attachment.mime_type)
+
+    def _resolve_remote_file_id(self, attachment: AttachmentRef, client: Any = None) -> Optional[str]:
+        """Return a Files API id for ``attachment``, uploading it once through ``client``.
+
+        ``client`` is None when uploads are disabled and for input types that
+        only accept inline data.
+        """
+        scope = self._upload_scope()
+        if attachment.remote_file_id and self._remote_id_usable(attachment, scope):
+            return attachment.remote_file_id
+        if client is None:
+            # Chat Completions and audio/video inputs cannot reference uploaded files
+            return None
+        cache = get_attachment_cache()
+        file_id = cache.remote_file_id(scope, attachment)
+        if file_id:
+            return file_id
+        store = self.attachment_store
+        record = store.find(attachment) if store is not None else None
+        if record is not None and record.ref.remote_file_id and self._remote_id_usable(record.ref, scope):
+            return record.ref.remote_file_id
+        if attachment_size(attachment) < self._upload_min_bytes():
+            return None
+
+        def _upload() -> str:
+            data = cache.read_bytes(attachment, cache=False)
+            if data is None:
+                raise ValueError("attachment payload is not readable")
+            name = attachment.name or attachment.attachment_id or "attachment"
+            uploaded = client.files.create(
+                file=(name, data, attachment.mime_type or "application/octet-stream"),
+                purpose="user_data",
+            )
+            ATTACHMENT_UPLOADS.inc(provider="openai")
+            return uploaded.id
+
+        try:
+            file_id = cache.upload_once(scope, attachment, _upload)
+        except Exception as exc:
+            logger.warning("Uploading attachment %s failed, sending it inline: %s", attachment.attachment_id, exc)
+            return None
+        if file_id and record is not None:
+            store.update_remote_file_id(record.ref.attachment_id, file_id, scope=scope)
+        return file_id
+
+    @staticmethod
+    def _remote_id_usable(attachment: AttachmentRef, scope: str) -> bool:
+        """Ids uploaded by another endpoint or account are not valid here; unscoped ids were supplied by the user."""
+        owner = (attachment.metadata or {}).get(REMOTE_FILE_SCOPE_KEY)
+        return owner is None or owner == scope
 
     def _serialize_function_call_output_event(
         self,
         event: FunctionCallOutputEvent,
+        file_client: Any = None,
     ) -> Dict[str, Any]:
         payload: Dict[str, Any] = {
             "type": event.type,
             "call_id": event.call_id or event.function_name or "tool_call",
         }
         if event.output_blocks:
-            payload["output"] = self._serialize_blocks(event.output_blocks, MessageRole.TOOL)
+            payload["output"] = self._serialize_blocks(event.output_blocks, MessageRole.TOOL, file_client)
         else:
             text = event.output_text or ""
             payload["output"] = [
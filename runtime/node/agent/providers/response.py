@@ -1,7 +1,7 @@
 """Normalized provider response dataclasses."""
 
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Dict
 
 from entity.messages import Message
 
@@ -14,7 +14,7 @@ class ModelResponse:
     raw_response: Any | None = None
 
     def has_tool_calls(self) -> bool:
-        return bool(self.message.tool_calls)
+        return bool(self.message.tool_calls_view)
 
     def to_dict(self) -> dict:
         """Return a simple dict representation for compatibility."""
@@ -27,8 +27,9 @@ class ModelResponse:
             ]
         else:
             payload["content"] = self.message.content
-        if self.message.tool_calls:
-            payload["tool_calls"] = [call.to_openai_dict() for call in self.message.tool_calls]
+        tool_calls = self.message.tool_calls_view
+        if tool_calls:
+            payload["tool_calls"] = [call.to_openai_dict() for call in tool_calls]
         if self.message.tool_call_id:
             payload["tool_call_id"] = self.message.tool_call_id
         if self.message.name:
@@ -37,3 +38,37 @@ class ModelResponse:
 
     def str_raw_response(self):
         return self.raw_response.__str__()
+
+
+@dataclass
+class ModelDelta:
+    """Incremental piece of a streamed provider response.
+
+    Text deltas carry ``text``; tool-call deltas carry the call's position in
+    the response (``tool_call_index``) and, when first seen, its id and name,
+    followed by ``arguments`` fragments. ``reset`` tells consumers to discard
+    what was streamed so far because the call is being retried.
+    """
+
+    text: str = ""
+    tool_call_index: int | None = None
+    tool_call_id: str | None = None
+    tool_name: str | None = None
+    arguments: str = ""
+    reset: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {}
+        if self.text:
+            payload["text"] = self.text
+        if self.tool_call_index is not None:
+            payload["tool_call_index"] = self.tool_call_index
+            if self.tool_call_id:
+                payload["tool_call_id"] = self.tool_call_id
+            if self.tool_name:
+                payload["tool_name"] = self.tool_name
+            if self.arguments:
+                payload["arguments"] = self.arguments
+        if self.reset:
+            payload["reset"] = True
+        return payload
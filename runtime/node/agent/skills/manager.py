@@ -143,6 +143,33 @@ class AgentSkillManager:
             self._skills_by_name = discovered
         return list(self._skills_by_name.values())
 
+    def fingerprint(self) -> tuple:
+        """Stat-based signature of the skills root; changes when any SKILL.md is added, removed or edited."""
+        try:
+            candidates = sorted(self.root.iterdir())
+        except OSError:
+            return ()
+        signature = []
+        for candidate in candidates:
+            try:
+                stat = (candidate / "SKILL.md").stat()
+            except OSError:
+                continue
+            signature.append((candidate.name, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def fork(self) -> "AgentSkillManager":
+        """Return a manager reusing this one's discovery results with fresh activation state."""
+        self.discover()
+        forked = AgentSkillManager(warning_reporter=self.warning_reporter)
+        forked.root = self.root
+        forked.allow = self.allow
+        forked.available_tool_names = self.available_tool_names
+        forked._skills_by_name = self._skills_by_name
+        forked._skill_content_cache = self._skill_content_cache
+        forked._discovery_warnings = list(self._discovery_warnings)
+        return forked
+
     def has_skills(self) -> bool:
         return bool(self.discover())
 
@@ -0,0 +1,120 @@
+"""Dependency-ordered runner for the pre-generation stages of an agent node."""
+
+import concurrent.futures
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from utils.metrics import PRE_GENERATION_STAGE_DURATION, submit_tracked
+
+StageFn = Callable[[Dict[str, Any]], Any]
+
+
+@dataclass
+class StageTiming:
+    """Start offset and duration of one stage, relative to the graph start."""
+
+    started_ms: float
+    duration_ms: float
+
+    def to_dict(self) -> Dict[str, float]:
+        return {"started_ms": round(self.started_ms, 3), "duration_ms": round(self.duration_ms, 3)}
+
+
+class StageGraph:
+    """Run named stages once all of their dependencies have finished.
+
+    Each stage receives the results of the stages finished so far, keyed by
+    name. Stages with no path between them run concurrently on a thread pool
+    sized to the graph; a stage that is the only runnable one while nothing is
+    in flight runs inline on the caller's thread, so a single chain never
+    pays for a pool. The first failure stops new stages from starting and is
+    re-raised once the in-flight ones have finished.
+    """
+
+    def __init__(self, pool_name: str = "pre_generation") -> None:
+        self.pool_name = pool_name
+        self._stages: Dict[str, Tuple[StageFn, Tuple[str, ...]]] = {}
+        self.timings: Dict[str, StageTiming] = {}
+
+    def add(self, name: str, fn: StageFn, after: Sequence[str] = ()) -> None:
+        if name in self._stages:
+            raise ValueError(f"Stage '{name}' is already defined")
+        missing = [dep for dep in after if dep not in self._stages]
+        if missing:
+            raise ValueError(f"Stage '{name}' depends on undefined stages: {missing}")
+        self._stages[name] = (fn, tuple(after))
+
+    def __bool__(self) -> bool:
+        return bool(self._stages)
+
+    def _max_parallel(self) -> int:
+        # One worker per root: enough for graphs built from independent chains
+        return max(1, sum(1 for _, deps in self._stages.values() if not deps))
+
+    def run(self) -> Dict[str, Any]:
+        results: Dict[str, Any] = {}
+        pending = dict(self._stages)
+        origin = time.perf_counter()
+        pool: concurrent.futures.ThreadPoolExecutor | None = None
+        in_flight: Dict[concurrent.futures.Future, str] = {}
+        failure: BaseException | None = None
+
+        def _timed(name: str, fn: StageFn, done: Dict[str, Any]) -> Any:
+            started = time.perf_counter()
+            try:
+                return fn(done)
+            finally:
+                finished = time.perf_counter()
+                self.timings[name] = StageTiming(
+                    started_ms=(started - origin) * 1000, duration_ms=(finished - started) * 1000
+                )
+                PRE_GENERATION_STAGE_DURATION.observe(finished - started, stage=name)
+
+        try:
+            while pending or in_flight:
+                ready: List[str] = []
+                if failure is None:
+                    ready = [
+                        name for name, (_, deps) in pending.items() if all(dep in results for dep in deps)
+                    ]
+                    for name in ready:
+                        pending.pop(name)
+                if len(ready) == 1 and not in_flight:
+                    name = ready[0]
+                    fn = self._stages[name][0]
+                    try:
+                        results[name] = _timed(name, fn, dict(results))
+                    except BaseException as exc:
+                        failure = exc
+                    continue
+                if ready:
+                    if pool is None:
+                        pool = concurrent.futures.ThreadPoolExecutor(
+                            max_workers=self._max_parallel(), thread_name_prefix=self.pool_name
+                        )
+                    for name in ready:
+                        fn = self._stages[name][0]
+                        future = submit_tracked(pool, self.pool_name, _timed, name, fn, dict(results))
+                        in_flight[future] = name
+                if not in_flight:
+                    # Either everything finished or a failure left stages that
+                    # can never start
+                    break
+                done, _ = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    name = in_flight.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except BaseException as exc:
+                        if failure is None:
+                            failure = exc
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True)
+        if failure is not None:
+            raise failure
+        return results
+
+    def timing_details(self) -> Dict[str, Dict[str, float]]:
+        return {name: timing.to_dict() for name, timing in self.timings.items()}
@@ -3,7 +3,7 @@
 Implements different execution strategies for each node type.
 """
 
-from runtime.node.executor.base import NodeExecutor, ExecutionContext
+from runtime.node.executor.base import NodeExecutor, ExecutionContext, abandon_scope
 from runtime.node.executor.agent_executor import AgentNodeExecutor
 from runtime.node.executor.human_executor import HumanNodeExecutor
 from runtime.node.executor.subgraph_executor import SubgraphNodeExecutor
@@ -13,6 +13,7 @@ from runtime.node.executor.factory import NodeExecutorFactory
 __all__ = [
     "NodeExecutor",
     "ExecutionContext",
+    "abandon_scope",
     "AgentNodeExecutor",
     "HumanNodeExecutor",
     "SubgraphNodeExecutor",
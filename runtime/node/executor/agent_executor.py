@@ -10,10 +10,13 @@ Responsible for running agent nodes, including
 import asyncio
 import base64
 import json
+import threading
 import traceback
+from dataclasses import dataclass, field
 from typing import Any, Callable, Dict, List, Optional, Sequence
 
 from entity.configs import Node
+from entity.configs.base import config_fingerprint
 from entity.configs.node.agent import AgentConfig, AgentRetryConfig
 from entity.enums import CallStage, AgentExecFlowStage, AgentInputMode
 from entity.messages import (
@@ -25,22 +28,60 @@ from entity.messages import (
     ToolCallPayload,
 )
 from entity.tool_spec import ToolSpec
-from runtime.node.executor.base import NodeExecutor
+from runtime.node.executor.base import NODE_ERROR_KEY, ExecutionContext, NodeExecutor
 from runtime.node.agent.memory.memory_base import (
     MemoryContentSnapshot,
     MemoryRetrievalResult,
     MemoryWritePayload,
 )
 from runtime.node.agent.memory.rlm_memory import RLMMemory
+from runtime.node.agent.context_budget import ContextBudget, SummaryCache
 from runtime.node.agent import ThinkingPayload
-from runtime.node.agent import ModelProvider, ProviderRegistry, ModelResponse
+from runtime.node.agent import ModelDelta, ModelProvider, ProviderRegistry, ModelResponse
 from runtime.node.agent.skills import AgentSkillManager
+from runtime.node.agent.stage_graph import StageGraph
+from utils.exceptions import WorkflowCancelledError
+from utils.metrics import CONTEXT_COMPACTIONS, PROVIDER_IN_FLIGHT
+from utils.tracing import start_span
 from tenacity import Retrying, retry_if_exception, stop_after_attempt, wait_random_exponential
 
+_CONTEXT_SUMMARY_PROMPT = (
+    "Summarize the earlier part of this conversation so the work can continue without it. "
+    "Keep decisions, facts, open questions and tool results that are still relevant. "
+    "Reply with the summary only."
+)
+
+
+@dataclass
+class _AgentPlan:
+    """Per-node setup reused across executions until the config or skills change.
+
+    Holds the merged tool specs, the discovered skills and the system prompt,
+    plus the provider-serialized tool payloads filled in lazily by providers
+    and the provider client, so its connection pool stays warm between calls.
+    Activation state is per execution, so callers fork ``skill_manager``.
+    """
+
+    signature: str
+    skills_fingerprint: tuple
+    tool_specs: List[ToolSpec]
+    skill_manager: AgentSkillManager | None
+    system_prompt: str | None
+    tool_payloads: Dict[Any, Any] = field(default_factory=dict)
+    client: Any = None
+    client_ready: bool = False
+    client_lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
 
 class AgentNodeExecutor(NodeExecutor):
     """Executor that runs agent nodes."""
 
+    def __init__(self, context: ExecutionContext) -> None:
+        super().__init__(context)
+        self._plans: Dict[str, _AgentPlan] = {}
+        self._plans_lock = threading.Lock()
+        self._summary_caches: Dict[str, SummaryCache] = {}
+
     def execute(self, node: Node, inputs: List[Message]) -> List[Message]:
         """Execute an agent node.
 
@@ -74,18 +115,24 @@ class AgentNodeExecutor(NodeExecutor):
                 inputs, input_data
             )
             input_mode = agent_config.input_mode or AgentInputMode.PROMPT
-            external_tool_specs = self.tool_manager.get_tool_specs(agent_config.tooling)
-            skill_manager = self._build_skill_manager(node, agent_config, external_tool_specs)
-
-            provider = provider_class(agent_config)
-            client = provider.create_client()
+            plan = self._get_agent_plan(node, agent_config)
+            skill_manager = plan.skill_manager.fork() if plan.skill_manager is not None else None
+
+            # Per-run state goes to this execution's provider, never onto the
+            # config that concurrent map units of the node share
+            provider = provider_class(
+                agent_config,
+                tool_payload_cache=plan.tool_payloads,
+                attachment_store=self.context.global_state.get("attachment_store"),
+            )
+            client = self._get_client(plan, provider)
 
             if input_mode is AgentInputMode.PROMPT:
-                conversation = self._prepare_prompt_messages(node, input_data, skill_manager)
+                conversation = self._prepare_prompt_messages(node, input_data, plan.system_prompt)
             else:
-                conversation = self._prepare_message_conversation(node, inputs, skill_manager)
+                conversation = self._prepare_message_conversation(node, inputs, plan.system_prompt)
             call_options = self._prepare_call_options(node)
-            tool_specs = self._merge_skill_tool_specs(external_tool_specs, skill_manager)
+            tool_specs = plan.tool_specs
 
             agent_invoker = self._build_agent_invoker(
                 provider,
@@ -95,26 +142,17 @@ class AgentNodeExecutor(NodeExecutor):
                 node,
             )
 
-            if agent_config.thinking:
-                self._apply_pre_generation_thinking(
-                    node,
-                    conversation,
-                    input_payload,
-                    memory_query_snapshot,
-                    AgentExecFlowStage.PRE_GEN_THINKING_STAGE,
-                    agent_invoker,
-                    input_mode,
-                )
-
-            self._apply_memory_retrieval(
+            self._run_pre_generation_stages(
                 node,
                 conversation,
+                input_payload,
                 memory_query_snapshot,
-                AgentExecFlowStage.GEN_STAGE,
+                agent_invoker,
                 input_mode,
             )
 
             timeline = self._build_initial_timeline(conversation)
+            unit_index = self._dynamic_unit_index(inputs)
             response_obj = self._invoke_provider(
                 provider,
                 client,
@@ -123,6 +161,8 @@ class AgentNodeExecutor(NodeExecutor):
                 call_options,
                 tool_specs,
                 node,
+                stream=True,
+                unit_index=unit_index,
             )
 
             if response_obj.has_tool_calls():
@@ -136,6 +176,7 @@ class AgentNodeExecutor(NodeExecutor):
                     response_obj,
                     tool_specs,
                     skill_manager,
+                    unit_index=unit_index,
                 )
             else:
                 response_message = response_obj.message
@@ -159,6 +200,8 @@ class AgentNodeExecutor(NodeExecutor):
                     input_mode,
                 )
 
+            # An abandoned node must not write memory once its run has moved on
+            self._ensure_not_cancelled()
             self._update_memory(node, input_data, inputs, final_message)
 
             if isinstance(final_message, Message):
@@ -171,6 +214,8 @@ class AgentNodeExecutor(NodeExecutor):
                 )
             ]
 
+        except WorkflowCancelledError:
+            raise
         except Exception as e:
             traceback.print_exc()
             error_msg = f"[Node: {node.id}] Error calling model: {str(e)}"
@@ -180,21 +225,77 @@ class AgentNodeExecutor(NodeExecutor):
                     role=MessageRole.ASSISTANT,
                     content=f"Error calling model {node.model_name}: {str(e)}\n\nOriginal input: {input_data[:200]}...",
                     source=node.id,
+                    metadata={NODE_ERROR_KEY: f"{e.__class__.__name__}: {e}"},
                 )
             ]
         finally:
             self._current_node_id = None
     
+    def prefetch(self, node: Node) -> None:
+        """Discover tools and skills and create the provider client before the node runs."""
+        agent_config = node.as_config(AgentConfig)
+        if not agent_config:
+            return
+        provider_class = ProviderRegistry.get_provider(agent_config.provider)
+        if not provider_class:
+            return
+        plan = self._get_agent_plan(node, agent_config)
+        self._get_client(plan, provider_class(agent_config))
+
+    @staticmethod
+    def _get_client(plan: _AgentPlan, provider: ModelProvider) -> Any:
+        """Return the plan's provider client, creating it on first use."""
+        with plan.client_lock:
+            if not plan.client_ready:
+                plan.client = provider.create_client()
+                plan.client_ready = True
+            return plan.client
+
+    def _get_agent_plan(self, node: Node, agent_config: AgentConfig) -> _AgentPlan:
+        """Return the node's cached setup, rebuilding it when the config or skill files changed."""
+        # Keyed on content, so in-place config edits rebuild the plan and a
+        # new config object with the same settings keeps it
+        signature = json.dumps(
+            [
+                node.role,
+                config_fingerprint(agent_config.tooling),
+                config_fingerprint(agent_config.skills),
+            ],
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        skills_enabled = bool(agent_config.skills and agent_config.skills.enabled)
+        with self._plans_lock:
+            plan = self._plans.get(node.id)
+        if plan is not None and plan.signature == signature:
+            if not skills_enabled or plan.skill_manager is None:
+                return plan
+            if plan.skill_manager.fingerprint() == plan.skills_fingerprint:
+                return plan
+
+        external_tool_specs = self.tool_manager.get_tool_specs(agent_config.tooling)
+        skill_manager = self._build_skill_manager(node, agent_config, external_tool_specs)
+        skills_fingerprint = skill_manager.fingerprint() if skill_manager is not None else ()
+        plan = _AgentPlan(
+            signature=signature,
+            skills_fingerprint=skills_fingerprint,
+            tool_specs=self._merge_skill_tool_specs(external_tool_specs, skill_manager),
+            skill_manager=skill_manager,
+            system_prompt=self._build_system_prompt(node, skill_manager),
+        )
+        with self._plans_lock:
+            self._plans[node.id] = plan
+        return plan
+
     def _prepare_prompt_messages(
         self,
         node: Node,
         input_data: str,
-        skill_manager: AgentSkillManager | None,
+        system_prompt: str | None,
     ) -> List[Message]:
         """Prepare the prompt-style message sequence."""
         messages: List[Message] = []
 
-        system_prompt = self._build_system_prompt(node, skill_manager)
         if system_prompt:
             messages.append(Message(role=MessageRole.SYSTEM, content=system_prompt))
 
@@ -218,11 +319,10 @@ class AgentNodeExecutor(NodeExecutor):
         self,
         node: Node,
         inputs: List[Message],
-        skill_manager: AgentSkillManager | None,
+        system_prompt: str | None,
     ) -> List[Message]:
         messages: List[Message] = []
 
-        system_prompt = self._build_system_prompt(node, skill_manager)
         if system_prompt:
             messages.append(Message(role=MessageRole.SYSTEM, content=system_prompt))
 
@@ -360,33 +460,120 @@ class AgentNodeExecutor(NodeExecutor):
         call_options: Dict[str, Any],
         tool_specs: List[ToolSpec] | None,
         node: Node,
+        *,
+        stream: bool = False,
+        unit_index: int | None = None,
     ) -> ModelResponse:
-        """Invoke provider with logging + token tracking."""
+        """Invoke provider with logging + token tracking.
+
+        With ``stream`` set and a delta sink on the context, output is
+        forwarded to the sink as the provider produces it, keyed by node and
+        ``unit_index`` so parallel map units of one node stream separately.
+        """
         self._ensure_not_cancelled()
         if self.context.token_tracker:
             self.context.token_tracker.current_node_id = node.id
 
         agent_config = node.as_config(AgentConfig)
         retry_policy = self._resolve_retry_policy(node, agent_config)
+        if agent_config and agent_config.context:
+            self._fit_context(provider, client, conversation, timeline, call_options, node, agent_config)
+
+        attempts = 0
+        delta_sink = self.context.delta_sink if stream else None
+
+        def _on_delta(delta: ModelDelta) -> None:
+            delta_sink.publish(node.id, delta, unit_index=unit_index)
 
         def _call_provider() -> ModelResponse:
-            return provider.call_model(
-                client,
-                conversation=conversation,
-                timeline=timeline,
-                tool_specs=tool_specs or None,
-                **call_options,
-            )
+            nonlocal attempts
+            attempts += 1
+            PROVIDER_IN_FLIGHT.inc()
+            try:
+                with start_span("model_attempt", {"node.id": node.id, "attempt": attempts}):
+                    if delta_sink is None:
+                        return provider.call_model(
+                            client,
+                            conversation=conversation,
+                            timeline=timeline,
+                            tool_specs=tool_specs or None,
+                            **call_options,
+                        )
+                    if attempts > 1:
+                        _on_delta(ModelDelta(reset=True))
+                    return provider.stream_model(
+                        client,
+                        conversation=conversation,
+                        timeline=timeline,
+                        tool_specs=tool_specs or None,
+                        on_delta=_on_delta,
+                        **call_options,
+                    )
+            finally:
+                PROVIDER_IN_FLIGHT.dec()
+                if delta_sink is not None:
+                    delta_sink.flush(node.id, unit_index=unit_index)
 
         last_input = (
             "".join(msg.text_content() for msg in conversation) if conversation else ""
         )
         self._record_model_call(node, last_input, None, CallStage.BEFORE)
-        response = self._execute_with_retry(node, retry_policy, _call_provider)
+        with self.log_manager.model_timer(node.id) as span:
+            if span is not None:
+                span.set_attribute("model.name", node.model_name)
+            response = self._execute_with_retry(node, retry_policy, _call_provider)
+            if span is not None:
+                span.set_attribute("model.attempts", attempts)
         self.log_manager.debug(response.str_raw_response())
         self._record_model_call(node, last_input, response, CallStage.AFTER)
         return response
 
+    def _fit_context(
+        self,
+        provider: ModelProvider,
+        client: Any,
+        conversation: List[Message],
+        timeline: List[Any],
+        call_options: Dict[str, Any],
+        node: Node,
+        agent_config: AgentConfig,
+    ) -> None:
+        """Compact the conversation and timeline in place to the node's token budget."""
+        with self._plans_lock:
+            cache = self._summary_caches.setdefault(node.id, SummaryCache())
+
+        def _summarize(previous: str, transcript: str) -> str:
+            parts = [_CONTEXT_SUMMARY_PROMPT]
+            if previous:
+                parts.append(f"Summary so far:\n{previous}")
+            parts.append(f"Conversation:\n{transcript}")
+            invoker = self._build_agent_invoker(provider, client, call_options, [], node)
+            return invoker([Message(role=MessageRole.USER, content="\n\n".join(parts))]).text_content()
+
+        budget = ContextBudget(
+            agent_config.context,
+            cache=cache,
+            model=agent_config.name,
+            summarizer=_summarize,
+            node_id=node.id,
+        )
+        # Timeline items are clones of the conversation, so the second fit
+        # normally reuses the summary the first one produced.
+        for items in (conversation, timeline):
+            result = budget.fit(items)
+            if result is None:
+                continue
+            CONTEXT_COMPACTIONS.inc(source=result.source)
+            self.log_manager.info(
+                f"Compacted {result.compacted_turns} earlier turns to fit the context budget",
+                node_id=node.id,
+                details={
+                    "tokens_before": result.tokens_before,
+                    "tokens_after": result.tokens_after,
+                    "source": result.source,
+                },
+            )
+
     def _record_model_call(
         self,
         node: Node,
@@ -467,32 +654,100 @@ class AgentNodeExecutor(NodeExecutor):
         agent_config.retry = default_retry
         return default_retry
 
-    def _apply_pre_generation_thinking(
+    def _run_pre_generation_stages(
         self,
         node: Node,
         conversation: List[Message],
         input_payload: ThinkingPayload,
         query_snapshot: MemoryContentSnapshot,
-        stage: AgentExecFlowStage,
         agent_invoker: Callable[[List[Message]], Message],
         input_mode: AgentInputMode,
     ) -> None:
-        """Apply pre-generation thinking."""
+        """Run pre-generation thinking and memory retrieval as a stage graph.
+
+        Two chains only depend on the node inputs: thinking (its own memory
+        retrieval, RLM exploration, then the thinking call) and generation
+        memory (retrieval across attachments, then RLM exploration). They run
+        concurrently, every stage is timed, and the results are applied in the
+        original order: thinking first, then the retrieved memories.
+        """
         self._ensure_not_cancelled()
-        thinking_manager = self.context.get_thinking_manager(node.id)
-        if not thinking_manager or not conversation:
+        if not conversation:
+            return
+
+        agent_config = node.as_config(AgentConfig)
+        has_memory = self.context.get_memory_manager(node.id) is not None
+        think_stage = AgentExecFlowStage.PRE_GEN_THINKING_STAGE
+        gen_stage = AgentExecFlowStage.GEN_STAGE
+        graph = StageGraph()
+
+        if (
+            agent_config is not None
+            and agent_config.thinking is not None
+            and self.context.get_thinking_manager(node.id) is not None
+        ):
+            thinking_deps: Sequence[str] = ()
+            if has_memory:
+                graph.add(
+                    "thinking_memory",
+                    lambda done: self._query_memory(node, query_snapshot, think_stage),
+                )
+                graph.add(
+                    "thinking_rlm",
+                    lambda done: self._explore_retrieved_memory(
+                        node, done["thinking_memory"], query_snapshot, think_stage
+                    ),
+                    after=("thinking_memory",),
+                )
+                thinking_deps = ("thinking_rlm",)
+            graph.add(
+                "thinking",
+                lambda done: self._think_before_generation(
+                    node, input_payload, done.get("thinking_rlm"), think_stage, agent_invoker
+                ),
+                after=thinking_deps,
+            )
+        if has_memory:
+            graph.add("memory", lambda done: self._query_memory(node, query_snapshot, gen_stage))
+            graph.add(
+                "rlm",
+                lambda done: self._explore_retrieved_memory(node, done["memory"], query_snapshot, gen_stage),
+                after=("memory",),
+            )
+        if not graph:
             return
 
+        results = graph.run()
+        self.log_manager.debug(
+            f"[Node: {node.id}] Pre-generation stages finished",
+            node_id=node.id,
+            details={"stages": graph.timing_details()},
+        )
+        self._ensure_not_cancelled()
+        if "thinking" in results:
+            self._apply_thinking_result(node, conversation, results["thinking"], input_mode)
+        if has_memory:
+            self._merge_retrieved_memory(node, conversation, results["rlm"], input_mode)
+
+    def _think_before_generation(
+        self,
+        node: Node,
+        input_payload: ThinkingPayload,
+        retrieved_memory: MemoryRetrievalResult | None,
+        stage: AgentExecFlowStage,
+        agent_invoker: Callable[[List[Message]], Message],
+    ) -> Message | str:
+        """Run pre-generation thinking over already retrieved memory."""
+        self._ensure_not_cancelled()
+        thinking_manager = self.context.get_thinking_manager(node.id)
         model = node.as_config(AgentConfig)
 
         with self.log_manager.thinking_timer(node.id, stage.value):
-            retrieved_memory = self._retrieve_memory(node, query_snapshot, stage)
-            memory_payload = self._memory_result_to_thinking_payload(retrieved_memory)
             thinking_result = thinking_manager.think(
                 agent_invoker=agent_invoker,
                 input_payload=input_payload,
                 agent_role=node.role or "",
-                memory=memory_payload,
+                memory=self._memory_result_to_thinking_payload(retrieved_memory),
                 gen_payload=None,
             )
 
@@ -504,7 +759,16 @@ class AgentNodeExecutor(NodeExecutor):
             stage.value,
             {"has_memory": bool(retrieved_memory and retrieved_memory.items)},
         )
+        return thinking_result
 
+    def _apply_thinking_result(
+        self,
+        node: Node,
+        conversation: List[Message],
+        thinking_result: Message | str,
+        input_mode: AgentInputMode,
+    ) -> None:
+        """Apply the pre-generation thinking result to the conversation."""
         if input_mode is AgentInputMode.MESSAGES:
             if isinstance(thinking_result, Message):
                 self._persist_message_attachments(thinking_result, node.id)
@@ -521,21 +785,13 @@ class AgentNodeExecutor(NodeExecutor):
             )
             conversation[-1] = conversation[-1].with_content(content)
 
-    def _apply_memory_retrieval(
+    def _merge_retrieved_memory(
         self,
         node: Node,
         conversation: List[Message],
-        query_snapshot: MemoryContentSnapshot,
-        stage: AgentExecFlowStage,
+        retrieved_memory: MemoryRetrievalResult | None,
         input_mode: AgentInputMode,
     ) -> None:
-        """Apply memory retrieval side effects."""
-        self._ensure_not_cancelled()
-        if not conversation:
-            return
-
-        retrieved_memory = self._retrieve_memory(node, query_snapshot, stage)
-
         if retrieved_memory and retrieved_memory.formatted_text:
             if input_mode is AgentInputMode.MESSAGES:
                 self._insert_memory_message(
@@ -553,24 +809,42 @@ class AgentNodeExecutor(NodeExecutor):
         stage: AgentExecFlowStage,
     ) -> MemoryRetrievalResult | None:
         """Retrieve memory for the node."""
+        retrieved_memory = self._query_memory(node, query_snapshot, stage)
+        return self._explore_retrieved_memory(node, retrieved_memory, query_snapshot, stage)
+
+    def _query_memory(
+        self,
+        node: Node,
+        query_snapshot: MemoryContentSnapshot,
+        stage: AgentExecFlowStage,
+    ) -> MemoryRetrievalResult | None:
+        """Query the node's memory attachments for ``stage``."""
+        self._ensure_not_cancelled()
         memory_manager = self.context.get_memory_manager(node.id)
         if not memory_manager:
             return None
 
-        agent_config = node.as_config(AgentConfig)
-
         with self.log_manager.memory_timer(node.id, "RETRIEVE", stage.value):
-            retrieved_memory = memory_manager.retrieve(
+            return memory_manager.retrieve(
                 agent_role=node.role if node.role else "",
                 query=query_snapshot,
                 current_stage=stage,
             )
 
+    def _explore_retrieved_memory(
+        self,
+        node: Node,
+        retrieved_memory: MemoryRetrievalResult | None,
+        query_snapshot: MemoryContentSnapshot,
+        stage: AgentExecFlowStage,
+    ) -> MemoryRetrievalResult | None:
+        """Append RLM exploration to retrieved memory and record the retrieval."""
         if not retrieved_memory:
             return None
+        self._ensure_not_cancelled()
 
         rlm_result = self._run_rlm_exploration(
-            node, retrieved_memory, query_snapshot.text, agent_config
+            node, retrieved_memory, query_snapshot.text, node.as_config(AgentConfig)
         )
 
         if rlm_result:
@@ -579,13 +853,10 @@ class AgentNodeExecutor(NodeExecutor):
                 items=retrieved_memory.items,
             )
 
-        preview_text = retrieved_memory.formatted_text if retrieved_memory else ""
         details = {
             "stage": stage.value,
-            "item_count": len(retrieved_memory.items) if retrieved_memory else 0,
-            "attachment_count": len(retrieved_memory.attachment_overview())
-            if retrieved_memory
-            else 0,
+            "item_count": len(retrieved_memory.items),
+            "attachment_count": len(retrieved_memory.attachment_overview()),
             "rlm_executed": rlm_result is not None,
         }
 
@@ -593,7 +864,7 @@ class AgentNodeExecutor(NodeExecutor):
             node.id,
             "RETRIEVE",
             stage.value,
-            preview_text,
+            retrieved_memory.formatted_text,
             details,
         )
 
@@ -658,6 +929,8 @@ class AgentNodeExecutor(NodeExecutor):
         initial_response: ModelResponse,
         tool_specs: List[ToolSpec],
         skill_manager: AgentSkillManager | None,
+        *,
+        unit_index: int | None = None,
     ) -> Message:
         """Handle tool calls until completion or until the loop limit is reached."""
         assistant_message = initial_response.message
@@ -671,7 +944,7 @@ class AgentNodeExecutor(NodeExecutor):
             conversation.append(cloned_assistant)
             trace_messages.append(cloned_assistant)
 
-            if not assistant_message.tool_calls:
+            if not assistant_message.tool_calls_view:
                 return self._finalize_tool_trace(
                     assistant_message, trace_messages, True, node.id
                 )
@@ -688,7 +961,7 @@ class AgentNodeExecutor(NodeExecutor):
 
             tool_call_messages, tool_events = self._execute_tool_batch(
                 node,
-                assistant_message.tool_calls,
+                assistant_message.tool_calls_view,
                 tool_specs,
                 skill_manager,
             )
@@ -706,13 +979,15 @@ class AgentNodeExecutor(NodeExecutor):
                 call_options,
                 tool_specs,
                 node,
+                stream=True,
+                unit_index=unit_index,
             )
             assistant_message = follow_up_response.message
 
     def _execute_tool_batch(
         self,
         node: Node,
-        tool_calls: List[ToolCallPayload],
+        tool_calls: Sequence[ToolCallPayload],
         tool_specs: List[ToolSpec],
         skill_manager: AgentSkillManager | None,
     ) -> tuple[List[Message], List[Any]]:
@@ -1080,7 +1355,7 @@ class AgentNodeExecutor(NodeExecutor):
             msg = msg.with_role(MessageRole.TOOL)
             msg.tool_call_id = tool_call.id
             metadata = dict(base_metadata)
-            metadata.update(msg.metadata)
+            metadata.update(msg.metadata_view)
             msg.metadata = metadata
             return msg
 
@@ -1120,7 +1395,7 @@ class AgentNodeExecutor(NodeExecutor):
     ) -> Message:
         final_message = self._clone_with_source(message, node_id)
         if trace_messages:
-            metadata = dict(final_message.metadata)
+            metadata = dict(final_message.metadata_view)
             metadata["context_trace"] = [item.to_dict() for item in trace_messages]
             metadata["context_trace_complete"] = complete
             final_message.metadata = metadata
@@ -1128,7 +1403,7 @@ class AgentNodeExecutor(NodeExecutor):
 
     def _clone_with_source(self, message: Message, node_id: str) -> Message:
         cloned = message.clone()
-        metadata = dict(cloned.metadata)
+        metadata = dict(cloned.metadata_view)
         metadata.setdefault("source", node_id)
         cloned.metadata = metadata
         return cloned
@@ -1185,23 +1460,29 @@ class AgentNodeExecutor(NodeExecutor):
         store = self.context.global_state.get("attachment_store")
         if store is None:
             return
-        for block in message.blocks():
+        blocks = message.blocks()
+        persisted: List[MessageBlock] = []
+        for block in blocks:
             attachment = block.attachment
-            if not attachment:
-                continue
-            try:
-                self._persist_single_attachment(store, block, node_id)
-            except Exception as exc:
-                raise RuntimeError(
-                    f"Failed to persist attachment '{attachment.name or attachment.attachment_id}': {exc}"
-                ) from exc
+            if attachment:
+                try:
+                    block = self._persist_single_attachment(store, block, node_id)
+                except Exception as exc:
+                    raise RuntimeError(
+                        f"Failed to persist attachment '{attachment.name or attachment.attachment_id}': {exc}"
+                    ) from exc
+            persisted.append(block)
+        # Blocks are immutable and may be shared with other messages
+        if any(new is not old for new, old in zip(persisted, blocks)):
+            message.content = persisted
 
     def _persist_single_attachment(
         self, store: Any, block: MessageBlock, node_id: str
-    ) -> None:
+    ) -> MessageBlock:
+        """Store the attachment of ``block`` and return a block pointing at the stored copy."""
         attachment = block.attachment
         if attachment is None:
-            return
+            return block
         if (
             attachment.remote_file_id
             and not attachment.data_uri
@@ -1215,8 +1496,7 @@ class AgentNodeExecutor(NodeExecutor):
                 kind=block.type,
                 attachment_id=attachment.attachment_id,
             )
-            block.attachment = record.ref
-            return
+            return block.replace(attachment=record.ref)
 
         workspace_root = self.context.global_state.get("python_workspace_root")
         if workspace_root is None or not node_id:
@@ -1230,7 +1510,7 @@ class AgentNodeExecutor(NodeExecutor):
         inferred_mime = attachment.mime_type or self._guess_mime_from_data_uri(
             attachment.data_uri
         )
-        attachment.mime_type = inferred_mime
+        attachment = attachment.replace(mime_type=inferred_mime)
 
         data_bytes = (
             self._decode_data_uri(attachment.data_uri) if attachment.data_uri else None
@@ -1262,7 +1542,7 @@ class AgentNodeExecutor(NodeExecutor):
             copy_file=False,
             persist=True,
         )
-        block.attachment = record.ref
+        return block.replace(attachment=record.ref)
 
     def _decode_data_uri(self, data_uri: Optional[str]) -> Optional[bytes]:
         if not data_uri:
@@ -1351,6 +1631,14 @@ class AgentNodeExecutor(NodeExecutor):
 
         return result
 
+    @staticmethod
+    def _dynamic_unit_index(inputs: List[Message]) -> int | None:
+        """Return the dynamic map unit these inputs belong to, if they all agree on one."""
+        indexes = {msg.get_metadata("dynamic_edge_unit_index") for msg in inputs}
+        if len(indexes) == 1:
+            return indexes.pop()
+        return None
+
     def _coerce_inputs_to_messages(self, inputs: List[Message]) -> List[Message]:
         return [message.clone() for message in inputs if isinstance(message, Message)]
 
@@ -3,9 +3,12 @@
 Defines the interfaces that every node executor must implement.
 """
 
+import threading
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from entity.configs import Node
 from entity.messages import Message, MessageContent, MessageRole, serialize_messages
@@ -20,6 +23,28 @@ from utils.token_tracker import TokenTracker
 from utils.exceptions import WorkflowCancelledError
 
 
+# Metadata key on an output message that reports a failure instead of a result
+NODE_ERROR_KEY = "node_error"
+
+# Set for nodes whose result is no longer wanted, without cancelling the workflow
+_abandon_events: ContextVar[Tuple[threading.Event, ...]] = ContextVar("node_abandon_events", default=())
+
+
+@contextmanager
+def abandon_scope(event: threading.Event) -> Iterator[None]:
+    """Stop executors started from this context at their next step once ``event`` is set.
+
+    Thread pools that submit through ``submit_tracked`` copy the context, so
+    nodes handed to them inherit the scope. Scopes nest: setting the event of
+    any enclosing scope stops them too.
+    """
+    token = _abandon_events.set(_abandon_events.get() + (event,))
+    try:
+        yield
+    finally:
+        _abandon_events.reset(token)
+
+
 @dataclass
 class ExecutionContext:
     """Node execution context that bundles every service and state the executor needs.
@@ -34,6 +59,8 @@ class ExecutionContext:
         thinking_managers: Mapping of node_id to ``ThinkingManagerBase`` instances
         token_tracker: Token tracker used for accounting
         global_state: Shared global state dictionary
+        delta_sink: Receives streamed model output via ``publish(node_id, delta, unit_index=...)``
+            and ``flush(node_id, unit_index=...)``; providers stream only when it is set
     """
 
     tool_manager: ToolManager
@@ -48,6 +75,7 @@ class ExecutionContext:
     workspace_hook: Optional[Any] = None
     human_prompt_service: Optional[HumanPromptService] = None
     cancel_event: Optional[Any] = None
+    delta_sink: Optional[Any] = None
 
     def get_memory_manager(self, node_id: str) -> Optional[MemoryManager]:
         """Return the memory manager for a given node."""
@@ -106,6 +134,15 @@ class NodeExecutor(ABC):
         """
         pass
 
+    def prefetch(self, node: Node) -> None:
+        """Prepare per-node setup ahead of execution.
+
+        Called from a background thread while an upstream node runs, possibly
+        concurrently with ``execute`` for the same node, and may be abandoned.
+        Implementations must only warm caches that ``execute`` would otherwise
+        fill itself. The default does nothing.
+        """
+
     @property
     def tool_manager(self) -> ToolManager:
         """Return the shared tool manager."""
@@ -126,7 +163,7 @@ class NodeExecutor(ABC):
             return ""
         parts: list[str] = []
         for message in inputs:
-            source = message.metadata.get("source", "UNKNOWN")
+            source = message.get_metadata("source", "UNKNOWN")
             parts.append(
                 f"=== INPUT FROM {source} ({message.role.value}) ===\n\n{message.text_content()}"
             )
@@ -168,3 +205,5 @@ class NodeExecutor(ABC):
         event = getattr(self.context, "cancel_event", None)
         if event is not None and event.is_set():
             raise WorkflowCancelledError("Workflow execution cancelled")
+        if any(abandoned.is_set() for abandoned in _abandon_events.get()):
+            raise WorkflowCancelledError("Node execution abandoned")
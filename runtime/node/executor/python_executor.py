@@ -12,6 +12,8 @@ from entity.configs import Node
 from entity.configs.node.python_runner import PythonRunnerConfig
 from entity.messages import Message, MessageRole
 from runtime.node.executor.base import NodeExecutor
+from utils.metrics import PYTHON_SCRIPT_RUNS
+from utils.python_worker_pool import WorkerUnavailable, get_worker_pool, script_command
 
 
 _CODE_BLOCK_RE = re.compile(r"```(?P<lang>[a-zA-Z0-9_+-]*)?\s*\n(?P<code>.*?)```", re.DOTALL)
@@ -120,23 +122,37 @@ class PythonNodeExecutor(NodeExecutor):
         workspace: Path,
         node: Node,
     ) -> _ExecutionResult:
-        cmd = [config.interpreter]
-        if config.args:
-            cmd.extend(config.args)
-        cmd.append(str(script_path))
-        env = os.environ.copy()
-        env.update(config.env or {})
-        env.update(
+        run_env = dict(config.env or {})
+        run_env.update(
             {
                 "MAC_CODE_WORKSPACE": str(workspace),
                 "MAC_CODE_SCRIPT": str(script_path),
                 "MAC_NODE_ID": node.id,
             }
         )
+        memory_limit = config.memory_limit_mb * 1024 * 1024 if config.memory_limit_mb else None
+        # Interpreter args (e.g. -X flags) only apply to a fresh interpreter
+        if config.worker_pool and not config.args:
+            try:
+                return self._run_in_worker(config, script_path, workspace, node, run_env, memory_limit)
+            except WorkerUnavailable as exc:
+                self.log_manager.debug(
+                    f"Python node {node.id} falling back to a fresh interpreter", node_id=node.id,
+                    details={"reason": str(exc)},
+                )
+
+        cmd = [config.interpreter]
+        if config.args:
+            cmd.extend(config.args)
+        cmd.extend(script_command(script_path, memory_limit))
+        env = os.environ.copy()
+        env.update(run_env)
+        PYTHON_SCRIPT_RUNS.inc(mode="fresh")
         try:
             completed = subprocess.run(
                 cmd,
                 cwd=str(workspace),
+                env=env,
                 capture_output=True,
                 check=False,
                 timeout=config.timeout_seconds,
@@ -166,6 +182,37 @@ class PythonNodeExecutor(NodeExecutor):
             exit_code=completed.returncode,
         )
 
+    def _run_in_worker(
+        self,
+        config: PythonRunnerConfig,
+        script_path: Path,
+        workspace: Path,
+        node: Node,
+        env: dict,
+        memory_limit: int | None,
+    ) -> _ExecutionResult:
+        def _stream(stream: str, text: str) -> None:
+            self.log_manager.debug(f"Python node {node.id} {stream}", node_id=node.id, details={stream: text})
+
+        pool = get_worker_pool(config.interpreter, config.preload_modules)
+        result = pool.run(
+            script_path,
+            cwd=workspace,
+            env=env,
+            timeout=config.timeout_seconds,
+            memory_limit_bytes=memory_limit,
+            encoding=config.encoding,
+            on_output=_stream,
+        )
+        PYTHON_SCRIPT_RUNS.inc(mode="pool")
+        return _ExecutionResult(
+            success=result.returncode == 0 and not result.timed_out,
+            stdout=result.stdout,
+            stderr=result.stderr,
+            exit_code=None if result.timed_out else result.returncode,
+            error=result.error,
+        )
+
     def _build_failure_message(
         self,
         node: Node,
@@ -89,7 +89,7 @@ class SubgraphNodeExecutor(NodeExecutor):
         else:
             for msg in result_messages:
                 result_message = msg.clone()
-                meta = dict(result_message.metadata)
+                meta = dict(result_message.metadata_view)
                 meta.setdefault("source", node.id)
                 result_message.metadata = meta
                 final_results.append(result_message)
@@ -1,15 +1,15 @@
 """Template node executor."""
 
 import json
-from typing import List, Any
+from typing import Any, Dict, List, Tuple
 
-from jinja2 import TemplateSyntaxError, UndefinedError, StrictUndefined
+from jinja2 import Template, TemplateSyntaxError, UndefinedError, StrictUndefined
 from jinja2.sandbox import SandboxedEnvironment
 
 from entity.configs import Node
 from entity.configs.node.template import TemplateNodeConfig
 from entity.messages import Message, MessageRole
-from runtime.node.executor.base import NodeExecutor
+from runtime.node.executor.base import ExecutionContext, NodeExecutor
 
 
 class TemplateRenderError(Exception):
@@ -37,6 +37,35 @@ def _tojson_filter(value: Any) -> str:
 class TemplateNodeExecutor(NodeExecutor):
     """Format input messages using Jinja2 templates and emit the result."""
 
+    def __init__(self, context: ExecutionContext) -> None:
+        super().__init__(context)
+        self._env = SandboxedEnvironment(
+            autoescape=False,
+            undefined=StrictUndefined,  # Strict mode - fail on undefined variables
+        )
+        # Register custom filters
+        self._env.filters["fromjson"] = _fromjson_filter
+        self._env.filters["tojson"] = _tojson_filter
+        # Compiled templates by node id, with the source they were built from
+        self._templates: Dict[str, Tuple[str, Template]] = {}
+
+    def prefetch(self, node: Node) -> None:
+        config = node.as_config(TemplateNodeConfig)
+        if config is None:
+            return
+        try:
+            self._get_template(node.id, config.template)
+        except TemplateSyntaxError:
+            pass  # reported when the node executes
+
+    def _get_template(self, node_id: str, source: str) -> Template:
+        cached = self._templates.get(node_id)
+        if cached is not None and cached[0] == source:
+            return cached[1]
+        template = self._env.from_string(source)
+        self._templates[node_id] = (source, template)
+        return template
+
     def execute(self, node: Node, inputs: List[Message]) -> List[Message]:
         if node.node_type != "template":
             raise ValueError(f"Node {node.id} is not a template node")
@@ -66,19 +95,9 @@ class TemplateNodeExecutor(NodeExecutor):
                 details={"input_count": len(inputs)},
             )
 
-        # Create sandboxed Jinja2 environment
-        env = SandboxedEnvironment(
-            autoescape=False,
-            undefined=StrictUndefined,  # Strict mode - fail on undefined variables
-        )
-
-        # Register custom filters
-        env.filters["fromjson"] = _fromjson_filter
-        env.filters["tojson"] = _tojson_filter
-
         # Compile template
         try:
-            template = env.from_string(config.template)
+            template = self._get_template(node.id, config.template)
         except TemplateSyntaxError as exc:
             error_msg = f"Invalid template syntax in node '{node.id}': {exc}"
             self.log_manager.error(
@@ -3,10 +3,11 @@
 Provides different methods to split input messages into execution units.
 """
 
+import itertools
 import json
 import re
 from abc import ABC, abstractmethod
-from typing import List, Any, Optional
+from typing import Any, Iterator, List, Optional, Tuple
 
 from entity.configs.dynamic_base import SplitConfig, RegexSplitConfig, JsonPathSplitConfig
 from entity.messages import Message
@@ -16,6 +17,19 @@ class Splitter(ABC):
     """Abstract base class for input splitters."""
 
     @abstractmethod
+    def iter_units(self, inputs: List[Message]) -> Iterator[List[Message]]:
+        """Lazily yield execution units.
+
+        Units are produced one at a time so a scheduler can start the first
+        unit before the whole payload has been split.
+
+        Args:
+            inputs: Input messages to split
+
+        Yields:
+            Message groups, each group is one execution unit
+        """
+
     def split(self, inputs: List[Message]) -> List[List[Message]]:
         """Split inputs into execution units.
         
@@ -25,15 +39,16 @@ class Splitter(ABC):
         Returns:
             List of message groups, each group is one execution unit
         """
-        pass
+        return list(self.iter_units(inputs))
 
 
 class MessageSplitter(Splitter):
     """Split by message - each message becomes one execution unit."""
 
-    def split(self, inputs: List[Message]) -> List[List[Message]]:
+    def iter_units(self, inputs: List[Message]) -> Iterator[List[Message]]:
         """Each input message becomes a separate unit."""
-        return [[msg] for msg in inputs]
+        for msg in inputs:
+            yield [msg]
 
 
 class RegexSplitter(Splitter):
@@ -71,31 +86,32 @@ class RegexSplitter(Splitter):
         self.group = group
         self.on_no_match = on_no_match
 
-    def split(self, inputs: List[Message]) -> List[List[Message]]:
-        """Split by finding all regex matches across all inputs."""
-        units: List[List[Message]] = []
+    def iter_units(self, inputs: List[Message]) -> Iterator[List[Message]]:
+        """Yield one unit per regex match across all inputs, as matches are found."""
+        produced = False
         
         for msg in inputs:
             text = msg.text_content()
+            matches = self.pattern.finditer(text)
+            first = next(matches, None)
             
-            # Find all matches
-            matches = list(self.pattern.finditer(text))
-            
-            if not matches:
+            if first is None:
                 # Handle no match case
                 if self.on_no_match == "pass":
-                    units.append([msg])
+                    produced = True
+                    yield [msg]
                 elif self.on_no_match == "empty":
                     # Return empty content
                     unit_msg = Message(
                         role=msg.role,
                         content="",
-                        metadata={**msg.metadata, "split_source": "regex", "split_no_match": True},
+                        metadata={**msg.metadata_view, "split_source": "regex", "split_no_match": True},
                     )
-                    units.append([unit_msg])
+                    produced = True
+                    yield [unit_msg]
                 continue
             
-            for match in matches:
+            for match in itertools.chain((first,), matches):
                 # Extract the appropriate group
                 if self.group is not None:
                     try:
@@ -111,15 +127,189 @@ class RegexSplitter(Splitter):
                 unit_msg = Message(
                     role=msg.role,
                     content=match_text,
-                    metadata={**msg.metadata, "split_source": "regex"},
+                    metadata={**msg.metadata_view, "split_source": "regex"},
                 )
-                units.append([unit_msg])
+                produced = True
+                yield [unit_msg]
         
-        return units if units else [[msg] for msg in inputs]
+        if not produced:
+            for msg in inputs:
+                yield [msg]
+
+
+class JsonScanError(ValueError):
+    """Raised when a JSON payload turns out to be malformed while it is being scanned."""
+
+    def __init__(self, message: str, offset: int) -> None:
+        super().__init__(f"{message} at offset {offset}")
+        self.offset = offset
+
+
+_JSON_WS = re.compile(r"[ \t\n\r]*")
+_JSON_STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_JSON_SCALAR = re.compile(r"[^ \t\n\r,:\[\]{}\"]+")
+# Strings and brackets; everything else inside a container is skipped over
+_JSON_NESTING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{}]|"', re.DOTALL)
+_JSON_SEPARATOR = re.compile(r"[ \t\n\r]*([,\]}])[ \t\n\r]*")
+_JSON_CLOSERS = {"{": "}", "[": "]"}
+_JSON_DECODER = json.JSONDecoder()
+
+
+class _JsonSpanScanner:
+    """Locate JSON values in a text by offset without building Python objects.
+
+    Only strings and brackets are tokenized; containers that are not on the
+    requested path are skipped by bracket depth, so memory stays at the size
+    of the input text no matter how many items the array holds.
+    """
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+    def skip_ws(self, pos: int) -> int:
+        return _JSON_WS.match(self.text, pos).end()
+
+    def value_end(self, pos: int) -> int:
+        """Return the offset just past the value starting at ``pos``."""
+        text = self.text
+        if pos >= len(text):
+            raise JsonScanError("expected a value", pos)
+        char = text[pos]
+        if char == '"':
+            match = _JSON_STRING.match(text, pos)
+            if match is None:
+                raise JsonScanError("unterminated string", pos)
+            return match.end()
+        if char not in _JSON_CLOSERS:
+            match = _JSON_SCALAR.match(text, pos)
+            if match is None:
+                raise JsonScanError(f"unexpected character {char!r}", pos)
+            return match.end()
+
+        stack = [_JSON_CLOSERS[char]]
+        for match in _JSON_NESTING.finditer(text, pos + 1):
+            token = match.group()
+            if token in _JSON_CLOSERS:
+                stack.append(_JSON_CLOSERS[token])
+            elif token in ("]", "}"):
+                if token != stack.pop():
+                    raise JsonScanError("mismatched bracket", match.start())
+                if not stack:
+                    return match.end()
+            elif token == '"':
+                raise JsonScanError("unterminated string", match.start())
+        raise JsonScanError("unterminated container", pos)
+
+    def member_value(self, pos: int, key: str) -> Tuple[int | None, int]:
+        """Locate ``key`` in the object starting at ``pos``.
+
+        Returns the offset of its value (None when absent) and the offset just
+        past the object. As with ``json.loads`` the last duplicate key wins;
+        every other member is parsed, so a malformed one raises here.
+        """
+        text = self.text
+        found = None
+        pos = self.skip_ws(pos + 1)
+        if text.startswith("}", pos):
+            return None, pos + 1
+        while True:
+            if not text.startswith('"', pos):
+                raise JsonScanError("expected an object key", pos)
+            key_end = self.value_end(pos)
+            current = json.loads(text[pos:key_end])
+            pos = self.skip_ws(key_end)
+            if not text.startswith(":", pos):
+                raise JsonScanError("expected ':'", pos)
+            pos = self.skip_ws(pos + 1)
+            if current == key:
+                if found is not None:
+                    self.decode_value(found)
+                found = pos
+                end = self.value_end(pos)
+            else:
+                end, _ = self.decode_value(pos)
+            next_pos = self._after_item(end, "}")
+            if next_pos is None:
+                return found, self.skip_ws(end) + 1
+            pos = next_pos
+
+    def item_at(self, pos: int, index: int) -> Tuple[int | None, int]:
+        """Locate item ``index`` of the array starting at ``pos``.
+
+        Returns the offset of the item (None when out of range) and the offset
+        just past the array; the other items are parsed like in :meth:`member_value`.
+        """
+        text = self.text
+        found = None
+        pos = self.skip_ws(pos + 1)
+        if text.startswith("]", pos):
+            return None, pos + 1
+        for idx in itertools.count():
+            if idx == index:
+                found = pos
+                end = self.value_end(pos)
+            else:
+                end, _ = self.decode_value(pos)
+            next_pos = self._after_item(end, "]")
+            if next_pos is None:
+                return found, self.skip_ws(end) + 1
+            pos = next_pos
+
+    def decode_value(self, pos: int) -> Tuple[int, Any]:
+        """Parse the single value starting at ``pos``; return its end offset and value."""
+        try:
+            value, end = _JSON_DECODER.raw_decode(self.text, pos)
+        except json.JSONDecodeError as exc:
+            raise JsonScanError(exc.msg, exc.pos) from None
+        return end, value
+
+    def iter_items(self, pos: int, *, decode: bool = False) -> Iterator[Tuple[int, int, Any]]:
+        """Yield ``(start, end, value)`` for the items of the array starting at ``pos``.
+
+        With ``decode`` each item is parsed on its own (fast, and only as
+        large as the item); otherwise items are skipped and ``value`` is None.
+        """
+        text = self.text
+        pos = self.skip_ws(pos + 1)
+        if text.startswith("]", pos):
+            return
+        while True:
+            if decode:
+                end, value = self.decode_value(pos)
+            else:
+                end, value = self.value_end(pos), None
+            yield pos, end, value
+            pos = self._after_item(end, "]")
+            if pos is None:
+                return
+
+    def _after_item(self, end: int, closer: str) -> int | None:
+        """Advance past the separator after an item; None at the closing bracket."""
+        match = _JSON_SEPARATOR.match(self.text, end)
+        if match is not None:
+            if match.group(1) == ",":
+                return match.end()
+            if match.group(1) == closer:
+                return None
+        raise JsonScanError(f"expected ',' or {closer!r}", self.skip_ws(end))
 
 
 class JsonPathSplitter(Splitter):
-    """Split by JSON array path extraction."""
+    """Split by JSON array path extraction.
+
+    Payloads whose top level is an object or array are scanned incrementally:
+    array items are located by offset and yielded as they are found, object
+    and array items keep their original text, and strings and other scalars
+    are decoded from their own span only. Duplicate keys resolve to the last
+    occurrence, as with ``json.loads``. The whole payload is checked before
+    the first unit, one item at a time, so a payload that is not JSON, is
+    malformed anywhere or has trailing text becomes a single unit.
+
+    Splitting is therefore lazy in memory but not in time: the first unit
+    waits for one full parse of the payload. That parse is the only one for
+    container items, which are then yielded as text slices; scalar items are
+    decoded a second time from their own span when yielded.
+    """
 
     def __init__(self, json_path: str):
         """Initialize with JSON path.
@@ -155,36 +345,99 @@ class JsonPathSplitter(Splitter):
             return current
         return [current]
 
-    def split(self, inputs: List[Message]) -> List[List[Message]]:
-        """Split by extracting array items from JSON content."""
-        units: List[List[Message]] = []
+    def iter_units(self, inputs: List[Message]) -> Iterator[List[Message]]:
+        """Yield one unit per array item found at ``json_path``."""
+        produced = False
         
         for msg in inputs:
-            text = msg.text_content()
-            
-            # Try to parse as JSON
+            contents = self._iter_contents(msg.text_content())
             try:
-                data = json.loads(text)
-                items = self._extract_array(data)
-                
-                for item in items:
-                    if isinstance(item, (dict, list)):
-                        content = json.dumps(item, ensure_ascii=False)
-                    else:
-                        content = str(item)
-                    
-                    unit_msg = Message(
-                        role=msg.role,
-                        content=content,
-                        metadata={**msg.metadata, "split_source": "json_path"},
-                    )
-                    units.append([unit_msg])
-                    
-            except json.JSONDecodeError:
+                first = next(contents, None)
+            except ValueError:
                 # If not valid JSON, treat as single unit
-                units.append([msg])
+                produced = True
+                yield [msg]
+                continue
+            if first is None:
+                continue
+            
+            for content in itertools.chain((first,), contents):
+                unit_msg = Message(
+                    role=msg.role,
+                    content=content,
+                    metadata={**msg.metadata_view, "split_source": "json_path"},
+                )
+                produced = True
+                yield [unit_msg]
         
-        return units if units else [[msg] for msg in inputs]
+        if not produced:
+            for msg in inputs:
+                yield [msg]
+
+    def _iter_contents(self, text: str) -> Iterator[str]:
+        """Yield the text of each item, raising ValueError for non-JSON input."""
+        scanner = _JsonSpanScanner(text)
+        start = scanner.skip_ws(0)
+        if start >= len(text) or text[start] not in _JSON_CLOSERS:
+            # Scalars (and anything that does not look like a container) are
+            # small enough to parse the regular way
+            yield from (self._item_content(item) for item in self._extract_array(json.loads(text)))
+            return
+
+        # The whole document is checked before the first item is yielded, so
+        # malformed input falls back to a single unit instead of failing mid-stream
+        pos: int | None = start
+        document_end: int | None = None
+        for part in self.json_path.split(".") if self.json_path else []:
+            char = text[pos]
+            if char == "{":
+                pos, end = scanner.member_value(pos, part)
+            elif char == "[" and part.isdigit():
+                pos, end = scanner.item_at(pos, int(part))
+            else:
+                end, _ = scanner.decode_value(pos)
+                pos = None
+            if document_end is None:
+                document_end = end
+            if pos is None:
+                break
+        if document_end is None:
+            document_end = scanner.value_end(start)
+        trailing = scanner.skip_ws(document_end)
+        if trailing != len(text):
+            raise JsonScanError("extra data after the document", trailing)
+        if pos is None:
+            return
+
+        if text[pos] == "[":
+            # Items are decoded and dropped one by one, so the check holds no
+            # more than one item in memory. The second pass only skips over
+            # containers, which are yielded as text, and decodes scalars
+            for _ in scanner.iter_items(pos, decode=True):
+                pass
+            for item_start, item_end, _ in scanner.iter_items(pos):
+                if text[item_start] in _JSON_CLOSERS:
+                    yield text[item_start:item_end]
+                else:
+                    _, value = scanner.decode_value(item_start)
+                    yield self._span_content(text, item_start, item_end, value)
+        else:
+            end, value = scanner.decode_value(pos)
+            if value is not None:
+                yield self._span_content(text, pos, end, value)
+
+    @staticmethod
+    def _span_content(text: str, start: int, end: int, value: Any) -> str:
+        # Containers keep their original text instead of being re-serialized
+        if isinstance(value, (dict, list)):
+            return text[start:end]
+        return str(value)
+
+    @staticmethod
+    def _item_content(item: Any) -> str:
+        if isinstance(item, (dict, list)):
+            return json.dumps(item, ensure_ascii=False)
+        return str(item)
 
 
 def create_splitter(
@@ -11,6 +11,7 @@ from entity.graph_config import GraphConfig
 from entity.messages import Message
 from runtime.bootstrap.schema import ensure_schema_registry_populated
 from utils.attachments import AttachmentStore
+from utils.blob_store import get_blob_store
 from utils.exceptions import ValidationError
 from server.settings import YAML_DIR
 from utils.task_input import TaskInputBuilder
@@ -54,7 +55,7 @@ def _build_task_input(
 
     attachments_dir = graph_context.directory / "code_workspace" / "attachments"
     attachments_dir.mkdir(parents=True, exist_ok=True)
-    store = AttachmentStore(attachments_dir)
+    store = AttachmentStore(attachments_dir, blob_store=get_blob_store())
     builder = TaskInputBuilder(store)
     normalized_paths = [str(Path(path).expanduser()) for path in attachments]
     return builder.build_from_file_paths(prompt, normalized_paths)
@@ -1,9 +1,10 @@
 """Aggregates API routers."""
 
-from . import artifacts, execute, execute_sync, health, sessions, spatial_configs, uploads, vuegraphs, workflows, websocket, batch, tools
+from . import artifacts, execute, execute_sync, health, metrics, sessions, spatial_configs, uploads, vuegraphs, workflows, websocket, batch, tools
 
 ALL_ROUTERS = [
     health.router,
+    metrics.router,
     vuegraphs.router,
     workflows.router,
     uploads.router,
@@ -1,11 +1,12 @@
 import asyncio
+from dataclasses import asdict
 
 from fastapi import APIRouter, File, Form, HTTPException, UploadFile
 
 from entity.enums import LogLevel
 from server.services.batch_parser import parse_batch_file
 from server.services.batch_run_service import BatchRunService
-from server.state import ensure_known_session
+from server.state import ensure_known_session, get_websocket_manager
 from utils.exceptions import ValidationError
 
 router = APIRouter()
@@ -19,11 +20,6 @@ async def execute_batch(
     max_parallel: int = Form(5),
     log_level: str | None = Form(None),
 ):
-    try:
-        manager = ensure_known_session(session_id, require_connection=True)
-    except ValidationError as exc:
-        raise HTTPException(status_code=400, detail=str(exc))
-
     if max_parallel < 1:
         raise HTTPException(status_code=400, detail="max_parallel must be >= 1")
 
@@ -40,6 +36,31 @@ async def execute_batch(
         except ValueError:
             raise HTTPException(status_code=400, detail="log_level must be either DEBUG or INFO")
 
+    accepted = {
+        "status": "accepted",
+        "session_id": session_id,
+        "batch_id": session_id,
+        "task_count": len(tasks),
+    }
+    forwarded = await get_websocket_manager().forward_to_connection(
+        session_id,
+        {
+            "type": "batch",
+            "yaml_file": yaml_file,
+            "tasks": [asdict(task) for task in tasks],
+            "max_parallel": max_parallel,
+            "file_base": file_base,
+            "log_level": resolved_level.value if resolved_level else None,
+        },
+    )
+    if forwarded:
+        return accepted
+
+    try:
+        manager = ensure_known_session(session_id, require_connection=True)
+    except ValidationError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
     service = BatchRunService()
     asyncio.create_task(
         service.run_batch(
@@ -53,9 +74,4 @@ async def execute_batch(
         )
     )
 
-    return {
-        "status": "accepted",
-        "session_id": session_id,
-        "batch_id": session_id,
-        "task_count": len(tasks),
-    }
+    return accepted
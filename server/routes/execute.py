@@ -3,7 +3,7 @@ import asyncio
 from fastapi import APIRouter, HTTPException
 
 from server.models import WorkflowRequest
-from server.state import ensure_known_session
+from server.state import ensure_known_session, get_websocket_manager
 from utils.exceptions import ValidationError, WorkflowExecutionError
 from utils.structured_logger import get_server_logger, LogType
 
@@ -12,6 +12,22 @@ router = APIRouter()
 
 @router.post("/api/workflow/execute")
 async def execute_workflow(request: WorkflowRequest):
+    forwarded = await get_websocket_manager().forward_to_connection(
+        request.session_id,
+        {
+            "type": "execute",
+            "yaml_file": request.yaml_file,
+            "task_prompt": request.task_prompt,
+            "attachments": request.attachments,
+        },
+    )
+    if forwarded:
+        # The worker holding the session's socket runs it and streams the events
+        return {
+            "status": "started",
+            "session_id": request.session_id,
+            "message": "Workflow execution started",
+        }
     try:
         manager = ensure_known_session(request.session_id, require_connection=True)
         # log_level = LogLevel(request.log_level) if request.log_level else None
@@ -20,6 +20,7 @@ from runtime.sdk import OUTPUT_ROOT, run_workflow
 from server.models import WorkflowRunRequest
 from server.settings import YAML_DIR
 from utils.attachments import AttachmentStore
+from utils.blob_store import get_blob_store
 from utils.exceptions import ValidationError, WorkflowExecutionError
 from utils.logger import WorkflowLogger
 from utils.structured_logger import get_server_logger, LogType
@@ -60,7 +61,7 @@ def _build_task_input(
 
     attachments_dir = graph_context.directory / "code_workspace" / "attachments"
     attachments_dir.mkdir(parents=True, exist_ok=True)
-    store = AttachmentStore(attachments_dir)
+    store = AttachmentStore(attachments_dir, blob_store=get_blob_store())
     builder = TaskInputBuilder(store)
     normalized_paths = [str(Path(path).expanduser()) for path in attachments]
     return builder.build_from_file_paths(prompt, normalized_paths)
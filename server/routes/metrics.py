@@ -0,0 +1,29 @@
+from collections import Counter
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from server.services.session_store import SessionStatus
+from server.state import get_websocket_manager
+from utils.metrics import ACTIVE_SESSIONS, WEBSOCKET_BUFFERED_MESSAGES, get_metrics_registry
+
+router = APIRouter()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _collect_session_metrics() -> None:
+    """Refresh session gauges from the live store at scrape time."""
+    sessions = get_websocket_manager().session_store.local_sessions()
+    by_status = Counter(session.status.value for session in sessions)
+    for status in SessionStatus:
+        ACTIVE_SESSIONS.set(by_status.get(status.value, 0), status=status.value)
+    WEBSOCKET_BUFFERED_MESSAGES.set(sum(len(session.message_buffer) for session in sessions))
+
+
+get_metrics_registry().add_collector(_collect_session_metrics)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(get_metrics_registry().render(), media_type=PROMETHEUS_CONTENT_TYPE)
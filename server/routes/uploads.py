@@ -1,3 +1,5 @@
+import asyncio
+
 from fastapi import APIRouter, File, HTTPException, UploadFile
 
 from server.state import ensure_known_session
@@ -9,7 +11,7 @@ router = APIRouter()
 @router.post("/api/uploads/{session_id}")
 async def upload_attachment(session_id: str, file: UploadFile = File(...)):
     try:
-        manager = ensure_known_session(session_id, require_connection=False)
+        manager = await asyncio.to_thread(ensure_known_session, session_id, require_connection=False)
     except ValidationError as exc:
         raise HTTPException(status_code=400, detail=str(exc))
     try:
@@ -38,7 +40,7 @@ async def upload_attachment(session_id: str, file: UploadFile = File(...)):
 @router.get("/api/uploads/{session_id}")
 async def list_attachments(session_id: str):
     try:
-        manager = ensure_known_session(session_id, require_connection=False)
+        manager = await asyncio.to_thread(ensure_known_session, session_id, require_connection=False)
     except ValidationError as exc:
         raise HTTPException(status_code=400, detail=str(exc))
     manifest = manager.attachment_service.list_attachment_manifests(session_id)
@@ -4,7 +4,7 @@ import logging
 import mimetypes
 import os
 import shutil
-import tempfile
+import uuid
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
@@ -12,15 +12,17 @@ from fastapi import UploadFile
 
 from entity.messages import MessageBlock, MessageBlockType
 from utils.attachments import AttachmentStore, AttachmentRecord
+from utils.blob_store import BlobStore, default_blob_root
 
 
 class AttachmentService:
     """Handles attachment lifecycle per session."""
 
-    def __init__(self, *, root: Path | str = Path("WareHouse")) -> None:
+    def __init__(self, *, root: Path | str = Path("WareHouse"), blob_store: Optional[BlobStore] = None) -> None:
         self.logger = logging.getLogger(__name__)
         self.attachments_root = Path(root)
         self.attachments_root.mkdir(parents=True, exist_ok=True)
+        self.blob_store = blob_store or BlobStore(default_blob_root(self.attachments_root))
         env_flag = os.environ.get("MAC_AUTO_CLEAN_ATTACHMENTS", "0").strip().lower()
         self.clean_on_cleanup = env_flag in {"1", "true", "yes"}
 
@@ -41,7 +43,7 @@ class AttachmentService:
 
     def get_attachment_store(self, session_id: str) -> AttachmentStore:
         path = self.prepare_session_workspace(session_id)
-        return AttachmentStore(path)
+        return AttachmentStore(path, blob_store=self.blob_store)
 
     @staticmethod
     def _safe_upload_filename(raw: Optional[str]) -> str:
@@ -61,39 +63,31 @@ class AttachmentService:
 
     async def save_upload_file(self, session_id: str, upload: UploadFile) -> AttachmentRecord:
         filename = self._safe_upload_filename(upload.filename)
-        temp_dir = Path(tempfile.mkdtemp(prefix="mac_upload_"))
-        temp_path = temp_dir / filename
-        try:
-            with temp_path.open("wb") as buffer:
-                while True:
-                    chunk = await upload.read(1024 * 1024)
-                    if not chunk:
-                        break
-                    buffer.write(chunk)
-            store = self.get_attachment_store(session_id)
-            mime_type = upload.content_type or mimetypes.guess_type(filename)[0]
-            record = store.register_file(
-                temp_path,
-                kind=MessageBlockType.from_mime_type(mime_type),
-                display_name=filename,
-                mime_type=mime_type,
-                extra={
-                    "source": "user_upload",
-                    "origin": "web_upload",
-                    "session_id": session_id,
-                },
-            )
-            return record
-        finally:
-            if temp_path.exists():
-                try:
-                    temp_path.unlink()
-                except OSError:
-                    pass
-            try:
-                temp_dir.rmdir()
-            except OSError:
-                pass
+        store = self.get_attachment_store(session_id)
+        attachment_id = uuid.uuid4().hex
+        target_path = store.root / attachment_id / filename
+        # Hash while streaming into place; where the blob store deduplicates,
+        # identical uploads from other sessions share one blob.
+        with self.blob_store.writer(target_path) as writer:
+            while True:
+                chunk = await upload.read(1024 * 1024)
+                if not chunk:
+                    break
+                writer.write(chunk)
+        mime_type = upload.content_type or mimetypes.guess_type(filename)[0]
+        return store.register_blob(
+            writer.sha256,
+            path=target_path,
+            attachment_id=attachment_id,
+            kind=MessageBlockType.from_mime_type(mime_type),
+            display_name=filename,
+            mime_type=mime_type,
+            extra={
+                "source": "user_upload",
+                "origin": "web_upload",
+                "session_id": session_id,
+            },
+        )
 
     def build_attachment_blocks(
         self,
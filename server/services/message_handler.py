@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from typing import Any, Dict
 
@@ -10,6 +11,9 @@ from server.services.session_store import WorkflowSessionStore
 class MessageHandler:
     """Routes WebSocket messages to the appropriate handlers."""
 
+    # Need the live run, which may belong to another worker than the socket
+    RUN_OWNER_MESSAGES = ("human_input", "cancel")
+
     def __init__(
         self,
         session_store: WorkflowSessionStore,
@@ -23,6 +27,10 @@ class MessageHandler:
 
     async def handle_message(self, session_id: str, data: Dict[str, Any], websocket_manager):
         message_type = data.get("type")
+        if message_type in self.RUN_OWNER_MESSAGES and await websocket_manager.forward_to_run_owner(
+            session_id, data
+        ):
+            return
         if message_type == "human_input":
             await self._handle_human_input(session_id, data, websocket_manager)
         elif message_type == "ping":
@@ -84,7 +92,7 @@ class MessageHandler:
         await websocket_manager.handle_heartbeat(session_id)
 
     async def _handle_get_status(self, session_id: str, websocket_manager):
-        session_info = self.session_store.get_session_info(session_id)
+        session_info = await asyncio.to_thread(self.session_store.get_session_info, session_id)
         await websocket_manager.send_message(
             session_id,
             {"type": "status", "data": session_info or {"message": "Session not found"}},
@@ -0,0 +1,114 @@
+"""Coalesces streamed model output into ``node_delta`` WebSocket events."""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from runtime.node.agent import ModelDelta
+
+
+@dataclass
+class _PendingDelta:
+    text: str = ""
+    tool_calls: Dict[int, Dict[str, Any]] = field(default_factory=dict)
+    seq: int = 0
+    last_sent: float = 0.0
+
+    def empty(self) -> bool:
+        return not self.text and not self.tool_calls
+
+
+_StreamKey = Tuple[str, Optional[int]]
+
+
+class NodeDeltaDispatcher:
+    """Sends streamed deltas to the session's WebSocket, batched per node execution.
+
+    Deltas are buffered per node and dynamic map unit, since the parallel
+    units of a map all run the same node. The first delta of a call is sent
+    immediately so the client sees the first token without waiting; later
+    deltas are merged until ``flush_interval`` has passed or ``max_chars``
+    are buffered. The executor calls :meth:`flush` when a model call ends,
+    so nothing is left behind.
+    """
+
+    FLUSH_INTERVAL_SECONDS = 0.05
+    MAX_BUFFERED_CHARS = 2048
+
+    def __init__(
+        self,
+        session_id: str,
+        websocket_manager,
+        *,
+        flush_interval: float = FLUSH_INTERVAL_SECONDS,
+        max_chars: int = MAX_BUFFERED_CHARS,
+    ) -> None:
+        self.session_id = session_id
+        self.websocket_manager = websocket_manager
+        self.flush_interval = flush_interval
+        self.max_chars = max_chars
+        self.logger = logging.getLogger(__name__)
+        self._pending: Dict[_StreamKey, _PendingDelta] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, node_id: str, delta: ModelDelta, *, unit_index: Optional[int] = None) -> None:
+        key = (node_id, unit_index)
+        with self._lock:
+            pending = self._pending.setdefault(key, _PendingDelta())
+            if delta.reset:
+                pending.text = ""
+                pending.tool_calls.clear()
+                event = self._take(key, pending, reset=True)
+            else:
+                pending.text += delta.text
+                if delta.tool_call_index is not None:
+                    call = pending.tool_calls.setdefault(delta.tool_call_index, {"index": delta.tool_call_index})
+                    if delta.tool_call_id:
+                        call["id"] = delta.tool_call_id
+                    if delta.tool_name:
+                        call["name"] = delta.tool_name
+                    if delta.arguments:
+                        call["arguments"] = call.get("arguments", "") + delta.arguments
+                due = time.monotonic() - pending.last_sent >= self.flush_interval
+                event = self._take(key, pending) if due or len(pending.text) >= self.max_chars else None
+        # Sending blocks on the event loop; never hold the lock other units need meanwhile
+        if event is not None:
+            self._send(event)
+
+    def flush(self, node_id: Optional[str] = None, *, unit_index: Optional[int] = None) -> None:
+        """Send what is buffered for one node execution, or for all of them without ``node_id``."""
+        with self._lock:
+            keys: List[_StreamKey] = [(node_id, unit_index)] if node_id is not None else list(self._pending)
+            events = []
+            for key in keys:
+                pending = self._pending.get(key)
+                if pending is not None and not pending.empty():
+                    events.append(self._take(key, pending))
+        for event in events:
+            self._send(event)
+
+    @staticmethod
+    def _take(key: _StreamKey, pending: _PendingDelta, *, reset: bool = False) -> Dict[str, Any]:
+        node_id, unit_index = key
+        data: Dict[str, Any] = {"node_id": node_id, "seq": pending.seq}
+        if unit_index is not None:
+            data["unit_index"] = unit_index
+        if reset:
+            data["reset"] = True
+        if pending.text:
+            data["text"] = pending.text
+        if pending.tool_calls:
+            data["tool_calls"] = [call for _, call in sorted(pending.tool_calls.items())]
+        pending.seq += 1
+        pending.text = ""
+        pending.tool_calls = {}
+        pending.last_sent = time.monotonic()
+        return data
+
+    def _send(self, data: Dict[str, Any]) -> None:
+        try:
+            self.websocket_manager.send_message_sync(self.session_id, {"type": "node_delta", "data": data})
+        except Exception as exc:
+            self.logger.warning("Failed to send node delta for %s: %s", data["node_id"], exc)
@@ -0,0 +1,152 @@
+"""Admission limit and threads for workflow runs that are actually executing."""
+
+import concurrent.futures
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Deque, Iterator, Optional, Tuple
+
+
+class _Lease:
+    """One run's hold on a slot.
+
+    Several threads of the same run (the nodes of one layer) can park at
+    once; the slot is handed back on the first park and taken again only
+    when the last one resumes.
+    """
+
+    def __init__(self, slots: "RunSlots") -> None:
+        self.slots = slots
+        self.parks = 0
+        self.holding = True
+
+
+_current_lease: ContextVar[Optional[_Lease]] = ContextVar("run_slot_lease", default=None)
+
+_Task = Tuple[concurrent.futures.Future, Callable[..., Any], tuple]
+
+
+class RunSlots:
+    """Bound the number of workflow runs executing at once and run them on threads.
+
+    A run holds a slot for its whole execution, except while it is parked on
+    something outside the server (a human prompt): :func:`parked` hands the
+    slot to the next queued run and takes one back before the run continues.
+    Runs resuming from a park go before queued runs.
+
+    Queued runs hold no thread. Threads are started on demand and retire
+    after ``idle_seconds``, so the process holds one thread per executing
+    run plus one per parked run, and parked runs never keep queued runs
+    from starting.
+
+    Parking is not suspension: a parked run keeps its thread, and the
+    threads of the graph layer it is in, until the input arrives or the
+    wait times out. Releasing them would need runs that resume from saved
+    state, which node executors (live provider clients, tool sessions,
+    in-memory conversation) do not support, so that is out of scope here.
+    """
+
+    def __init__(self, limit: int, *, idle_seconds: float = 60.0) -> None:
+        self.limit = max(1, limit)
+        self.idle_seconds = idle_seconds
+        self._cond = threading.Condition()
+        self._queue: Deque[_Task] = deque()
+        self._ready: Deque[_Task] = deque()
+        self._executing = 0
+        self._resuming = 0
+        self._idle_threads = 0
+
+    @property
+    def executing(self) -> int:
+        """Number of runs currently holding a slot."""
+        with self._cond:
+            return self._executing
+
+    def submit(self, func: Callable[..., Any], *args: Any) -> concurrent.futures.Future:
+        """Queue ``func(*args)`` as a run; it starts once a slot is free."""
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        with self._cond:
+            self._queue.append((future, func, args))
+            self._dispatch()
+        return future
+
+    def _dispatch(self) -> None:
+        # Caller holds self._cond; a freed slot may also wake a resuming run
+        self._cond.notify_all()
+        while self._queue and not self._resuming and self._executing < self.limit:
+            task = self._queue.popleft()
+            self._executing += 1
+            if self._idle_threads:
+                self._idle_threads -= 1
+                self._ready.append(task)
+            else:
+                threading.Thread(target=self._worker, args=(task,), name="workflow-run", daemon=True).start()
+
+    def _worker(self, task: Optional[_Task]) -> None:
+        while task is not None:
+            self._run(task)
+            with self._cond:
+                self._idle_threads += 1
+                if not self._cond.wait_for(lambda: self._ready, self.idle_seconds):
+                    self._idle_threads -= 1
+                    return
+                task = self._ready.popleft()
+
+    def _run(self, task: _Task) -> None:
+        future, func, args = task
+        lease = _Lease(self)
+        token = _current_lease.set(lease)
+        try:
+            if future.set_running_or_notify_cancel():
+                try:
+                    result = func(*args)
+                except BaseException as exc:
+                    future.set_exception(exc)
+                else:
+                    future.set_result(result)
+        finally:
+            _current_lease.reset(token)
+            with self._cond:
+                if lease.holding:
+                    lease.holding = False
+                    self._executing -= 1
+                self._dispatch()
+
+    def _park(self, lease: _Lease) -> None:
+        with self._cond:
+            lease.parks += 1
+            if lease.holding:
+                lease.holding = False
+                self._executing -= 1
+                self._dispatch()
+
+    def _unpark(self, lease: _Lease) -> None:
+        with self._cond:
+            lease.parks -= 1
+            if lease.parks or lease.holding:
+                return
+            self._resuming += 1
+            try:
+                # Another thread of the run may take the slot back, or park again, meanwhile
+                self._cond.wait_for(lambda: lease.holding or lease.parks or self._executing < self.limit)
+            finally:
+                self._resuming -= 1
+            if not lease.holding and not lease.parks:
+                lease.holding = True
+                self._executing += 1
+            self._dispatch()
+
+
+@contextmanager
+def parked() -> Iterator[None]:
+    """Release the current run's slot while the block waits; a no-op outside a run."""
+    lease = _current_lease.get()
+    if lease is None:
+        yield
+        return
+    lease.slots._park(lease)
+    try:
+        yield
+    finally:
+        lease.slots._unpark(lease)
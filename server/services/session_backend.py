@@ -0,0 +1,375 @@
+"""Pluggable persistence backends for workflow session metadata and events.
+
+The in-process ``WorkflowSessionStore`` keeps live objects (executors, futures,
+cancel events) that cannot leave the worker that owns them. Backends persist the
+serializable part of a session -- its status record and the buffered WebSocket
+events -- so other server workers can answer status queries, replay a session
+to a reconnecting client, and notice sessions orphaned by a crashed worker.
+
+Backends also record which worker holds each session's WebSocket and queue
+commands addressed to a worker process, so a request that lands on the wrong
+worker can be forwarded to the one owning the socket or the run.
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from contextlib import closing, contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+SESSION_BACKEND_ENV = "SESSION_STORE_BACKEND"
+SESSION_DB_ENV = "SESSION_DB_PATH"
+
+
+class SessionBackend(ABC):
+    """Interface implemented by session persistence backends."""
+
+    #: Whether records written by one process are visible to other processes.
+    shared: bool = False
+
+    @abstractmethod
+    def save_record(self, session_id: str, record: Dict[str, Any]) -> None:
+        """Create or replace the status record of a session."""
+
+    @abstractmethod
+    def load_record(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Return the session's status record, or None if there is none."""
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        """Forget the session's record, events, socket owner and queued commands."""
+
+    @abstractmethod
+    def list_records(self) -> Dict[str, Dict[str, Any]]:
+        """Return every status record, keyed by session id."""
+
+    @abstractmethod
+    def append_event(self, session_id: str, message: Dict[str, Any]) -> int:
+        """Persist a buffered event and return its monotonically increasing cursor."""
+
+    @abstractmethod
+    def read_events(self, session_id: str, after: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+        """Return events newer than ``after`` and the cursor of the last one."""
+
+    @abstractmethod
+    def set_connection_owner(self, session_id: str, pid: int) -> None:
+        """Record that process ``pid`` holds the session's WebSocket."""
+
+    @abstractmethod
+    def clear_connection_owner(self, session_id: str, pid: int) -> None:
+        """Forget the socket owner, unless another process has claimed it since."""
+
+    @abstractmethod
+    def connection_owner(self, session_id: str) -> Optional[int]:
+        """Return the pid of the process holding the session's WebSocket, if any."""
+
+    @abstractmethod
+    def post_command(self, target_pid: int, session_id: str, command: Dict[str, Any]) -> None:
+        """Queue ``command`` for the worker process ``target_pid``."""
+
+    @abstractmethod
+    def take_commands(self, pid: int) -> List[Tuple[str, Dict[str, Any]]]:
+        """Remove and return ``(session_id, command)`` pairs queued for ``pid``, oldest first."""
+
+    def open_wake_socket(self, pid: int) -> Optional[socket.socket]:
+        """Return a non-blocking socket that becomes readable when :meth:`wake` is called for ``pid``.
+
+        Returns None when the backend has no wake channel; callers then only poll.
+        """
+        return None
+
+    def wake(self, pid: int) -> None:
+        """Tell worker ``pid`` that commands or events are waiting for it; best effort."""
+
+
+class InMemorySessionBackend(SessionBackend):
+    """Process-local backend; the default for single-worker deployments."""
+
+    def __init__(self, max_events: int = 1000) -> None:
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._events: Dict[str, List[Tuple[int, Dict[str, Any]]]] = {}
+        self._cursor = 0
+        self._max_events = max_events
+        self._connections: Dict[str, int] = {}
+        self._commands: Dict[int, List[Tuple[str, Dict[str, Any]]]] = {}
+        self._lock = threading.Lock()
+
+    def save_record(self, session_id: str, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self._records[session_id] = dict(record)
+
+    def load_record(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            record = self._records.get(session_id)
+            return dict(record) if record else None
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._records.pop(session_id, None)
+            self._events.pop(session_id, None)
+            self._connections.pop(session_id, None)
+            for commands in self._commands.values():
+                commands[:] = [item for item in commands if item[0] != session_id]
+
+    def list_records(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {sid: dict(record) for sid, record in self._records.items()}
+
+    def append_event(self, session_id: str, message: Dict[str, Any]) -> int:
+        with self._lock:
+            self._cursor += 1
+            events = self._events.setdefault(session_id, [])
+            events.append((self._cursor, message))
+            if len(events) > self._max_events:
+                del events[: len(events) - self._max_events]
+            return self._cursor
+
+    def read_events(self, session_id: str, after: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+        with self._lock:
+            events = [(cursor, msg) for cursor, msg in self._events.get(session_id, []) if cursor > after]
+        if not events:
+            return [], after
+        return [msg for _, msg in events], events[-1][0]
+
+    def set_connection_owner(self, session_id: str, pid: int) -> None:
+        with self._lock:
+            self._connections[session_id] = pid
+
+    def clear_connection_owner(self, session_id: str, pid: int) -> None:
+        with self._lock:
+            if self._connections.get(session_id) == pid:
+                del self._connections[session_id]
+
+    def connection_owner(self, session_id: str) -> Optional[int]:
+        with self._lock:
+            return self._connections.get(session_id)
+
+    def post_command(self, target_pid: int, session_id: str, command: Dict[str, Any]) -> None:
+        with self._lock:
+            self._commands.setdefault(target_pid, []).append((session_id, dict(command)))
+
+    def take_commands(self, pid: int) -> List[Tuple[str, Dict[str, Any]]]:
+        with self._lock:
+            return self._commands.pop(pid, [])
+
+
+class SqliteSessionBackend(SessionBackend):
+    """SQLite-backed store shared by every worker process on the host.
+
+    Workers are woken through Unix datagram sockets in ``<db path>.wake/``
+    named by pid, so forwarded commands and relayed events are picked up as
+    soon as they are written instead of at the next poll. Where Unix sockets
+    are unavailable, workers fall back to polling.
+    """
+
+    shared = True
+
+    def __init__(self, db_path: Path | str, max_events: int = 1000) -> None:
+        self.db_path = Path(db_path)
+        self._max_events = max_events
+        self._wake_dir = self.db_path.with_name(self.db_path.name + ".wake")
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS sessions (
+                    session_id TEXT PRIMARY KEY,
+                    record TEXT NOT NULL
+                )
+                """
+            )
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS session_events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id TEXT NOT NULL,
+                    payload TEXT NOT NULL
+                )
+                """
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS idx_session_events_session ON session_events (session_id, id)"
+            )
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS session_connections (
+                    session_id TEXT PRIMARY KEY,
+                    owner_pid INTEGER NOT NULL
+                )
+                """
+            )
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS session_commands (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    target_pid INTEGER NOT NULL,
+                    session_id TEXT NOT NULL,
+                    payload TEXT NOT NULL
+                )
+                """
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS idx_session_commands_target ON session_commands (target_pid, id)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection for one operation, committing on success and always closing it."""
+        with closing(sqlite3.connect(self.db_path, timeout=30)) as connection:
+            with connection:
+                yield connection
+
+    def save_record(self, session_id: str, record: Dict[str, Any]) -> None:
+        with self._connect() as connection:
+            connection.execute(
+                """
+                INSERT INTO sessions (session_id, record)
+                VALUES (?, ?)
+                ON CONFLICT(session_id) DO UPDATE SET record=excluded.record
+                """,
+                (session_id, json.dumps(record, default=str)),
+            )
+
+    def load_record(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT record FROM sessions WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def delete(self, session_id: str) -> None:
+        with self._connect() as connection:
+            connection.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            connection.execute("DELETE FROM session_events WHERE session_id = ?", (session_id,))
+            connection.execute("DELETE FROM session_connections WHERE session_id = ?", (session_id,))
+            connection.execute("DELETE FROM session_commands WHERE session_id = ?", (session_id,))
+
+    def list_records(self) -> Dict[str, Dict[str, Any]]:
+        with self._connect() as connection:
+            rows = connection.execute("SELECT session_id, record FROM sessions").fetchall()
+        return {session_id: json.loads(record) for session_id, record in rows}
+
+    def append_event(self, session_id: str, message: Dict[str, Any]) -> int:
+        with self._connect() as connection:
+            cursor = connection.execute(
+                "INSERT INTO session_events (session_id, payload) VALUES (?, ?)",
+                (session_id, json.dumps(message, default=str)),
+            )
+            event_id = cursor.lastrowid
+            # Trim to the same bound as the in-process replay buffer
+            connection.execute(
+                """
+                DELETE FROM session_events
+                WHERE session_id = ? AND id < (
+                    SELECT id FROM session_events WHERE session_id = ?
+                    ORDER BY id DESC LIMIT 1 OFFSET ?
+                )
+                """,
+                (session_id, session_id, self._max_events - 1),
+            )
+        return event_id
+
+    def read_events(self, session_id: str, after: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+        with self._connect() as connection:
+            rows = connection.execute(
+                """
+                SELECT id, payload FROM session_events
+                WHERE session_id = ? AND id > ?
+                ORDER BY id
+                """,
+                (session_id, after),
+            ).fetchall()
+        if not rows:
+            return [], after
+        return [json.loads(payload) for _, payload in rows], rows[-1][0]
+
+    def set_connection_owner(self, session_id: str, pid: int) -> None:
+        with self._connect() as connection:
+            connection.execute(
+                """
+                INSERT INTO session_connections (session_id, owner_pid)
+                VALUES (?, ?)
+                ON CONFLICT(session_id) DO UPDATE SET owner_pid=excluded.owner_pid
+                """,
+                (session_id, pid),
+            )
+
+    def clear_connection_owner(self, session_id: str, pid: int) -> None:
+        with self._connect() as connection:
+            connection.execute(
+                "DELETE FROM session_connections WHERE session_id = ? AND owner_pid = ?",
+                (session_id, pid),
+            )
+
+    def connection_owner(self, session_id: str) -> Optional[int]:
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT owner_pid FROM session_connections WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+        return row[0] if row else None
+
+    def post_command(self, target_pid: int, session_id: str, command: Dict[str, Any]) -> None:
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT INTO session_commands (target_pid, session_id, payload) VALUES (?, ?, ?)",
+                (target_pid, session_id, json.dumps(command, default=str)),
+            )
+
+    def take_commands(self, pid: int) -> List[Tuple[str, Dict[str, Any]]]:
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT id, session_id, payload FROM session_commands WHERE target_pid = ? ORDER BY id",
+                (pid,),
+            ).fetchall()
+            if rows:
+                # Commands posted in between get higher ids and stay queued
+                connection.execute(
+                    "DELETE FROM session_commands WHERE target_pid = ? AND id <= ?",
+                    (pid, rows[-1][0]),
+                )
+        return [(session_id, json.loads(payload)) for _, session_id, payload in rows]
+
+    def open_wake_socket(self, pid: int) -> Optional[socket.socket]:
+        if not hasattr(socket, "AF_UNIX"):
+            return None
+        path = self._wake_dir / str(pid)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            self._wake_dir.mkdir(parents=True, exist_ok=True)
+            # A socket file left by an exited process with the same pid
+            path.unlink(missing_ok=True)
+            sock.bind(str(path))
+        except OSError:
+            sock.close()
+            return None
+        sock.setblocking(False)
+        return sock
+
+    def wake(self, pid: int) -> None:
+        if not hasattr(socket, "AF_UNIX"):
+            return
+        try:
+            with closing(socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)) as sock:
+                sock.setblocking(False)
+                sock.sendto(b"\0", str(self._wake_dir / str(pid)))
+        except OSError:
+            # Nobody listening, or its queue is full; it polls in either case
+            pass
+
+
+def create_session_backend() -> SessionBackend:
+    """Build the backend selected by ``SESSION_STORE_BACKEND`` (memory or sqlite)."""
+    backend_name = os.getenv(SESSION_BACKEND_ENV, "memory").strip().lower()
+    if backend_name == "sqlite":
+        return SqliteSessionBackend(os.getenv(SESSION_DB_ENV, "data/sessions.db"))
+    if backend_name not in ("", "memory"):
+        raise ValueError(f"Unknown session store backend: {backend_name}")
+    return InMemorySessionBackend()
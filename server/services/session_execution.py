@@ -2,13 +2,14 @@
 
 import concurrent.futures
 import logging
-import time
+import threading
 from concurrent.futures import Future
 from typing import Any, Dict, Optional
 
 from utils.exceptions import ValidationError, TimeoutError as CustomTimeoutError, WorkflowCancelledError
 from utils.structured_logger import LogType, get_server_logger
 
+from .run_slots import parked
 from .session_store import SessionStatus, WorkflowSessionStore
 
 
@@ -18,6 +19,8 @@ class SessionExecutionController:
     def __init__(self, store: WorkflowSessionStore) -> None:
         self.store = store
         self.logger = logging.getLogger(__name__)
+        # Serializes resolving a pending input future against cancelling it
+        self._future_lock = threading.Lock()
 
     def set_waiting_for_input(self, session_id: str, node_id: str, input_data: Dict[str, Any]) -> None:
         session = self.store.get_session(session_id)
@@ -29,9 +32,16 @@ class SessionExecutionController:
         session.status = SessionStatus.WAITING_FOR_INPUT
         session.human_input_future = Future()
         session.human_input_value = None
+        self.store.sync_session(session_id)
         self.logger.info("Session %s waiting for input at node %s", session_id, node_id)
 
     def wait_for_human_input(self, session_id: str, timeout: float = 1800.0) -> Any:
+        """Block the calling node thread until input is provided, cancelled or ``timeout`` passes.
+
+        The wait is a single blocking future wait, and the run's slot is
+        released for its duration (see :func:`parked`), but the thread itself
+        stays blocked: runs cannot be suspended and resumed from saved state.
+        """
         session = self.store.get_session(session_id)
         if not session:
             logger = get_server_logger()
@@ -51,36 +61,16 @@ class SessionExecutionController:
                 details={"session_id": session_id, "waiting_for_input": session.waiting_for_input},
             )
 
-        start_time = time.time()
-        poll_interval = 1.0
+        # The future is resolved by ``provide_human_input`` or failed by
+        # ``cancel_pending_input``, so a single blocking wait replaces polling.
         try:
-            while True:
-                if session.cancel_event.is_set():
-                    raise WorkflowCancelledError("Workflow execution cancelled", workflow_id=session_id)
-
-                elapsed = time.time() - start_time
-                remaining = timeout - elapsed
-                if remaining <= 0:
-                    raise concurrent.futures.TimeoutError()
-
-                wait_time = min(poll_interval, remaining)
-                try:
-                    result = future.result(timeout=wait_time)
-                    logger = get_server_logger()
-                    input_length = 0
-                    if isinstance(result, dict):
-                        input_length = len(result.get("text") or "")
-                    elif result is not None:
-                        input_length = len(str(result))
-                    logger.info(
-                        "Human input received",
-                        log_type=LogType.WORKFLOW,
-                        session_id=session_id,
-                        input_length=input_length,
-                    )
-                    return result
-                except concurrent.futures.TimeoutError:
-                    continue
+            if session.cancel_event.is_set():
+                raise WorkflowCancelledError("Workflow execution cancelled", workflow_id=session_id)
+            # A parked run does not count toward WORKFLOW_MAX_CONCURRENT_RUNS
+            with parked():
+                result = future.result(timeout=timeout)
+        except concurrent.futures.CancelledError:
+            raise WorkflowCancelledError("Workflow execution cancelled", workflow_id=session_id)
         except concurrent.futures.TimeoutError:
             self.logger.warning("Session %s human input timeout", session_id)
             logger = get_server_logger()
@@ -91,11 +81,26 @@ class SessionExecutionController:
                 timeout_duration=timeout,
             )
             raise CustomTimeoutError("Input timeout", operation="wait_for_human_input", timeout_duration=timeout)
+        else:
+            logger = get_server_logger()
+            input_length = 0
+            if isinstance(result, dict):
+                input_length = len(result.get("text") or "")
+            elif result is not None:
+                input_length = len(str(result))
+            logger.info(
+                "Human input received",
+                log_type=LogType.WORKFLOW,
+                session_id=session_id,
+                input_length=input_length,
+            )
+            return result
         finally:
             session.waiting_for_input = False
             session.current_node_id = None
             session.pending_input_data = None
             session.human_input_future = None
+            self.store.sync_session(session_id)
 
     def provide_human_input(self, session_id: str, user_input: Any) -> None:
         session = self.store.get_session(session_id)
@@ -107,7 +112,12 @@ class SessionExecutionController:
             )
 
         future: Optional[Future] = session.human_input_future
-        if not session.waiting_for_input or future is None:
+        with self._future_lock:
+            resolved = session.waiting_for_input and future is not None and not future.done()
+            if resolved:
+                future.set_result(user_input)
+                session.waiting_for_input = False
+        if not resolved:
             logger = get_server_logger()
             logger.warning("Session %s is not waiting for input when providing data", session_id)
             raise ValidationError(
@@ -115,8 +125,6 @@ class SessionExecutionController:
                 details={"session_id": session_id, "waiting_for_input": session.waiting_for_input},
             )
 
-        future.set_result(user_input)
-        session.waiting_for_input = False
         length = 0
         if isinstance(user_input, dict):
             length = len(user_input.get("text") or "")
@@ -130,6 +138,23 @@ class SessionExecutionController:
             input_length=length,
         )
 
+    def cancel_pending_input(self, session_id: str, reason: Optional[str] = None) -> bool:
+        """Wake a worker blocked in ``wait_for_human_input`` with a cancellation error."""
+        session = self.store.get_session(session_id)
+        if not session:
+            return False
+        future: Optional[Future] = session.human_input_future
+        if future is None:
+            return False
+        with self._future_lock:
+            if future.done():
+                return False
+            future.set_exception(
+                WorkflowCancelledError(reason or "Workflow execution cancelled", workflow_id=session_id)
+            )
+        self.logger.info("Session %s pending human input cancelled", session_id)
+        return True
+
     def cleanup_session(self, session_id: str) -> None:
         session = self.store.get_session(session_id)
         if not session:
@@ -1,13 +1,17 @@
 """Session persistence primitives for workflow runs."""
 
 import logging
+import os
+import threading
 import time
+from collections import deque
 from dataclasses import dataclass, field
 from enum import Enum
 from threading import Event
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
 
 from server.services.artifact_events import ArtifactEventQueue
+from server.services.session_backend import SessionBackend, create_session_backend
 
 
 class SessionStatus(Enum):
@@ -67,12 +71,217 @@ class WorkflowSession:
         self.message_buffer.append(message)
 
 
-class WorkflowSessionStore:
-    """In-memory registry that tracks workflow session metadata."""
+_ACTIVE_STATUSES = {SessionStatus.IDLE.value, SessionStatus.RUNNING.value, SessionStatus.WAITING_FOR_INPUT.value}
+
+SESSION_RETENTION_ENV = "SESSION_RETENTION_SECONDS"
+DEFAULT_SESSION_RETENTION_SECONDS = 24 * 3600
+
+
+def _process_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+class _BackendWriter:
+    """Ordered background thread for backend writes made from the event loop.
+
+    Events are published as they are sent to the WebSocket and status updates
+    are made from request handlers, so writing them inline would put a
+    database round trip on the event loop for every one. A single thread
+    keeps records, events and the deletes that follow them in order.
+    """
 
     def __init__(self) -> None:
+        self._tasks: Deque[Tuple[int, Callable[..., Any], tuple]] = deque()
+        self._cond = threading.Condition()
+        self._submitted = 0
+        self._completed = 0
+        self._thread: Optional[threading.Thread] = None
+        self.logger = logging.getLogger(__name__)
+
+    def submit(self, func: Callable[..., Any], *args: Any) -> int:
+        with self._cond:
+            self._submitted += 1
+            ticket = self._submitted
+            self._tasks.append((ticket, func, args))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="session-backend-writer", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+            return ticket
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every write submitted so far was applied."""
+        with self._cond:
+            ticket = self._submitted
+            return self._cond.wait_for(lambda: self._completed >= ticket, timeout)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._tasks)
+                ticket, func, args = self._tasks.popleft()
+            try:
+                func(*args)
+            except Exception as exc:
+                self.logger.warning("Session backend write %s failed: %s", getattr(func, "__name__", func), exc)
+            finally:
+                with self._cond:
+                    self._completed = ticket
+                    self._cond.notify_all()
+
+
+class WorkflowSessionStore:
+    """Registry that tracks workflow session metadata.
+
+    Live session objects stay in this process; their serializable state is
+    written through to a ``SessionBackend`` so that other server workers can
+    report on, and replay events for, sessions they do not own.
+    """
+
+    PRUNE_INTERVAL_SECONDS = 300.0
+
+    def __init__(self, backend: Optional[SessionBackend] = None, retention_seconds: Optional[float] = None) -> None:
         self._sessions: Dict[str, WorkflowSession] = {}
+        self.backend = backend or create_session_backend()
         self.logger = logging.getLogger(__name__)
+        if retention_seconds is None:
+            retention_seconds = float(os.getenv(SESSION_RETENTION_ENV, DEFAULT_SESSION_RETENTION_SECONDS))
+        self.retention_seconds = retention_seconds
+        self._last_prune = 0.0
+        self._writer = _BackendWriter()
+        # Sessions whose WebSocket this process claimed; their events need no wake-up
+        self._claimed: set[str] = set()
+
+    def _to_record(self, session: WorkflowSession) -> Dict[str, Any]:
+        return {
+            "session_id": session.session_id,
+            "yaml_file": session.yaml_file,
+            "task_prompt": session.task_prompt,
+            "status": session.status.value,
+            "created_at": session.created_at,
+            "updated_at": session.updated_at,
+            "current_node_id": session.current_node_id,
+            "waiting_for_input": session.waiting_for_input,
+            "pending_input": session.pending_input_data if session.waiting_for_input else None,
+            "error_message": session.error_message,
+            "owner_pid": os.getpid(),
+        }
+
+    def sync_session(self, session_id: str) -> None:
+        """Write the current state of a local session through to the backend.
+
+        Shared backends are written from the background writer, queued with
+        the session's events, so status updates made on the event loop never
+        wait on the database.
+        """
+        session = self._sessions.get(session_id)
+        if not session:
+            return
+        record = self._to_record(session)
+        if self.backend.shared:
+            self._writer.submit(self._save_record, session_id, record)
+        else:
+            self._save_record(session_id, record)
+
+    def _save_record(self, session_id: str, record: Dict[str, Any]) -> None:
+        try:
+            self.backend.save_record(session_id, record)
+        except Exception as exc:
+            self.logger.warning("Failed to persist session %s: %s", session_id, exc)
+
+    def _load_remote_record(self, session_id: str) -> Optional[Dict[str, Any]]:
+        if not self.backend.shared:
+            return None
+        try:
+            record = self.backend.load_record(session_id)
+        except Exception as exc:
+            self.logger.warning("Failed to load session %s from backend: %s", session_id, exc)
+            return None
+        if record and record.get("status") in _ACTIVE_STATUSES and not _process_alive(record.get("owner_pid")):
+            # The worker that was running this session is gone; surface that instead of a stale status
+            record["status"] = SessionStatus.ERROR.value
+            record["waiting_for_input"] = False
+            record["pending_input"] = None
+            record["error_message"] = record.get("error_message") or "Owning worker process exited"
+        return record
+
+    def is_local(self, session_id: str) -> bool:
+        """Return True when this process owns the live session object."""
+        return session_id in self._sessions
+
+    def remote_run_owner(self, session_id: str) -> Optional[int]:
+        """Return the pid of another live worker running this session, if any.
+
+        Reads the backend; call it through ``asyncio.to_thread`` from the event loop.
+        """
+        if self.is_local(session_id):
+            return None
+        record = self._load_remote_record(session_id)
+        if not record or record.get("status") not in _ACTIVE_STATUSES:
+            return None
+        pid = record.get("owner_pid")
+        return pid if pid != os.getpid() else None
+
+    def claim_connection(self, session_id: str) -> None:
+        """Record in a shared backend that this process holds the session's WebSocket."""
+        if not self.backend.shared:
+            return
+        self._claimed.add(session_id)
+        try:
+            self.backend.set_connection_owner(session_id, os.getpid())
+        except Exception as exc:
+            self.logger.warning("Failed to claim connection for session %s: %s", session_id, exc)
+
+    def release_connection(self, session_id: str) -> None:
+        """Drop this process's socket claim in the background, keeping a newer claim."""
+        if self.backend.shared:
+            self._claimed.discard(session_id)
+            self._writer.submit(self.backend.clear_connection_owner, session_id, os.getpid())
+
+    def remote_connection_owner(self, session_id: str) -> Optional[int]:
+        """Return the pid of another live worker holding the session's WebSocket, if any."""
+        if not self.backend.shared:
+            return None
+        try:
+            pid = self.backend.connection_owner(session_id)
+        except Exception as exc:
+            self.logger.warning("Failed to look up connection of session %s: %s", session_id, exc)
+            return None
+        if pid is None or pid == os.getpid() or not _process_alive(pid):
+            return None
+        return pid
+
+    def forward_command(self, target_pid: int, session_id: str, command: Dict[str, Any]) -> bool:
+        """Queue ``command`` for another worker; False if the backend refused it."""
+        try:
+            self.backend.post_command(target_pid, session_id, command)
+        except Exception as exc:
+            self.logger.warning("Failed to forward %s for session %s: %s", command.get("type"), session_id, exc)
+            return False
+        self.backend.wake(target_pid)
+        return True
+
+    def take_commands(self) -> list:
+        """Remove and return the ``(session_id, command)`` pairs forwarded to this process."""
+        if not self.backend.shared:
+            return []
+        try:
+            return self.backend.take_commands(os.getpid())
+        except Exception as exc:
+            self.logger.warning("Failed to read forwarded commands: %s", exc)
+            return []
 
     def create_session(
         self,
@@ -89,14 +298,30 @@ class WorkflowSessionStore:
             task_attachments=list(attachments or []),
         )
         self._sessions[session_id] = session
+        self.sync_session(session_id)
+        if time.time() - self._last_prune >= self.PRUNE_INTERVAL_SECONDS:
+            self._last_prune = time.time()
+            if self.backend.shared:
+                self._writer.submit(self.prune_finished_sessions)
+            else:
+                self.prune_finished_sessions()
         self.logger.info("Created session %s for workflow %s", session_id, yaml_file)
         return session
 
     def get_session(self, session_id: str) -> Optional[WorkflowSession]:
         return self._sessions.get(session_id)
 
+    def local_sessions(self) -> list[WorkflowSession]:
+        """Return the live session objects owned by this process."""
+        return list(self._sessions.values())
+
     def has_session(self, session_id: str) -> bool:
-        return session_id in self._sessions
+        """Whether the session is live here or recorded in the backend.
+
+        Reads the backend for remote sessions; call it through
+        ``asyncio.to_thread`` from the event loop.
+        """
+        return session_id in self._sessions or self._load_remote_record(session_id) is not None
 
     def update_session_status(self, session_id: str, status: SessionStatus, **kwargs: Any) -> None:
         session = self._sessions.get(session_id)
@@ -107,6 +332,7 @@ class WorkflowSessionStore:
         for key, value in kwargs.items():
             if hasattr(session, key):
                 setattr(session, key, value)
+        self.sync_session(session_id)
         self.logger.info("Updated session %s status to %s", session_id, status.value)
 
     def set_session_error(self, session_id: str, error_message: str) -> None:
@@ -116,12 +342,102 @@ class WorkflowSessionStore:
         self.update_session_status(session_id, SessionStatus.COMPLETED, results=results)
 
     def pop_session(self, session_id: str) -> Optional[WorkflowSession]:
+        if self.backend.shared:
+            # Queued behind the session's pending events so none outlive the delete
+            self._writer.submit(self.backend.delete, session_id)
+        else:
+            try:
+                self.backend.delete(session_id)
+            except Exception as exc:
+                self.logger.warning("Failed to delete session %s from backend: %s", session_id, exc)
         return self._sessions.pop(session_id, None)
 
+    def prune_finished_sessions(self) -> int:
+        """Delete backend records and events of sessions that ended over ``retention_seconds`` ago.
+
+        Sessions are normally removed by :meth:`pop_session` when their client
+        disconnects; this catches the ones whose worker died or whose client
+        never came back. Sessions owned by this process are left alone.
+        """
+        self._last_prune = time.time()
+        cutoff = self._last_prune - self.retention_seconds
+        try:
+            records = self.backend.list_records()
+        except Exception as exc:
+            self.logger.warning("Failed to list sessions for pruning: %s", exc)
+            return 0
+        removed = 0
+        for session_id, record in records.items():
+            if session_id in self._sessions or float(record.get("updated_at") or 0) > cutoff:
+                continue
+            if record.get("status") in _ACTIVE_STATUSES and _process_alive(record.get("owner_pid")):
+                continue
+            try:
+                self.backend.delete(session_id)
+            except Exception as exc:
+                self.logger.warning("Failed to prune session %s: %s", session_id, exc)
+                continue
+            removed += 1
+        if removed:
+            self.logger.info("Pruned %d finished sessions from the session backend", removed)
+        return removed
+
+    def append_message(self, session_id: str, message: Dict[str, Any]) -> None:
+        """Buffer a business message for replay, publishing it to shared backends in the background."""
+        session = self._sessions.get(session_id)
+        if not session:
+            return
+        session.append_message(message)
+        if self.backend.shared:
+            self._writer.submit(self._publish_event, session_id, message)
+
+    def _publish_event(self, session_id: str, message: Dict[str, Any]) -> None:
+        """Append an event and wake the worker relaying it, if the socket is elsewhere."""
+        self.backend.append_event(session_id, message)
+        if session_id in self._claimed:
+            return
+        owner = self.backend.connection_owner(session_id)
+        if owner is not None and owner != os.getpid():
+            self.backend.wake(owner)
+
+    def flush_events(self, timeout: Optional[float] = None) -> bool:
+        """Wait until published events, record writes and deletes have reached the backend."""
+        return self._writer.flush(timeout)
+
+    def read_events(self, session_id: str, after: int = 0) -> tuple[list, int]:
+        """Return buffered events newer than ``after`` from the shared backend."""
+        if not self.backend.shared:
+            return [], after
+        try:
+            return self.backend.read_events(session_id, after)
+        except Exception as exc:
+            self.logger.warning("Failed to read events for session %s: %s", session_id, exc)
+            return [], after
+
     def get_session_info(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Return the status summary of a local or remote session.
+
+        Reads the backend for remote sessions; call it through
+        ``asyncio.to_thread`` from the event loop.
+        """
         session = self._sessions.get(session_id)
         if not session:
-            return None
+            record = self._load_remote_record(session_id)
+            if not record:
+                return None
+            return {
+                key: record.get(key)
+                for key in (
+                    "session_id",
+                    "yaml_file",
+                    "status",
+                    "created_at",
+                    "updated_at",
+                    "current_node_id",
+                    "waiting_for_input",
+                    "error_message",
+                )
+            }
         return {
             "session_id": session.session_id,
             "yaml_file": session.yaml_file,
@@ -134,7 +450,17 @@ class WorkflowSessionStore:
         }
 
     def list_sessions(self) -> Dict[str, Dict[str, Any]]:
-        return {session_id: self.get_session_info(session_id) for session_id in self._sessions.keys()}
+        """Return the status summaries of local and backend sessions.
+
+        Reads the backend; call it through ``asyncio.to_thread`` from the event loop.
+        """
+        session_ids = list(self._sessions.keys())
+        if self.backend.shared:
+            try:
+                session_ids.extend(sid for sid in self.backend.list_records() if sid not in self._sessions)
+            except Exception as exc:
+                self.logger.warning("Failed to list sessions from backend: %s", exc)
+        return {session_id: self.get_session_info(session_id) for session_id in session_ids}
 
     def get_artifact_queue(self, session_id: str) -> Optional[ArtifactEventQueue]:
         session = self._sessions.get(session_id)
@@ -143,7 +469,12 @@ class WorkflowSessionStore:
     def get_session_snapshot(self, session_id: str) -> Optional[Dict[str, Any]]:
         session = self._sessions.get(session_id)
         if not session:
-            return None
+            record = self._load_remote_record(session_id)
+            if not record:
+                return None
+            snapshot = {key: value for key, value in record.items() if key != "owner_pid"}
+            snapshot["message_count"] = None
+            return snapshot
         return {
             "session_id": session.session_id,
             "yaml_file": session.yaml_file,
@@ -153,6 +484,7 @@ class WorkflowSessionStore:
             "created_at": session.created_at,
             "updated_at": session.updated_at,
             "waiting_for_input": session.waiting_for_input,
+            "pending_input": session.pending_input_data if session.waiting_for_input else None,
             "error_message": session.error_message,
             "message_count": len(session.message_buffer),
         }
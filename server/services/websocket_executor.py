@@ -1,7 +1,9 @@
 """GraphExecutor variant that reports results over WebSocket."""
 
 import asyncio
-from typing import List
+import os
+import threading
+from typing import List, Optional
 
 from utils.logger import WorkflowLogger
 from workflow.graph import GraphExecutor
@@ -9,11 +11,32 @@ from workflow.graph_context import GraphContext
 
 from server.services.attachment_service import AttachmentService
 from server.services.artifact_dispatcher import ArtifactDispatcher
+from server.services.node_delta_dispatcher import NodeDeltaDispatcher
 from server.services.prompt_channel import WebPromptChannel
+from server.services.run_slots import RunSlots
 from server.services.session_store import WorkflowSessionStore
 from server.services.session_execution import SessionExecutionController
 from workflow.hooks.workspace_artifact import WorkspaceArtifact, WorkspaceArtifactHook
 
+MAX_CONCURRENT_RUNS_ENV = "WORKFLOW_MAX_CONCURRENT_RUNS"
+DEFAULT_MAX_CONCURRENT_RUNS = 32
+
+_run_slots: Optional[RunSlots] = None
+_run_slots_lock = threading.Lock()
+
+
+def get_run_slots() -> RunSlots:
+    """Return the process-wide limit on executing runs, which also runs them.
+
+    Runs beyond ``WORKFLOW_MAX_CONCURRENT_RUNS`` queue, without a thread,
+    until one finishes or parks on a human prompt; parked runs do not count.
+    """
+    global _run_slots
+    with _run_slots_lock:
+        if _run_slots is None:
+            _run_slots = RunSlots(int(os.getenv(MAX_CONCURRENT_RUNS_ENV, DEFAULT_MAX_CONCURRENT_RUNS)))
+        return _run_slots
+
 
 class WebSocketGraphExecutor(GraphExecutor):
     """GraphExecutor subclass that emits events via WebSocket."""
@@ -62,8 +85,17 @@ class WebSocketGraphExecutor(GraphExecutor):
 
         return WebSocketLogger(self.websocket_manager, self.session_id, self.graph.name, self.graph.log_level)
 
+    def _create_delta_sink(self) -> NodeDeltaDispatcher:
+        return NodeDeltaDispatcher(self.session_id, self.websocket_manager)
+
     async def execute_graph_async(self, task_prompt):
-        await asyncio.get_event_loop().run_in_executor(None, self._execute, task_prompt)
+        """Run the graph under the run limit and await its completion.
+
+        Sessions can sit on a human prompt for a long time, so the run must not
+        occupy a slot in the event loop's shared default executor, which would
+        starve other sessions and ``asyncio.to_thread`` callers.
+        """
+        await asyncio.wrap_future(get_run_slots().submit(self._execute, task_prompt))
 
     def get_results(self):
         return self.outputs
@@ -3,6 +3,8 @@
 import asyncio
 import json
 import logging
+import os
+import socket
 import time
 import traceback
 import uuid
@@ -40,6 +42,9 @@ def _encode_ws_message(message: Any) -> str:
 
 class WebSocketManager:
     SESSION_TTL_SECONDS = 24 * 60 * 60  # 24 hours
+    # Poll interval for forwarded commands and relayed events; backends with a
+    # wake channel deliver them at once and this only bounds a missed wake-up
+    RELAY_INTERVAL_SECONDS = 0.5
 
     def __init__(
         self,
@@ -53,6 +58,15 @@ class WebSocketManager:
         self.connection_timestamps: Dict[str, float] = {}
         self._owner_loop: Optional[asyncio.AbstractEventLoop] = None
         self._gc_task: Optional[asyncio.Task] = None
+        self._relay_task: Optional[asyncio.Task] = None
+        self._command_task: Optional[asyncio.Task] = None
+        # Event cursors for connected sessions whose workflow runs in another worker
+        self._relay_cursors: Dict[str, int] = {}
+        # Wake-ups from other workers; the events belong to the loop running the relay
+        self._wake_socket: Optional[socket.socket] = None
+        self._wake_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._relay_wake: Optional[asyncio.Event] = None
+        self._command_wake: Optional[asyncio.Event] = None
         self.session_store = session_store or WorkflowSessionStore()
         self.session_controller = session_controller or SessionExecutionController(self.session_store)
         self.attachment_service = attachment_service or AttachmentService()
@@ -75,7 +89,8 @@ class WebSocketManager:
             self._owner_loop = asyncio.get_running_loop()
 
         # --- Reconnect to existing session ---
-        if session_id and self.session_store.has_session(session_id):
+        # Backend lookups may hit the database; keep them off the event loop
+        if session_id and await asyncio.to_thread(self.session_store.has_session, session_id):
             # If an old WebSocket is still tied to this session, close it first
             if session_id in self.active_connections:
                 old_ws = self.active_connections[session_id]
@@ -90,6 +105,7 @@ class WebSocketManager:
 
             # Always start the GC loop (idempotent)
             self._start_gc()
+            await self._claim_connection(session_id)
 
             # Send connection confirmation
             await self._send_raw(
@@ -104,9 +120,19 @@ class WebSocketManager:
                 messages_to_replay = list(session.message_buffer)
                 for msg in messages_to_replay:
                     await self._send_raw(session_id, msg)
+            else:
+                # Session is owned by another worker: replay from the shared event log
+                # and keep relaying new events while this socket stays connected.
+                messages_to_replay, cursor = await asyncio.to_thread(
+                    self.session_store.read_events, session_id, 0
+                )
+                for msg in messages_to_replay:
+                    await self._send_raw(session_id, msg)
+                self._relay_cursors[session_id] = cursor
+                self._start_relay()
 
             # Send session state snapshot
-            snapshot = self.session_store.get_session_snapshot(session_id)
+            snapshot = await asyncio.to_thread(self.session_store.get_session_snapshot, session_id)
             if snapshot:
                 await self._send_raw(session_id, {"type": "session_resumed", "data": snapshot})
 
@@ -121,6 +147,7 @@ class WebSocketManager:
 
         # Always start the GC loop (idempotent)
         self._start_gc()
+        await self._claim_connection(session_id)
 
         await self.send_message(
             session_id,
@@ -136,14 +163,43 @@ class WebSocketManager:
             del self.active_connections[session_id]
         if session_id in self.connection_timestamps:
             del self.connection_timestamps[session_id]
+        self._relay_cursors.pop(session_id, None)
+        self.session_store.release_connection(session_id)
         logging.info("WebSocket disconnected (session preserved): %s", session_id)
 
+    async def _claim_connection(self, session_id: str) -> None:
+        """Let other workers route this session's requests here."""
+        if not self.session_store.backend.shared:
+            return
+        await asyncio.to_thread(self.session_store.claim_connection, session_id)
+        self._start_commands()
+
+    async def forward_to_connection(self, session_id: str, command: Dict[str, Any]) -> bool:
+        """Hand ``command`` to the worker holding the session's socket when that is not this one.
+
+        Returns False when the socket is here, or no other live worker holds it.
+        """
+        if session_id in self.active_connections or not self.session_store.backend.shared:
+            return False
+        owner = await asyncio.to_thread(self.session_store.remote_connection_owner, session_id)
+        if owner is None:
+            return False
+        return await asyncio.to_thread(self.session_store.forward_command, owner, session_id, command)
+
+    async def forward_to_run_owner(self, session_id: str, command: Dict[str, Any]) -> bool:
+        """Hand ``command`` to the worker running the session when that is not this one."""
+        if self.session_store.is_local(session_id) or not self.session_store.backend.shared:
+            return False
+        owner = await asyncio.to_thread(self.session_store.remote_run_owner, session_id)
+        if owner is None:
+            return False
+        return await asyncio.to_thread(self.session_store.forward_command, owner, session_id, command)
+
     async def send_message(self, session_id: str, message: Dict[str, Any]) -> None:
-        # Buffer business messages for reconnection replay (exclude transport messages)
-        if message.get("type") not in ("connection", "pong"):
-            session = self.session_store.get_session(session_id)
-            if session:
-                session.append_message(message)
+        # Buffer business messages for reconnection replay (exclude transport messages
+        # and streamed deltas, which would crowd the events replay needs out of the buffer)
+        if message.get("type") not in ("connection", "pong", "node_delta"):
+            self.session_store.append_message(session_id, message)
 
         if session_id in self.active_connections:
             websocket = self.active_connections[session_id]
@@ -233,6 +289,117 @@ class WebSocketManager:
         loop = asyncio.get_running_loop()
         self._gc_task = loop.create_task(self._gc_loop())
 
+    def _open_wake_channel(self) -> None:
+        """Listen for wake-ups from other workers, if the backend offers them."""
+        loop = asyncio.get_running_loop()
+        if self._wake_loop is loop:
+            return
+        self._wake_loop = loop
+        self._relay_wake = asyncio.Event()
+        self._command_wake = asyncio.Event()
+        if self._wake_socket is None:
+            self._wake_socket = self.session_store.backend.open_wake_socket(os.getpid())
+        if self._wake_socket is not None:
+            loop.add_reader(self._wake_socket.fileno(), self._on_wake)
+
+    def _on_wake(self) -> None:
+        try:
+            while self._wake_socket.recv(64):
+                pass
+        except OSError:
+            # BlockingIOError once the queue is drained
+            pass
+        self._relay_wake.set()
+        self._command_wake.set()
+
+    async def _wait_for_wake(self, wake: asyncio.Event) -> None:
+        """Return when another worker wakes this one, or after the poll interval."""
+        try:
+            await asyncio.wait_for(wake.wait(), self.RELAY_INTERVAL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        wake.clear()
+
+    def _start_relay(self) -> None:
+        """Start the cross-worker event relay task if not already running."""
+        if self._relay_task is not None and not self._relay_task.done():
+            return
+        self._open_wake_channel()
+        loop = asyncio.get_running_loop()
+        self._relay_task = loop.create_task(self._relay_loop())
+
+    async def _relay_loop(self) -> None:
+        """Forward events published by other workers to sockets connected here."""
+        while self._relay_cursors:
+            await self._wait_for_wake(self._relay_wake)
+            for session_id, cursor in list(self._relay_cursors.items()):
+                if session_id not in self.active_connections:
+                    self._relay_cursors.pop(session_id, None)
+                    continue
+                try:
+                    events, next_cursor = await asyncio.to_thread(
+                        self.session_store.read_events, session_id, cursor
+                    )
+                except Exception as exc:
+                    logging.warning("Relay read failed for %s: %s", session_id, exc)
+                    continue
+                if session_id not in self._relay_cursors:
+                    continue
+                self._relay_cursors[session_id] = next_cursor
+                for event in events:
+                    await self._send_raw(session_id, event)
+
+    def _start_commands(self) -> None:
+        """Start applying commands forwarded by other workers, if not already running."""
+        if self._command_task is not None and not self._command_task.done():
+            return
+        self._open_wake_channel()
+        loop = asyncio.get_running_loop()
+        self._command_task = loop.create_task(self._command_loop())
+
+    async def _command_loop(self) -> None:
+        """Apply execute, batch, human input and cancel requests other workers forwarded here."""
+        while True:
+            await self._wait_for_wake(self._command_wake)
+            commands = await asyncio.to_thread(self.session_store.take_commands)
+            for session_id, command in commands:
+                try:
+                    await self.apply_command(session_id, command)
+                except Exception as exc:
+                    logging.error("Forwarded %s for %s failed: %s", command.get("type"), session_id, exc)
+
+    async def apply_command(self, session_id: str, command: Dict[str, Any]) -> None:
+        command_type = command.get("type")
+        if command_type == "execute":
+            asyncio.create_task(
+                self.workflow_run_service.start_workflow(
+                    session_id,
+                    command["yaml_file"],
+                    command["task_prompt"],
+                    self,
+                    attachments=command.get("attachments"),
+                )
+            )
+        elif command_type == "batch":
+            from entity.enums import LogLevel
+            from server.services.batch_parser import BatchTask
+            from server.services.batch_run_service import BatchRunService
+
+            log_level = command.get("log_level")
+            asyncio.create_task(
+                BatchRunService().run_batch(
+                    session_id,
+                    command["yaml_file"],
+                    [BatchTask(**task) for task in command["tasks"]],
+                    self,
+                    max_parallel=command["max_parallel"],
+                    file_base=command["file_base"],
+                    log_level=LogLevel(log_level) if log_level else None,
+                )
+            )
+        else:
+            await self.message_handler.handle_message(session_id, command, self)
+
     async def _gc_loop(self) -> None:
         """Periodically clean up terminal sessions older than TTL."""
         TERMINAL = {SessionStatus.COMPLETED, SessionStatus.ERROR, SessionStatus.CANCELLED}
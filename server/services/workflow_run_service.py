@@ -44,6 +44,9 @@ class WorkflowRunService:
             session.cancel_event.set()
             self.logger.info("Cancellation requested for session %s", session_id)
 
+        # Release a worker parked on a human prompt instead of letting it wait out the timeout
+        self.session_controller.cancel_pending_input(session_id, cancel_message)
+
         if session.executor:
             try:
                 session.executor.request_cancel(cancel_message)
@@ -88,6 +88,17 @@ def build_parser() -> argparse.ArgumentParser:
         default="info",
         help="Log level (default: info)"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help=(
+            "Number of uvicorn worker processes (default: 1). More than one "
+            "worker switches the session store to the shared SQLite backend "
+            "unless SESSION_STORE_BACKEND is set explicitly; requests reaching "
+            "a worker that does not own the session are forwarded through it."
+        ),
+    )
     parser.add_argument(
         "--reload",
         action="store_true",
@@ -143,6 +154,13 @@ def main():
     logger = logging.getLogger(__name__)
     logger.info(f"Starting DevAll Workflow Server on {args.host}:{args.port}")
 
+    if args.workers > 1:
+        if args.reload:
+            logger.warning("--workers is ignored when --reload is active")
+        else:
+            # Workers share session state through the SQLite session backend
+            os.environ.setdefault("SESSION_STORE_BACKEND", "sqlite")
+
     if args.reload and not _watchfiles_available():
         logger.warning(
             "--reload is active but 'watchfiles' is not installed; uvicorn will "
@@ -159,6 +177,7 @@ def main():
         reload=args.reload,
         log_level=args.log_level,
         ws="wsproto",
+        workers=None if args.reload else args.workers,
         **build_reload_kwargs(args),
     )
 
@@ -6,6 +6,16 @@ import pytest
 from fastapi.testclient import TestClient
 
 
+@pytest.fixture(autouse=True, scope="session")
+def _log_files_in_tmp(tmp_path_factory: pytest.TempPathFactory):
+    """Write the server and workflow log files under a temporary directory, not ``logs/``."""
+    log_dir = tmp_path_factory.mktemp("logs")
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv("SERVER_LOG_FILE", str(log_dir / "server.log"))
+        patch.setenv("WORKFLOW_LOG_FILE", str(log_dir / "workflow.log"))
+        yield
+
+
 @pytest.fixture()
 def tmp_yaml_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
     """Provide an isolated temporary YAML directory."""
@@ -0,0 +1,124 @@
+"""Tests for the per-node agent plan cache."""
+
+import pytest
+
+import runtime.node.agent.skills.manager as skills_manager
+from entity.configs import Node
+from entity.messages import Message, MessageRole
+from entity.tool_spec import ToolSpec
+from runtime.bootstrap.schema import ensure_schema_registry_populated
+from runtime.node.agent import ToolManager
+from runtime.node.agent.providers.openai_provider import OpenAIProvider
+from runtime.node.executor.agent_executor import AgentNodeExecutor
+from runtime.node.executor.base import ExecutionContext
+from utils.function_manager import FunctionManager
+from utils.log_manager import LogManager
+from utils.logger import WorkflowLogger
+
+ensure_schema_registry_populated()
+
+
+class _CountingToolManager(ToolManager):
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def get_tool_specs(self, tool_configs):
+        self.calls += 1
+        return [ToolSpec(name="lookup", description="Find things", parameters={"type": "object", "properties": {}})]
+
+
+def _write_skill(root, name="notes", description="Take notes"):
+    skill_dir = root / name
+    skill_dir.mkdir(parents=True, exist_ok=True)
+    (skill_dir / "SKILL.md").write_text(f"---\nname: {name}\ndescription: {description}\n---\nBody\n", encoding="utf-8")
+
+
+@pytest.fixture
+def executor(tmp_path, monkeypatch):
+    monkeypatch.setattr(skills_manager, "DEFAULT_SKILLS_ROOT", tmp_path / "skills")
+    _write_skill(tmp_path / "skills")
+    context = ExecutionContext(
+        tool_manager=_CountingToolManager(),
+        function_manager=FunctionManager(tmp_path),
+        log_manager=LogManager(WorkflowLogger("plan-test")),
+    )
+    return AgentNodeExecutor(context)
+
+
+def _agent_node():
+    return Node.from_dict(
+        {
+            "id": "writer",
+            "type": "agent",
+            "config": {
+                "provider": "mock",
+                "name": "mock-model",
+                "role": "You write.",
+                "skills": {"enabled": True},
+            },
+        },
+        path="graph.nodes.writer",
+    )
+
+
+class TestAgentPlan:
+
+    def test_plan_reused_until_skill_files_change(self, executor, tmp_path):
+        node = _agent_node()
+        config = node.config
+
+        first = executor._get_agent_plan(node, config)
+        assert executor._get_agent_plan(node, config) is first
+        assert executor.context.tool_manager.calls == 1
+        assert [spec.name for spec in first.tool_specs] == ["lookup", "activate_skill", "read_skill_file"]
+        assert "<name>notes</name>" in first.system_prompt
+
+        _write_skill(tmp_path / "skills", "review", "Review drafts")
+        rebuilt = executor._get_agent_plan(node, config)
+        assert rebuilt is not first
+        assert "<name>review</name>" in rebuilt.system_prompt
+        assert executor.context.tool_manager.calls == 2
+
+    def test_plan_keyed_on_config_content(self, executor):
+        node = _agent_node()
+        first = executor._get_agent_plan(node, node.config)
+        same = _agent_node()
+        assert executor._get_agent_plan(same, same.config) is first
+
+        node.config.skills.allow = ["notes"]
+        assert executor._get_agent_plan(node, node.config) is not first
+
+    def test_executions_get_fresh_skill_state(self, executor):
+        node = _agent_node()
+        plan = executor._get_agent_plan(node, node.config)
+        first = plan.skill_manager.fork()
+        first.activate_skill("notes")
+        assert not plan.skill_manager.fork().is_activated("notes")
+
+    def test_execute_uses_cached_plan(self, executor):
+        node = _agent_node()
+        for _ in range(3):
+            output = executor.execute(node, [Message(role=MessageRole.USER, content="hi")])
+            assert not output[0].text_content().startswith("Error calling model")
+        assert executor.context.tool_manager.calls == 1
+
+
+class TestToolPayloadCache:
+
+    def test_provider_serializes_tools_once_per_plan(self):
+        node = Node.from_dict(
+            {"id": "a", "type": "agent", "config": {"provider": "openai", "name": "gpt-test", "api_key": "k"}},
+            path="graph.nodes.a",
+        )
+        cache = {}
+        provider = OpenAIProvider(node.config, tool_payload_cache=cache)
+        specs = [ToolSpec(name="lookup", description="", parameters={})]
+        timeline = [Message(role=MessageRole.USER, content="hi")]
+
+        first = provider._build_request_payload(timeline, specs, {})
+        second = provider._build_request_payload(timeline, specs, {})
+        assert first["tools"][0] is second["tools"][0]
+        assert provider._build_chat_payload(timeline, specs, {})["tools"][0]["function"]["name"] == "lookup"
+        assert len(cache) == 2
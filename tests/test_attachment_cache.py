@@ -0,0 +1,199 @@
+"""Tests for the attachment payload cache and provider upload reuse."""
+
+import base64
+from types import SimpleNamespace
+
+import pytest
+
+from entity.configs.node.agent import AgentConfig
+from entity.messages import AttachmentRef, Message, MessageBlock, MessageBlockType, MessageRole
+from runtime.node.agent.providers.openai_provider import OpenAIProvider
+from utils import attachment_cache
+from utils.attachment_cache import AttachmentCache, get_attachment_cache
+from utils.attachments import AttachmentStore
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    get_attachment_cache().clear()
+    yield
+    get_attachment_cache().clear()
+
+
+def _ref(path, **extra) -> AttachmentRef:
+    return AttachmentRef(attachment_id="att", local_path=str(path), mime_type="application/pdf", **extra)
+
+
+class TestAttachmentCache:
+
+    def test_encoded_forms_are_cached(self, tmp_path, monkeypatch):
+        path = tmp_path / "doc.pdf"
+        path.write_bytes(b"%PDF-1.4 payload")
+        cache = AttachmentCache()
+        reads = []
+        load = cache._load_bytes
+        monkeypatch.setattr(cache, "_load_bytes", lambda ref: reads.append(ref) or load(ref))
+
+        first = cache.data_uri(_ref(path, sha256="abc"))
+        second = cache.data_uri(_ref(path, sha256="abc"))
+        assert first is second
+        assert first == "data:application/pdf;base64," + base64.b64encode(b"%PDF-1.4 payload").decode()
+        assert len(reads) == 1
+
+    def test_path_key_follows_file_changes(self, tmp_path):
+        path = tmp_path / "notes.txt"
+        path.write_text("one", encoding="utf-8")
+        cache = AttachmentCache()
+        assert cache.text(_ref(path)) == "one"
+        path.write_text("three", encoding="utf-8")
+        assert cache.text(_ref(path)) == "three"
+
+    def test_hashed_key_follows_in_place_edits(self, tmp_path):
+        path = tmp_path / "notes.txt"
+        path.write_text("one", encoding="utf-8")
+        cache = AttachmentCache()
+        assert cache.text(_ref(path, sha256="abc")) == "one"
+        path.write_text("three", encoding="utf-8")
+        assert cache.text(_ref(path, sha256="abc")) == "three"
+
+    def test_data_uri_key_is_a_digest(self):
+        data_uri = "data:text/plain;base64," + base64.b64encode(b"x" * 4096).decode()
+        key = AttachmentCache().content_key(AttachmentRef(attachment_id="a", data_uri=data_uri))
+        assert key[0] == "uri" and data_uri not in key and len(key[1]) == 64
+
+    def test_lru_respects_byte_budget(self):
+        cache = AttachmentCache(max_bytes=10)
+        refs = [AttachmentRef(attachment_id=str(idx), data_uri=f"data:,{idx}xxxx") for idx in range(3)]
+        for ref in refs:
+            cache.read_bytes(ref)
+        assert cache.size <= 10
+        assert len(cache._entries) == 2
+
+    def test_upload_once_reuses_id_until_expiry(self, monkeypatch):
+        cache = AttachmentCache()
+        ref = AttachmentRef(attachment_id="a", sha256="abc")
+        uploads = []
+
+        def upload():
+            uploads.append(1)
+            return f"file-{len(uploads)}"
+
+        assert cache.upload_once("scope", ref, upload) == "file-1"
+        assert cache.upload_once("scope", ref, upload) == "file-1"
+        assert cache.upload_once("other", ref, upload) == "file-2"
+        assert cache.remote_file_id("scope", ref, max_age=-1) is None
+        assert cache.upload_once("scope", ref, upload) == "file-3"
+
+    def test_remote_ids_are_bounded(self, monkeypatch):
+        monkeypatch.setattr(attachment_cache, "MAX_REMOTE_IDS", 2)
+        cache = AttachmentCache()
+        refs = [AttachmentRef(attachment_id=str(idx), sha256=str(idx)) for idx in range(3)]
+        cache.upload_once("scope", refs[0], lambda: "file-0")
+        cache.upload_once("scope", refs[1], lambda: "file-1")
+        assert cache.remote_file_id("scope", refs[0]) == "file-0"
+        cache.upload_once("scope", refs[2], lambda: "file-2")
+        assert len(cache._remote_ids) == 2
+        assert cache.remote_file_id("scope", refs[1]) is None
+        assert cache.remote_file_id("scope", refs[0]) == "file-0"
+
+    def test_failed_upload_releases_its_lock(self):
+        cache = AttachmentCache()
+        ref = AttachmentRef(attachment_id="a", sha256="abc")
+
+        def fail():
+            raise RuntimeError("service unavailable")
+
+        with pytest.raises(RuntimeError):
+            cache.upload_once("scope", ref, fail)
+        assert cache._upload_locks == {}
+        assert cache.upload_once("scope", ref, lambda: "file-1") == "file-1"
+        assert cache._upload_locks == {}
+
+
+class _FakeFiles:
+
+    def __init__(self, prefix="file"):
+        self.prefix = prefix
+        self.created = []
+
+    def create(self, file, purpose):
+        self.created.append((file[0], purpose))
+        return SimpleNamespace(id=f"{self.prefix}-{len(self.created)}")
+
+
+class TestOpenAIUploadReuse:
+
+    def _provider(self, store, api_key="k", **params):
+        config = AgentConfig.from_dict(
+            {"provider": "openai", "name": "gpt-test", "api_key": api_key, "params": params},
+            path="test.model",
+        )
+        return OpenAIProvider(config, attachment_store=store)
+
+    def _timeline(self, record):
+        return [Message(role=MessageRole.USER, content=[MessageBlock.text_block("read"), record.as_message_block()])]
+
+    def test_large_file_uploaded_once_and_recorded(self, tmp_path):
+        store = AttachmentStore(tmp_path / "store")
+        source = tmp_path / "report.pdf"
+        source.write_bytes(b"x" * 2048)
+        record = store.register_file(source, kind=MessageBlockType.FILE)
+        provider = self._provider(store, upload_attachments=True, upload_min_bytes=1024)
+        files = _FakeFiles()
+        client = SimpleNamespace(files=files)
+
+        for _ in range(3):
+            payload = provider._build_request_payload(
+                self._timeline(record), None, dict(provider.params), file_client=client
+            )
+            assert payload["input"][0]["content"][1] == {"type": "input_file", "file_id": "file-1", "filename": "report.pdf"}
+            assert "upload_attachments" not in payload
+        assert files.created == [("report.pdf", "user_data")]
+        assert store.get(record.ref.attachment_id).ref.remote_file_id == "file-1"
+
+    def test_no_upload_without_file_client(self, tmp_path):
+        store = AttachmentStore(tmp_path / "store")
+        source = tmp_path / "report.pdf"
+        source.write_bytes(b"x" * 2048)
+        record = store.register_file(source, kind=MessageBlockType.FILE)
+        provider = self._provider(store, upload_attachments=True, upload_min_bytes=1024)
+
+        payload = provider._build_request_payload(self._timeline(record), None, dict(provider.params))
+        assert "file_data" in payload["input"][0]["content"][1]
+        assert not hasattr(provider, "_file_client")
+
+    def test_small_or_chat_attachments_stay_inline(self, tmp_path):
+        store = AttachmentStore(tmp_path / "store")
+        source = tmp_path / "small.pdf"
+        source.write_bytes(b"tiny")
+        record = store.register_file(source, kind=MessageBlockType.FILE)
+        provider = self._provider(store, upload_attachments=True)
+        client = SimpleNamespace(files=_FakeFiles())
+
+        payload = provider._build_request_payload(self._timeline(record), None, {}, file_client=client)
+        assert payload["input"][0]["content"][1]["file_data"].startswith("data:application/pdf;base64,")
+
+        chat = provider._build_chat_payload(self._timeline(record), None, {"upload_attachments": True})
+        assert "upload_attachments" not in chat
+
+    def test_uploaded_id_not_reused_by_another_account(self, tmp_path):
+        store = AttachmentStore(tmp_path / "store")
+        source = tmp_path / "report.pdf"
+        source.write_bytes(b"x" * 2048)
+        record = store.register_file(source, kind=MessageBlockType.FILE)
+        first = self._provider(store, upload_attachments=True, upload_min_bytes=1024)
+        first._build_request_payload(
+            self._timeline(record), None, dict(first.params), file_client=SimpleNamespace(files=_FakeFiles())
+        )
+        uploaded = store.get(record.ref.attachment_id)
+        assert uploaded.ref.remote_file_id == "file-1"
+
+        get_attachment_cache().clear()
+        other = self._provider(store, api_key="other", upload_attachments=True, upload_min_bytes=1024)
+        files = _FakeFiles(prefix="other")
+        for timeline in (self._timeline(record), self._timeline(uploaded)):
+            payload = other._build_request_payload(
+                timeline, None, dict(other.params), file_client=SimpleNamespace(files=files)
+            )
+            assert payload["input"][0]["content"][1]["file_id"] == "other-1"
+        assert files.created == [("report.pdf", "user_data")]
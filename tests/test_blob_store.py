@@ -0,0 +1,118 @@
+"""Tests for the shared content-addressed attachment blob store."""
+
+import asyncio
+import io
+import json
+import os
+
+import pytest
+from fastapi import UploadFile
+
+from entity.messages import MessageBlockType
+from server.services.attachment_service import AttachmentService
+from utils.attachments import AttachmentStore
+from utils.blob_store import BlobStore
+
+
+def _source(tmp_path, name="data.csv", payload=b"a,b\n1,2\n"):
+    path = tmp_path / name
+    path.write_bytes(payload)
+    return path
+
+
+class TestBlobStore:
+
+    def test_identical_payloads_stored_once(self, tmp_path):
+        blobs = BlobStore(tmp_path / "blobs")
+        first = blobs.put_file(_source(tmp_path))
+        second = blobs.put_bytes(b"a,b\n1,2\n")
+        assert first == second
+        assert [path.name for path in (tmp_path / "blobs").rglob("*") if path.is_file()] == [first]
+
+    def test_workspace_edits_do_not_reach_the_blob(self, tmp_path):
+        blobs = BlobStore(tmp_path / "blobs")
+        digest = blobs.put_bytes(b"shared")
+        target = tmp_path / "ws" / "copy.bin"
+        assert blobs.link(digest, target) in ("reflink", "copy")
+        assert os.stat(blobs.path_for(digest)).st_nlink == 1
+
+        with open(target, "r+b") as handle:
+            handle.write(b"edited")
+        assert blobs.path_for(digest).read_bytes() == b"shared"
+
+    def test_writer_discards_payload_on_error(self, tmp_path):
+        blobs = BlobStore(tmp_path / "blobs")
+        with pytest.raises(RuntimeError):
+            with blobs.writer() as writer:
+                writer.write(b"partial")
+                raise RuntimeError("client went away")
+        assert not any((tmp_path / "blobs").iterdir())
+
+
+class TestAttachmentStoreWithBlobs:
+
+    def test_sessions_share_one_blob(self, tmp_path):
+        blobs = BlobStore(tmp_path / "blobs", reflink=True)
+        source = _source(tmp_path)
+        records = [
+            AttachmentStore(tmp_path / f"session_{idx}", blob_store=blobs).register_file(source)
+            for idx in range(3)
+        ]
+        assert len({record.ref.sha256 for record in records}) == 1
+        assert all(open(record.ref.local_path, "rb").read() == source.read_bytes() for record in records)
+        assert len([path for path in (tmp_path / "blobs").rglob("*") if path.is_file()]) == 1
+
+    def test_without_reflinks_no_blob_is_kept(self, tmp_path):
+        blobs = BlobStore(tmp_path / "blobs", reflink=False)
+        source = _source(tmp_path)
+        store = AttachmentStore(tmp_path / "session", blob_store=blobs)
+        records = [store.register_file(source), store.register_bytes(b"payload", display_name="p.bin")]
+        with blobs.writer(tmp_path / "session" / "up" / "u.bin") as writer:
+            writer.write(b"upload")
+
+        assert open(records[0].ref.local_path, "rb").read() == source.read_bytes()
+        assert open(records[1].ref.local_path, "rb").read() == b"payload"
+        assert (tmp_path / "session" / "up" / "u.bin").read_bytes() == b"upload"
+        assert not any(path.is_file() for path in (tmp_path / "blobs").rglob("*"))
+        assert not list((tmp_path / "session").rglob(".incoming-*"))
+
+    def test_manifest_is_append_only_and_reloads(self, tmp_path):
+        store = AttachmentStore(tmp_path / "session", blob_store=BlobStore(tmp_path / "blobs"))
+        record = store.register_bytes(b"payload", display_name="p.bin")
+        store.update_remote_file_id(record.ref.attachment_id, "file-1")
+        temp = store.register_bytes(b"temp", display_name="t.bin")
+        store.register_bytes(b"temp", display_name="t.bin", attachment_id=temp.ref.attachment_id, persist=False)
+
+        lines = store.manifest_path.read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 4
+        with store.manifest_path.open("a", encoding="utf-8") as handle:
+            handle.write('{"torn": ')
+
+        reloaded = AttachmentStore(tmp_path / "session")
+        assert list(reloaded.export_manifest()) == [record.ref.attachment_id]
+        assert reloaded.get(record.ref.attachment_id).ref.remote_file_id == "file-1"
+
+    def test_legacy_manifest_is_read(self, tmp_path):
+        root = tmp_path / "session"
+        root.mkdir()
+        legacy = {"old": {"ref": {"attachment_id": "old", "name": "x.txt", "sha256": "abc"}, "kind": "file"}}
+        (root / "attachments_manifest.json").write_text(json.dumps(legacy), encoding="utf-8")
+        store = AttachmentStore(root)
+        assert store.get("old").ref.name == "x.txt"
+        assert store.find(store.get("old").ref) is store.get("old")
+
+
+class TestUploadStreaming:
+
+    def test_upload_streams_into_blob_store(self, tmp_path):
+        blobs = BlobStore(tmp_path / "WareHouse" / ".blobs", reflink=True)
+        service = AttachmentService(root=tmp_path / "WareHouse", blob_store=blobs)
+        uploads = [
+            asyncio.run(service.save_upload_file(session, UploadFile(filename="r.csv", file=io.BytesIO(b"x" * 10))))
+            for session in ("s1", "s2")
+        ]
+        assert uploads[0].ref.sha256 == uploads[1].ref.sha256
+        assert uploads[0].kind is MessageBlockType.FILE
+        assert service.blob_store.contains(uploads[0].ref.sha256)
+        assert all(open(upload.ref.local_path, "rb").read() == b"x" * 10 for upload in uploads)
+        assert AttachmentService(root=tmp_path / "WareHouse").blob_store.root == tmp_path / "WareHouse" / ".blobs"
@@ -0,0 +1,160 @@
+"""Tests for token budgeting of agent prompts."""
+
+from collections import OrderedDict
+
+import pytest
+
+from entity.configs import Node
+from entity.configs.base import ConfigError
+from entity.configs.node.agent import AgentContextConfig
+from entity.messages import FunctionCallOutputEvent, Message, MessageRole, ToolCallPayload
+from runtime.bootstrap.schema import ensure_schema_registry_populated
+from runtime.node.agent import ToolManager
+from runtime.node.agent import context_budget
+from runtime.node.agent.context_budget import CONTEXT_SUMMARY_KEY, ContextBudget, SummaryCache
+from runtime.node.executor.agent_executor import AgentNodeExecutor
+from runtime.node.executor.base import ExecutionContext
+from utils import token_counter
+from utils.function_manager import FunctionManager
+from utils.log_manager import LogManager
+from utils.logger import WorkflowLogger
+
+ensure_schema_registry_populated()
+
+
+def _context(max_tokens=200, **extra):
+    extra.setdefault("summary_tokens", 60)
+    return AgentContextConfig.from_dict({"max_tokens": max_tokens, **extra}, path="node.context")
+
+
+def _turns(count, words=20):
+    messages = [Message(role=MessageRole.SYSTEM, content="You are a careful planner.")]
+    for idx in range(count):
+        role = MessageRole.USER if idx % 2 == 0 else MessageRole.ASSISTANT
+        messages.append(Message(role=role, content=f"turn {idx} " + "word " * words))
+    return messages
+
+
+class TestContextBudget:
+
+    def test_under_budget_is_untouched(self):
+        messages = _turns(2)
+        budget = ContextBudget(_context(max_tokens=1000), cache=SummaryCache())
+        assert budget.fit(messages) is None
+        assert len(messages) == 3
+
+    def test_over_budget_keeps_prefix_and_recent_turns(self):
+        messages = _turns(12)
+        recent = [message.text_content() for message in messages[-2:]]
+        budget = ContextBudget(_context(keep_recent=2, strategy="digest"), cache=SummaryCache())
+
+        result = budget.fit(messages)
+        assert result is not None and result.source == "digest"
+        assert result.tokens_after <= 200 < result.tokens_before
+        assert messages[0].text_content() == "You are a careful planner."
+        assert CONTEXT_SUMMARY_KEY in messages[1].metadata
+        assert [message.text_content() for message in messages[-2:]] == recent
+
+    def test_summary_reused_for_grown_conversation(self):
+        cache = SummaryCache()
+        calls = []
+
+        def _summarize(previous, transcript):
+            calls.append(transcript)
+            return "summary of the plan"
+
+        budget = ContextBudget(_context(max_tokens=300), cache=cache, summarizer=_summarize)
+        first = _turns(12)
+        budget.fit(first)
+        summary_calls = len(calls)
+        assert summary_calls >= 1
+
+        # Next execution resends the same history plus a new turn: the cached
+        # summary covers the old turns and the prompt prefix is unchanged.
+        second = _turns(12) + [Message(role=MessageRole.USER, content="one more")]
+        result = budget.fit(second)
+        assert result is not None and result.source == "cache"
+        assert len(calls) == summary_calls
+        assert second[1].text_content() == first[1].text_content()
+
+    def test_tool_results_stay_with_their_call(self):
+        messages = _turns(6)
+        call = ToolCallPayload(id="c1", function_name="search", arguments="{}")
+        messages.append(Message(role=MessageRole.ASSISTANT, content="", tool_calls=[call]))
+        messages.append(FunctionCallOutputEvent(call_id="c1", function_name="search", output_text="x " * 300))
+        messages.append(Message(role=MessageRole.USER, content="thanks"))
+        budget = ContextBudget(_context(keep_recent=2, strategy="digest"), cache=SummaryCache())
+
+        budget.fit(messages)
+        assert isinstance(messages[-2], FunctionCallOutputEvent)
+        assert messages[-3].tool_calls[0].id == "c1"
+
+    def test_failed_summary_falls_back_to_digest(self):
+        def _fail(previous, transcript):
+            raise RuntimeError("provider down")
+
+        budget = ContextBudget(_context(), cache=SummaryCache(), summarizer=_fail)
+        result = budget.fit(_turns(12))
+        assert result.source == "digest"
+
+
+class TestContextConfig:
+
+    def test_estimated_counts_keep_a_margin(self, monkeypatch):
+        monkeypatch.setattr(context_budget, "counts_are_exact", lambda model=None: False)
+        assert ContextBudget(_context(max_tokens=1000), cache=SummaryCache()).max_tokens == 800
+        monkeypatch.setattr(context_budget, "counts_are_exact", lambda model=None: True)
+        assert ContextBudget(_context(max_tokens=1000), cache=SummaryCache()).max_tokens == 1000
+
+    def test_estimate_counts_non_ascii_per_character(self, monkeypatch):
+        monkeypatch.setattr(token_counter, "_get_encoding", lambda name: None)
+        assert token_counter.count_tokens("预算估计测试 budget") == 6 + 2
+
+    def test_count_cache_holds_digests_not_texts(self, monkeypatch):
+        monkeypatch.setattr(token_counter, "_counts", OrderedDict())
+        monkeypatch.setattr(token_counter, "_COUNT_CACHE_SIZE", 2)
+        texts = ["first " * 1000, "second " * 1000, "third " * 1000]
+        counts = [token_counter.count_tokens(text) for text in texts]
+        assert len(token_counter._counts) == 2
+        assert all(len(digest) == 16 for digest, _ in token_counter._counts)
+        assert token_counter.count_tokens(texts[2]) == counts[2]
+
+    def test_summary_must_fit_budget(self):
+        with pytest.raises(ConfigError):
+            _context(max_tokens=100, summary_tokens=100)
+
+    def test_unknown_strategy_rejected(self):
+        with pytest.raises(ConfigError):
+            _context(strategy="truncate")
+
+    def test_executor_compacts_before_provider_call(self, tmp_path):
+        node = Node.from_dict(
+            {
+                "id": "writer",
+                "type": "agent",
+                "config": {
+                    "provider": "mock",
+                    "name": "mock-model",
+                    "context": {"max_tokens": 200, "strategy": "digest", "summary_tokens": 60},
+                },
+            },
+            path="graph.nodes.writer",
+        )
+        context = ExecutionContext(
+            tool_manager=ToolManager(),
+            function_manager=FunctionManager(tmp_path),
+            log_manager=LogManager(WorkflowLogger("context-budget-test")),
+        )
+        executor = AgentNodeExecutor(context)
+        captured = []
+        original = executor._invoke_provider
+
+        def _capture(provider, client, conversation, *args, **kwargs):
+            result = original(provider, client, conversation, *args, **kwargs)
+            captured.append(list(conversation))
+            return result
+
+        executor._invoke_provider = _capture
+        executor.execute(node, _turns(12)[1:])
+        assert any(CONTEXT_SUMMARY_KEY in message.metadata for message in captured[0])
+        assert len(captured[0]) < 12
@@ -0,0 +1,93 @@
+"""Tests for the cached scoped topology used by CycleExecutor."""
+
+from entity.configs import Node
+from runtime.bootstrap.schema import ensure_schema_registry_populated
+from utils.log_manager import LogManager
+from utils.logger import WorkflowLogger
+from workflow.cycle_manager import CycleManager
+from workflow.executor.cycle_executor import CycleExecutor
+from workflow.topology_builder import GraphTopologyBuilder
+
+ensure_schema_registry_populated()
+
+
+def _node(node_id: str) -> Node:
+    return Node.from_dict({"id": node_id, "type": "passthrough", "config": {}}, path=f"graph.nodes.{node_id}")
+
+
+def _connect(source: Node, target: Node) -> None:
+    source.add_successor(target)
+    target.add_predecessor(source)
+
+
+class _LoopRunner:
+    """Records executions; ``b`` loops back to ``a`` until it has run ``rounds`` times."""
+
+    def __init__(self, rounds: int):
+        self.rounds = rounds
+        self.executed = []
+
+    def __call__(self, node: Node) -> None:
+        node.reset_triggers()
+        self.executed.append(node.id)
+        if node.id == "a":
+            node.find_outgoing_edge("b").triggered = True
+        elif node.id == "b":
+            target = "a" if self.executed.count("b") < self.rounds else "done"
+            node.find_outgoing_edge(target).triggered = True
+
+
+def _loop_graph():
+    nodes = {node_id: _node(node_id) for node_id in ("start", "a", "b", "done")}
+    _connect(nodes["start"], nodes["a"])
+    _connect(nodes["a"], nodes["b"])
+    _connect(nodes["b"], nodes["a"])
+    _connect(nodes["b"], nodes["done"])
+    return nodes
+
+
+def _run_cycle(nodes, rounds):
+    manager = CycleManager()
+    manager.initialize_cycles([{"a", "b"}], nodes)
+    cycle_id = next(iter(manager.cycles))
+    runner = _LoopRunner(rounds)
+    executor = CycleExecutor(LogManager(WorkflowLogger("cycle-test")), nodes, [], manager, runner)
+    nodes["start"].find_outgoing_edge("a").triggered = True
+    executor._execute_cycle({"cycle_id": cycle_id, "nodes": ["a", "b"]})
+    return manager.cycles[cycle_id], runner
+
+
+class TestCyclePlanCache:
+
+    def test_topology_computed_once_per_variant(self, monkeypatch):
+        calls = {"detect": 0, "layers": 0}
+        detect_cycles = GraphTopologyBuilder.detect_cycles
+        build_dag_layers = GraphTopologyBuilder.build_dag_layers
+
+        def counting_detect(nodes):
+            calls["detect"] += 1
+            return detect_cycles(nodes)
+
+        def counting_layers(nodes):
+            calls["layers"] += 1
+            return build_dag_layers(nodes)
+
+        monkeypatch.setattr(GraphTopologyBuilder, "detect_cycles", staticmethod(counting_detect))
+        monkeypatch.setattr(GraphTopologyBuilder, "build_dag_layers", staticmethod(counting_layers))
+
+        cycle_info, runner = _run_cycle(_loop_graph(), rounds=5)
+
+        assert runner.executed == ["a", "b"] * 5
+        assert calls == {"detect": 1, "layers": 2}
+        assert set(cycle_info.layer_plans) == {("a", None), ("a", frozenset({"a"}))}
+
+    def test_cached_plans_match_fresh_build(self):
+        nodes = _loop_graph()
+        cycle_info, runner = _run_cycle(nodes, rounds=3)
+        assert runner.executed == ["a", "b"] * 3
+        assert nodes["done"].is_triggered()
+        manager = CycleManager()
+        manager.initialize_cycles([{"a", "b"}], nodes)
+        fresh = CycleExecutor(LogManager(WorkflowLogger("cycle-test")), nodes, [], manager, lambda node: None)
+        expected = fresh._build_topological_layers_in_scope(["a", "b"], "a", [], is_first_iteration=True)
+        assert cycle_info.layer_plans[("a", None)] == expected
@@ -0,0 +1,170 @@
+"""Tests for map unit failure policies, retries and resumable checkpoints."""
+
+import threading
+
+import pytest
+import yaml
+
+from check.check import load_config
+from entity.configs import ConfigError, Node
+from entity.configs.edge.dynamic_edge_config import DynamicEdgeConfig
+from entity.graph_config import GraphConfig
+from entity.messages import Message, MessageRole
+from runtime.bootstrap.schema import ensure_schema_registry_populated
+from utils.exceptions import WorkflowExecutionError
+from utils.log_manager import LogManager
+from utils.logger import WorkflowLogger
+from workflow.executor.dynamic_edge_executor import DynamicEdgeExecutor
+from workflow.executor.map_unit_store import MapUnitStore
+from workflow.graph import GraphExecutor
+from workflow.graph_context import GraphContext
+
+ensure_schema_registry_populated()
+
+
+def _map_config(**config) -> DynamicEdgeConfig:
+    return DynamicEdgeConfig.from_dict(
+        {"type": "map", "split": {"type": "message"}, "config": {"max_parallel": 4, **config}},
+        path="edge.dynamic",
+    )
+
+
+class _Worker:
+    """Upper-cases its input; items listed in ``failures`` fail that many times."""
+
+    def __init__(self, failures=None):
+        self.failures = dict(failures or {})
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, node, inputs):
+        text = inputs[-1].text_content()
+        with self._lock:
+            self.calls.append(text)
+            remaining = self.failures.get(text, 0)
+            if remaining:
+                self.failures[text] = remaining - 1
+        if remaining:
+            raise RuntimeError(f"unit {text} failed")
+        return [Message(role=MessageRole.ASSISTANT, content=text.upper())]
+
+
+def _node() -> Node:
+    return Node.from_dict({"id": "mapper", "type": "passthrough", "config": {}}, path="graph.nodes[0]")
+
+
+def _agent_map_design(agent_params, map_config):
+    nodes = [
+        {"id": "items", "type": "literal", "config": {"content": '["a", "b", "c"]', "role": "user"}},
+        {
+            "id": "mapper",
+            "type": "agent",
+            "config": {"provider": "mock", "name": "mock-model", "params": agent_params, "retry": {"enabled": False}},
+        },
+    ]
+    dynamic = {"type": "map", "split": {"type": "json_path", "config": {"json_path": ""}}, "config": map_config}
+    graph = {
+        "id": "agent_map",
+        "log_level": "ERROR",
+        "start": ["items"],
+        "nodes": nodes,
+        "edges": [{"from": "items", "to": "mapper", "dynamic": dynamic}],
+    }
+    return {"version": "0.4.0", "vars": {}, "graph": graph}
+
+
+def _graph_context(design, tmp_path) -> GraphContext:
+    path = tmp_path / "agent_map.yaml"
+    path.write_text(yaml.safe_dump(design), encoding="utf-8")
+    loaded = load_config(path)
+    graph_config = GraphConfig.from_definition(
+        loaded.graph, name="agent_map", output_root=tmp_path, source_path=str(path), vars=loaded.vars
+    )
+    return GraphContext(config=graph_config)
+
+
+def _run(worker, config, items="abcd", store=None):
+    executor = DynamicEdgeExecutor(LogManager(WorkflowLogger("map-test")), worker, unit_store=store)
+    inputs = [Message(role=MessageRole.USER, content=item) for item in items]
+    outputs = executor.execute_from_inputs(_node(), inputs, config)
+    return executor, [msg.text_content() for msg in outputs]
+
+
+class TestFailurePolicies:
+
+    def test_fail_fast_raises(self):
+        with pytest.raises(RuntimeError):
+            _run(_Worker({"c": 1}), _map_config())
+
+    def test_skip_failed_keeps_successful_units(self):
+        executor, outputs = _run(_Worker({"c": 1}), _map_config(failure_policy="skip_failed"))
+        assert outputs == ["A", "B", "D"]
+        failed = [outcome for outcome in executor.unit_outcomes if outcome.status == "failed"]
+        assert [outcome.index for outcome in failed] == [2]
+        assert "unit c failed" in failed[0].error
+
+    def test_skip_failed_raises_when_every_unit_fails(self):
+        with pytest.raises(WorkflowExecutionError):
+            _run(_Worker({"a": 1, "b": 1}), _map_config(failure_policy="skip_failed"), items="ab")
+
+    def test_retry_recovers_flaky_unit(self):
+        worker = _Worker({"b": 2})
+        executor, outputs = _run(worker, _map_config(retry_n=2))
+        assert outputs == ["A", "B", "C", "D"]
+        assert worker.calls.count("b") == 3
+        assert executor.unit_outcomes[1].attempts == 3
+
+    def test_invalid_policy_rejected(self):
+        with pytest.raises(ConfigError):
+            _map_config(failure_policy="ignore")
+
+
+class TestResume:
+
+    def test_rerun_only_repeats_failed_units(self, tmp_path):
+        store = MapUnitStore(tmp_path)
+        with pytest.raises(RuntimeError):
+            _run(_Worker({"c": 1}), _map_config(resume=True, max_parallel=1), store=store)
+
+        worker = _Worker()
+        executor, outputs = _run(worker, _map_config(resume=True), store=store)
+        assert outputs == ["A", "B", "C", "D"]
+        assert "c" in worker.calls
+        assert not {"a", "b"}.intersection(worker.calls)
+        statuses = [outcome.status for outcome in executor.unit_outcomes]
+        assert statuses[:2] == ["cached", "cached"]
+
+    def test_resume_disabled_does_not_checkpoint(self, tmp_path):
+        store = MapUnitStore(tmp_path)
+        _run(_Worker(), _map_config(), store=store)
+        assert not store.root.exists()
+
+    def test_unit_key_ignores_metadata(self, tmp_path):
+        store = MapUnitStore(tmp_path)
+        first = Message(role=MessageRole.USER, content="x", metadata={"source": "a"})
+        second = Message(role=MessageRole.USER, content="x", metadata={"source": "b"})
+        assert store.unit_key(_node(), [first]) == store.unit_key(_node(), [second])
+        assert store.unit_key(_node(), [first]) != store.unit_key(
+            _node(), [Message(role=MessageRole.USER, content="y")]
+        )
+
+
+class TestAgentUnits:
+
+    def test_model_errors_fail_units_and_are_not_checkpointed(self, tmp_path):
+        map_config = {"max_parallel": 3, "retry_n": 1, "failure_policy": "skip_failed", "resume": True}
+        context = _graph_context(_agent_map_design({"failure_rate": 1.0}, map_config), tmp_path)
+        with pytest.raises(WorkflowExecutionError, match="All 3 map units"):
+            GraphExecutor.execute_graph(context, "go")
+        assert not (context.checkpoint_directory / "map_units").exists()
+
+    def test_checkpoints_outlive_timestamped_run_directories(self, tmp_path):
+        design = _agent_map_design({"response": "{input}"}, {"max_parallel": 3, "resume": True})
+        first = _graph_context(design, tmp_path)
+        second = _graph_context(design, tmp_path)
+        assert first.directory.name.startswith("agent_map_")
+        assert first.checkpoint_directory == second.checkpoint_directory == tmp_path / "agent_map"
+
+        GraphExecutor.execute_graph(first, "go")
+        checkpoints = list((first.checkpoint_directory / "map_units" / "mapper").glob("*.json"))
+        assert len(checkpoints) == 3
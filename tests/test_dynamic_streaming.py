@@ -0,0 +1,243 @@
+"""Tests for streaming map edges (per-unit forwarding and early downstream units)."""
+
+import threading
+import time
+
+import pytest
+import yaml
+
+from check.check import load_config
+from entity.configs import ConfigError, Node
+from entity.configs.edge.dynamic_edge_config import DynamicEdgeConfig
+from entity.graph_config import GraphConfig
+from entity.messages import Message, MessageRole
+from runtime.bootstrap.schema import ensure_schema_registry_populated
+from runtime.node.executor.base import NodeExecutor
+from utils.exceptions import WorkflowCancelledError
+from utils.log_manager import LogManager
+from utils.logger import WorkflowLogger
+from utils.tracing import SpanExporter, set_span_exporter
+from workflow.executor.dynamic_edge_executor import DynamicEdgeExecutor, StreamingMapStage
+from workflow.executor.resource_manager import ResourceManager
+from workflow.graph import GraphExecutor
+from workflow.graph_context import GraphContext
+
+ensure_schema_registry_populated()
+
+
+def _agent(node_id, params=None):
+    config = {"provider": "mock", "name": "mock-model", "role": f"You are agent {node_id}.", "params": dict(params or {})}
+    return {"id": node_id, "type": "agent", "config": config}
+
+
+def _literal(node_id, content):
+    return {"id": node_id, "type": "literal", "config": {"content": content, "role": "user"}}
+
+
+def _edge(source, target, **extra):
+    return {"from": source, "to": target, **extra}
+
+
+def _design(graph_id, nodes, edges, start):
+    graph = {"id": graph_id, "log_level": "ERROR", "start": start, "nodes": nodes, "edges": edges}
+    return {"version": "0.4.0", "vars": {}, "graph": graph}
+
+
+class _CollectingExporter(SpanExporter):
+
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+
+def _map_config(**extra) -> DynamicEdgeConfig:
+    data = {"type": "map", "split": {"type": "message"}, "config": {"max_parallel": 4}}
+    data.update(extra)
+    return DynamicEdgeConfig.from_dict(data, path="edge.dynamic")
+
+
+def _sleepy_executor(delays):
+    def run(node, inputs):
+        text = inputs[-1].text_content()
+        time.sleep(delays[text])
+        return [Message(role=MessageRole.ASSISTANT, content=f"done {text}")]
+
+    return run
+
+
+def _worker_node() -> Node:
+    return Node.from_dict({"id": "worker", "type": "passthrough", "config": {}}, path="graph.nodes[0]")
+
+
+def _streaming_design(units: int, stream: bool):
+    dynamic = {"type": "map", "split": {"type": "message"}, "config": {"max_parallel": units}, "stream": stream}
+    slow = {"latency": {"distribution": "uniform", "min": 0.0, "max": 0.3}}
+    nodes = [{"id": "collect", "type": "passthrough", "config": {"only_last_message": False}}]
+    edges = []
+    start = []
+    for idx in range(units):
+        nodes.append(_literal(f"item_{idx}", f"Item {idx}"))
+        edges.append(_edge(f"item_{idx}", "collect"))
+        start.append(f"item_{idx}")
+    nodes += [_agent("research", slow), _agent("refine", {"latency": 0.01}), _agent("sink")]
+    edges += [
+        _edge("collect", "research", dynamic=dynamic),
+        _edge("research", "refine", dynamic=dynamic),
+        _edge("refine", "sink"),
+    ]
+    return _design("streaming_map", nodes, edges, start)
+
+
+def _run_design(design, tmp_path):
+    tmp_path.mkdir(parents=True, exist_ok=True)
+    path = tmp_path / "streaming_map.yaml"
+    path.write_text(yaml.safe_dump(design), encoding="utf-8")
+    loaded = load_config(path)
+    graph_config = GraphConfig.from_definition(
+        loaded.graph, name="streaming_map", output_root=tmp_path, source_path=str(path), vars=loaded.vars
+    )
+    context = GraphContext(config=graph_config)
+    return GraphExecutor.execute_graph(context, "go")
+
+
+class _StepChecker(NodeExecutor):
+    """Executor stub exposing the per-step cancellation check."""
+
+    def __init__(self):
+        super().__init__(context=None)
+
+    def execute(self, node, inputs):
+        return []
+
+
+def _abandon_watcher(abandoned: threading.Event):
+    checker = _StepChecker()
+
+    def run(node, inputs):
+        if inputs[-1].text_content() == "bad":
+            time.sleep(0.05)
+            raise RuntimeError("unit failed")
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            try:
+                checker._ensure_not_cancelled()
+            except WorkflowCancelledError:
+                abandoned.set()
+                raise
+            time.sleep(0.01)
+        return [Message(role=MessageRole.ASSISTANT, content="finished")]
+
+    return run
+
+
+class TestStreamingConfig:
+
+    def test_defaults(self):
+        config = _map_config()
+        assert config.stream is False
+        assert config.ordered is True
+
+    def test_stream_rejected_for_tree(self):
+        with pytest.raises(ConfigError):
+            DynamicEdgeConfig.from_dict(
+                {"type": "tree", "split": {"type": "message"}, "stream": True}, path="edge.dynamic"
+            )
+
+
+class TestUnitCallbacks:
+
+    def _run(self, config):
+        delays = {"a": 0.15, "b": 0.0, "c": 0.05}
+        executor = DynamicEdgeExecutor(LogManager(WorkflowLogger("stream-test")), _sleepy_executor(delays))
+        seen = []
+        inputs = [Message(role=MessageRole.USER, content=key) for key in delays]
+        outputs = executor.execute_from_inputs(
+            _worker_node(), inputs, config, on_unit_complete=lambda idx, out: seen.append(idx)
+        )
+        return seen, [msg.text_content() for msg in outputs]
+
+    def test_ordered_releases_in_split_order(self):
+        seen, outputs = self._run(_map_config(stream=True))
+        assert seen == [0, 1, 2]
+        assert outputs == ["done a", "done b", "done c"]
+
+    def test_unordered_releases_in_completion_order(self):
+        seen, outputs = self._run(_map_config(stream=True, ordered=False))
+        assert seen == [1, 2, 0]
+        # The collected result keeps split order either way
+        assert outputs == ["done a", "done b", "done c"]
+
+
+class TestStreamingGraph:
+
+    def test_downstream_map_starts_before_upstream_finishes(self, tmp_path):
+        exporter = _CollectingExporter()
+        set_span_exporter(exporter)
+        try:
+            executor = _run_design(_streaming_design(6, stream=True), tmp_path)
+        finally:
+            set_span_exporter(None)
+
+        units = [span for span in exporter.spans if span.name == "dynamic_unit"]
+        research = [span for span in units if span.attributes["node.id"] == "research"]
+        refine = [span for span in units if span.attributes["node.id"] == "refine"]
+        assert len(research) == len(refine) == 6
+        assert min(span.start_ns for span in refine) < max(span.end_ns for span in research)
+        assert len(executor.graph.nodes["refine"].output) == 6
+
+    def test_streaming_matches_batch_outputs(self, tmp_path):
+        streamed = _run_design(_streaming_design(4, stream=True), tmp_path / "stream")
+        batched = _run_design(_streaming_design(4, stream=False), tmp_path / "batch")
+        for node_id in ("research", "refine", "sink"):
+            assert len(streamed.graph.nodes[node_id].output) == len(batched.graph.nodes[node_id].output)
+
+    def test_streamed_units_run_under_target_node_span(self, tmp_path):
+        exporter = _CollectingExporter()
+        set_span_exporter(exporter)
+        try:
+            _run_design(_streaming_design(4, stream=True), tmp_path)
+        finally:
+            set_span_exporter(None)
+
+        node_spans = [
+            span for span in exporter.spans
+            if span.name == "node" and span.attributes["node.id"] == "refine"
+        ]
+        units = [
+            span for span in exporter.spans
+            if span.name == "dynamic_unit" and span.attributes["node.id"] == "refine"
+        ]
+        assert len(node_spans) == 1
+        assert all(span.parent is node_spans[0] for span in units)
+
+
+class TestFailFast:
+
+    def test_failed_unit_abandons_running_siblings(self):
+        abandoned = threading.Event()
+        executor = DynamicEdgeExecutor(LogManager(WorkflowLogger("fail-fast-test")), _abandon_watcher(abandoned))
+        inputs = [Message(role=MessageRole.USER, content=text) for text in ("slow", "bad")]
+        with pytest.raises(RuntimeError, match="unit failed"):
+            executor.execute_from_inputs(_worker_node(), inputs, _map_config())
+        assert abandoned.wait(2)
+
+    def test_failed_streamed_unit_abandons_siblings_and_releases_resources(self):
+        abandoned = threading.Event()
+        node = Node.from_dict({"id": "script", "type": "python", "config": {}}, path="graph.nodes[0]")
+        resources = ResourceManager()
+        held = resources.try_hold_node(node)
+        assert held is not None
+        assert resources.try_hold_node(node) is None
+
+        executor = DynamicEdgeExecutor(LogManager(WorkflowLogger("stream-fail-test")), _abandon_watcher(abandoned))
+        stage = StreamingMapStage(executor, node, _map_config(stream=True), resources=held)
+        for text in ("slow", "bad"):
+            stage.submit(Message(role=MessageRole.USER, content=text))
+        with pytest.raises(RuntimeError, match="unit failed"):
+            stage.collect()
+        assert abandoned.wait(2)
+        again = resources.try_hold_node(node)
+        assert again is not None
+        again.close()
@@ -0,0 +1,86 @@
+"""Tests for eager tree reduction in the dynamic edge executor."""
+
+import threading
+import time
+
+from entity.configs import Node
+from entity.configs.edge.dynamic_edge_config import DynamicEdgeConfig
+from entity.messages import Message, MessageRole
+from runtime.bootstrap.schema import ensure_schema_registry_populated
+from utils.log_manager import LogManager
+from utils.logger import WorkflowLogger
+from workflow.executor.dynamic_edge_executor import DynamicEdgeExecutor
+
+ensure_schema_registry_populated()
+
+
+def _tree_config(eager=True, ordered=True, group_size=2, max_parallel=8) -> DynamicEdgeConfig:
+    return DynamicEdgeConfig.from_dict(
+        {
+            "type": "tree",
+            "split": {"type": "message"},
+            "ordered": ordered,
+            "config": {"group_size": group_size, "max_parallel": max_parallel, "eager": eager},
+        },
+        path="edge.dynamic",
+    )
+
+
+class _Reducer:
+    """Joins its inputs; leaves named in ``slow`` take longer."""
+
+    def __init__(self, slow=(), delay=0.2):
+        self.slow = set(slow)
+        self.delay = delay
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, node, inputs):
+        texts = [msg.text_content() for msg in inputs]
+        layer = inputs[0].metadata["dynamic_edge_tree_layer"]
+        started = time.monotonic()
+        if self.slow.intersection(texts):
+            time.sleep(self.delay)
+        with self._lock:
+            self.calls.append((layer, started, time.monotonic()))
+        return [Message(role=MessageRole.ASSISTANT, content="".join(texts))]
+
+
+def _run(reducer, letters, config):
+    node = Node.from_dict({"id": "reduce", "type": "passthrough", "config": {}}, path="graph.nodes[0]")
+    executor = DynamicEdgeExecutor(LogManager(WorkflowLogger("tree-test")), reducer)
+    inputs = [Message(role=MessageRole.USER, content=letter) for letter in letters]
+    return [msg.text_content() for msg in executor.execute_from_inputs(node, inputs, config)]
+
+
+class TestEagerTree:
+
+    def test_ordered_result_matches_layered(self):
+        letters = "abcdefghij"
+        layered = _run(_Reducer(), letters, _tree_config(eager=False))
+        eager = _run(_Reducer(slow={"a", "e"}, delay=0.05), letters, _tree_config())
+        assert eager == layered == ["abcdefghij"]
+
+    def test_unordered_keeps_every_input(self):
+        result = _run(_Reducer(slow={"a"}, delay=0.05), "abcdefg", _tree_config(ordered=False, group_size=3))
+        assert len(result) == 1
+        assert sorted(result[0]) == list("abcdefg")
+
+    def test_upper_layer_starts_before_slow_leaf_finishes(self):
+        reducer = _Reducer(slow={"a"})
+        _run(reducer, "abcdefgh", _tree_config(ordered=False))
+        slow_leaf_end = max(end for layer, _, end in reducer.calls if layer == 1)
+        first_upper_start = min(start for layer, start, _ in reducer.calls if layer > 1)
+        assert first_upper_start < slow_leaf_end
+
+    def test_layered_waits_for_slow_leaf(self):
+        reducer = _Reducer(slow={"a"})
+        _run(reducer, "abcdefgh", _tree_config(eager=False))
+        slow_leaf_end = max(end for layer, _, end in reducer.calls if layer == 1)
+        first_upper_start = min(start for layer, start, _ in reducer.calls if layer > 1)
+        assert first_upper_start >= slow_leaf_end
+
+    def test_single_input_is_returned_unreduced(self):
+        reducer = _Reducer()
+        assert _run(reducer, "a", _tree_config()) == ["a"]
+        assert reducer.calls == []
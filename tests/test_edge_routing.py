@@ -0,0 +1,136 @@
+"""Tests for routing a node's keyword edges in one pass."""
+
+import pytest
+import yaml
+
+from check.check import load_config
+from entity.configs.edge.edge_condition import KeywordEdgeConditionConfig
+from entity.graph_config import GraphConfig
+from runtime.bootstrap.schema import ensure_schema_registry_populated
+from runtime.edge.conditions import KeywordEdgeConditionManager, KeywordRouter
+from workflow.graph import GraphExecutor
+from workflow.graph_context import GraphContext
+
+ensure_schema_registry_populated()
+
+
+def _literal(node_id, content):
+    return {"id": node_id, "type": "literal", "config": {"content": content, "role": "user"}}
+
+
+def _edge(source, target, **extra):
+    return {"from": source, "to": target, **extra}
+
+
+def _design(graph_id, nodes, edges, start):
+    graph = {"id": graph_id, "log_level": "ERROR", "start": start, "nodes": nodes, "edges": edges}
+    return {"version": "0.4.0", "vars": {}, "graph": graph}
+
+
+CONDITIONS = [
+    {"any": ["ok"]},
+    {"any": ["okay", "fine"], "none": ["not"]},
+    {"any": ["CONFLICT"], "case_sensitive": False},
+    {"none": ["abort"]},
+    {"regex": [r"score:\s*\d+"], "any": ["skip"]},
+    {"any": ["Ok"], "regex": [r"^done$"], "case_sensitive": False},
+]
+
+TEXTS = [
+    "",
+    "okay then",
+    "it is not okay",
+    "conflict between reviewers",
+    "please abort",
+    "final score: 42",
+    "DONE",
+    "ok",
+    "nothing relevant",
+]
+
+
+def _configs():
+    return [
+        KeywordEdgeConditionConfig.from_dict(data, path=f"edges[{idx}].condition")
+        for idx, data in enumerate(CONDITIONS)
+    ]
+
+
+def _managers():
+    return [KeywordEdgeConditionManager(config, None, None) for config in _configs()]
+
+
+def _routing_design():
+    nodes = [
+        _literal("triage", "Reviewers disagree: CONFLICT on dosage, score: 3"),
+        {"id": "consensus", "type": "passthrough", "config": {}},
+        {"id": "conflict", "type": "passthrough", "config": {}},
+        {"id": "scored", "type": "passthrough", "config": {}},
+        {"id": "report", "type": "passthrough", "config": {}},
+    ]
+    edges = [
+        _edge("triage", "consensus", condition={"type": "keyword", "config": {"any": ["CONSENSUS"]}}),
+        _edge("triage", "conflict", condition={"type": "keyword", "config": {"any": ["conflict"], "case_sensitive": False}}),
+        _edge("triage", "scored", condition={"type": "keyword", "config": {"regex": [r"score:\s*\d+"]}}),
+    ] + [_edge(branch, "report") for branch in ("consensus", "conflict", "scored")]
+    return _design("routing", nodes, edges, ["triage"])
+
+
+class TestKeywordRouter:
+
+    @pytest.mark.parametrize("text", TEXTS)
+    def test_matches_per_edge_evaluation(self, text):
+        expected = [manager._evaluate(text) for manager in _managers()]
+        router = KeywordRouter(_configs())
+        assert [router.evaluate(idx, text) for idx in range(len(router))] == expected
+
+    def test_text_lowered_once_for_all_edges(self):
+        class CountingText(str):
+            lowered = 0
+
+            def lower(self):
+                CountingText.lowered += 1
+                return super().lower()
+
+        router = KeywordRouter(_configs())
+        text = CountingText("nothing relevant")
+        results = [router.evaluate(idx, text) for idx in range(len(router))]
+        assert results == [manager._evaluate("nothing relevant") for manager in _managers()]
+        assert CountingText.lowered == 1
+
+    def test_text_scanned_once_for_all_edges(self, monkeypatch):
+        router = KeywordRouter(_configs())
+        managers = _managers()
+        for idx, manager in enumerate(managers):
+            manager.attach_router(router, idx)
+        calls = []
+        original = router._route
+        monkeypatch.setattr(router, "_route", lambda data: calls.append(data) or original(data))
+
+        text = "conflict " * 1000
+        assert [manager._evaluate(text) for manager in managers] == [False, False, True, True, False, False]
+        assert len(calls) == 1
+        assert managers[0]._evaluate("ok")
+        assert len(calls) == 2
+
+
+class TestGraphRouting:
+
+    def test_router_node_routes_through_shared_router(self, tmp_path):
+        path = tmp_path / "routing.yaml"
+        path.write_text(yaml.safe_dump(_routing_design()), encoding="utf-8")
+        loaded = load_config(path)
+        graph_config = GraphConfig.from_definition(
+            loaded.graph, name="routing", output_root=tmp_path, source_path=str(path), vars=loaded.vars
+        )
+        context = GraphContext(config=graph_config)
+        executor = GraphExecutor.execute_graph(context, "route")
+
+        triage = context.nodes["triage"]
+        routers = {id(edge_link.condition_manager.router) for edge_link in triage.iter_outgoing_edges()}
+        assert len(routers) == 1 and None not in routers
+        assert [node_id for node_id in ("consensus", "conflict", "scored") if context.nodes[node_id].output] == [
+            "conflict",
+            "scored",
+        ]
+        assert executor._get_pseudo_edge(triage) is executor._get_pseudo_edge(triage)
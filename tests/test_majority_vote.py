@@ -0,0 +1,196 @@
+"""Tests for incremental majority voting with early stopping."""
+
+import threading
+import time
+
+import pytest
+import yaml
+
+from check.check import DesignError, load_config
+from entity.configs import ConfigError, MajorityVoteConfig
+from entity.graph_config import GraphConfig
+from runtime.bootstrap.schema import ensure_schema_registry_populated
+from runtime.node.executor import abandon_scope
+from runtime.node.executor.passthrough_executor import PassthroughNodeExecutor
+from utils.exceptions import WorkflowCancelledError
+from workflow.executor.vote_tally import VoteTally, normalize_answer
+from workflow.graph import GraphExecutor
+from workflow.graph_context import GraphContext
+
+ensure_schema_registry_populated()
+
+
+def _agent(node_id, params=None):
+    config = {"provider": "mock", "name": "mock-model", "role": f"You are agent {node_id}.", "params": dict(params or {})}
+    return {"id": node_id, "type": "agent", "config": config}
+
+
+def _design(graph_id, nodes, edges, start):
+    graph = {"id": graph_id, "log_level": "ERROR", "start": start, "nodes": nodes, "edges": edges}
+    return {"version": "0.4.0", "vars": {}, "graph": graph}
+
+
+def _voting_design(answers, vote=None):
+    nodes = []
+    for idx, (answer, latency) in enumerate(answers):
+        params = {"response": answer, "latency": latency, "input_tokens": 10, "output_tokens": 5}
+        nodes.append(_agent(f"voter_{idx}", params))
+    design = _design("vote", nodes, [], [node["id"] for node in nodes])
+    design["graph"]["is_majority_voting"] = True
+    if vote is not None:
+        design["graph"]["majority_vote"] = vote
+    return design
+
+
+def _run(design, tmp_path):
+    path = tmp_path / "vote.yaml"
+    path.write_text(yaml.safe_dump(design), encoding="utf-8")
+    loaded = load_config(path)
+    graph_config = GraphConfig.from_definition(
+        loaded.graph, name="vote", output_root=tmp_path, source_path=str(path), vars=loaded.vars
+    )
+    return GraphExecutor.execute_graph(GraphContext(config=graph_config), "pick one")
+
+
+class TestVoteTally:
+
+    def test_decided_once_leader_cannot_be_caught(self):
+        tally = VoteTally(["a", "b", "c", "d", "e"])
+        tally.add("a", "X")
+        tally.add("b", "X")
+        assert not tally.is_decided()
+        tally.add("c", "X")
+        assert tally.is_decided()
+        assert tally.result() == "X"
+
+    def test_plurality_settled_without_majority(self):
+        tally = VoteTally(["a", "b", "c", "d", "e", "f"], quorum=6)
+        for voter, answer in zip("abcde", ["X", "X", "X", "Y", "Z"]):
+            tally.add(voter, answer)
+        # One voter left: X=3 can only be tied at best by Y reaching 2
+        assert tally.is_decided()
+
+    def test_ties_follow_voter_order(self):
+        tally = VoteTally(["a", "b", "c", "d"])
+        for voter, answer in [("d", "Y"), ("c", "Y"), ("b", "X"), ("a", "X")]:
+            tally.add(voter, answer)
+        assert tally.result() == "X"
+
+    def test_empty_answers_abstain(self):
+        tally = VoteTally(["a", "b", "c"])
+        tally.add("a", "")
+        tally.add("b", "Y")
+        tally.add("c", "")
+        assert tally.standings() == [("Y", 1)]
+
+    def test_normalized_clustering(self):
+        assert normalize_answer('  "Option   A." ') == "option a"
+        tally = VoteTally(["a", "b", "c"], clustering="normalized")
+        tally.add("a", "Option A")
+        tally.add("b", "option a.")
+        assert tally.standings() == [("Option A", 2)]
+
+    def test_embedding_clustering(self):
+        vectors = {"yes": [1.0, 0.0], "yeah": [0.95, 0.1], "no": [0.0, 1.0]}
+        tally = VoteTally(["a", "b", "c"], clustering="embedding", embed=vectors.__getitem__)
+        tally.add("a", "yes")
+        tally.add("b", "no")
+        tally.add("c", "yeah")
+        assert tally.standings() == [("yes", 2), ("no", 1)]
+
+
+class TestMajorityVoteConfig:
+
+    def test_embedding_clustering_requires_model(self):
+        with pytest.raises(ConfigError):
+            MajorityVoteConfig.from_dict({"clustering": "embedding"}, path="graph.majority_vote")
+
+    @pytest.mark.parametrize("field", ["quorum", "max_parallel"])
+    @pytest.mark.parametrize("value", [0, "two", 1.5, True])
+    def test_counts_must_be_positive_integers(self, field, value):
+        with pytest.raises(ConfigError) as excinfo:
+            MajorityVoteConfig.from_dict({field: value}, path="graph.majority_vote")
+        assert excinfo.value.path == f"graph.majority_vote.{field}"
+
+    def test_quorum_cannot_exceed_voters(self, tmp_path):
+        design = _voting_design([("A", 0.0), ("A", 0.0)], vote={"quorum": 3})
+        with pytest.raises(DesignError, match="quorum"):
+            _run(design, tmp_path)
+
+    def test_quorum_must_be_a_strict_majority(self, tmp_path):
+        design = _voting_design([("A", 0.0)] * 4, vote={"quorum": 2})
+        with pytest.raises(DesignError, match="strict majority"):
+            _run(design, tmp_path)
+
+
+class TestMajorityVoteStrategy:
+
+    def test_waits_for_every_voter_by_default(self, tmp_path):
+        executor = _run(_voting_design([("A", 0.0), ("B", 0.0), ("A", 0.0)]), tmp_path)
+        assert executor.get_final_output() == "A"
+        assert executor.majority_report.counted == ["voter_0", "voter_1", "voter_2"]
+        assert not executor.majority_report.decided_early
+
+    def test_early_stop_abandons_slow_voters(self, tmp_path):
+        answers = [("B", 0.5), ("A", 0.0), ("A", 0.0), ("A", 0.0), ("B", 0.5)]
+        design = _voting_design(answers, vote={"early_stop": True})
+        started = time.perf_counter()
+        executor = _run(design, tmp_path)
+        elapsed = time.perf_counter() - started
+
+        report = executor.majority_report
+        assert executor.get_final_output() == "A"
+        assert report.decided_early
+        assert report.votes == {"A": 3}
+        assert report.abandoned == ["voter_0", "voter_4"]
+        assert report.cancelled == []
+        assert elapsed < 0.5
+        assert "node_voter_0" not in executor.outputs
+        # The abandoned call finishes in the background; its result is dropped
+        time.sleep(0.6)
+        assert not executor.graph.nodes["voter_0"].output
+
+    def test_early_stop_never_starts_queued_voters(self, tmp_path):
+        answers = [("A", 0.0), ("A", 0.0), ("A", 0.0), ("B", 0.0), ("B", 0.0)]
+        design = _voting_design(answers, vote={"early_stop": True, "quorum": 3, "max_parallel": 1})
+        executor = _run(design, tmp_path)
+
+        report = executor.majority_report
+        assert executor.get_final_output() == "A"
+        assert report.counted == ["voter_0", "voter_1", "voter_2"]
+        assert report.cancelled == ["voter_3", "voter_4"]
+        assert report.estimated_tokens_saved == 30
+        assert not executor.graph.nodes["voter_3"].output
+
+    def test_early_stop_estimates_savings_when_decided(self, tmp_path):
+        answers = [("A", 0.2), ("A", 0.3), ("A", 0.2), ("B", 0.2), ("B", 0.2)]
+        design = _voting_design(answers, vote={"early_stop": True, "quorum": 3, "max_parallel": 2})
+        executor = _run(design, tmp_path)
+
+        # voter_3 took voter_1's slot and is abandoned; voter_4 never starts
+        report = executor.majority_report
+        assert report.abandoned == ["voter_3"]
+        assert report.cancelled == ["voter_4"]
+        assert report.latency_saved_ms >= 300
+        assert report.estimated_tokens_saved == 15
+        assert executor.outputs["majority_vote"]["latency_saved_ms"] == round(report.latency_saved_ms, 3)
+
+    def test_abandoned_executor_stops_at_next_step(self):
+        event = threading.Event()
+        executor = PassthroughNodeExecutor.__new__(PassthroughNodeExecutor)
+        executor.context = None
+        with abandon_scope(event):
+            executor._ensure_not_cancelled()
+            event.set()
+            with pytest.raises(WorkflowCancelledError, match="abandoned"):
+                executor._ensure_not_cancelled()
+        executor._ensure_not_cancelled()
+
+    def test_nested_abandon_scope_sees_outer_event(self):
+        outer = threading.Event()
+        executor = PassthroughNodeExecutor.__new__(PassthroughNodeExecutor)
+        executor.context = None
+        with abandon_scope(outer), abandon_scope(threading.Event()):
+            outer.set()
+            with pytest.raises(WorkflowCancelledError, match="abandoned"):
+                executor._ensure_not_cancelled()
@@ -0,0 +1,97 @@
+"""Tests for concurrent access to shared memory stores."""
+
+import json
+import threading
+from unittest.mock import MagicMock
+
+from entity.configs import MemoryStoreConfig
+from runtime.bootstrap.schema import ensure_schema_registry_populated
+from runtime.node.agent.memory.blackboard_memory import BlackboardMemory
+from runtime.node.agent.memory.memory_base import MemoryContentSnapshot, MemoryWritePayload
+from runtime.node.agent.memory.simple_memory import SimpleMemory
+
+ensure_schema_registry_populated()
+
+
+def _board(tmp_path, max_items=1000):
+    store = MemoryStoreConfig.from_dict(
+        {
+            "name": "board",
+            "type": "blackboard",
+            "config": {"memory_path": str(tmp_path / "board.json"), "max_items": max_items},
+        },
+        path="memory[0]",
+    )
+    return BlackboardMemory(store)
+
+
+def _payload(text):
+    return MemoryWritePayload(
+        agent_role="writer",
+        inputs_text="in",
+        input_snapshot=None,
+        output_snapshot=MemoryContentSnapshot(text=text),
+    )
+
+
+def _run_threads(count, target):
+    threads = [threading.Thread(target=target, args=(idx,)) for idx in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+class TestMemorySnapshots:
+
+    def test_parallel_appends_are_not_lost(self, tmp_path):
+        memory = _board(tmp_path)
+
+        def _write(idx):
+            for step in range(50):
+                memory.update(_payload(f"{idx}-{step}"))
+
+        _run_threads(8, _write)
+        assert memory.count_memories() == 400
+        assert memory.snapshot().version == 400
+
+    def test_trim_keeps_newest_under_contention(self, tmp_path):
+        memory = _board(tmp_path, max_items=20)
+        _run_threads(4, lambda idx: [memory.update(_payload(f"{idx}-{step}")) for step in range(30)])
+        assert memory.count_memories() == 20
+
+    def test_readers_keep_their_snapshot(self, tmp_path):
+        memory = _board(tmp_path)
+        memory.update(_payload("first"))
+        snapshot = memory.snapshot()
+        retrieved = memory.retrieve("writer", MemoryContentSnapshot(text="q"), 0, -1.0)
+
+        memory.update(_payload("second"))
+        assert [item.content_summary for item in snapshot.items] == ["first"]
+        assert [item.content_summary for item in retrieved] == ["first"]
+        assert memory.snapshot().version == snapshot.version + 1
+
+    def test_concurrent_saves_write_complete_files(self, tmp_path):
+        memory = _board(tmp_path)
+        for step in range(100):
+            memory.update(_payload(f"item {step}"))
+        _run_threads(6, lambda idx: memory.save())
+
+        saved = json.loads((tmp_path / "board.json").read_text(encoding="utf-8"))
+        assert len(saved) == 100
+        assert not list(tmp_path.glob("*.tmp"))
+
+
+class TestSimpleMemoryDedup:
+
+    def test_duplicate_content_stored_once(self):
+        store = MagicMock()
+        store.name = "simple"
+        store.as_config.return_value = MagicMock(memory_path=None, embedding=None)
+        memory = SimpleMemory(store)
+        memory.embedding = MagicMock()
+        memory.embedding.get_embedding.return_value = [0.1] * 8
+        content = "the same conclusion reached by every parallel agent"
+
+        _run_threads(8, lambda idx: memory.update(_payload(content)))
+        assert memory.count_memories() == 1
@@ -0,0 +1,160 @@
+"""Tests for write-behind memory updates."""
+
+import json
+import threading
+
+import pytest
+
+from entity.configs import MemoryAttachmentConfig, MemoryStoreConfig
+from entity.configs.base import ConfigError
+from entity.enums import AgentExecFlowStage
+from runtime.bootstrap.schema import ensure_schema_registry_populated
+from runtime.node.agent.memory.blackboard_memory import BlackboardMemory
+from runtime.node.agent.memory.memory_base import (
+    MemoryContentSnapshot,
+    MemoryManager,
+    MemoryWriteError,
+    MemoryWritePayload,
+)
+from runtime.node.agent.memory.write_behind import MemoryWriter
+
+ensure_schema_registry_populated()
+
+
+class _SlowBlackboard(BlackboardMemory):
+    """Blackboard store whose updates block until released."""
+
+    def __init__(self, store):
+        super().__init__(store)
+        self.release = threading.Event()
+        self.saves = 0
+
+    def update(self, payload):
+        self.release.wait(5)
+        super().update(payload)
+
+    def save(self):
+        self.saves += 1
+        super().save()
+
+
+def _store(tmp_path, durability=None):
+    data = {"name": "board", "type": "blackboard", "config": {"memory_path": str(tmp_path / "board.json")}}
+    if durability:
+        data["durability"] = durability
+    return _SlowBlackboard(MemoryStoreConfig.from_dict(data, path="memory[0]"))
+
+
+def _payload(text):
+    return MemoryWritePayload(
+        agent_role="writer",
+        inputs_text="in",
+        input_snapshot=None,
+        output_snapshot=MemoryContentSnapshot(text=text),
+    )
+
+
+def _broken_payload():
+    return MemoryWritePayload(agent_role="writer", inputs_text="x", input_snapshot=None, output_snapshot=object())
+
+
+def _manager(memory, writer):
+    attachment = MemoryAttachmentConfig.from_dict({"name": "board"}, path="node.memories[0]")
+    return MemoryManager([attachment], {"board": memory}, writer)
+
+
+def _saved(tmp_path):
+    path = tmp_path / "board.json"
+    return [item["content_summary"] for item in json.loads(path.read_text())] if path.exists() else []
+
+
+class TestMemoryWriter:
+
+    def test_update_returns_before_write_and_reads_see_own_writes(self, tmp_path):
+        memory = _store(tmp_path)
+        writer = MemoryWriter({"board": memory})
+        manager = _manager(memory, writer)
+
+        manager.update(_payload("first"))
+        manager.update(_payload("second"))
+        assert memory.contents == ()
+
+        threading.Timer(0.1, memory.release.set).start()
+        result = manager.retrieve("writer", MemoryContentSnapshot(text="q"), AgentExecFlowStage.GEN_STAGE)
+        assert sorted(item.content_summary for item in result.items) == ["first", "second"]
+        writer.close()
+        assert _saved(tmp_path) == ["first", "second"]
+
+    def test_on_finish_saves_only_when_flushed(self, tmp_path):
+        memory = _store(tmp_path, durability="on_finish")
+        memory.release.set()
+        writer = MemoryWriter({"board": memory})
+        manager = _manager(memory, writer)
+
+        manager.update(_payload("kept"))
+        manager.wait_for_writes()
+        assert len(memory.contents) == 1 and memory.saves == 0
+
+        assert writer.flush()
+        assert memory.saves == 1 and _saved(tmp_path) == ["kept"]
+
+    def test_sync_writes_inline(self, tmp_path):
+        memory = _store(tmp_path, durability="sync")
+        memory.release.set()
+        manager = _manager(memory, MemoryWriter({"board": memory}))
+        manager.update(_payload("now"))
+        assert _saved(tmp_path) == ["now"]
+
+    def test_failed_write_does_not_block_queue(self, tmp_path):
+        memory = _store(tmp_path)
+        memory.release.set()
+        writer = MemoryWriter({"board": memory})
+        manager = _manager(memory, writer)
+
+        manager.update(_broken_payload())
+        manager.update(_payload("after"))
+        with pytest.raises(MemoryWriteError) as excinfo:
+            writer.flush(timeout=5)
+        assert [name for name, _ in excinfo.value.failures] == ["board"]
+        assert _saved(tmp_path) == ["after"]
+        # Reported once: the next flush and close succeed
+        assert writer.flush(timeout=5)
+        assert writer.close(timeout=5)
+
+    def test_failed_write_reported_to_submitting_manager(self, tmp_path):
+        memory = _store(tmp_path, durability="on_finish")
+        memory.release.set()
+        writer = MemoryWriter({"board": memory})
+        failing = _manager(memory, writer)
+        healthy = _manager(memory, writer)
+
+        failing.update(_broken_payload())
+        healthy.update(_payload("fine"))
+        healthy.wait_for_writes()
+        with pytest.raises(MemoryWriteError):
+            failing.wait_for_writes()
+        failing.wait_for_writes()
+
+        with pytest.raises(MemoryWriteError):
+            writer.close(timeout=5)
+        assert _saved(tmp_path) == ["fine"]
+
+    def test_concurrent_updates_keep_every_ticket(self, tmp_path):
+        memory = _store(tmp_path)
+        memory.release.set()
+        writer = MemoryWriter({"board": memory})
+        manager = _manager(memory, writer)
+
+        threads = [threading.Thread(target=manager.update, args=(_payload(f"unit {i}"),)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sorted(manager._pending_writes["board"]) == list(range(1, 9))
+        manager.wait_for_writes()
+        assert len(memory.contents) == 8
+        writer.close()
+
+    def test_unknown_durability_rejected(self, tmp_path):
+        with pytest.raises(ConfigError):
+            _store(tmp_path, durability="eventually")
@@ -0,0 +1,117 @@
+"""Tests for copy-on-write message cloning."""
+
+import copy
+import dataclasses
+import pickle
+import threading
+
+import pytest
+
+from entity.messages import AttachmentRef, Message, MessageBlock, MessageBlockType, MessageRole
+
+
+def _image_message() -> Message:
+    attachment = AttachmentRef(attachment_id="img", mime_type="image/png", data_uri="data:image/png;base64," + "A" * 1024)
+    return Message(
+        role=MessageRole.USER,
+        content=[MessageBlock.text_block("look"), MessageBlock(MessageBlockType.IMAGE, attachment=attachment)],
+        metadata={"source": "user"},
+    )
+
+
+class TestImmutableBlocks:
+
+    def test_blocks_and_refs_are_frozen(self):
+        block = _image_message().content[1]
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            block.text = "changed"
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            block.attachment.name = "changed"
+
+    def test_replace_returns_new_block(self):
+        block = MessageBlock.text_block("a")
+        changed = block.replace(text="b")
+        assert (block.text, changed.text) == ("a", "b")
+        assert block.copy() is block
+
+
+class TestCopyOnWrite:
+
+    def test_clone_shares_blocks(self):
+        original = _image_message()
+        cloned = original.clone()
+        assert cloned == original
+        assert cloned.content is not original.content
+        assert all(left is right for left, right in zip(cloned.content, original.content))
+
+    def test_clone_shares_containers_until_accessed(self):
+        original = _image_message()
+        cloned = original.clone()
+        assert cloned._metadata is original._metadata
+        assert cloned._content is original._content
+        cloned.metadata["source"] = "node"
+        cloned.content.append(MessageBlock.text_block("more"))
+        assert original.metadata == {"source": "user"}
+        assert len(original.content) == 2
+        assert len(cloned.content) == 3
+
+    def test_original_mutation_does_not_leak_into_clone(self):
+        original = _image_message()
+        cloned = original.clone()
+        original.metadata["extra"] = True
+        original.tool_calls.append("call")
+        assert cloned.metadata == {"source": "user"}
+        assert cloned.tool_calls == []
+
+    def test_with_role_and_with_content(self):
+        original = _image_message()
+        tool = original.with_role(MessageRole.TOOL)
+        replaced = original.with_content("plain")
+        tool.metadata["tool"] = True
+        assert original.role is MessageRole.USER
+        assert replaced.text_content() == "plain"
+        assert "tool" not in original.metadata and "tool" not in replaced.metadata
+
+    def test_reads_do_not_copy_shared_containers(self):
+        original = _image_message()
+        original.tool_calls.append("call")
+        cloned = original.clone()
+        assert cloned.get_metadata("source") == "user"
+        assert cloned.get_metadata("missing", 1) == 1
+        assert dict(cloned.metadata_view) == {"source": "user"}
+        assert cloned.tool_calls_view == ("call",)
+        assert cloned._metadata is original._metadata
+        assert cloned._tool_calls is original._tool_calls
+        with pytest.raises(TypeError):
+            cloned.metadata_view["source"] = "node"
+
+    def test_concurrent_writers_share_one_copy(self):
+        original = _image_message()
+        cloned = original.clone()
+        barrier = threading.Barrier(8)
+
+        def write(idx):
+            barrier.wait()
+            cloned.metadata[f"k{idx}"] = idx
+
+        threads = [threading.Thread(target=write, args=(idx,)) for idx in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert cloned.metadata == {"source": "user", **{f"k{idx}": idx for idx in range(8)}}
+        assert original.metadata == {"source": "user"}
+
+    def test_dict_blocks_are_copied_on_access(self):
+        original = Message(role=MessageRole.USER, content=[{"type": "text", "text": "hi"}])
+        cloned = original.clone()
+        cloned.content[0]["text"] = "bye"
+        assert original.content[0]["text"] == "hi"
+
+    def test_copy_and_pickle(self):
+        original = _image_message()
+        shallow = copy.copy(original)
+        shallow.metadata["x"] = 1
+        assert "x" not in original.metadata
+        assert pickle.loads(pickle.dumps(original)) == original
+        assert Message.from_dict(original.to_dict()) == original
@@ -0,0 +1,95 @@
+"""Tests for the metrics registry and the /metrics endpoint."""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils.logger import WorkflowLogger
+from utils.metrics import POOL_QUEUE_DEPTH, TOOL_DURATION, MetricsRegistry, metric_scope, submit_tracked
+
+
+class TestMetricsRegistry:
+
+    def test_counter_and_gauge_render(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("demo_total", "Demo counter.", ("kind",))
+        gauge = registry.gauge("demo_depth", "Demo gauge.")
+        counter.inc(2, kind="a")
+        gauge.inc()
+        gauge.inc()
+        gauge.dec()
+
+        text = registry.render()
+        assert "# TYPE demo_total counter" in text
+        assert 'demo_total{kind="a"} 2' in text
+        assert "demo_depth 1" in text
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram("demo_seconds", "Demo histogram.", buckets=(0.1, 1.0))
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        histogram.observe(5.0)
+
+        text = registry.render()
+        assert 'demo_seconds_bucket{le="0.1"} 1' in text
+        assert 'demo_seconds_bucket{le="1"} 2' in text
+        assert 'demo_seconds_bucket{le="+Inf"} 3' in text
+        assert "demo_seconds_count 3" in text
+
+    def test_label_mismatch_rejected(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("demo_total", "Demo counter.", ("kind",))
+        with pytest.raises(ValueError):
+            counter.inc(other="x")
+
+    def test_reregistering_returns_same_metric(self):
+        registry = MetricsRegistry()
+        first = registry.gauge("demo", "Demo.")
+        assert registry.gauge("demo", "Demo.") is first
+        with pytest.raises(ValueError):
+            registry.counter("demo", "Demo.")
+
+    def test_submit_tracked_settles_queue_depth(self):
+        before = POOL_QUEUE_DEPTH.value(pool="test")
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            futures = [submit_tracked(executor, "test", lambda x: x * 2, i) for i in range(5)]
+            assert [f.result() for f in futures] == [0, 2, 4, 6, 8]
+        assert POOL_QUEUE_DEPTH.value(pool="test") == before
+
+    def test_scope_counts_only_its_own_context(self):
+        histogram = MetricsRegistry().histogram("scoped_seconds", "Scoped histogram.")
+        outsider = threading.Thread(target=lambda: histogram.observe(0.1))
+        with metric_scope() as outer:
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                submit_tracked(executor, "test", histogram.observe, 0.1).result()
+            with metric_scope() as inner:
+                histogram.observe(0.1)
+            outsider.start()
+            outsider.join()
+        histogram.observe(0.1)
+
+        assert histogram.count() == 4
+        assert inner.count(histogram) == 1
+        assert outer.count(histogram) == 2
+
+    def test_logger_timers_feed_histograms(self):
+        logger = WorkflowLogger("metrics-test")
+        before = TOOL_DURATION.count(tool="metrics_probe")
+        with logger.tool_timer("n1", "metrics_probe"):
+            pass
+        assert TOOL_DURATION.count(tool="metrics_probe") == before + 1
+        assert logger.get_timer("tool_n1_metrics_probe") is not None
+
+
+class TestMetricsEndpoint:
+
+    def test_metrics_exposition(self, client):
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        body = response.text
+        assert "# TYPE devall_node_duration_seconds histogram" in body
+        assert 'devall_active_sessions{status="running"}' in body
+        assert "devall_websocket_buffered_messages" in body
@@ -0,0 +1,211 @@
+"""Tests for the mock provider and the benchmark harness built on it."""
+
+import random
+import threading
+
+import pytest
+import yaml
+
+from benchmarks.harness import patch_design_for_mock, run_design_file, run_instance_suite, unsupported_reason
+from benchmarks.synthetic import SYNTHETIC_SUITE, deep_chain, map_fanout
+from entity.configs.node.agent import AgentConfig
+from entity.messages import Message, MessageRole
+from entity.tool_spec import ToolSpec
+from runtime.bootstrap.schema import ensure_schema_registry_populated
+from runtime.node.agent import ProviderRegistry
+from runtime.node.agent.providers.mock_provider import MockProvider, MockProviderError
+from utils.token_tracker import TokenTracker
+from workflow import subgraph_loader
+from workflow.graph import GraphExecutor
+
+ensure_schema_registry_populated()
+
+
+def _provider(**params) -> MockProvider:
+    config = AgentConfig.from_dict(
+        {"provider": "mock", "name": "mock-model", "params": params},
+        path="test.model",
+    )
+    config.node_id = "n1"
+    return MockProvider(config)
+
+
+def _ask(provider, text="hello", tool_specs=None):
+    return provider.call_model(
+        provider.create_client(),
+        conversation=[Message(role=MessageRole.USER, content=text)],
+        timeline=[],
+        tool_specs=tool_specs,
+    )
+
+
+class TestMockProvider:
+
+    def test_registered(self):
+        assert ProviderRegistry.get_provider("mock") is MockProvider
+
+    def test_response_template_and_determinism(self):
+        first = _ask(_provider(response="{node_id}:{input}", seed=7))
+        second = _ask(_provider(response="{node_id}:{input}", seed=7))
+        assert first.message.text_content() == "n1:hello"
+        assert first.message.text_content() == second.message.text_content()
+
+    def test_template_keeps_literal_braces(self):
+        response = _ask(_provider(response='{"node": "{node_id}", "items": {}}'))
+        assert response.message.text_content() == '{"node": "n1", "items": {}}'
+
+    def test_token_usage_is_tracked(self):
+        provider = _provider(input_tokens=11, output_tokens=5)
+        provider.config.token_tracker = TokenTracker("wf")
+        _ask(provider)
+        usage = provider.config.token_tracker.get_node_usage("n1")
+        assert (usage.input_tokens, usage.output_tokens) == (11, 5)
+
+    def test_tool_call_emitted_once(self):
+        specs = [ToolSpec(name="search", description="", parameters={})]
+        provider = _provider(tool_calls={"probability": 1.0, "arguments": {"q": "x"}})
+        response = _ask(provider, tool_specs=specs)
+        assert response.has_tool_calls()
+        assert response.message.tool_calls[0].function_name == "search"
+
+        follow_up = provider.call_model(
+            None,
+            conversation=[Message(role=MessageRole.TOOL, content="result", tool_call_id="c1")],
+            timeline=[],
+            tool_specs=specs,
+        )
+        assert not follow_up.has_tool_calls()
+
+    def test_failure_injection_is_retryable(self):
+        with pytest.raises(MockProviderError) as excinfo:
+            _ask(_provider(failure_rate=1.0))
+        assert excinfo.value.status_code == 503
+
+    @pytest.mark.parametrize("distribution", ["constant", "uniform", "normal", "lognormal", "exponential"])
+    def test_latency_distributions_respect_bounds(self, distribution):
+        provider = _provider(latency={"distribution": distribution, "mean": 0.01, "stddev": 0.005, "min": 0, "max": 0.02})
+        for seed in range(20):
+            delay = provider._sample_latency(random.Random(seed))
+            assert 0 <= delay <= 0.02
+
+
+class TestBenchmarkHarness:
+
+    def test_patch_switches_agents_to_mock(self):
+        design = {
+            "graph": {
+                "log_level": "DEBUG",
+                "nodes": [{"id": "a", "type": "agent", "config": {"provider": "openai", "api_key": "k", "name": "m"}}],
+            }
+        }
+        patched = patch_design_for_mock(design, {"latency": 0})
+        config = patched["graph"]["nodes"][0]["config"]
+        assert config["provider"] == "mock"
+        assert "api_key" not in config
+        assert patched["graph"]["log_level"] == "ERROR"
+
+    def test_patch_stubs_embeddings_and_drops_mcp_tooling(self):
+        tooling = [{"type": "mcp_remote", "config": {}}, {"type": "function", "config": {}}]
+        embedding = {"provider": "openai", "model": "text-embedding-3-small", "api_key": "k"}
+        design = {
+            "graph": {
+                "nodes": [{"id": "a", "type": "agent", "config": {"provider": "openai", "name": "", "tooling": tooling}}],
+                "memory": [{"name": "m", "type": "simple", "config": {"embedding": embedding}}],
+            }
+        }
+        patched = patch_design_for_mock(design, {"latency": 0})
+        config = patched["graph"]["nodes"][0]["config"]
+        assert config["name"] == "mock-model"
+        assert [entry["type"] for entry in config["tooling"]] == ["function"]
+        assert patched["graph"]["memory"][0]["config"]["embedding"] == {
+            "provider": "mock",
+            "model": "text-embedding-3-small",
+        }
+
+    def test_interactive_designs_are_supported(self):
+        assert unsupported_reason({"graph": {"nodes": [{"id": "h", "type": "human"}]}}) is None
+        assert unsupported_reason(deep_chain(depth=2)) is None
+
+    def test_human_node_is_answered(self, tmp_path):
+        design = {
+            "version": "0.4.0",
+            "vars": {},
+            "graph": {
+                "id": "review",
+                "start": ["h"],
+                "nodes": [
+                    {"id": "h", "type": "human", "config": {"description": "Review the draft."}},
+                    {"id": "a", "type": "agent", "config": {"provider": "mock", "name": "mock-model"}},
+                ],
+                "edges": [{"from": "h", "to": "a"}],
+            },
+        }
+        path = tmp_path / "review.yaml"
+        path.write_text(yaml.safe_dump(design), encoding="utf-8")
+        result = run_design_file(path, measure_memory=False)
+        assert result.status == "ok", result.error
+        assert (result.nodes_executed, result.model_calls) == (2, 1)
+
+    def test_external_memory_and_json_templates_are_skipped(self):
+        assert "mem0" in unsupported_reason({"memory": [{"name": "m", "type": "mem0"}]})
+        template = {"id": "t", "type": "template", "config": {"template": "{{ input | fromjson }}"}}
+        assert "JSON" in unsupported_reason({"graph": {"nodes": [template]}})
+
+    def test_suite_covers_requested_shapes(self):
+        assert set(SYNTHETIC_SUITE) == {
+            "wide_dag", "deep_chain", "nested_cycles", "map_fanout", "tree_fanout", "subgraph_heavy",
+        }
+
+    def test_synthetic_graph_runs_through_mock(self, tmp_path):
+        path = tmp_path / "map.yaml"
+        path.write_text(yaml.safe_dump(map_fanout(units=4, max_parallel=2)), encoding="utf-8")
+        result = run_design_file(path, measure_memory=False)
+        assert result.status == "ok", result.error
+        assert result.model_calls == 5
+        assert result.nodes_executed == 7
+
+    def test_invalid_design_is_not_an_error(self, tmp_path):
+        design = map_fanout(units=2, max_parallel=1)
+        agent = next(node for node in design["graph"]["nodes"] if node["type"] == "agent")
+        agent["config"]["tooling"] = {"type": "function"}
+        path = tmp_path / "broken.yaml"
+        path.write_text(yaml.safe_dump(design), encoding="utf-8")
+        assert run_design_file(path, measure_memory=False).status == "invalid"
+
+    def test_subgraphs_resolve_against_patched_copy(self, monkeypatch):
+        seen = []
+
+        def _record(path, **kwargs):
+            seen.append((path.parent.resolve(), subgraph_loader._DEFAULT_SUBGRAPH_ROOT))
+            return path
+
+        monkeypatch.setattr("benchmarks.harness.run_design_file", _record)
+        run_instance_suite({"latency": 0}, only=["demo_sub_graph_path"])
+        assert len(seen) == 1
+        copy_root, subgraph_root = seen[0]
+        assert subgraph_root == copy_root
+        assert subgraph_loader._DEFAULT_SUBGRAPH_ROOT != copy_root
+
+    def test_design_output_stays_out_of_working_directory(self, tmp_path, monkeypatch):
+        design_dir = tmp_path / "designs"
+        design_dir.mkdir()
+        path = design_dir / "map.yaml"
+        path.write_text(yaml.safe_dump(map_fanout(units=2, max_parallel=1)), encoding="utf-8")
+        monkeypatch.chdir(tmp_path)
+
+        result = run_design_file(path, measure_memory=False)
+        assert result.status == "ok", result.error
+        assert sorted(entry.name for entry in tmp_path.iterdir()) == ["designs"]
+
+    def test_design_ignoring_cancellation_times_out(self, tmp_path, monkeypatch):
+        release = threading.Event()
+        monkeypatch.setattr(GraphExecutor, "_execute", lambda *args, **kwargs: release.wait(10))
+        monkeypatch.setattr("benchmarks.harness.CANCEL_GRACE_SECONDS", 0.1)
+        path = tmp_path / "map.yaml"
+        path.write_text(yaml.safe_dump(map_fanout(units=2, max_parallel=1)), encoding="utf-8")
+        try:
+            result = run_design_file(path, measure_memory=False, timeout=0.1)
+        finally:
+            release.set()
+        assert result.status == "timeout"
+        assert "ignored cancellation" in result.error
@@ -0,0 +1,120 @@
+"""Tests for the per-node incoming-edge index and trigger state."""
+
+import pytest
+import yaml
+
+from check.check import load_config
+from entity.configs import ConfigError, Node
+from entity.graph_config import GraphConfig
+from runtime.bootstrap.schema import ensure_schema_registry_populated
+from workflow.graph_context import GraphContext
+from workflow.graph_manager import GraphManager
+
+ensure_schema_registry_populated()
+
+
+def _literal(node_id, content):
+    return {"id": node_id, "type": "literal", "config": {"content": content, "role": "user"}}
+
+
+def _edge(source, target, **extra):
+    return {"from": source, "to": target, **extra}
+
+
+def _design(graph_id, nodes, edges, start):
+    graph = {"id": graph_id, "log_level": "ERROR", "start": start, "nodes": nodes, "edges": edges}
+    return {"version": "0.4.0", "vars": {}, "graph": graph}
+
+
+def _node(node_id: str) -> Node:
+    return Node.from_dict({"id": node_id, "type": "passthrough", "config": {}}, path=f"graph.nodes.{node_id}")
+
+
+def _connect(source: Node, target: Node, **edge_config) -> None:
+    source.add_successor(target, edge_config or None)
+    target.add_predecessor(source)
+
+
+def _build(design, tmp_path) -> GraphContext:
+    path = tmp_path / "graph.yaml"
+    path.write_text(yaml.safe_dump(design), encoding="utf-8")
+    loaded = load_config(path)
+    graph_config = GraphConfig.from_definition(
+        loaded.graph, name="edges", output_root=tmp_path, source_path=str(path), vars=loaded.vars
+    )
+    context = GraphContext(config=graph_config)
+    GraphManager(context).build_graph_structure()
+    return context
+
+
+class TestIncomingEdgeIndex:
+
+    def test_index_lists_edges_from_predecessors(self):
+        a, b, c = _node("a"), _node("b"), _node("c")
+        _connect(a, c)
+        _connect(b, c, trigger=False)
+        assert [link.source for link in c.incoming_edges()] == [a, b]
+        assert len(c._trigger_flags) == 1
+
+    def test_trigger_flags_follow_edge_state(self):
+        a, b, c = _node("a"), _node("b"), _node("c")
+        _connect(a, c)
+        _connect(b, c)
+        assert not c.is_triggered()
+        b.find_outgoing_edge("c").triggered = True
+        assert c.is_triggered()
+        assert c._trigger_flags == bytearray([0, 1])
+        c.reset_triggers()
+        assert not c.is_triggered()
+        assert not b.find_outgoing_edge("c").triggered
+
+    def test_non_trigger_edge_never_triggers(self):
+        a, c = _node("a"), _node("c")
+        _connect(a, c, trigger=False)
+        a.find_outgoing_edge("c").triggered = True
+        assert not c.is_triggered()
+        c.reset_triggers()
+        assert not a.find_outgoing_edge("c").triggered
+
+    def test_adding_edge_rebuilds_index_and_keeps_state(self):
+        a, b, c = _node("a"), _node("b"), _node("c")
+        _connect(a, c)
+        a.find_outgoing_edge("c").triggered = True
+        assert c.is_triggered()
+        _connect(b, c)
+        assert c._incoming_edges is None
+        assert c.is_triggered()
+        assert len(c.incoming_edges()) == 2
+
+    def test_dynamic_config_resolved_from_incoming_edges(self):
+        a, c = _node("a"), _node("c")
+        _connect(a, c, dynamic={"type": "map", "split": {"type": "message"}})
+        assert c.incoming_dynamic_config().type == "map"
+        assert a.incoming_dynamic_config() is None
+
+
+class TestGraphBuild:
+
+    def test_build_indexes_every_node(self, tmp_path):
+        design = _design(
+            "edges",
+            [_literal("a", "x"), _literal("b", "y"), _literal("c", "z")],
+            [_edge("a", "c"), _edge("b", "c")],
+            ["a", "b"],
+        )
+        context = _build(design, tmp_path)
+        target = context.nodes["c"]
+        assert target._incoming_edges is not None
+        assert {link.source.id for link in target.incoming_edges()} == {"a", "b"}
+
+    def test_inconsistent_dynamic_configs_rejected(self, tmp_path):
+        first = {"type": "map", "split": {"type": "message"}, "config": {"max_parallel": 2}}
+        second = {"type": "map", "split": {"type": "message"}, "config": {"max_parallel": 4}}
+        design = _design(
+            "edges",
+            [_literal("a", "x"), _literal("b", "y"), _literal("c", "z")],
+            [_edge("a", "c", dynamic=first), _edge("b", "c", dynamic=second)],
+            ["a", "b"],
+        )
+        with pytest.raises(ConfigError, match="max_parallel"):
+            _build(design, tmp_path)
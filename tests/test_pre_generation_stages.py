@@ -0,0 +1,170 @@
+"""Tests for concurrent pre-generation stages of agent nodes."""
+
+import threading
+
+import pytest
+
+from entity.configs import MemoryAttachmentConfig, MemoryStoreConfig, Node
+from entity.enums import AgentExecFlowStage
+from entity.messages import Message, MessageRole
+from runtime.bootstrap.schema import ensure_schema_registry_populated
+from runtime.node.agent import ToolManager
+from runtime.node.agent.memory.blackboard_memory import BlackboardMemory
+from runtime.node.agent.memory.memory_base import MemoryContentSnapshot, MemoryManager, MemoryWritePayload
+from runtime.node.agent.stage_graph import StageGraph
+from runtime.node.agent.thinking.thinking_manager import ThinkingManagerBase
+from runtime.node.executor.agent_executor import AgentNodeExecutor
+from runtime.node.executor.base import ExecutionContext
+from utils.function_manager import FunctionManager
+from utils.log_manager import LogManager
+from utils.logger import WorkflowLogger
+
+ensure_schema_registry_populated()
+
+
+class _BarrierBoard(BlackboardMemory):
+    """Blackboard store whose retrievals meet at a barrier."""
+
+    def __init__(self, name, barrier):
+        store = MemoryStoreConfig.from_dict({"name": name, "type": "blackboard", "config": {}}, path="memory")
+        super().__init__(store)
+        self.barrier = barrier
+        self.update(
+            MemoryWritePayload(
+                agent_role="", inputs_text="", input_snapshot=None,
+                output_snapshot=MemoryContentSnapshot(text=f"note from {name}"),
+            )
+        )
+
+    def retrieve(self, agent_role, query, top_k, similarity_threshold):
+        self.barrier.wait()
+        return super().retrieve(agent_role, query, top_k, similarity_threshold)
+
+
+class _BarrierThinking(ThinkingManagerBase):
+
+    def __init__(self, barrier):
+        self.barrier = barrier
+        self.before_gen_think_enabled = True
+        self.after_gen_think_enabled = False
+        self.thinking_concat_prompt = "{origin}\n\nThinking Result: {thinking}"
+
+    def _before_gen_think(self, agent_invoker, input_payload, agent_role, memory):
+        self.barrier.wait()
+        return "plan first", False
+
+    def _after_gen_think(self, agent_invoker, input_payload, agent_role, memory, gen_payload):
+        return gen_payload.text, False
+
+
+def _attachments(names, stages=None):
+    return [
+        MemoryAttachmentConfig.from_dict({"name": name, "retrieve_stage": stages}, path=f"memories[{idx}]")
+        for idx, name in enumerate(names)
+    ]
+
+
+class TestConcurrentRetrieval:
+
+    def test_manager_queries_stores_concurrently(self):
+        barrier = threading.Barrier(3, timeout=5)
+        stores = {name: _BarrierBoard(name, barrier) for name in ("a", "b", "c")}
+        manager = MemoryManager(_attachments(stores), stores)
+
+        result = manager.retrieve("", MemoryContentSnapshot(text="note"), AgentExecFlowStage.GEN_STAGE)
+        assert not barrier.broken
+        assert sorted(item.content_summary for item in result.items) == ["note from a", "note from b", "note from c"]
+
+    def test_thinking_overlaps_generation_retrieval(self, tmp_path):
+        barrier = threading.Barrier(2, timeout=5)
+        store = _BarrierBoard("board", barrier)
+        node = Node.from_dict(
+            {
+                "id": "writer",
+                "type": "agent",
+                "config": {
+                    "provider": "mock",
+                    "name": "mock-model",
+                    "thinking": {"type": "reflection", "config": {"reflection_prompt": "Reflect."}},
+                    "memories": [{"name": "board", "retrieve_stage": ["gen"]}],
+                },
+            },
+            path="graph.nodes.writer",
+        )
+        captured = []
+        context = ExecutionContext(
+            tool_manager=ToolManager(),
+            function_manager=FunctionManager(tmp_path),
+            log_manager=LogManager(WorkflowLogger("pre-gen-test")),
+            memory_managers={"writer": MemoryManager(_attachments(["board"], ["gen"]), {"board": store})},
+            memory_stores={"board": store},
+            thinking_managers={"writer": _BarrierThinking(barrier)},
+        )
+        executor = AgentNodeExecutor(context)
+        original = executor._invoke_provider
+
+        def _capture(provider, client, conversation, *args, **kwargs):
+            captured.append([message.text_content() for message in conversation])
+            return original(provider, client, conversation, *args, **kwargs)
+
+        executor._invoke_provider = _capture
+        output = executor.execute(node, [Message(role=MessageRole.USER, content="draft the note")])
+
+        assert not output[0].text_content().startswith("Error calling model")
+        assert not barrier.broken
+        # Same layout as the sequential path: memories sit before the thinking result
+        assert "note from board" in captured[0][-2]
+        assert captured[0][-1].endswith("Thinking Result: plan first")
+
+    def test_single_store_runs_inline(self):
+        store = _BarrierBoard("solo", threading.Barrier(1))
+        manager = MemoryManager(_attachments(["solo"]), {"solo": store})
+        result = manager.retrieve("", MemoryContentSnapshot(text="note"), AgentExecFlowStage.GEN_STAGE)
+        assert [item.content_summary for item in result.items] == ["note from solo"]
+
+
+
+class TestStageGraph:
+
+    def test_independent_chains_overlap(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def _meet(value):
+            barrier.wait()
+            return value
+
+        graph = StageGraph()
+        graph.add("left", lambda done: _meet("l"))
+        graph.add("left_next", lambda done: done["left"] + "+", after=("left",))
+        graph.add("right", lambda done: _meet("r"))
+        graph.add("right_next", lambda done: _meet(done["right"] + "+"), after=("right",))
+        graph.add("left_last", lambda done: _meet(done["left_next"] + "!"), after=("left_next",))
+
+        results = graph.run()
+        assert not barrier.broken
+        assert results["left_last"] == "l+!"
+        assert results["right_next"] == "r+"
+        assert set(graph.timing_details()) == {"left", "left_next", "left_last", "right", "right_next"}
+
+    def test_single_chain_runs_inline(self):
+        caller = threading.get_ident()
+        graph = StageGraph()
+        graph.add("first", lambda done: threading.get_ident())
+        graph.add("second", lambda done: threading.get_ident(), after=("first",))
+        assert graph.run() == {"first": caller, "second": caller}
+
+    def test_failure_stops_dependents(self):
+        ran = []
+        graph = StageGraph()
+        graph.add("broken", lambda done: 1 / 0)
+        graph.add("after_broken", lambda done: ran.append("after_broken"), after=("broken",))
+        graph.add("other", lambda done: ran.append("other"))
+        with pytest.raises(ZeroDivisionError):
+            graph.run()
+        assert "after_broken" not in ran
+        assert "broken" in graph.timings
+
+    def test_rejects_unknown_dependency(self):
+        graph = StageGraph()
+        with pytest.raises(ValueError):
+            graph.add("late", lambda done: None, after=("missing",))
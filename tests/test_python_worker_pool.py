@@ -0,0 +1,135 @@
+"""Tests for the warm Python worker pool."""
+
+import socket
+import subprocess
+import sys
+
+import pytest
+
+from entity.configs.node.python_runner import PythonRunnerConfig
+from functions.function_calling.code_executor import execute_code
+from utils.python_worker_pool import (
+    PythonWorkerPool,
+    WorkerUnavailable,
+    _Worker,
+    pool_supported,
+    script_command,
+)
+
+pytestmark = pytest.mark.skipif(not pool_supported(), reason="worker pool needs fork and fd passing")
+
+
+@pytest.fixture
+def pool():
+    pool = PythonWorkerPool(sys.executable, ("json",), max_workers=1)
+    yield pool
+    pool.close()
+
+
+def _script(tmp_path, body: str, name: str = "script.py"):
+    path = tmp_path / name
+    path.write_text(body, encoding="utf-8")
+    return path
+
+
+class TestPythonWorkerPool:
+
+    def test_runs_are_isolated_and_reuse_worker(self, pool, tmp_path):
+        script = _script(
+            tmp_path,
+            "import os, sys\n"
+            "counter = globals().setdefault('counter', 0) + 1\n"
+            "print(counter, os.environ['RUN'], os.getcwd(), 'json' in sys.modules)\n"
+            "print('warn', file=sys.stderr)\n"
+            "sys.exit(3)\n",
+        )
+        first = pool.run(script, cwd=tmp_path, env={"RUN": "a"})
+        worker = pool._idle[0]
+        second = pool.run(script, cwd=tmp_path, env={"RUN": "b"})
+
+        assert first.returncode == 3 and first.stderr == "warn\n"
+        assert first.stdout == f"1 a {tmp_path} True\n"
+        assert second.stdout == f"1 b {tmp_path} True\n"
+        assert pool._idle == [worker]
+
+    def test_timeout_kills_run_and_streams_output(self, pool, tmp_path):
+        script = _script(tmp_path, "import time\nprint('started', flush=True)\ntime.sleep(30)\n")
+        chunks = []
+        result = pool.run(script, cwd=tmp_path, timeout=1, on_output=lambda stream, text: chunks.append((stream, text)))
+
+        assert result.timed_out
+        assert result.stdout == "started\n"
+        assert chunks == [("stdout", "started\n")]
+        assert pool.run(_script(tmp_path, "print('ok')\n", "ok.py"), cwd=tmp_path).stdout == "ok\n"
+
+    def test_lost_exit_frame_after_timeout_retires_worker(self, pool, tmp_path, monkeypatch):
+        receive = _Worker.receive
+        timed_out = []
+
+        def flaky_receive(worker, timeout):
+            # Once the run has timed out, lose the exit frame as well
+            if timed_out:
+                raise socket.timeout("timed out")
+            try:
+                return receive(worker, timeout)
+            except socket.timeout:
+                timed_out.append(True)
+                raise
+
+        monkeypatch.setattr(_Worker, "receive", flaky_receive)
+        result = pool.run(_script(tmp_path, "import time\ntime.sleep(30)\n"), cwd=tmp_path, timeout=1)
+
+        assert result.timed_out and result.returncode is None
+        assert pool._idle == []
+
+    def test_memory_limit(self, pool, tmp_path):
+        script = _script(tmp_path, "data = bytearray(512 * 1024 * 1024)\n")
+        result = pool.run(script, cwd=tmp_path, memory_limit_bytes=256 * 1024 * 1024)
+        assert result.returncode == 1
+        assert result.stderr.splitlines()[-1] == "MemoryError"
+
+    def test_fresh_interpreter_limit_set_before_script(self, tmp_path):
+        pytest.importorskip("resource")
+        script = _script(
+            tmp_path,
+            "import sys\n"
+            "print(sys.argv, __name__)\n"
+            "data = bytearray(512 * 1024 * 1024)\n",
+        )
+        completed = subprocess.run(
+            [sys.executable, *script_command(script, 256 * 1024 * 1024), "arg"],
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        assert completed.returncode == 1
+        assert completed.stdout == f"{[str(script), 'arg']} __main__\n"
+        assert completed.stderr.splitlines()[-1] == "MemoryError"
+        assert "runpy" not in completed.stderr
+        assert script_command(script, None) == [str(script)]
+
+    def test_busy_or_missing_interpreter_is_unavailable(self, tmp_path):
+        missing = PythonWorkerPool(str(tmp_path / "no-python"))
+        with pytest.raises(WorkerUnavailable):
+            missing.run(_script(tmp_path, "pass\n"), cwd=tmp_path)
+
+        busy = PythonWorkerPool(sys.executable, max_workers=1)
+        busy._slots.acquire()
+        with pytest.raises(WorkerUnavailable):
+            busy.run(_script(tmp_path, "pass\n"), cwd=tmp_path)
+
+
+class TestWorkerPoolConfig:
+
+    def test_python_runner_fields(self):
+        config = PythonRunnerConfig.from_dict(
+            {"worker_pool": True, "preload_modules": ["numpy"], "memory_limit_mb": 512}, path="node.config"
+        )
+        assert config.worker_pool and config.preload_modules == ["numpy"] and config.memory_limit_mb == 512
+        assert PythonRunnerConfig.from_dict({}, path="node.config").worker_pool is False
+
+    def test_execute_code_uses_pool_when_enabled(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("TEMP_CODE_DIR", str(tmp_path))
+        monkeypatch.setenv("CODE_EXECUTOR_WORKER_POOL", "1")
+        assert execute_code("print(6 * 7)") == "42\n"
+        assert execute_code("import time\ntime.sleep(5)", time_out=1).endswith("timed out after 1 seconds.")
@@ -0,0 +1,290 @@
+"""Unit tests for server.services.session_backend and the store write-through."""
+
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+from server.services.session_backend import (
+    InMemorySessionBackend,
+    SessionBackend,
+    SqliteSessionBackend,
+    create_session_backend,
+)
+from server.services.session_store import SessionStatus, WorkflowSessionStore
+from server.services.websocket_manager import WebSocketManager
+
+
+@pytest.fixture()
+def sqlite_backend(tmp_path):
+    return SqliteSessionBackend(tmp_path / "sessions.db", max_events=3)
+
+
+def test_session_backend_is_abstract():
+    with pytest.raises(TypeError):
+        SessionBackend()
+
+
+class TestSqliteSessionBackend:
+
+    def test_record_roundtrip(self, sqlite_backend):
+        sqlite_backend.save_record("s1", {"session_id": "s1", "status": "running"})
+        sqlite_backend.save_record("s1", {"session_id": "s1", "status": "completed"})
+        assert sqlite_backend.load_record("s1")["status"] == "completed"
+        assert list(sqlite_backend.list_records()) == ["s1"]
+
+    def test_events_are_read_after_cursor_and_trimmed(self, sqlite_backend):
+        for idx in range(5):
+            sqlite_backend.append_event("s1", {"type": "log", "idx": idx})
+        sqlite_backend.append_event("s2", {"type": "log", "idx": 99})
+
+        events, cursor = sqlite_backend.read_events("s1")
+        assert [event["idx"] for event in events] == [2, 3, 4]
+
+        sqlite_backend.append_event("s1", {"type": "log", "idx": 5})
+        newer, _ = sqlite_backend.read_events("s1", cursor)
+        assert [event["idx"] for event in newer] == [5]
+
+    def test_delete_removes_events(self, sqlite_backend):
+        sqlite_backend.save_record("s1", {"session_id": "s1"})
+        sqlite_backend.append_event("s1", {"type": "log"})
+        sqlite_backend.delete("s1")
+        assert sqlite_backend.load_record("s1") is None
+        assert sqlite_backend.read_events("s1") == ([], 0)
+
+
+    def test_connection_owner_keeps_newer_claim(self, sqlite_backend):
+        sqlite_backend.set_connection_owner("s1", 100)
+        sqlite_backend.set_connection_owner("s1", 200)
+        sqlite_backend.clear_connection_owner("s1", 100)
+        assert sqlite_backend.connection_owner("s1") == 200
+        sqlite_backend.clear_connection_owner("s1", 200)
+        assert sqlite_backend.connection_owner("s1") is None
+
+    def test_commands_are_taken_once_in_order(self, sqlite_backend):
+        sqlite_backend.post_command(100, "s1", {"type": "cancel"})
+        sqlite_backend.post_command(200, "s2", {"type": "cancel"})
+        sqlite_backend.post_command(100, "s3", {"type": "human_input", "data": {"input": "hi"}})
+        assert sqlite_backend.take_commands(100) == [
+            ("s1", {"type": "cancel"}),
+            ("s3", {"type": "human_input", "data": {"input": "hi"}}),
+        ]
+        assert sqlite_backend.take_commands(100) == []
+        assert sqlite_backend.take_commands(200) == [("s2", {"type": "cancel"})]
+
+    def test_wake_reaches_worker_socket(self, sqlite_backend):
+        sock = sqlite_backend.open_wake_socket(4242)
+        try:
+            sqlite_backend.wake(4242)
+            assert sock.recv(64) == b"\0"
+        finally:
+            sock.close()
+        # Nobody listening is not an error
+        sqlite_backend.wake(4343)
+
+
+class TestStoreWithSharedBackend:
+
+    def test_other_worker_sees_session_and_events(self, sqlite_backend):
+        owner = WorkflowSessionStore(backend=sqlite_backend)
+        observer = WorkflowSessionStore(backend=sqlite_backend)
+        owner.create_session(yaml_file="w.yaml", task_prompt="p", session_id="s1")
+        owner.update_session_status("s1", SessionStatus.RUNNING)
+        owner.append_message("s1", {"type": "node_started"})
+        assert owner.flush_events(timeout=5)
+
+        assert observer.has_session("s1")
+        assert not observer.is_local("s1")
+        assert observer.get_session_info("s1")["status"] == "running"
+        events, _ = observer.read_events("s1")
+        assert events == [{"type": "node_started"}]
+
+    def test_orphaned_session_reports_error(self, sqlite_backend):
+        sqlite_backend.save_record(
+            "s1",
+            {"session_id": "s1", "status": "running", "owner_pid": 2**22 + 12345},
+        )
+        store = WorkflowSessionStore(backend=sqlite_backend)
+        info = store.get_session_info("s1")
+        assert info["status"] == "error"
+        assert "worker" in info["error_message"]
+
+    def test_pop_deletes_from_backend(self, sqlite_backend):
+        store = WorkflowSessionStore(backend=sqlite_backend)
+        store.create_session(yaml_file="w.yaml", task_prompt="p", session_id="s1")
+        store.append_message("s1", {"type": "log"})
+        store.pop_session("s1")
+        assert store.flush_events(timeout=5)
+        assert sqlite_backend.load_record("s1") is None
+        assert sqlite_backend.read_events("s1") == ([], 0)
+
+    def test_events_are_published_off_the_calling_thread(self, sqlite_backend, monkeypatch):
+        store = WorkflowSessionStore(backend=sqlite_backend)
+        store.create_session(yaml_file="w.yaml", task_prompt="p", session_id="s1")
+        caller = threading.get_ident()
+        writers = []
+        original = sqlite_backend.append_event
+
+        def _recording_append(session_id, message):
+            writers.append(threading.get_ident())
+            return original(session_id, message)
+
+        monkeypatch.setattr(sqlite_backend, "append_event", _recording_append)
+        for idx in range(3):
+            store.append_message("s1", {"type": "log", "idx": idx})
+        assert store.flush_events(timeout=5)
+
+        assert writers and caller not in writers
+        events, _ = sqlite_backend.read_events("s1")
+        assert [event["idx"] for event in events] == [0, 1, 2]
+
+    def test_status_updates_are_written_off_the_calling_thread(self, sqlite_backend, monkeypatch):
+        caller = threading.get_ident()
+        writers = []
+        original = sqlite_backend.save_record
+
+        def _recording_save(session_id, record):
+            writers.append(threading.get_ident())
+            return original(session_id, record)
+
+        monkeypatch.setattr(sqlite_backend, "save_record", _recording_save)
+        store = WorkflowSessionStore(backend=sqlite_backend)
+        store.create_session(yaml_file="w.yaml", task_prompt="p", session_id="s1")
+        store.update_session_status("s1", SessionStatus.RUNNING)
+        store.set_session_error("s1", "boom")
+        assert store.flush_events(timeout=5)
+
+        assert len(writers) == 3 and caller not in writers
+        record = sqlite_backend.load_record("s1")
+        assert record["status"] == "error" and record["error_message"] == "boom"
+
+    def test_published_events_wake_the_relaying_worker(self, sqlite_backend):
+        sqlite_backend.set_connection_owner("s1", 4242)
+        sock = sqlite_backend.open_wake_socket(4242)
+        try:
+            store = WorkflowSessionStore(backend=sqlite_backend)
+            store.create_session(yaml_file="w.yaml", task_prompt="p", session_id="s1")
+            store.append_message("s1", {"type": "log"})
+            assert store.flush_events(timeout=5)
+            assert sock.recv(64) == b"\0"
+        finally:
+            sock.close()
+
+    def test_prune_removes_old_finished_sessions(self, sqlite_backend):
+        old = 1000.0
+        sqlite_backend.save_record("done", {"session_id": "done", "status": "completed", "updated_at": old})
+        sqlite_backend.append_event("done", {"type": "log"})
+        sqlite_backend.save_record(
+            "orphan", {"session_id": "orphan", "status": "running", "owner_pid": 2**22 + 12345, "updated_at": old}
+        )
+        store = WorkflowSessionStore(backend=sqlite_backend, retention_seconds=60)
+        store.create_session(yaml_file="w.yaml", task_prompt="p", session_id="live")
+        sqlite_backend.save_record("recent", {"session_id": "recent", "status": "completed", "updated_at": time.time()})
+
+        assert store.flush_events(timeout=5)
+        store.prune_finished_sessions()
+        assert sorted(sqlite_backend.list_records()) == ["live", "recent"]
+        assert sqlite_backend.read_events("done") == ([], 0)
+
+    def test_connections_are_closed(self, sqlite_backend, monkeypatch):
+        import sqlite3
+
+        opened = []
+        original = sqlite3.connect
+
+        def _tracking_connect(*args, **kwargs):
+            connection = original(*args, **kwargs)
+            opened.append(connection)
+            return connection
+
+        monkeypatch.setattr(sqlite3, "connect", _tracking_connect)
+        sqlite_backend.save_record("s1", {"session_id": "s1"})
+        sqlite_backend.load_record("s1")
+        with pytest.raises(sqlite3.ProgrammingError):
+            opened[0].execute("SELECT 1")
+        assert len(opened) == 2
+
+
+class TestForwarding:
+    """Another live process (the test runner's parent) stands in for the owning worker."""
+
+    def test_execute_is_forwarded_to_socket_owner(self, sqlite_backend):
+        sqlite_backend.set_connection_owner("s1", os.getppid())
+        manager = WebSocketManager(session_store=WorkflowSessionStore(backend=sqlite_backend))
+        command = {"type": "execute", "yaml_file": "w.yaml", "task_prompt": "p", "attachments": []}
+
+        assert asyncio.run(manager.forward_to_connection("s1", command))
+        assert sqlite_backend.take_commands(os.getppid()) == [("s1", command)]
+
+    def test_dead_socket_owner_is_not_targeted(self, sqlite_backend):
+        sqlite_backend.set_connection_owner("s1", 2**22 + 12345)
+        manager = WebSocketManager(session_store=WorkflowSessionStore(backend=sqlite_backend))
+        assert not asyncio.run(manager.forward_to_connection("s1", {"type": "execute"}))
+
+    def test_human_input_is_forwarded_to_run_owner(self, sqlite_backend):
+        sqlite_backend.save_record(
+            "s1", {"session_id": "s1", "status": "waiting_for_input", "owner_pid": os.getppid()}
+        )
+        manager = WebSocketManager(session_store=WorkflowSessionStore(backend=sqlite_backend))
+        message = {"type": "human_input", "data": {"input": "yes"}}
+
+        asyncio.run(manager.message_handler.handle_message("s1", message, manager))
+        assert sqlite_backend.take_commands(os.getppid()) == [("s1", message)]
+
+    def test_forwarded_cancel_is_applied_by_owner(self, sqlite_backend):
+        store = WorkflowSessionStore(backend=sqlite_backend)
+        store.create_session(yaml_file="w.yaml", task_prompt="p", session_id="s1")
+        store.update_session_status("s1", SessionStatus.RUNNING)
+        manager = WebSocketManager(session_store=store)
+
+        asyncio.run(manager.apply_command("s1", {"type": "cancel"}))
+        session = store.get_session("s1")
+        assert session.cancel_event.is_set()
+        assert session.status is SessionStatus.CANCELLED
+
+    def test_forwarded_command_is_applied_without_waiting_for_a_poll(self, sqlite_backend, monkeypatch):
+        monkeypatch.setattr(WebSocketManager, "RELAY_INTERVAL_SECONDS", 30.0)
+        manager = WebSocketManager(session_store=WorkflowSessionStore(backend=sqlite_backend))
+        sender = WorkflowSessionStore(backend=sqlite_backend)
+
+        async def _scenario():
+            applied = asyncio.Event()
+
+            async def _apply(session_id, command):
+                applied.set()
+
+            manager.apply_command = _apply
+            manager._start_commands()
+            await asyncio.sleep(0)
+            await asyncio.to_thread(sender.forward_command, os.getpid(), "s1", {"type": "cancel"})
+            await asyncio.wait_for(applied.wait(), 5)
+
+        started = time.perf_counter()
+        asyncio.run(_scenario())
+        assert time.perf_counter() - started < 5
+
+    def test_in_memory_backend_never_forwards(self):
+        manager = WebSocketManager(session_store=WorkflowSessionStore(backend=InMemorySessionBackend()))
+        assert not asyncio.run(manager.forward_to_connection("s1", {"type": "execute"}))
+        assert not asyncio.run(manager.forward_to_run_owner("s1", {"type": "cancel"}))
+
+
+class TestBackendSelection:
+
+    def test_default_is_in_memory(self, monkeypatch):
+        monkeypatch.delenv("SESSION_STORE_BACKEND", raising=False)
+        backend = create_session_backend()
+        assert isinstance(backend, InMemorySessionBackend)
+        assert backend.shared is False
+
+    def test_sqlite_from_env(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("SESSION_STORE_BACKEND", "sqlite")
+        monkeypatch.setenv("SESSION_DB_PATH", str(tmp_path / "s.db"))
+        assert isinstance(create_session_backend(), SqliteSessionBackend)
+
+    def test_unknown_backend_rejected(self, monkeypatch):
+        monkeypatch.setenv("SESSION_STORE_BACKEND", "redis")
+        with pytest.raises(ValueError):
+            create_session_backend()
@@ -0,0 +1,259 @@
+"""Unit tests for server.services.session_execution."""
+
+import asyncio
+import contextvars
+import threading
+import time
+
+import pytest
+
+from server.services.session_execution import SessionExecutionController
+from server.services.session_store import SessionStatus, WorkflowSessionStore
+from utils.exceptions import TimeoutError as CustomTimeoutError, ValidationError, WorkflowCancelledError
+
+
+def _make_controller() -> SessionExecutionController:
+    store = WorkflowSessionStore()
+    store.create_session(yaml_file="w.yaml", task_prompt="p", session_id="s1")
+    return SessionExecutionController(store)
+
+
+def _wait_in_thread(controller, timeout=5.0):
+    outcome = {}
+
+    def worker():
+        try:
+            outcome["result"] = controller.wait_for_human_input("s1", timeout=timeout)
+        except Exception as exc:
+            outcome["error"] = exc
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    return thread, outcome
+
+
+def _race_provide_and_cancel(controller):
+    errors = []
+    barrier = threading.Barrier(2)
+
+    def provide():
+        barrier.wait()
+        try:
+            controller.provide_human_input("s1", {"text": "ok"})
+        except ValidationError:
+            pass
+        except Exception as exc:
+            errors.append(exc)
+
+    def cancel():
+        barrier.wait()
+        try:
+            controller.cancel_pending_input("s1")
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=provide), threading.Thread(target=cancel)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=2)
+    return errors
+
+
+class TestHumanInputWait:
+
+    def test_provided_input_is_returned(self):
+        controller = _make_controller()
+        controller.set_waiting_for_input("s1", "review", {"input": "draft"})
+        session = controller.store.get_session("s1")
+        assert session.status == SessionStatus.WAITING_FOR_INPUT
+
+        thread, outcome = _wait_in_thread(controller)
+        controller.provide_human_input("s1", {"text": "ok", "attachments": []})
+        thread.join(timeout=2)
+
+        assert outcome["result"] == {"text": "ok", "attachments": []}
+        assert session.waiting_for_input is False
+        assert session.human_input_future is None
+
+    def test_cancel_wakes_waiter_immediately(self):
+        controller = _make_controller()
+        controller.set_waiting_for_input("s1", "review", {})
+
+        thread, outcome = _wait_in_thread(controller, timeout=60.0)
+        time.sleep(0.05)
+        started = time.monotonic()
+        assert controller.cancel_pending_input("s1", "stop") is True
+        thread.join(timeout=2)
+
+        assert not thread.is_alive()
+        assert time.monotonic() - started < 1.0
+        assert isinstance(outcome["error"], WorkflowCancelledError)
+
+    def test_cancel_event_set_before_wait(self):
+        controller = _make_controller()
+        controller.set_waiting_for_input("s1", "review", {})
+        controller.store.get_session("s1").cancel_event.set()
+
+        with pytest.raises(WorkflowCancelledError):
+            controller.wait_for_human_input("s1", timeout=5.0)
+
+    def test_timeout(self):
+        controller = _make_controller()
+        controller.set_waiting_for_input("s1", "review", {})
+
+        with pytest.raises(CustomTimeoutError):
+            controller.wait_for_human_input("s1", timeout=0.05)
+
+    def test_provide_after_cancel_is_rejected(self):
+        controller = _make_controller()
+        controller.set_waiting_for_input("s1", "review", {})
+        controller.cancel_pending_input("s1")
+
+        with pytest.raises(ValidationError):
+            controller.provide_human_input("s1", {"text": "late"})
+
+    def test_concurrent_provide_and_cancel_resolve_once(self):
+        for _ in range(50):
+            controller = _make_controller()
+            controller.set_waiting_for_input("s1", "review", {})
+            future = controller.store.get_session("s1").human_input_future
+            errors = _race_provide_and_cancel(controller)
+            assert errors == []
+            assert future.done()
+
+    def test_snapshot_exposes_pending_prompt(self):
+        controller = _make_controller()
+        controller.set_waiting_for_input("s1", "review", {"input": "draft"})
+
+        snapshot = controller.store.get_session_snapshot("s1")
+        assert snapshot["waiting_for_input"] is True
+        assert snapshot["pending_input"] == {"input": "draft"}
+
+
+class TestRunPool:
+
+    def _limit_runs(self, monkeypatch, limit):
+        from server.services import websocket_executor
+        from server.services.run_slots import RunSlots
+
+        monkeypatch.setattr(websocket_executor, "_run_slots", RunSlots(limit))
+        return websocket_executor
+
+    def test_runs_beyond_the_cap_wait_for_a_free_slot(self, monkeypatch):
+        websocket_executor = self._limit_runs(monkeypatch, 1)
+        release = threading.Event()
+        started = []
+
+        class _Run:
+            def __init__(self, name):
+                self.name = name
+
+            def _execute(self, task_prompt):
+                started.append(self.name)
+                release.wait(5)
+
+        async def scenario():
+            first = asyncio.create_task(websocket_executor.WebSocketGraphExecutor.execute_graph_async(_Run("a"), "p"))
+            second = asyncio.create_task(websocket_executor.WebSocketGraphExecutor.execute_graph_async(_Run("b"), "p"))
+            await asyncio.sleep(0.2)
+            assert started == ["a"]
+            release.set()
+            await asyncio.gather(first, second)
+
+        asyncio.run(scenario())
+        assert started == ["a", "b"]
+
+    def test_run_waiting_for_input_frees_its_slot(self, monkeypatch):
+        websocket_executor = self._limit_runs(monkeypatch, 1)
+        controller = _make_controller()
+        controller.set_waiting_for_input("s1", "review", {"input": "draft"})
+        second_done = threading.Event()
+        events = []
+
+        class _Waiting:
+            def _execute(self, task_prompt):
+                events.append("a waits")
+                events.append(f"a got {controller.wait_for_human_input('s1', timeout=5)['text']}")
+
+        class _Other:
+            def _execute(self, task_prompt):
+                events.append("b runs")
+                second_done.set()
+
+        async def scenario():
+            first = asyncio.create_task(websocket_executor.WebSocketGraphExecutor.execute_graph_async(_Waiting(), "p"))
+            await asyncio.sleep(0.1)
+            second = asyncio.create_task(websocket_executor.WebSocketGraphExecutor.execute_graph_async(_Other(), "p"))
+            assert await asyncio.to_thread(second_done.wait, 5)
+            controller.provide_human_input("s1", {"text": "ok"})
+            await asyncio.gather(first, second)
+
+        asyncio.run(scenario())
+        assert events == ["a waits", "b runs", "a got ok"]
+
+    def test_parked_runs_do_not_hold_back_queued_runs(self, monkeypatch):
+        websocket_executor = self._limit_runs(monkeypatch, 1)
+        controllers = [_make_controller() for _ in range(3)]
+        for controller in controllers:
+            controller.set_waiting_for_input("s1", "review", {"input": "draft"})
+        finished = []
+
+        class _Waiting:
+            def __init__(self, controller):
+                self.controller = controller
+
+            def _execute(self, task_prompt):
+                finished.append(self.controller.wait_for_human_input("s1", timeout=5)["text"])
+
+        class _Other:
+            def _execute(self, task_prompt):
+                finished.append("other")
+
+        async def scenario():
+            waiting = [
+                asyncio.create_task(websocket_executor.WebSocketGraphExecutor.execute_graph_async(_Waiting(c), "p"))
+                for c in controllers
+            ]
+            await asyncio.wait_for(websocket_executor.WebSocketGraphExecutor.execute_graph_async(_Other(), "p"), 5)
+            for controller in controllers:
+                controller.provide_human_input("s1", {"text": "ok"})
+            await asyncio.gather(*waiting)
+
+        asyncio.run(scenario())
+        assert finished == ["other", "ok", "ok", "ok"]
+
+    def test_slot_is_retaken_after_the_last_park_of_a_run(self):
+        from server.services.run_slots import RunSlots, parked
+
+        slots = RunSlots(1)
+        first_parked = threading.Event()
+        second_parked = threading.Event()
+        release_first = threading.Event()
+        release_second = threading.Event()
+        observed = []
+
+        def wait(parked_event, release_event):
+            with parked():
+                parked_event.set()
+                release_event.wait(5)
+
+        def run():
+            context = contextvars.copy_context()
+            other = threading.Thread(target=context.run, args=(wait, second_parked, release_second))
+            other.start()
+            wait(first_parked, release_first)
+            observed.append(slots.executing)
+            other.join()
+            observed.append(slots.executing)
+
+        future = slots.submit(run)
+        assert first_parked.wait(5) and second_parked.wait(5)
+        assert slots.executing == 0
+        release_first.set()
+        time.sleep(0.1)
+        assert observed == [0]
+        release_second.set()
+        future.result(5)
+        assert observed == [0, 1]
+        assert slots.executing == 0
@@ -0,0 +1,138 @@
+"""Tests for prefetching successor node setup."""
+
+import threading
+
+import yaml
+
+from check.check import load_config
+from entity.configs import Node
+from entity.graph_config import GraphConfig
+from entity.messages import Message, MessageRole
+from runtime.bootstrap.schema import ensure_schema_registry_populated
+from runtime.node.agent import ToolManager
+from runtime.node.agent.providers.mock_provider import MockProvider
+from runtime.node.executor.agent_executor import AgentNodeExecutor
+from runtime.node.executor.base import ExecutionContext, NodeExecutor
+from utils.function_manager import FunctionManager
+from utils.log_manager import LogManager
+from utils.logger import WorkflowLogger
+from workflow.executor.setup_prefetcher import SetupPrefetcher
+from workflow.graph import GraphExecutor
+from workflow.graph_context import GraphContext
+
+ensure_schema_registry_populated()
+
+
+def _chain_design(depth, params):
+    nodes = [
+        {
+            "id": f"step_{idx}",
+            "type": "agent",
+            "config": {"provider": "mock", "name": "mock-model", "role": "You are a step.", "params": dict(params)},
+        }
+        for idx in range(depth)
+    ]
+    edges = [{"from": f"step_{idx}", "to": f"step_{idx + 1}"} for idx in range(depth - 1)]
+    graph = {"id": "chain", "log_level": "ERROR", "start": ["step_0"], "nodes": nodes, "edges": edges}
+    return {"version": "0.4.0", "vars": {}, "graph": graph}
+
+
+class _GatedExecutor(NodeExecutor):
+    """Executor whose prefetch blocks until released."""
+
+    def __init__(self):
+        super().__init__(context=None)
+        self.release = threading.Event()
+        self.started = []
+
+    def execute(self, node, inputs):
+        return []
+
+    def prefetch(self, node):
+        self.started.append(node.id)
+        self.release.wait(5)
+
+
+def _node(node_id):
+    return Node.from_dict({"id": node_id, "type": "passthrough", "config": {}}, path=f"graph.nodes.{node_id}")
+
+
+def _log_manager():
+    return LogManager(WorkflowLogger("prefetch-test"))
+
+
+class TestSetupPrefetcher:
+
+    def test_budget_drops_excess_and_cancel_skips_queued(self):
+        executor = _GatedExecutor()
+        prefetcher = SetupPrefetcher(lambda node: executor, _log_manager(), max_workers=1, max_pending=2)
+        prefetcher.schedule([_node("a"), _node("b"), _node("c")])
+
+        prefetcher.cancel("b")
+        executor.release.set()
+        prefetcher.claim("a")
+        prefetcher.close()
+        assert executor.started == ["a"]
+
+    def test_claim_waits_for_running_prefetch(self):
+        executor = _GatedExecutor()
+        prefetcher = SetupPrefetcher(lambda node: executor, _log_manager())
+        prefetcher.schedule([_node("a")])
+        threading.Timer(0.05, executor.release.set).start()
+
+        prefetcher.claim("a")
+        assert executor.release.is_set()
+        prefetcher.close()
+
+    def test_executors_without_prefetch_are_skipped(self):
+        class _Plain(NodeExecutor):
+            def execute(self, node, inputs):
+                return []
+
+        prefetcher = SetupPrefetcher(lambda node: _Plain(None), _log_manager())
+        prefetcher.schedule([_node("a")])
+        assert prefetcher._futures == {}
+
+
+class TestAgentPrefetch:
+
+    def test_plan_and_client_reused_by_execute(self, tmp_path, monkeypatch):
+        created = []
+        monkeypatch.setattr(MockProvider, "create_client", lambda self: created.append(1) or object())
+        node = Node.from_dict(
+            {"id": "writer", "type": "agent", "config": {"provider": "mock", "name": "mock-model"}},
+            path="graph.nodes.writer",
+        )
+        executor = AgentNodeExecutor(
+            ExecutionContext(
+                tool_manager=ToolManager(),
+                function_manager=FunctionManager(tmp_path),
+                log_manager=_log_manager(),
+            )
+        )
+
+        executor.prefetch(node)
+        assert "writer" in executor._plans and len(created) == 1
+        for _ in range(2):
+            executor.execute(node, [Message(role=MessageRole.USER, content="go")])
+        assert len(created) == 1
+
+    def test_chain_successors_prefetched_in_background(self, tmp_path, monkeypatch):
+        prefetched = {}
+        original = AgentNodeExecutor.prefetch
+
+        def _record(self, node):
+            prefetched[node.id] = threading.current_thread().name
+            original(self, node)
+
+        monkeypatch.setattr(AgentNodeExecutor, "prefetch", _record)
+        path = tmp_path / "chain.yaml"
+        path.write_text(yaml.safe_dump(_chain_design(4, {"latency": 0.02})), encoding="utf-8")
+        loaded = load_config(path)
+        graph_config = GraphConfig.from_definition(
+            loaded.graph, name="chain", output_root=tmp_path, source_path=str(path), vars=loaded.vars
+        )
+        GraphExecutor.execute_graph(GraphContext(config=graph_config), "go")
+
+        assert sorted(prefetched) == ["step_1", "step_2", "step_3"]
+        assert all(name.startswith("prefetch") for name in prefetched.values())
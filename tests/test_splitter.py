@@ -0,0 +1,116 @@
+"""Tests for the lazy dynamic-edge splitters."""
+
+import json
+
+import pytest
+
+from entity.configs import Node
+from entity.configs.edge.dynamic_edge_config import DynamicEdgeConfig
+from entity.messages import Message, MessageRole
+from runtime.bootstrap.schema import ensure_schema_registry_populated
+from runtime.node.splitter import JsonPathSplitter, RegexSplitter, _JsonSpanScanner
+from utils.log_manager import LogManager
+from utils.logger import WorkflowLogger
+from workflow.executor.dynamic_edge_executor import DynamicEdgeExecutor
+
+ensure_schema_registry_populated()
+
+
+def _message(text: str) -> Message:
+    return Message(role=MessageRole.USER, content=text, metadata={"origin": "test"})
+
+
+def _split(splitter, text):
+    return [unit[0].text_content() for unit in splitter.split([_message(text)])]
+
+
+class TestJsonPathSplitter:
+
+    def test_items_keep_original_text(self):
+        text = '{"skip": {"x": "]"}, "items": [{"k":  1}, "a\\"b", 2.0, true, [1,2]], "tail": 1}'
+        assert _split(JsonPathSplitter("items"), text) == ['{"k":  1}', 'a"b', "2.0", "True", "[1,2]"]
+
+    def test_nested_path_and_index(self):
+        text = json.dumps({"data": {"results": [[0], ["x", "y"]]}})
+        assert _split(JsonPathSplitter("data.results.1"), text) == ["x", "y"]
+
+    def test_non_array_target_is_one_unit(self):
+        assert _split(JsonPathSplitter("item"), '{"item": {"a": 1}}') == ['{"a": 1}']
+
+    def test_missing_path_passes_message_through(self):
+        assert _split(JsonPathSplitter("items"), '{"other": [1]}') == ['{"other": [1]}']
+
+    @pytest.mark.parametrize("text", ["1. first item", "[Note] see below", "plain text", ""])
+    def test_non_json_is_single_unit(self, text):
+        assert _split(JsonPathSplitter("items"), text) == [text]
+
+    @pytest.mark.parametrize("text", ['{"items": [1, 2, oops]}', '{"items": [1, {"a" 2}, 3]}'])
+    def test_malformed_item_is_single_unit(self, text):
+        assert _split(JsonPathSplitter("items"), text) == [text]
+
+    def test_container_items_are_parsed_once(self, monkeypatch):
+        decoded = []
+        decode = _JsonSpanScanner.decode_value
+        monkeypatch.setattr(
+            _JsonSpanScanner, "decode_value", lambda scanner, pos: decoded.append(pos) or decode(scanner, pos)
+        )
+        text = '{"items": [{"a": 1}, [2], "s"]}'
+        assert _split(JsonPathSplitter("items"), text) == ['{"a": 1}', "[2]", "s"]
+        assert sorted(decoded) == [text.index("{", 1), text.index("[2"), text.index('"s"'), text.index('"s"')]
+
+    def test_duplicate_keys_resolve_to_last(self):
+        assert _split(JsonPathSplitter("items"), '{"items": [1, 2], "items": [3]}') == ["3"]
+        assert _split(JsonPathSplitter("items"), '{"items": {"a" 1}, "items": [3]}') == ['{"items": {"a" 1}, "items": [3]}']
+
+    @pytest.mark.parametrize(
+        "text",
+        ['{"x": 1, "items": [1], }', '{"items": [1, 2]} trailing', '{"items": [1]}}', '[[1, 2], [3] x]'],
+    )
+    def test_malformed_outside_the_array_passes_through(self, text):
+        path = "1" if text.startswith("[") else "items"
+        assert _split(JsonPathSplitter(path), text) == [text]
+
+    def test_metadata_is_tagged(self):
+        unit = JsonPathSplitter("items").split([_message('{"items": [1]}')])[0][0]
+        assert unit.metadata == {"origin": "test", "split_source": "json_path"}
+
+
+class TestRegexSplitter:
+
+    def test_matches_are_lazy(self):
+        units = RegexSplitter(r"\d+").iter_units([_message("a1 b22 c333")])
+        assert next(units)[0].text_content() == "1"
+        assert [unit[0].text_content() for unit in units] == ["22", "333"]
+
+    def test_no_match_passes_message(self):
+        assert _split(RegexSplitter(r"\d+"), "none") == ["none"]
+
+
+class TestLazyMapScheduling:
+
+    def test_units_pulled_only_when_workers_free(self):
+        pulled = []
+
+        def units():
+            for idx in range(6):
+                pulled.append(idx)
+                yield [_message(str(idx))]
+
+        seen_when_running = {}
+
+        def run(node, inputs):
+            text = inputs[-1].text_content()
+            seen_when_running[text] = len(pulled)
+            return [Message(role=MessageRole.ASSISTANT, content=text)]
+
+        config = DynamicEdgeConfig.from_dict(
+            {"type": "map", "split": {"type": "message"}, "config": {"max_parallel": 2}},
+            path="edge.dynamic",
+        )
+        node = Node.from_dict({"id": "mapper", "type": "passthrough", "config": {}}, path="graph.nodes[0]")
+        executor = DynamicEdgeExecutor(LogManager(WorkflowLogger("split-test")), run)
+        outputs = executor._execute_map(node, units(), config)
+
+        assert [msg.text_content() for msg in outputs] == [str(idx) for idx in range(6)]
+        assert seen_when_running["0"] <= 2
+        assert len(executor.unit_outcomes) == 6
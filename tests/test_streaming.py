@@ -0,0 +1,241 @@
+"""Tests for streaming model output to WebSocket clients."""
+
+from types import SimpleNamespace
+
+import httpx
+import openai
+from google.genai import types as genai_types
+
+from entity.configs import AgentConfig, Node
+from entity.messages import Message, MessageRole
+from runtime.bootstrap.schema import ensure_schema_registry_populated
+from runtime.node.agent import ModelDelta, ToolManager
+from runtime.node.agent.providers.gemini_provider import GeminiProvider
+from runtime.node.agent.providers.openai_provider import OpenAIProvider
+from runtime.node.executor.agent_executor import AgentNodeExecutor
+from runtime.node.executor.base import ExecutionContext
+from server.services.node_delta_dispatcher import NodeDeltaDispatcher
+from utils.function_manager import FunctionManager
+from utils.log_manager import LogManager
+from utils.logger import WorkflowLogger
+
+ensure_schema_registry_populated()
+
+
+class _RecordingManager:
+
+    def __init__(self):
+        self.sent = []
+
+    def send_message_sync(self, session_id, message):
+        self.sent.append(message["data"])
+
+
+class _RecordingSink:
+
+    def __init__(self):
+        self.deltas = []
+        self.flushes = []
+
+    def publish(self, node_id, delta, unit_index=None):
+        self.deltas.append((node_id, delta))
+
+    def flush(self, node_id, unit_index=None):
+        self.flushes.append((node_id, unit_index))
+
+
+def _agent_node(provider, **params):
+    return Node.from_dict(
+        {
+            "id": "writer",
+            "type": "agent",
+            "config": {"provider": provider, "name": "model-x", "api_key": "test", "params": params},
+        },
+        path="graph.nodes.writer",
+    )
+
+
+def _chat_chunk(content=None, tool_calls=None, usage=None):
+    delta = SimpleNamespace(content=content, tool_calls=tool_calls)
+    return SimpleNamespace(
+        id="chunk",
+        model="model-x",
+        usage=usage,
+        choices=[SimpleNamespace(index=0, delta=delta, finish_reason=None)] if usage is None else [],
+    )
+
+
+def _tool_delta(index, arguments, call_id=None, name=None):
+    return SimpleNamespace(index=index, id=call_id, function=SimpleNamespace(name=name, arguments=arguments))
+
+
+class TestNodeDeltaDispatcher:
+
+    def test_first_delta_sent_immediately_then_coalesced(self):
+        manager = _RecordingManager()
+        dispatcher = NodeDeltaDispatcher("session", manager, flush_interval=60)
+
+        for word in ("Hel", "lo", " wor", "ld"):
+            dispatcher.publish("writer", ModelDelta(text=word))
+        assert manager.sent == [{"node_id": "writer", "seq": 0, "text": "Hel"}]
+
+        dispatcher.flush("writer")
+        assert manager.sent[-1] == {"node_id": "writer", "seq": 1, "text": "lo world"}
+        dispatcher.flush("writer")
+        assert len(manager.sent) == 2
+
+    def test_tool_call_arguments_merged(self):
+        manager = _RecordingManager()
+        dispatcher = NodeDeltaDispatcher("session", manager, flush_interval=60)
+        dispatcher.publish("writer", ModelDelta(tool_call_index=0, tool_call_id="c1", tool_name="search"))
+        dispatcher.publish("writer", ModelDelta(tool_call_index=0, arguments='{"q": '))
+        dispatcher.publish("writer", ModelDelta(tool_call_index=0, arguments='"x"}'))
+        dispatcher.flush("writer")
+        assert manager.sent[-1]["tool_calls"] == [{"index": 0, "arguments": '{"q": "x"}'}]
+        assert manager.sent[0]["tool_calls"] == [{"index": 0, "id": "c1", "name": "search"}]
+
+    def test_reset_discards_pending_text(self):
+        manager = _RecordingManager()
+        dispatcher = NodeDeltaDispatcher("session", manager, flush_interval=60)
+        dispatcher.publish("writer", ModelDelta(text="first"))
+        dispatcher.publish("writer", ModelDelta(text=" partial"))
+        dispatcher.publish("writer", ModelDelta(reset=True))
+        dispatcher.flush("writer")
+        assert manager.sent[-1] == {"node_id": "writer", "seq": 1, "reset": True}
+
+    def test_map_units_buffer_separately(self):
+        manager = _RecordingManager()
+        dispatcher = NodeDeltaDispatcher("session", manager, flush_interval=60)
+        dispatcher.publish("writer", ModelDelta(text="a0"), unit_index=0)
+        dispatcher.publish("writer", ModelDelta(text="b0"), unit_index=1)
+        dispatcher.publish("writer", ModelDelta(text=" a1"), unit_index=0)
+        dispatcher.publish("writer", ModelDelta(text=" b1"), unit_index=1)
+        dispatcher.publish("writer", ModelDelta(reset=True), unit_index=1)
+        dispatcher.flush("writer", unit_index=0)
+
+        assert manager.sent[:2] == [
+            {"node_id": "writer", "unit_index": 0, "seq": 0, "text": "a0"},
+            {"node_id": "writer", "unit_index": 1, "seq": 0, "text": "b0"},
+        ]
+        assert manager.sent[2] == {"node_id": "writer", "unit_index": 1, "seq": 1, "reset": True}
+        assert manager.sent[3] == {"node_id": "writer", "unit_index": 0, "seq": 1, "text": " a1"}
+
+    def test_send_happens_outside_the_lock(self):
+        dispatcher = None
+
+        class _ProbingManager(_RecordingManager):
+            def send_message_sync(self, session_id, message):
+                assert dispatcher._lock.acquire(blocking=False)
+                dispatcher._lock.release()
+                super().send_message_sync(session_id, message)
+
+        manager = _ProbingManager()
+        dispatcher = NodeDeltaDispatcher("session", manager, flush_interval=0)
+        dispatcher.publish("writer", ModelDelta(text="hi"))
+        assert manager.sent == [{"node_id": "writer", "seq": 0, "text": "hi"}]
+
+
+class TestProviderStreaming:
+
+    def test_openai_chat_stream_assembles_message(self):
+        provider = OpenAIProvider(_agent_node("openai", protocol="chat").as_config(AgentConfig))
+        chunks = [
+            _chat_chunk("<think>plan"),
+            _chat_chunk("ning</think>Answer"),
+            _chat_chunk(" ready", tool_calls=[_tool_delta(0, '{"q":', "c1", "search")]),
+            _chat_chunk(tool_calls=[_tool_delta(0, ' "x"}')]),
+            _chat_chunk(usage=SimpleNamespace(prompt_tokens=5, completion_tokens=7, total_tokens=12)),
+        ]
+        client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=lambda **kwargs: iter(chunks))))
+        deltas = []
+        timeline = []
+
+        response = provider.stream_model(
+            client, [Message(role=MessageRole.USER, content="hi")], timeline, on_delta=deltas.append
+        )
+        assert "".join(delta.text for delta in deltas) == "Answer ready"
+        assert response.message.text_content() == "Answer ready"
+        assert response.message.tool_calls[0].arguments == '{"q": "x"}'
+        assert provider.extract_token_usage(response.raw_response).total_tokens == 12
+        assert timeline[-1]["tool_calls"][0]["function"]["name"] == "search"
+
+    def test_openai_chat_stream_retries_without_stream_options(self):
+        provider = OpenAIProvider(_agent_node("openai", protocol="chat").as_config(AgentConfig))
+        calls = []
+
+        def create(**kwargs):
+            calls.append(kwargs)
+            if "stream_options" in kwargs:
+                request = httpx.Request("POST", "https://proxy.test/v1/chat/completions")
+                raise openai.BadRequestError(
+                    "unknown field stream_options", response=httpx.Response(400, request=request), body=None
+                )
+            return iter([_chat_chunk("ok")])
+
+        client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        response = provider.stream_model(
+            client, [Message(role=MessageRole.USER, content="hi")], [], on_delta=lambda delta: None
+        )
+        assert response.message.text_content() == "ok"
+        assert ["stream_options" in kwargs for kwargs in calls] == [True, False]
+
+        calls.clear()
+        quiet = OpenAIProvider(_agent_node("openai", protocol="chat", stream_usage=False).as_config(AgentConfig))
+        quiet.stream_model(client, [Message(role=MessageRole.USER, content="hi")], [], on_delta=lambda delta: None)
+        assert len(calls) == 1 and "stream_options" not in calls[0] and "stream_usage" not in calls[0]
+
+    def test_gemini_stream_merges_text_parts(self):
+        provider = GeminiProvider(_agent_node("gemini").as_config(AgentConfig))
+
+        def _chunk(part):
+            return genai_types.GenerateContentResponse(
+                candidates=[genai_types.Candidate(content=genai_types.Content(role="model", parts=[part]))]
+            )
+
+        chunks = [
+            _chunk(genai_types.Part(text="Hello")),
+            _chunk(genai_types.Part(text=" there")),
+            _chunk(genai_types.Part(function_call=genai_types.FunctionCall(name="search", args={"q": "x"}))),
+        ]
+        client = SimpleNamespace(models=SimpleNamespace(generate_content_stream=lambda **kwargs: iter(chunks)))
+        deltas = []
+
+        response = provider.stream_model(
+            client, [], [Message(role=MessageRole.USER, content="hi")], on_delta=deltas.append
+        )
+        assert [delta.text for delta in deltas[:2]] == ["Hello", " there"]
+        assert deltas[2].tool_name == "search"
+        assert response.message.text_content() == "Hello there"
+        assert response.message.tool_calls[0].function_name == "search"
+
+
+class TestExecutorStreaming:
+
+    def test_agent_output_published_to_sink(self, tmp_path):
+        sink = _RecordingSink()
+        context = ExecutionContext(
+            tool_manager=ToolManager(),
+            function_manager=FunctionManager(tmp_path),
+            log_manager=LogManager(WorkflowLogger("streaming-test")),
+            delta_sink=sink,
+        )
+        node = _agent_node("mock", response="streamed reply")
+        output = AgentNodeExecutor(context).execute(node, [Message(role=MessageRole.USER, content="go")])
+
+        assert output[0].text_content() == "streamed reply"
+        assert [(node_id, delta.text) for node_id, delta in sink.deltas] == [("writer", "streamed reply")]
+        assert sink.flushes == [("writer", None)]
+
+    def test_map_unit_streams_under_its_index(self, tmp_path):
+        sink = _RecordingSink()
+        context = ExecutionContext(
+            tool_manager=ToolManager(),
+            function_manager=FunctionManager(tmp_path),
+            log_manager=LogManager(WorkflowLogger("streaming-test")),
+            delta_sink=sink,
+        )
+        node = _agent_node("mock", response="unit reply")
+        unit_input = Message(role=MessageRole.USER, content="go", metadata={"dynamic_edge_unit_index": 2})
+        AgentNodeExecutor(context).execute(node, [unit_input])
+
+        assert sink.flushes == [("writer", 2)]
@@ -0,0 +1,122 @@
+"""Tests for utils.tracing span propagation and exporters."""
+
+import json
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils.logger import WorkflowLogger
+from utils.metrics import submit_tracked
+from utils.token_tracker import TokenTracker, TokenUsage
+from utils.tracing import (
+    JsonFileSpanExporter,
+    OtlpHttpSpanExporter,
+    SpanExporter,
+    set_span_exporter,
+    start_span,
+    trace_id_for_session,
+)
+
+
+class _CollectingExporter(SpanExporter):
+
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+    def by_name(self, name):
+        return [span for span in self.spans if span.name == name]
+
+
+@pytest.fixture()
+def exporter():
+    collector = _CollectingExporter()
+    set_span_exporter(collector)
+    yield collector
+    set_span_exporter(None)
+
+
+class TestSpanTree:
+
+    def test_disabled_tracing_yields_none(self):
+        set_span_exporter(None)
+        with start_span("workflow") as span:
+            assert span is None
+
+    def test_children_share_trace_and_parent(self, exporter):
+        session_id = str(uuid.uuid4())
+        with start_span("workflow", trace_id=trace_id_for_session(session_id)):
+            with start_span("node", {"node.id": "a"}):
+                pass
+
+        node, workflow = exporter.spans
+        assert workflow.trace_id == uuid.UUID(session_id).hex
+        assert node.trace_id == workflow.trace_id
+        assert node.parent_id == workflow.span_id
+        assert workflow.parent_id is None
+
+    def test_parent_propagates_into_pool_threads(self, exporter):
+        def work(idx):
+            with start_span("dynamic_unit", {"unit.index": idx}):
+                pass
+
+        with start_span("node") as node_span:
+            with ThreadPoolExecutor(max_workers=3) as pool:
+                futures = [submit_tracked(pool, "test", work, idx) for idx in range(3)]
+                for future in futures:
+                    future.result()
+
+        units = exporter.by_name("dynamic_unit")
+        assert len(units) == 3
+        assert {span.parent_id for span in units} == {node_span.span_id}
+
+    def test_exception_marks_span_as_error(self, exporter):
+        with pytest.raises(RuntimeError):
+            with start_span("tool_call"):
+                raise RuntimeError("boom")
+        assert exporter.spans[0].status == "error"
+        assert "boom" in exporter.spans[0].error
+
+    def test_logger_timers_open_spans_and_tokens_land_on_model_call(self, exporter):
+        logger = WorkflowLogger("trace-test")
+        tracker = TokenTracker("trace-test")
+        with logger.node_timer("n1"):
+            with logger.model_timer("n1"):
+                with start_span("model_attempt"):
+                    tracker.record_usage("n1", "m", TokenUsage(input_tokens=7, output_tokens=3, total_tokens=10))
+
+        model_call = exporter.by_name("model_call")[0]
+        assert model_call.parent_id == exporter.by_name("node")[0].span_id
+        assert model_call.attributes["tokens.input"] == 7
+        assert model_call.attributes["tokens.output"] == 3
+
+
+class TestExporters:
+
+    def test_json_file_exporter(self, tmp_path):
+        path = tmp_path / "traces.jsonl"
+        set_span_exporter(JsonFileSpanExporter(path))
+        try:
+            with start_span("workflow", trace_id=trace_id_for_session("not-a-uuid")):
+                with start_span("node"):
+                    pass
+        finally:
+            set_span_exporter(None)
+
+        records = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [record["name"] for record in records] == ["node", "workflow"]
+        assert len(records[0]["trace_id"]) == 32
+        assert records[0]["parent_id"] == records[1]["span_id"]
+
+    def test_otlp_payload_shape(self, exporter):
+        with start_span("workflow", {"retries": 2, "ok": True}):
+            pass
+        payload = OtlpHttpSpanExporter("http://collector:4318")._encode(exporter.spans)
+        span = payload["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+        assert span["name"] == "workflow"
+        assert {"key": "retries", "value": {"intValue": "2"}} in span["attributes"]
+        assert {"key": "ok", "value": {"boolValue": True}} in span["attributes"]
+        assert "parentSpanId" not in span
@@ -0,0 +1,128 @@
+"""Tests for the shared uv environment cache."""
+
+import os
+import time
+
+import pytest
+
+import functions.function_calling.uv_related as uv_related
+from utils.uv_env_cache import UvEnvCache, environment_key, read_workspace_state, write_workspace_state
+
+
+def _fake_workspace(root, name="ws_a", lock="version = 1\n"):
+    workspace = root / name / "code_workspace"
+    workspace.mkdir(parents=True)
+    (workspace / "pyproject.toml").write_text('[project]\nname = "code-workspace"\n', encoding="utf-8")
+    (workspace / "uv.lock").write_text(lock, encoding="utf-8")
+    return workspace
+
+
+class TestUvEnvCache:
+
+    def test_key_ignores_order_and_tracks_python(self):
+        assert environment_key(["pandas", "matplotlib"], "3.12") == environment_key(["matplotlib", "pandas"], "3.12")
+        assert environment_key(["pandas"], "3.12") != environment_key(["pandas"], "3.11")
+
+    def test_attach_copies_project_files_into_new_workspace(self, tmp_path):
+        cache = UvEnvCache(tmp_path / "cache")
+        source = _fake_workspace(tmp_path, lock="version = 1\n# pandas\n")
+        key = environment_key(["pandas"], "3.12")
+        assert cache.store(key, source, packages=["pandas"], python_version="3.12")
+        assert not cache.store(key, source, packages=["pandas"], python_version="3.12")
+
+        target = tmp_path / "ws_b" / "code_workspace"
+        target.mkdir(parents=True)
+        assert cache.attach(key, target)
+        assert (target / "uv.lock").read_text(encoding="utf-8") == "version = 1\n# pandas\n"
+        assert os.stat(target / "pyproject.toml").st_ino != os.stat(source / "pyproject.toml").st_ino
+
+        # Edits in a workspace stay out of the entry
+        (target / "uv.lock").write_text("edited", encoding="utf-8")
+        other = tmp_path / "ws_c" / "code_workspace"
+        other.mkdir(parents=True)
+        assert cache.attach(key, other)
+        assert (other / "uv.lock").read_text(encoding="utf-8") == "version = 1\n# pandas\n"
+        assert not cache.attach(environment_key(["numpy"], "3.12"), other)
+
+    def test_workspace_without_lock_is_not_stored(self, tmp_path):
+        cache = UvEnvCache(tmp_path / "cache")
+        workspace = _fake_workspace(tmp_path)
+        (workspace / "uv.lock").unlink()
+        assert not cache.store(environment_key(["pandas"], None), workspace, packages=["pandas"], python_version=None)
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        cache = UvEnvCache(tmp_path / "cache", max_bytes=10**6)
+        keys = []
+        for idx in range(3):
+            workspace = _fake_workspace(tmp_path, f"ws_{idx}")
+            keys.append(environment_key([f"pkg{idx}"], None))
+            cache.store(keys[-1], workspace, packages=[f"pkg{idx}"], python_version=None)
+            os.utime(cache.entry_path(keys[-1]) / "meta.json", (time.time() - 100 + idx, time.time() - 100 + idx))
+        reader = tmp_path / "reader"
+        reader.mkdir()
+        cache.attach(keys[0], reader)
+
+        cache.max_bytes = 60
+        cache.evict()
+        assert [cache.contains(key) for key in keys] == [True, False, False]
+
+
+class TestInstallPythonPackages:
+
+    @pytest.fixture
+    def cache(self, tmp_path, monkeypatch):
+        cache = UvEnvCache(tmp_path / "cache")
+        monkeypatch.setattr(uv_related, "get_uv_env_cache", lambda: cache)
+        return cache
+
+    def test_second_workspace_reuses_resolution(self, tmp_path, monkeypatch, cache):
+        calls = []
+
+        def fake_uv(cmd, workspace_root, **kwargs):
+            calls.append(cmd[:2])
+            if cmd[:2] == ["uv", "add"]:
+                (workspace_root / "uv.lock").write_text("version = 1\n# pandas matplotlib\n", encoding="utf-8")
+            return {"command": cmd, "stdout": "", "stderr": "", "returncode": 0, "step": kwargs.get("step")}
+
+        monkeypatch.setattr(uv_related, "_run_uv_command", fake_uv)
+        results = []
+        for session in ("s1", "s2"):
+            workspace = tmp_path / session / "code_workspace"
+            workspace.mkdir(parents=True)
+            write_workspace_state(workspace, python_version="3.12", packages=[])
+            results.append(uv_related.install_python_packages(
+                ["pandas", "matplotlib"], _context={"python_workspace_root": str(workspace)}
+            ))
+
+        assert calls == [["uv", "add"], ["uv", "sync"]]
+        assert results[1]["returncode"] == 0 and results[1]["cached_env"] is True
+        assert read_workspace_state(tmp_path / "s2" / "code_workspace")["packages"] == ["matplotlib", "pandas"]
+        assert (tmp_path / "s2" / "code_workspace" / "uv.lock").read_text(encoding="utf-8").endswith("matplotlib\n")
+
+    def test_failed_frozen_sync_falls_back_to_uv_add(self, tmp_path, monkeypatch, cache):
+        source = _fake_workspace(tmp_path)
+        key = environment_key(["pandas"], "3.12")
+        cache.store(key, source, packages=["pandas"], python_version="3.12")
+        calls = []
+
+        def fake_uv(cmd, workspace_root, **kwargs):
+            calls.append(cmd[:2])
+            return {"command": cmd, "stdout": "", "stderr": "", "returncode": 1 if cmd[1] == "sync" else 0}
+
+        monkeypatch.setattr(uv_related, "_run_uv_command", fake_uv)
+        workspace = tmp_path / "s3" / "code_workspace"
+        workspace.mkdir(parents=True)
+        write_workspace_state(workspace, python_version="3.12", packages=[])
+        result = uv_related.install_python_packages(["pandas"], _context={"python_workspace_root": str(workspace)})
+        assert calls == [["uv", "sync"], ["uv", "add"]]
+        assert result["returncode"] == 0 and "cached_env" not in result
+
+    def test_untracked_workspace_skips_cache(self, tmp_path, monkeypatch, cache):
+        monkeypatch.setattr(
+            uv_related,
+            "_run_uv_command",
+            lambda cmd, root, **kwargs: {"command": cmd, "stdout": "", "stderr": "", "returncode": 0},
+        )
+        workspace = tmp_path / "plain"
+        uv_related.install_python_packages(["pandas"], _context={"python_workspace_root": str(workspace)})
+        assert not (tmp_path / "cache").exists()
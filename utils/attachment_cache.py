@@ -0,0 +1,264 @@
+"""Process-wide cache for attachment payloads sent to model providers.
+
+Providers serialize the whole conversation on every model call, so without a
+cache a PDF attached once is re-read and re-encoded for every turn of a tool
+loop or cycle. ``AttachmentCache`` keeps the encoded forms (raw bytes, data
+URIs, decoded text) in a byte-bounded LRU keyed by the attachment content:
+
+- ``AttachmentRef.sha256`` when the attachment store computed one,
+- otherwise a SHA-256 digest of the inline ``data_uri``,
+- otherwise the local path.
+
+Whenever the local file exists its mtime and size are part of the key too,
+since workspace files are edited in place and a recorded ``sha256`` goes
+stale with them.
+
+It also remembers which provider file ids were created for a given content
+key, so a file uploaded through a provider's Files API is uploaded once per
+account and referenced by id afterwards; the most recently used
+``MAX_REMOTE_IDS`` ids are kept. The capacity defaults to 256 MB and can be
+changed with ``ATTACHMENT_CACHE_BYTES``.
+"""
+
+import base64
+import binascii
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Tuple
+from urllib.parse import unquote_to_bytes
+
+from entity.messages import AttachmentRef
+from utils.metrics import ATTACHMENT_CACHE_LOOKUPS
+
+ATTACHMENT_CACHE_BYTES_ENV = "ATTACHMENT_CACHE_BYTES"
+DEFAULT_CACHE_BYTES = 256 * 1024 * 1024
+MAX_REMOTE_IDS = 4096
+
+
+def decode_data_uri(data_uri: str) -> Optional[bytes]:
+    """Decode a ``data:`` URI, returning None when it is malformed."""
+    if not data_uri.startswith("data:"):
+        return None
+    header, separator, data = data_uri.partition(",")
+    if not separator:
+        return None
+    if ";base64" in header:
+        try:
+            return base64.b64decode(data)
+        except (ValueError, binascii.Error):
+            return None
+    return unquote_to_bytes(data)
+
+
+def attachment_size(ref: AttachmentRef) -> int:
+    """Best-effort payload size of ``ref`` in bytes, without reading it; 0 when unknown."""
+    if ref.size is not None:
+        return ref.size
+    if ref.data_uri:
+        return len(ref.data_uri) * 3 // 4
+    if ref.local_path and os.path.exists(ref.local_path):
+        return os.path.getsize(ref.local_path)
+    return 0
+
+
+def _decode_text(data: bytes) -> str:
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        return data.decode("utf-8", errors="replace")
+
+
+class AttachmentCache:
+    """Byte-bounded LRU of encoded attachment payloads plus uploaded file ids."""
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES) -> None:
+        self.max_bytes = max(0, int(max_bytes))
+        self._entries: "OrderedDict[Tuple[Hashable, str], bytes | str]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._remote_ids: "OrderedDict[Tuple[str, Hashable], Tuple[str, float]]" = OrderedDict()
+        self._upload_locks: Dict[Tuple[str, Hashable], threading.Lock] = {}
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def content_key(self, ref: AttachmentRef) -> Optional[Hashable]:
+        """Return the cache key identifying the payload of ``ref``."""
+        version: Tuple[int, ...] = ()
+        if ref.local_path:
+            try:
+                stat = os.stat(ref.local_path)
+            except OSError:
+                pass
+            else:
+                version = (stat.st_mtime_ns, stat.st_size)
+        if ref.sha256:
+            return ("sha256", ref.sha256, *version)
+        if ref.data_uri:
+            digest = hashlib.sha256(ref.data_uri.encode("utf-8")).hexdigest()
+            return ("uri", digest, *version)
+        if version:
+            return ("path", ref.local_path, *version)
+        return None
+
+    def read_bytes(self, ref: AttachmentRef, *, cache: bool = True) -> Optional[bytes]:
+        """Return the raw payload of ``ref``; ``cache=False`` skips storing it."""
+        if not cache:
+            return self._load_bytes(ref)
+        return self._get_or_load(ref, "bytes", lambda: self._load_bytes(ref))
+
+    def text(self, ref: AttachmentRef) -> Optional[str]:
+        """Return the payload of ``ref`` decoded as UTF-8 (invalid bytes replaced)."""
+
+        def _load() -> Optional[str]:
+            data = self._load_bytes(ref)
+            return _decode_text(data) if data is not None else None
+
+        return self._get_or_load(ref, "text", _load)
+
+    def data_uri(self, ref: AttachmentRef, mime_type: Optional[str] = None) -> Optional[str]:
+        """Return the payload of ``ref`` as a base64 ``data:`` URI."""
+        if ref.data_uri:
+            return ref.data_uri
+        mime = mime_type or ref.mime_type or "application/octet-stream"
+
+        def _load() -> Optional[str]:
+            data = self._load_bytes(ref)
+            if data is None:
+                return None
+            return f"data:{mime};base64,{base64.b64encode(data).decode('ascii')}"
+
+        return self._get_or_load(ref, f"data_uri:{mime}", _load)
+
+    def remote_file_id(
+        self, scope: str, ref: AttachmentRef, *, max_age: Optional[float] = None
+    ) -> Optional[str]:
+        """Return the file id previously uploaded for ``ref`` within ``scope``."""
+        key = self.content_key(ref)
+        if key is None:
+            return None
+        with self._lock:
+            return self._live_remote_id((scope, key), max_age)
+
+    def upload_once(
+        self,
+        scope: str,
+        ref: AttachmentRef,
+        upload: Callable[[], str],
+        *,
+        max_age: Optional[float] = None,
+    ) -> Optional[str]:
+        """Upload ``ref`` with ``upload`` unless a live file id already exists for it.
+
+        ``scope`` identifies the provider account the id belongs to and
+        ``max_age`` (seconds) drops ids the provider expires on its side.
+        Concurrent callers for the same content wait for the first upload
+        instead of uploading again.
+        """
+        key = self.content_key(ref)
+        if key is None:
+            return None
+        slot = (scope, key)
+        with self._lock:
+            existing = self._live_remote_id(slot, max_age)
+            if existing:
+                return existing
+            lock = self._upload_locks.setdefault(slot, threading.Lock())
+        with lock:
+            with self._lock:
+                existing = self._live_remote_id(slot, max_age)
+            if existing:
+                return existing
+            try:
+                file_id = upload()
+                with self._lock:
+                    self._remote_ids[slot] = (file_id, time.time())
+                    self._remote_ids.move_to_end(slot)
+                    while len(self._remote_ids) > MAX_REMOTE_IDS:
+                        self._remote_ids.popitem(last=False)
+            finally:
+                with self._lock:
+                    self._upload_locks.pop(slot, None)
+            return file_id
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self._remote_ids.clear()
+
+    def _live_remote_id(self, slot: Tuple[str, Hashable], max_age: Optional[float]) -> Optional[str]:
+        entry = self._remote_ids.get(slot)
+        if entry is None:
+            return None
+        file_id, uploaded_at = entry
+        if max_age is not None and time.time() - uploaded_at > max_age:
+            del self._remote_ids[slot]
+            return None
+        self._remote_ids.move_to_end(slot)
+        return file_id
+
+    def _get_or_load(self, ref: AttachmentRef, form: str, load: Callable[[], Optional[bytes | str]]):
+        key = self.content_key(ref)
+        if key is None:
+            return load()
+        entry_key = (key, form)
+        with self._lock:
+            cached = self._entries.get(entry_key)
+            if cached is not None:
+                self._entries.move_to_end(entry_key)
+        if cached is not None:
+            ATTACHMENT_CACHE_LOOKUPS.inc(result="hit")
+            return cached
+        ATTACHMENT_CACHE_LOOKUPS.inc(result="miss")
+        value = load()
+        if value is not None:
+            self._store(entry_key, value)
+        return value
+
+    def _store(self, entry_key: Tuple[Hashable, str], value: bytes | str) -> None:
+        size = len(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(entry_key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[entry_key] = value
+            self._size += size
+            while self._size > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    @staticmethod
+    def _load_bytes(ref: AttachmentRef) -> Optional[bytes]:
+        if ref.data_uri:
+            decoded = decode_data_uri(ref.data_uri)
+            if decoded is not None:
+                return decoded
+        if ref.local_path and os.path.exists(ref.local_path):
+            try:
+                with open(ref.local_path, "rb") as handle:
+                    return handle.read()
+            except OSError:
+                return None
+        return None
+
+
+def _default_capacity() -> int:
+    raw = os.getenv(ATTACHMENT_CACHE_BYTES_ENV, "").strip()
+    try:
+        return int(raw) if raw else DEFAULT_CACHE_BYTES
+    except ValueError:
+        return DEFAULT_CACHE_BYTES
+
+
+_cache = AttachmentCache(_default_capacity())
+
+
+def get_attachment_cache() -> AttachmentCache:
+    return _cache
@@ -1,18 +1,21 @@
 """Attachment storage and serialization helpers."""
 
 import base64
-import hashlib
 import json
 import mimetypes
 import shutil
+import threading
 import uuid
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Dict, Optional
 
 from entity.messages import AttachmentRef, MessageBlock, MessageBlockType
+from utils.blob_store import BlobStore, sha256_file
 
 DEFAULT_INLINE_LIMIT = 512 * 1024  # 512 KB
+# Metadata key naming the provider endpoint/account a remote file id was uploaded to
+REMOTE_FILE_SCOPE_KEY = "remote_file_scope"
 
 
 @dataclass
@@ -51,22 +54,37 @@ class AttachmentRecord:
         """Convert to a MessageBlock referencing this attachment."""
         return MessageBlock(
             type=self.kind,
-            attachment=self.ref.copy(),
+            attachment=self.ref,
             data=dict(self.extra),
         )
 
 
 class AttachmentStore:
-    """Filesystem-backed attachment manifest for a workflow execution."""
+    """Filesystem-backed attachment manifest for a workflow execution.
 
-    def __init__(self, root_dir: Path | str, inline_size_limit: int = DEFAULT_INLINE_LIMIT) -> None:
+    With a ``blob_store`` the payloads are kept once in the shared
+    content-addressed store and reflinked into ``root`` where the filesystem
+    supports it; otherwise, or without a blob store, they are copied. The manifest is an append-only JSON Lines file: every change
+    appends the full record and the last line for an id wins on load.
+    """
+
+    def __init__(
+        self,
+        root_dir: Path | str,
+        inline_size_limit: int = DEFAULT_INLINE_LIMIT,
+        *,
+        blob_store: Optional[BlobStore] = None,
+    ) -> None:
         self.root = Path(root_dir)
         self.inline_size_limit = inline_size_limit
+        self.blob_store = blob_store
         self.root.mkdir(parents=True, exist_ok=True)
-        self.manifest_path = self.root / "attachments_manifest.json"
+        self.manifest_path = self.root / "attachments_manifest.jsonl"
+        self._legacy_manifest_path = self.root / "attachments_manifest.json"
         self._records: Dict[str, AttachmentRecord] = {}
         self._persistent_ids: set[str] = set()
         self._hash_index: Dict[str, str] = {}
+        self._manifest_lock = threading.Lock()
         self._load_manifest()
 
     def register_file(
@@ -90,7 +108,7 @@ class AttachmentStore:
 
         guessed_mime = mime_type or (mimetypes.guess_type(source.name)[0] or "application/octet-stream")
         attachment_id = attachment_id or uuid.uuid4().hex
-        sha256_source = _sha256_file(source)
+        sha256_source = sha256_file(source)
 
         if deduplicate:
             existing = self._find_duplicate_by_hash(
@@ -101,15 +119,16 @@ class AttachmentStore:
             if existing:
                 return existing
         if copy_file:
-            target_dir = self.root / attachment_id
-            target_dir.mkdir(parents=True, exist_ok=True)
-            target_path = target_dir / source.name
-            shutil.copy2(source, target_path)
+            target_path = self.root / attachment_id / source.name
+            if self.blob_store is not None:
+                self.blob_store.place_file(source, target_path, sha256_source)
+            else:
+                target_path.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(source, target_path)
         else:
             target_path = source.resolve()
 
         size = target_path.stat().st_size
-        sha256 = sha256_source or _sha256_file(target_path)
         data_uri = None
         # if size <= self.inline_size_limit:
         #     data_uri = encode_file_to_data_uri(target_path, guessed_mime)
@@ -119,7 +138,7 @@ class AttachmentStore:
             mime_type=guessed_mime,
             name=display_name or source.name,
             size=size,
-            sha256=sha256,
+            sha256=sha256_source,
             local_path=str(target_path),
             data_uri=data_uri,
         )
@@ -129,15 +148,49 @@ class AttachmentStore:
             description=description,
             extra=dict(extra) if extra else {},
         )
-        self._records[attachment_id] = record
-        if sha256:
-            self._hash_index[sha256] = attachment_id
-        if persist:
-            self._persistent_ids.add(attachment_id)
-            self._save_manifest()
+        return self._add_record(record, persist=persist)
+
+    def register_blob(
+        self,
+        sha256: str,
+        *,
+        display_name: str,
+        kind: MessageBlockType = MessageBlockType.FILE,
+        mime_type: Optional[str] = None,
+        attachment_id: Optional[str] = None,
+        description: Optional[str] = None,
+        extra: Optional[Dict[str, Any]] = None,
+        persist: bool = True,
+        path: Optional[Path | str] = None,
+    ) -> AttachmentRecord:
+        """Register a payload already written to the blob store (see ``BlobStore.writer``).
+
+        Pass ``path`` when the payload was already placed in this store's
+        root (a ``BlobStore.writer(target)``); it is then used as is.
+        """
+        if self.blob_store is None:
+            raise RuntimeError("AttachmentStore has no blob store")
+        attachment_id = attachment_id or uuid.uuid4().hex
+        if path is not None:
+            target_path = Path(path)
         else:
-            self._persistent_ids.discard(attachment_id)
-        return record
+            target_path = self.root / attachment_id / display_name
+            self.blob_store.link(sha256, target_path)
+        ref = AttachmentRef(
+            attachment_id=attachment_id,
+            mime_type=mime_type or (mimetypes.guess_type(display_name)[0] or "application/octet-stream"),
+            name=display_name,
+            size=target_path.stat().st_size,
+            sha256=sha256,
+            local_path=str(target_path),
+        )
+        record = AttachmentRecord(
+            ref=ref,
+            kind=kind,
+            description=description,
+            extra=dict(extra) if extra else {},
+        )
+        return self._add_record(record, persist=persist)
 
     def register_bytes(
         self,
@@ -159,6 +212,20 @@ class AttachmentStore:
         attachment_id = attachment_id or uuid.uuid4().hex
         filename = display_name or _default_filename_for_mime(mime_type)
 
+        if self.blob_store is not None:
+            target_path = self.root / attachment_id / filename
+            return self.register_blob(
+                self.blob_store.place_bytes(bytes(data), target_path),
+                path=target_path,
+                display_name=filename,
+                kind=kind,
+                mime_type=mime_type,
+                attachment_id=attachment_id,
+                description=description,
+                extra=extra,
+                persist=persist,
+            )
+
         target_dir = self.root / attachment_id
         target_dir.mkdir(parents=True, exist_ok=True)
         target_path = target_dir / filename
@@ -200,28 +267,43 @@ class AttachmentStore:
             remote_file_id=remote_file_id,
         )
         record = AttachmentRecord(ref=ref, kind=kind, description=description, extra=extra or {})
-        self._records[attachment_id] = record
-        if persist:
-            self._persistent_ids.add(attachment_id)
-            self._save_manifest()
-        else:
-            self._persistent_ids.discard(attachment_id)
-        if ref.sha256:
-            self._hash_index[ref.sha256] = attachment_id
-        return record
+        return self._add_record(record, persist=persist)
+
+    def update_remote_file_id(self, attachment_id: str, remote_file_id: str, *, scope: Optional[str] = None) -> None:
+        """Attach a provider file_id to an existing record (after upload).
+
+        ``scope`` names the provider endpoint and account the id belongs to;
+        it is kept in the metadata under ``remote_file_scope`` so other
+        accounts do not reuse the id.
+        """
+        record = self._records.get(attachment_id)
+        if not record:
+            raise KeyError(f"Attachment '{attachment_id}' not found")
+        metadata = {**record.ref.metadata, REMOTE_FILE_SCOPE_KEY: scope} if scope else record.ref.metadata
+        record.ref = record.ref.replace(remote_file_id=remote_file_id, metadata=metadata)
+        if attachment_id in self._persistent_ids:
+            self._append_manifest(record.to_dict())
 
-    def update_remote_file_id(self, attachment_id: str, remote_file_id: str) -> None:
-        """Attach a provider file_id to an existing record (after upload)."""
+    def update_metadata(self, attachment_id: str, values: Dict[str, Any]) -> None:
+        """Merge provider-specific values (e.g. uploaded file URIs) into a record's metadata."""
         record = self._records.get(attachment_id)
         if not record:
             raise KeyError(f"Attachment '{attachment_id}' not found")
-        record.ref.remote_file_id = remote_file_id
+        record.ref = record.ref.replace(metadata={**record.ref.metadata, **values})
         if attachment_id in self._persistent_ids:
-            self._save_manifest()
+            self._append_manifest(record.to_dict())
 
     def get(self, attachment_id: str) -> AttachmentRecord | None:
         return self._records.get(attachment_id)
 
+    def find(self, ref: AttachmentRef) -> AttachmentRecord | None:
+        """Return the record for ``ref`` by id, falling back to its content hash."""
+        record = self._records.get(ref.attachment_id) if ref.attachment_id else None
+        if record is None and ref.sha256:
+            existing_id = self._hash_index.get(ref.sha256)
+            record = self._records.get(existing_id) if existing_id else None
+        return record
+
     def to_message_block(self, attachment_id: str) -> MessageBlock:
         record = self._records.get(attachment_id)
         if not record:
@@ -274,65 +356,87 @@ class AttachmentStore:
     ) -> AttachmentRecord:
         """
         Import an existing attachment record (e.g., from a session upload) into this store.
-        Optionally copies the underlying file into the store directory.
+        Optionally copies (or links, with a blob store) the underlying file into the store directory.
         """
         source_ref = record.ref
         attachment_id = source_ref.attachment_id or uuid.uuid4().hex
-        new_ref = source_ref.copy()
-        new_ref.attachment_id = attachment_id
+        new_ref = source_ref.replace(attachment_id=attachment_id)
 
         local_path = source_ref.local_path
         if local_path and copy_file:
             source_path = Path(local_path)
             if source_path.exists():
-                target_dir = self.root / attachment_id
-                target_dir.mkdir(parents=True, exist_ok=True)
-                target_path = target_dir / source_path.name
-                shutil.copy2(source_path, target_path)
-                new_ref.local_path = str(target_path)
-        self._records[attachment_id] = AttachmentRecord(
+                target_path = self.root / attachment_id / source_path.name
+                if self.blob_store is not None:
+                    digest = self.blob_store.place_file(source_path, target_path, source_ref.sha256)
+                    new_ref = new_ref.replace(sha256=digest)
+                else:
+                    target_path.parent.mkdir(parents=True, exist_ok=True)
+                    shutil.copy2(source_path, target_path)
+                new_ref = new_ref.replace(local_path=str(target_path))
+        ingested = AttachmentRecord(
             ref=new_ref,
             kind=record.kind,
             description=record.description,
             extra=dict(record.extra),
         )
+        return self._add_record(ingested, persist=persist)
+
+    def _add_record(self, record: AttachmentRecord, *, persist: bool) -> AttachmentRecord:
+        attachment_id = record.ref.attachment_id
+        self._records[attachment_id] = record
+        if record.ref.sha256:
+            self._hash_index[record.ref.sha256] = attachment_id
         if persist:
             self._persistent_ids.add(attachment_id)
-            self._save_manifest()
-        else:
+            self._append_manifest(record.to_dict())
+        elif attachment_id in self._persistent_ids:
             self._persistent_ids.discard(attachment_id)
-        if new_ref.sha256:
-            self._hash_index[new_ref.sha256] = attachment_id
-        return self._records[attachment_id]
+            self._append_manifest({"attachment_id": attachment_id, "removed": True})
+        return record
 
     def _load_manifest(self) -> None:
+        # Stores written before the JSON Lines manifest keep a single JSON object
+        if self._legacy_manifest_path.exists():
+            try:
+                data = json.loads(self._legacy_manifest_path.read_text(encoding="utf-8"))
+            except json.JSONDecodeError:
+                data = {}
+            for record_data in data.values():
+                self._load_manifest_entry(record_data)
         if not self.manifest_path.exists():
             return
+        with self.manifest_path.open("r", encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn write from an interrupted append
+                self._load_manifest_entry(entry)
+
+    def _load_manifest_entry(self, entry: Any) -> None:
+        if not isinstance(entry, dict):
+            return
+        if entry.get("removed"):
+            attachment_id = entry.get("attachment_id")
+            self._records.pop(attachment_id, None)
+            self._persistent_ids.discard(attachment_id)
+            return
         try:
-            data = json.loads(self.manifest_path.read_text(encoding="utf-8"))
-        except json.JSONDecodeError:
+            record = AttachmentRecord.from_dict(entry)
+        except Exception:
             return
-        for attachment_id, record_data in data.items():
-            try:
-                record = AttachmentRecord.from_dict(record_data)
-            except Exception:
-                continue
-            self._records[attachment_id] = record
-            self._persistent_ids.add(attachment_id)
-            if record.ref.sha256:
-                self._hash_index[record.ref.sha256] = attachment_id
-
-    def _save_manifest(self) -> None:
-        serialized = self.export_manifest()
-        self.manifest_path.write_text(json.dumps(serialized, ensure_ascii=False, indent=2), encoding="utf-8")
-
-
-def _sha256_file(path: Path) -> str:
-    hasher = hashlib.sha256()
-    with path.open("rb") as handle:
-        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
-            hasher.update(chunk)
-    return hasher.hexdigest()
+        attachment_id = record.ref.attachment_id
+        self._records[attachment_id] = record
+        self._persistent_ids.add(attachment_id)
+        if record.ref.sha256:
+            self._hash_index[record.ref.sha256] = attachment_id
+
+    def _append_manifest(self, entry: Dict[str, Any]) -> None:
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._manifest_lock:
+            with self.manifest_path.open("a", encoding="utf-8") as handle:
+                handle.write(line)
 
 
 def encode_file_to_data_uri(path: Path, mime_type: str) -> str:
@@ -0,0 +1,256 @@
+"""Content-addressed blob storage shared by every session's attachment store.
+
+Each payload is stored once under ``<root>/<sha[:2]>/<sha>`` and placed into
+session workspaces as a reflink (copy-on-write clone, Linux ``FICLONE`` on
+btrfs/XFS), so batch rows or sessions that attach the same dataset share one
+copy on disk. Workspace files are never hardlinks: tools edit uploaded files
+in place, and a write through a hardlink would change the shared blob for
+every session and for every later upload of the same payload.
+
+Deduplication therefore only applies where the blob directory supports
+reflinks. Elsewhere (ext4, overlayfs) a shared blob would only add a copy on
+top of each workspace file, so :meth:`BlobStore.place_file` and friends skip
+the blob and write the workspace file alone, as the store did before blobs.
+
+The shared root defaults to ``WareHouse/.blobs`` and can be moved with
+``ATTACHMENT_BLOB_DIR``. Blobs are never deleted automatically; removing a
+session only drops its links.
+"""
+
+import hashlib
+import os
+import shutil
+import stat
+import tempfile
+import threading
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+BLOB_DIR_ENV = "ATTACHMENT_BLOB_DIR"
+DEFAULT_BLOB_DIR = Path("WareHouse") / ".blobs"
+_CHUNK_SIZE = 1024 * 1024
+_FICLONE = 0x40049409  # linux/fs.h
+
+
+class BlobWriter:
+    """Streams a payload into the blob store, hashing it on the fly.
+
+    Use as a context manager: the blob is committed when the block exits
+    normally and discarded on error. ``sha256`` and ``size`` are available
+    after the block. With a ``target`` the payload also ends up at that
+    path; when the store does not deduplicate it is written there directly
+    and no blob is kept.
+    """
+
+    def __init__(self, store: "BlobStore", target: Optional[Path | str] = None) -> None:
+        self.store = store
+        self.target = Path(target) if target is not None else None
+        self.sha256: Optional[str] = None
+        self.size = 0
+        self._hasher = hashlib.sha256()
+        self._keep_blob = self.target is None or store.deduplicates
+        staging_dir = store.root if self._keep_blob else self.target.parent
+        staging_dir.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(dir=staging_dir, prefix=".incoming-")
+        self._temp_path = Path(temp_name)
+        self._handle: BinaryIO = os.fdopen(fd, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        self._hasher.update(chunk)
+        self._handle.write(chunk)
+        self.size += len(chunk)
+
+    def commit(self) -> Path:
+        self._handle.close()
+        self.sha256 = self._hasher.hexdigest()
+        if not self._keep_blob:
+            os.replace(self._temp_path, self.target)
+            return self.target
+        blob = self.store._adopt(self._temp_path, self.sha256)
+        if self.target is not None:
+            self.store.link(self.sha256, self.target)
+        return blob
+
+    def abort(self) -> None:
+        self._handle.close()
+        self._temp_path.unlink(missing_ok=True)
+
+    def __enter__(self) -> "BlobWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+
+class BlobStore:
+    """Stores payloads by SHA-256 and links them into workspaces."""
+
+    def __init__(self, root: Path | str, *, reflink: Optional[bool] = None) -> None:
+        self.root = Path(root)
+        # None: probe the blob directory on first use
+        self._reflink_supported = reflink if _has_fcntl() else False
+
+    @property
+    def deduplicates(self) -> bool:
+        """True when workspace files can share the blob's storage (reflinks work under ``root``)."""
+        if self._reflink_supported is None:
+            self._reflink_supported = _probe_reflink(self.root)
+        return self._reflink_supported
+
+    def path_for(self, sha256: str) -> Path:
+        return self.root / sha256[:2] / sha256
+
+    def contains(self, sha256: str) -> bool:
+        return self.path_for(sha256).exists()
+
+    def writer(self, target: Optional[Path | str] = None) -> BlobWriter:
+        return BlobWriter(self, target)
+
+    def put_file(self, source: Path | str, sha256: Optional[str] = None) -> str:
+        """Store the contents of ``source`` and return their SHA-256."""
+        source = Path(source)
+        digest = sha256 or sha256_file(source)
+        if self.contains(digest):
+            return digest
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(dir=self.root, prefix=".incoming-")
+        os.close(fd)
+        temp_path = Path(temp_name)
+        try:
+            shutil.copyfile(source, temp_path)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+        self._adopt(temp_path, digest)
+        return digest
+
+    def put_bytes(self, data: bytes) -> str:
+        with self.writer() as writer:
+            writer.write(data)
+        return writer.sha256
+
+    def place_file(self, source: Path | str, target: Path | str, sha256: Optional[str] = None) -> str:
+        """Put the contents of ``source`` at ``target``, sharing a blob where possible; returns the SHA-256."""
+        digest = sha256 or sha256_file(source)
+        if self.deduplicates:
+            self.put_file(source, digest)
+            self.link(digest, target)
+            return digest
+        target = Path(target)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(source, target)
+        return digest
+
+    def place_bytes(self, data: bytes, target: Path | str) -> str:
+        """Write ``data`` to ``target``, sharing a blob where possible; returns the SHA-256."""
+        with self.writer(target) as writer:
+            writer.write(data)
+        return writer.sha256
+
+    def link(self, sha256: str, target: Path | str) -> str:
+        """Materialise blob ``sha256`` as a writable file at ``target``; returns reflink or copy."""
+        blob = self.path_for(sha256)
+        if not blob.exists():
+            raise FileNotFoundError(f"Blob not found: {sha256}")
+        target = Path(target)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if target.exists():
+            target.unlink()
+        return clone_file(blob, target, reflink=self.deduplicates)
+
+    def _adopt(self, temp_path: Path, sha256: str) -> Path:
+        final_path = self.path_for(sha256)
+        if final_path.exists():
+            temp_path.unlink(missing_ok=True)
+            return final_path
+        final_path.parent.mkdir(parents=True, exist_ok=True)
+        os.chmod(temp_path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+        # Concurrent writers of the same payload race harmlessly: the content is identical
+        os.replace(temp_path, final_path)
+        return final_path
+
+
+def sha256_file(path: Path | str) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(_CHUNK_SIZE), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def clone_file(source: Path | str, target: Path | str, *, reflink: bool = True) -> str:
+    """Copy ``source`` to a new file at ``target``, as a reflink where the filesystem allows.
+
+    Returns ``"reflink"`` or ``"copy"``. Either way the target is an
+    independent file: writing to it never changes ``source``.
+    """
+    if reflink and _has_fcntl():
+        try:
+            _reflink(Path(source), Path(target))
+            return "reflink"
+        except OSError:
+            pass
+    shutil.copyfile(source, target)
+    return "copy"
+
+
+def _has_fcntl() -> bool:
+    try:
+        import fcntl  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _probe_reflink(directory: Path) -> bool:
+    """Return True when files in ``directory`` can be cloned with ``FICLONE``."""
+    if not _has_fcntl():
+        return False
+    directory.mkdir(parents=True, exist_ok=True)
+    fd, source_name = tempfile.mkstemp(dir=directory, prefix=".probe-")
+    source = Path(source_name)
+    target = source.with_name(source.name + "-clone")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(b"reflink probe")
+        _reflink(source, target)
+        return True
+    except OSError:
+        return False
+    finally:
+        source.unlink(missing_ok=True)
+        target.unlink(missing_ok=True)
+
+
+def _reflink(source: Path, target: Path) -> None:
+    import fcntl
+
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+        except OSError:
+            dst.close()
+            target.unlink(missing_ok=True)
+            raise
+
+
+def default_blob_root(warehouse: Path | str = DEFAULT_BLOB_DIR.parent) -> Path:
+    """Blob directory for sessions under ``warehouse`` unless ``ATTACHMENT_BLOB_DIR`` is set."""
+    root = os.getenv(BLOB_DIR_ENV, "").strip()
+    return Path(root) if root else Path(warehouse) / DEFAULT_BLOB_DIR.name
+
+
+_blob_store: Optional[BlobStore] = None
+_blob_store_lock = threading.Lock()
+
+
+def get_blob_store() -> BlobStore:
+    """Return the process-wide blob store, creating it on first use."""
+    global _blob_store
+    with _blob_store_lock:
+        if _blob_store is None:
+            _blob_store = BlobStore(default_blob_root())
+        return _blob_store
@@ -138,10 +138,9 @@ class HumanPromptService:
             return [MessageBlock.text_block(fallback_text)]
         normalized: List[MessageBlock] = []
         for block in blocks:
-            dup = block.copy()
-            if dup.type is MessageBlockType.TEXT and dup.text is not None:
-                dup.text = self._sanitize_response(dup.text)
-            normalized.append(dup)
+            if block.type is MessageBlockType.TEXT and block.text is not None:
+                block = block.replace(text=self._sanitize_response(block.text))
+            normalized.append(block)
         return normalized
 
 
@@ -29,14 +29,14 @@ class LogManager:
     @contextmanager
     def node_timer(self, node_id: str):
         """Context manager that times node execution."""
-        with self.logger.node_timer(node_id):
-            yield
+        with self.logger.node_timer(node_id) as span:
+            yield span
 
     @contextmanager
     def model_timer(self, node_id: str):
         """Context manager that times model invocations."""
-        with self.logger.model_timer(node_id):
-            yield
+        with self.logger.model_timer(node_id) as span:
+            yield span
 
     @contextmanager
     def agent_timer(self, node_id: str):
@@ -47,26 +47,26 @@ class LogManager:
     @contextmanager
     def human_timer(self, node_id: str):
         """Context manager that times human interactions."""
-        with self.logger.human_timer(node_id):
-            yield
+        with self.logger.human_timer(node_id) as span:
+            yield span
 
     @contextmanager
     def tool_timer(self, node_id: str, tool_name: str):
         """Context manager that times tool invocations."""
-        with self.logger.tool_timer(node_id, tool_name):
-            yield
+        with self.logger.tool_timer(node_id, tool_name) as span:
+            yield span
 
     @contextmanager
     def thinking_timer(self, node_id: str, stage: str):
         """Context manager that times thinking workflows."""
-        with self.logger.thinking_timer(node_id, stage):
-            yield
+        with self.logger.thinking_timer(node_id, stage) as span:
+            yield span
 
     @contextmanager
     def memory_timer(self, node_id: str, operation_type: str, stage: str):
         """Context manager that times memory operations."""
-        with self.logger.memory_timer(node_id, operation_type, stage):
-            yield
+        with self.logger.memory_timer(node_id, operation_type, stage) as span:
+            yield span
 
     @contextmanager
     def operation_timer(self, operation_name: str):
@@ -8,7 +8,9 @@ import json
 import copy
 
 from entity.enums import CallStage, EventType, LogLevel
+from utils.metrics import MEMORY_DURATION, MODEL_CALL_DURATION, NODE_DURATION, TOOL_DURATION
 from utils.structured_logger import StructuredLogger, get_workflow_logger
+from utils.tracing import start_span
 
 
 def _json_safe(value: Any) -> Any:
@@ -405,11 +407,13 @@ class WorkflowLogger:
         self.__init_timers__()
         start_time = time.time()
         try:
-            yield
+            with start_span("node", {"node.id": node_id}) as span:
+                yield span
         finally:
             end_time = time.time()
             duration = (end_time - start_time)
             self._timers[node_id] = duration
+            NODE_DURATION.observe(duration)
     
     @contextmanager
     def model_timer(self, node_id: str):
@@ -417,11 +421,13 @@ class WorkflowLogger:
         self.__init_timers__()
         start_time = time.time()
         try:
-            yield
+            with start_span("model_call", {"node.id": node_id}) as span:
+                yield span
         finally:
             end_time = time.time()
             duration = (end_time - start_time)
             self._timers[f"model_{node_id}"] = duration
+            MODEL_CALL_DURATION.observe(duration)
     
     @contextmanager
     def agent_timer(self, node_id: str):
@@ -441,7 +447,8 @@ class WorkflowLogger:
         self.__init_timers__()
         start_time = time.time()
         try:
-            yield
+            with start_span("human_input", {"node.id": node_id}) as span:
+                yield span
         finally:
             end_time = time.time()
             duration = (end_time - start_time)
@@ -453,11 +460,13 @@ class WorkflowLogger:
         self.__init_timers__()
         start_time = time.time()
         try:
-            yield
+            with start_span("tool_call", {"node.id": node_id, "tool.name": tool_name}) as span:
+                yield span
         finally:
             end_time = time.time()
             duration = (end_time - start_time)
             self._timers[f"tool_{node_id}_{tool_name}"] = duration
+            TOOL_DURATION.observe(duration, tool=tool_name)
     
     @contextmanager
     def thinking_timer(self, node_id: str, stage: str):
@@ -465,7 +474,8 @@ class WorkflowLogger:
         self.__init_timers__()
         start_time = time.time()
         try:
-            yield
+            with start_span("thinking", {"node.id": node_id, "stage": stage}) as span:
+                yield span
         finally:
             end_time = time.time()
             duration = (end_time - start_time)
@@ -477,11 +487,13 @@ class WorkflowLogger:
         self.__init_timers__()
         start_time = time.time()
         try:
-            yield
+            with start_span(f"memory.{operation_type.lower()}", {"node.id": node_id, "stage": stage}) as span:
+                yield span
         finally:
             end_time = time.time()
             duration = (end_time - start_time)
             self._timers[f"memory_{node_id}_{operation_type}_{stage}"] = duration
+            MEMORY_DURATION.observe(duration, operation=operation_type.lower())
     
     def get_timer(self, timer_key: str) -> Optional[float]:
         """Return the elapsed time recorded by the timer key."""
@@ -0,0 +1,366 @@
+"""Process-wide metrics registry exposed in the Prometheus text format.
+
+The registry is intentionally dependency-free: counters, gauges and histograms
+are plain thread-safe objects keyed by label values, and ``render()`` produces
+the exposition format served by ``GET /metrics``. Hot paths (node execution,
+provider calls, tools, memory, embeddings) feed it through ``WorkflowLogger``
+timers so per-run JSON logs and live metrics always agree.
+"""
+
+import contextvars
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0,
+)
+
+
+class MetricScope:
+    """Per-run tally of histogram observations.
+
+    The process-wide metrics include whatever else the process is doing; a
+    scope only counts observations made in the context that opened it. Pools
+    that submit through :func:`submit_tracked` copy that context, so work a
+    run hands to worker threads is counted too.
+    """
+
+    def __init__(self, parent: Optional["MetricScope"] = None) -> None:
+        self.parent = parent
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str) -> None:
+        scope: Optional[MetricScope] = self
+        while scope is not None:
+            with scope._lock:
+                scope._counts[name] = scope._counts.get(name, 0) + 1
+            scope = scope.parent
+
+    def count(self, metric: "_Metric") -> int:
+        with self._lock:
+            return self._counts.get(metric.name, 0)
+
+
+_active_scope: contextvars.ContextVar[Optional[MetricScope]] = contextvars.ContextVar(
+    "metric_scope", default=None
+)
+
+
+@contextmanager
+def metric_scope() -> Iterator[MetricScope]:
+    """Count histogram observations made by the current context until exit."""
+    scope = MetricScope(_active_scope.get())
+    token = _active_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _active_scope.reset(token)
+
+
+def _escape_label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape_label(value)}"' for name, value in zip(names, values)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{_escape_label(extra[1])}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Shared label handling for every metric type."""
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"Metric {self.name} expects labels {list(self.labelnames)}, got {sorted(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing value."""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only be incremented by non-negative amounts")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(val)}" for key, val in items]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(val)}" for key, val in items]
+
+
+class Histogram(_Metric):
+    """Cumulative bucketed distribution of observed values."""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> (per-bucket counts incl. +Inf, sum, count)
+        self._values: Dict[Tuple[str, ...], List[Any]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self._values[key] = state
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+        scope = _active_scope.get()
+        if scope is not None:
+            scope.record(self.name)
+
+    def count(self, **labels: Any) -> int:
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return state[2] if state else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(state[0]), state[1], state[2]) for key, state in sorted(self._values.items())]
+        lines: List[str] = []
+        bounds = list(self.buckets) + [float("inf")]
+        for key, bucket_counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, bucket_counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metrics by name and renders them together."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} already registered with a different shape")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Register a callback that refreshes gauges right before rendering."""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        with self._lock:
+            collectors = list(self._collectors)
+            metrics = list(self._metrics.values())
+        for collector in collectors:
+            collector()
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+_registry = MetricsRegistry()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    return _registry
+
+
+NODE_DURATION = _registry.histogram(
+    "devall_node_duration_seconds", "Wall time of a single node execution."
+)
+MODEL_CALL_DURATION = _registry.histogram(
+    "devall_model_call_duration_seconds", "Latency of provider model calls, including retries."
+)
+TOOL_DURATION = _registry.histogram(
+    "devall_tool_duration_seconds", "Latency of tool invocations.", ("tool",)
+)
+MEMORY_DURATION = _registry.histogram(
+    "devall_memory_operation_duration_seconds", "Latency of memory retrieval and update.", ("operation",)
+)
+PRE_GENERATION_STAGE_DURATION = _registry.histogram(
+    "devall_pre_generation_stage_duration_seconds",
+    "Latency of agent pre-generation stages (memory retrieval, RLM exploration, thinking).",
+    ("stage",),
+)
+EMBEDDING_DURATION = _registry.histogram(
+    "devall_embedding_duration_seconds", "Latency of embedding requests.", ("backend",)
+)
+PROVIDER_IN_FLIGHT = _registry.gauge(
+    "devall_provider_requests_in_flight", "Provider model calls currently awaiting a response."
+)
+POOL_QUEUE_DEPTH = _registry.gauge(
+    "devall_pool_queue_depth", "Tasks submitted to executor thread pools but not yet started.", ("pool",)
+)
+ACTIVE_SESSIONS = _registry.gauge(
+    "devall_active_sessions", "Workflow sessions owned by this process, by status.", ("status",)
+)
+WEBSOCKET_BUFFERED_MESSAGES = _registry.gauge(
+    "devall_websocket_buffered_messages", "Messages held in per-session WebSocket replay buffers."
+)
+TOKENS_TOTAL = _registry.counter(
+    "devall_tokens_total", "Model tokens consumed, by direction.", ("direction",)
+)
+ATTACHMENT_CACHE_LOOKUPS = _registry.counter(
+    "devall_attachment_cache_lookups_total", "Attachment payload cache lookups, by result.", ("result",)
+)
+ATTACHMENT_UPLOADS = _registry.counter(
+    "devall_attachment_uploads_total", "Attachments uploaded to provider file APIs.", ("provider",)
+)
+PYTHON_SCRIPT_RUNS = _registry.counter(
+    "devall_python_script_runs_total", "Python scripts executed, by warm pool or fresh interpreter.", ("mode",)
+)
+SETUP_PREFETCHES = _registry.counter(
+    "devall_setup_prefetches_total", "Node setup prefetches started ahead of execution, by outcome.", ("outcome",)
+)
+CONTEXT_COMPACTIONS = _registry.counter(
+    "devall_context_compactions_total", "Agent prompts compacted to fit the context budget, by summary source.", ("source",)
+)
+
+
+def submit_tracked(executor, pool: str, fn: Callable[..., Any], *args: Any, **kwargs: Any):
+    """Submit ``fn`` to ``executor`` while counting it in the pool queue-depth gauge.
+
+    The caller's context is copied into the worker so the active trace span
+    stays the parent of spans opened by ``fn``.
+    """
+    context = contextvars.copy_context()
+    state = {"started": False}
+    lock = threading.Lock()
+
+    def _leave_queue() -> None:
+        with lock:
+            if state["started"]:
+                return
+            state["started"] = True
+        POOL_QUEUE_DEPTH.dec(pool=pool)
+
+    def _run():
+        _leave_queue()
+        return context.run(fn, *args, **kwargs)
+
+    POOL_QUEUE_DEPTH.inc(pool=pool)
+    try:
+        future = executor.submit(_run)
+    except Exception:
+        _leave_queue()
+        raise
+    # Cancelled futures never run; make sure they leave the gauge too.
+    future.add_done_callback(lambda _: _leave_queue())
+    return future
@@ -0,0 +1,43 @@
+"""Apply resource limits, then run a script as ``__main__``.
+
+Started as ``<interpreter> python_limit_bootstrap.py <memory_bytes> <script> [arg ...]``
+by :func:`utils.python_worker_pool.script_command`, so ``RLIMIT_AS`` is in place
+before any user code runs without needing a ``preexec_fn`` in the (threaded)
+server process. Only the standard library is used because the bootstrap runs
+under the node's configured interpreter.
+"""
+
+import os
+import runpy
+import sys
+import traceback
+
+
+def _print_script_traceback(exc: BaseException, script: str) -> None:
+    # Hide the bootstrap/runpy frames so the traceback reads like a plain `python script.py`
+    tb = exc.__traceback__
+    while tb is not None and tb.tb_frame.f_code.co_filename != script:
+        tb = tb.tb_next
+    traceback.print_exception(type(exc), exc, tb or exc.__traceback__)
+
+
+def main(argv) -> None:
+    limit = int(argv[0])
+    script = argv[1]
+    if limit:
+        import resource
+
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    sys.argv = [script, *argv[2:]]
+    sys.path[0] = os.path.dirname(script)
+    try:
+        runpy.run_path(script, run_name="__main__")
+    except SystemExit:
+        raise
+    except BaseException as exc:
+        _print_script_traceback(exc, script)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,375 @@
+"""Warm interpreters for Python nodes and the ``execute_code`` tool.
+
+Starting a fresh interpreter and re-importing numpy or pandas dominates short
+scripts in code-review/fix loops. A :class:`PythonWorkerPool` keeps a few
+fork servers (:mod:`utils.python_worker_server`) alive per interpreter and
+preload list; each run forks a clean child from one of them, so the imports
+are paid once while runs stay isolated from each other.
+
+Each run gets its own session (killed as a group on timeout), an optional
+``RLIMIT_AS`` memory cap, and stdout/stderr pipes that are read while the
+script runs so callers can stream output. Callers fall back to a fresh
+``subprocess`` when :class:`WorkerUnavailable` is raised, which happens when
+forking is unsupported on the platform, every warm worker is busy, or a
+worker failed before the script was handed over. The pool size per
+interpreter defaults to 4 and can be changed with ``PYTHON_WORKER_POOL_SIZE``.
+"""
+
+import atexit
+import codecs
+import os
+import signal
+import socket
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from utils.python_worker_server import recv_frame, send_frame
+
+WORKER_POOL_SIZE_ENV = "PYTHON_WORKER_POOL_SIZE"
+DEFAULT_POOL_SIZE = 4
+WORKER_STARTUP_TIMEOUT = 120.0
+_SERVER_SCRIPT = Path(__file__).with_name("python_worker_server.py")
+_LIMIT_BOOTSTRAP = Path(__file__).with_name("python_limit_bootstrap.py")
+_READ_SIZE = 64 * 1024
+_CONTROL_TIMEOUT = 10.0
+
+OutputCallback = Callable[[str, str], None]
+
+
+class WorkerUnavailable(RuntimeError):
+    """No warm worker could take the run; the script was not started."""
+
+
+@dataclass
+class WorkerRunResult:
+    returncode: int | None
+    stdout: str
+    stderr: str
+    timed_out: bool = False
+    error: str | None = None
+
+
+def pool_supported() -> bool:
+    return hasattr(os, "fork") and hasattr(socket, "send_fds") and hasattr(os, "killpg")
+
+
+def script_command(script: Path | str, memory_limit_bytes: Optional[int]) -> List[str]:
+    """Arguments after the interpreter that run ``script`` in a fresh process.
+
+    With a memory limit the script is started through a small bootstrap that
+    sets ``RLIMIT_AS`` before any user code runs; a ``preexec_fn`` is not safe
+    in a multithreaded server. The limit is skipped where ``resource`` is
+    unavailable.
+    """
+    if not memory_limit_bytes:
+        return [str(script)]
+    try:
+        import resource  # noqa: F401
+    except ImportError:
+        return [str(script)]
+    return [str(_LIMIT_BOOTSTRAP), str(memory_limit_bytes), str(script)]
+
+
+class _Worker:
+    """One fork server process and the socket used to talk to it."""
+
+    def __init__(self, interpreter: str, preload: Sequence[str]) -> None:
+        parent_sock, child_sock = socket.socketpair()
+        try:
+            self.process = subprocess.Popen(
+                [interpreter, str(_SERVER_SCRIPT), str(child_sock.fileno()), *preload],
+                pass_fds=(child_sock.fileno(),),
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True,
+            )
+        except BaseException:
+            parent_sock.close()
+            raise
+        finally:
+            child_sock.close()
+        self.sock = parent_sock
+        self.retired = False
+        self.base_env = dict(os.environ)
+        try:
+            ready = self.receive(WORKER_STARTUP_TIMEOUT)
+        except BaseException:
+            self.close()
+            raise
+        if not ready or not ready.get("ready"):
+            self.close()
+            raise WorkerUnavailable(f"Python worker for {interpreter} failed to start")
+        self.preload_errors: List[str] = list(ready.get("preload_errors") or [])
+
+    @property
+    def alive(self) -> bool:
+        return not self.retired and self.process.poll() is None
+
+    def retire(self) -> None:
+        """Mark the control channel as out of step so the worker is closed instead of reused."""
+        self.retired = True
+
+    def send(self, payload: dict, fds: Sequence[int]) -> None:
+        self.sock.settimeout(_CONTROL_TIMEOUT)
+        send_frame(self.sock, payload, fds)
+
+    def receive(self, timeout: Optional[float]) -> Optional[dict]:
+        self.sock.settimeout(timeout)
+        payload, _ = recv_frame(self.sock)
+        return payload
+
+    def env_delta(self, overrides: Mapping[str, str]) -> Tuple[Dict[str, str], List[str]]:
+        """Changes between the server's inherited environment and the current one."""
+        current = dict(os.environ)
+        env = {key: value for key, value in current.items() if self.base_env.get(key) != value}
+        unset = [key for key in self.base_env if key not in current]
+        env.update(overrides)
+        return env, unset
+
+    def close(self) -> None:
+        try:
+            self.sock.close()
+        finally:
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+
+
+class PythonWorkerPool:
+    """Warm fork servers for one interpreter and preload list."""
+
+    def __init__(self, interpreter: str, preload: Sequence[str] = (), max_workers: int = DEFAULT_POOL_SIZE) -> None:
+        self.interpreter = interpreter
+        self.preload = tuple(preload)
+        self._slots = threading.BoundedSemaphore(max(1, max_workers))
+        self._idle: List[_Worker] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def run(
+        self,
+        script: Path | str,
+        *,
+        cwd: Path | str,
+        env: Optional[Mapping[str, str]] = None,
+        argv: Sequence[str] = (),
+        timeout: Optional[float] = None,
+        memory_limit_bytes: Optional[int] = None,
+        encoding: str = "utf-8",
+        on_output: Optional[OutputCallback] = None,
+    ) -> WorkerRunResult:
+        """Run ``script`` in a child forked from a warm worker.
+
+        ``on_output(stream, text)`` is called from reader threads as output
+        arrives, with ``stream`` being ``"stdout"`` or ``"stderr"``. Raises
+        :class:`WorkerUnavailable` when the run could not be handed to a
+        worker, in which case nothing was executed.
+        """
+        if not pool_supported():
+            raise WorkerUnavailable("Forking worker pool is not supported on this platform")
+        if not self._slots.acquire(blocking=False):
+            raise WorkerUnavailable("All Python workers are busy")
+        try:
+            worker = self._checkout()
+            try:
+                result = self._run_on(
+                    worker, script, cwd, env or {}, argv, timeout, memory_limit_bytes, encoding, on_output
+                )
+            except BaseException:
+                worker.close()
+                raise
+            self._checkin(worker)
+            return result
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.close()
+
+    def _checkout(self) -> _Worker:
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.alive:
+                    return worker
+                worker.close()
+        try:
+            return _Worker(self.interpreter, self.preload)
+        except (OSError, EOFError) as exc:
+            raise WorkerUnavailable(f"Could not start Python worker: {exc}") from exc
+
+    def _checkin(self, worker: _Worker) -> None:
+        with self._lock:
+            if not self._closed and worker.alive:
+                self._idle.append(worker)
+                return
+        worker.close()
+
+    def _run_on(
+        self,
+        worker: _Worker,
+        script: Path | str,
+        cwd: Path | str,
+        env: Mapping[str, str],
+        argv: Sequence[str],
+        timeout: Optional[float],
+        memory_limit_bytes: Optional[int],
+        encoding: str,
+        on_output: Optional[OutputCallback],
+    ) -> WorkerRunResult:
+        delta, unset = worker.env_delta(env)
+        request = {
+            "script": str(script),
+            "cwd": str(cwd),
+            "argv": list(argv),
+            "env": delta,
+            "unset": unset,
+            "encoding": encoding,
+            "memory_limit": memory_limit_bytes,
+        }
+        out_r, out_w = os.pipe()
+        err_r, err_w = os.pipe()
+        try:
+            worker.send(request, [out_w, err_w])
+        except OSError as exc:
+            os.close(out_r)
+            os.close(err_r)
+            raise WorkerUnavailable(f"Python worker rejected the run: {exc}") from exc
+        finally:
+            os.close(out_w)
+            os.close(err_w)
+
+        deadline = time.monotonic() + timeout if timeout else None
+        readers = [
+            _OutputReader(out_r, "stdout", encoding, on_output),
+            _OutputReader(err_r, "stderr", encoding, on_output),
+        ]
+        try:
+            started = worker.receive(_CONTROL_TIMEOUT)
+        except (OSError, EOFError):
+            worker.retire()
+            started = None
+        pid = (started or {}).get("pid")
+        if not pid:
+            for reader in readers:
+                reader.join(_CONTROL_TIMEOUT)
+            error = (started or {}).get("error") or "Python worker exited before starting the script"
+            return _result(None, readers, error=error)
+
+        timed_out = False
+        try:
+            finished = worker.receive(_remaining(deadline))
+        except socket.timeout:
+            timed_out = True
+            _kill_group(pid)
+            try:
+                finished = worker.receive(_CONTROL_TIMEOUT)
+            except (OSError, EOFError):
+                # The exit frame may still arrive later; never hand this worker another run
+                worker.retire()
+                finished = None
+        for reader in readers:
+            reader.join(_remaining(deadline))
+            if reader.is_alive():
+                # Background processes left holding the pipes; same as a subprocess timeout
+                timed_out = True
+                _kill_group(pid)
+                reader.join(_CONTROL_TIMEOUT)
+        returncode = (finished or {}).get("exit")
+        error = f"Script did not finish within {timeout}s" if timed_out else None
+        return _result(returncode, readers, timed_out=timed_out, error=error)
+
+
+class _OutputReader(threading.Thread):
+    def __init__(self, fd: int, stream: str, encoding: str, on_output: Optional[OutputCallback]) -> None:
+        super().__init__(name=f"python-worker-{stream}", daemon=True)
+        self.fd = fd
+        self.stream = stream
+        self.encoding = encoding
+        self.on_output = on_output
+        self.chunks: List[bytes] = []
+        self.start()
+
+    def run(self) -> None:
+        decoder = codecs.getincrementaldecoder(self.encoding)(errors="replace") if self.on_output else None
+        try:
+            while True:
+                chunk = os.read(self.fd, _READ_SIZE)
+                if not chunk:
+                    break
+                self.chunks.append(chunk)
+                if decoder is not None:
+                    text = decoder.decode(chunk)
+                    if text:
+                        self.on_output(self.stream, text)
+        finally:
+            os.close(self.fd)
+
+    def text(self) -> str:
+        return b"".join(self.chunks).decode(self.encoding, errors="replace")
+
+
+def _result(
+    returncode: int | None, readers: List[_OutputReader], *, timed_out: bool = False, error: str | None = None
+) -> WorkerRunResult:
+    stdout, stderr = (reader.text() for reader in readers)
+    return WorkerRunResult(returncode=returncode, stdout=stdout, stderr=stderr, timed_out=timed_out, error=error)
+
+
+def _remaining(deadline: Optional[float]) -> Optional[float]:
+    if deadline is None:
+        return None
+    # A zero socket timeout would switch the socket to non-blocking mode
+    return max(0.001, deadline - time.monotonic())
+
+
+def _kill_group(pid: int) -> None:
+    # The child may not have called setsid() yet, so kill it directly as well
+    for kill, target in ((os.killpg, pid), (os.kill, pid)):
+        try:
+            kill(target, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+
+_pools: Dict[Tuple[str, Tuple[str, ...]], PythonWorkerPool] = {}
+_pools_lock = threading.Lock()
+
+
+def _pool_size() -> int:
+    raw = os.getenv(WORKER_POOL_SIZE_ENV, "").strip()
+    try:
+        return int(raw) if raw else DEFAULT_POOL_SIZE
+    except ValueError:
+        return DEFAULT_POOL_SIZE
+
+
+def get_worker_pool(interpreter: str, preload: Sequence[str] = ()) -> PythonWorkerPool:
+    """Return the process-wide pool for ``interpreter`` with ``preload`` imported."""
+    key = (interpreter, tuple(preload))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = PythonWorkerPool(interpreter, key[1], _pool_size())
+            _pools[key] = pool
+        return pool
+
+
+@atexit.register
+def shutdown_worker_pools() -> None:
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
@@ -0,0 +1,175 @@
+"""Fork server behind :mod:`utils.python_worker_pool`.
+
+Started as ``<interpreter> python_worker_server.py <fd> [module ...]``: it
+imports the listed modules once, then forks a fresh child for every script it
+is asked to run, so each run starts with numpy/pandas already imported but
+shares no state with earlier runs. Requests arrive over the inherited UNIX
+socket together with the stdout/stderr pipe ends the child should write to.
+
+Only the standard library is used here because the server runs under the
+node's configured interpreter, which may not have this repository installed.
+"""
+
+import atexit
+import importlib
+import json
+import os
+import runpy
+import signal
+import socket
+import struct
+import sys
+import traceback
+
+_HEADER = struct.Struct("!I")
+
+
+def send_frame(sock: socket.socket, payload: dict, fds=()) -> None:
+    data = json.dumps(payload).encode("utf-8")
+    frame = _HEADER.pack(len(data)) + data
+    if fds:
+        sent = socket.send_fds(sock, [frame], list(fds))
+        frame = frame[sent:]
+    if frame:
+        sock.sendall(frame)
+
+
+def recv_frame(sock: socket.socket, *, max_fds: int = 0):
+    """Read one frame; returns ``(payload, fds)`` or ``(None, [])`` on EOF."""
+    fds = []
+    if max_fds:
+        head, fds, _flags, _addr = socket.recv_fds(sock, _HEADER.size, max_fds)
+    else:
+        head = sock.recv(_HEADER.size)
+    if not head:
+        return None, fds
+    head += _recv_exact(sock, _HEADER.size - len(head))
+    (length,) = _HEADER.unpack(head)
+    return json.loads(_recv_exact(sock, length)), fds
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    while size > 0:
+        chunk = sock.recv(size)
+        if not chunk:
+            raise EOFError("worker socket closed mid-frame")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _preload(modules):
+    failed = []
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except Exception as exc:  # keep serving; the script will hit the same error itself
+            failed.append(f"{name}: {exc}")
+    return failed
+
+
+def _exit_code(code) -> int:
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
+def _print_script_traceback(exc: BaseException, script: str) -> None:
+    # Hide the runpy/server frames so the traceback reads like a plain `python script.py`
+    tb = exc.__traceback__
+    while tb is not None and tb.tb_frame.f_code.co_filename != script:
+        tb = tb.tb_next
+    traceback.print_exception(type(exc), exc, tb or exc.__traceback__)
+
+
+def _run_child(sock: socket.socket, request: dict, out_fd: int, err_fd: int) -> None:
+    sock.close()
+    os.setsid()
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    null_fd = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(null_fd, 0)
+    os.dup2(out_fd, 1)
+    os.dup2(err_fd, 2)
+    for fd in (null_fd, out_fd, err_fd):
+        os.close(fd)
+
+    encoding = request.get("encoding") or "utf-8"
+    sys.stdin = open(0, encoding=encoding, closefd=False)
+    sys.stdout = open(1, "w", buffering=1, encoding=encoding, closefd=False)
+    sys.stderr = open(2, "w", buffering=1, encoding=encoding, errors="backslashreplace", closefd=False)
+
+    for key in request.get("unset") or []:
+        os.environ.pop(key, None)
+    os.environ.update(request.get("env") or {})
+    os.chdir(request["cwd"])
+    limit = request.get("memory_limit")
+    if limit:
+        import resource
+
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    script = request["script"]
+    sys.argv = [script, *request.get("argv", [])]
+    sys.path.insert(0, os.path.dirname(script))
+    code = 0
+    try:
+        runpy.run_path(script, run_name="__main__")
+    except SystemExit as exc:
+        code = _exit_code(exc.code)
+    except BaseException as exc:
+        _print_script_traceback(exc, script)
+        code = 1
+    try:
+        atexit._run_exitfuncs()
+        sys.stdout.flush()
+        sys.stderr.flush()
+    finally:
+        os._exit(code)
+
+
+def serve(sock: socket.socket, preload) -> None:
+    send_frame(sock, {"ready": True, "preload_errors": _preload(preload)})
+    while True:
+        try:
+            request, fds = recv_frame(sock, max_fds=2)
+        except (OSError, EOFError):
+            return
+        if request is None:
+            return
+        if len(fds) != 2:
+            for fd in fds:
+                os.close(fd)
+            send_frame(sock, {"error": "expected stdout and stderr descriptors"})
+            continue
+        out_fd, err_fd = fds
+        pid = os.fork()
+        if pid == 0:
+            try:
+                _run_child(sock, request, out_fd, err_fd)
+            except BaseException:
+                traceback.print_exc()
+            finally:
+                os._exit(70)
+        os.close(out_fd)
+        os.close(err_fd)
+        send_frame(sock, {"pid": pid})
+        _, status = os.waitpid(pid, 0)
+        send_frame(sock, {"exit": os.waitstatus_to_exitcode(status)})
+
+
+def main(argv) -> None:
+    # Drop this file's directory so preloads and scripts never resolve against it
+    here = os.path.dirname(os.path.realpath(__file__))
+    if sys.path and os.path.realpath(sys.path[0] or os.curdir) == here:
+        del sys.path[0]
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    sock = socket.socket(fileno=int(argv[0]))
+    serve(sock, argv[1:])
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,85 @@
+"""Local token counting for prompt budgeting.
+
+Uses ``tiktoken`` when it is installed (``o200k_base`` for the 4o/o-series
+models, ``cl100k_base`` otherwise). ``tiktoken`` is optional and is not
+installed by default; without it, or when its encoding files cannot be
+downloaded, counts are estimated as four ASCII characters per token plus one
+token per non-ASCII character, which over-counts CJK text rather than
+under-counting it. :func:`counts_are_exact` tells callers which one is in use
+so they can keep a safety margin. Counts are memoised under a digest of the
+text, so re-measuring a conversation that only grew at the end costs a hash
+and a dictionary lookup per unchanged message, and the cache never keeps the
+prompt texts themselves alive.
+"""
+
+import hashlib
+import math
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+try:  # pragma: no cover - optional dependency
+    import tiktoken
+except ImportError:  # pragma: no cover
+    tiktoken = None
+
+CHARS_PER_TOKEN = 4
+_COUNT_CACHE_SIZE = 8192
+_encodings: dict[str, Any] = {}
+_encodings_lock = threading.Lock()
+_counts: "OrderedDict[Tuple[bytes, str], int]" = OrderedDict()
+_counts_lock = threading.Lock()
+
+
+def _encoding_name(model: Optional[str]) -> str:
+    name = (model or "").lower()
+    if name.startswith(("gpt-4o", "gpt-4.1", "gpt-5", "o1", "o3", "o4")):
+        return "o200k_base"
+    return "cl100k_base"
+
+
+def _get_encoding(name: str) -> Any:
+    if tiktoken is None:
+        return None
+    with _encodings_lock:
+        if name not in _encodings:
+            try:
+                _encodings[name] = tiktoken.get_encoding(name)
+            except Exception:  # encodings are downloaded on first use
+                _encodings[name] = None
+        return _encodings[name]
+
+
+def _count(text: str, encoding_name: str) -> int:
+    key = (hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest(), encoding_name)
+    with _counts_lock:
+        count = _counts.get(key)
+        if count is not None:
+            _counts.move_to_end(key)
+            return count
+    count = _measure(text, encoding_name)
+    with _counts_lock:
+        _counts[key] = count
+        if len(_counts) > _COUNT_CACHE_SIZE:
+            _counts.popitem(last=False)
+    return count
+
+
+def _measure(text: str, encoding_name: str) -> int:
+    encoding = _get_encoding(encoding_name)
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return math.ceil(ascii_chars / CHARS_PER_TOKEN) + len(text) - ascii_chars
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Return the token count of ``text`` for ``model``."""
+    if not text:
+        return 0
+    return _count(text, _encoding_name(model))
+
+
+def counts_are_exact(model: Optional[str] = None) -> bool:
+    """Whether :func:`count_tokens` uses a real tokenizer for ``model`` rather than the estimate."""
+    return _get_encoding(_encoding_name(model)) is not None
@@ -4,6 +4,9 @@ from datetime import datetime
 from typing import Dict, Optional, Any
 from collections import defaultdict
 
+from utils.metrics import TOKENS_TOTAL
+from utils.tracing import current_span
+
 
 @dataclass
 class TokenUsage:
@@ -54,6 +57,9 @@ class TokenTracker:
         self.total_usage.input_tokens += usage.input_tokens
         self.total_usage.output_tokens += usage.output_tokens
         self.total_usage.total_tokens += usage.total_tokens
+        TOKENS_TOTAL.inc(usage.input_tokens, direction="input")
+        TOKENS_TOTAL.inc(usage.output_tokens, direction="output")
+        self._annotate_span(usage)
         
         # Add to node-specific usage
         node_usage = self.node_usages[node_id]
@@ -89,9 +95,22 @@ class TokenTracker:
         # Add provider to history entry if available
         if provider:
             history_entry["provider"] = provider
-            
+
         self.call_history.append(history_entry)
 
+    @staticmethod
+    def _annotate_span(usage: TokenUsage) -> None:
+        """Add token counts to the enclosing model-call span, if tracing is on."""
+        span = current_span()
+        if span is None:
+            return
+        target = span.nearest("model_call") or span
+        target.add_to_attribute("tokens.input", usage.input_tokens)
+        target.add_to_attribute("tokens.output", usage.output_tokens)
+        if span is not target:
+            span.add_to_attribute("tokens.input", usage.input_tokens)
+            span.add_to_attribute("tokens.output", usage.output_tokens)
+
     def get_total_usage(self) -> TokenUsage:
         """Get total token usage for the workflow."""
         return self.total_usage
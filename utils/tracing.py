@@ -0,0 +1,303 @@
+"""Lightweight span tracing for workflow runs.
+
+Spans form a tree per run: workflow -> node -> dynamic unit -> model call ->
+retry attempt / tool call / memory operation. The active span lives in a
+``ContextVar`` so nesting follows the call stack; executor thread pools copy
+the submitting context (see ``utils.metrics.submit_tracked``) so spans started
+in worker threads keep their parent. The session id doubles as the trace id,
+which lets a collector group every span of one run together.
+
+Tracing is off unless an exporter is configured, either programmatically via
+``set_span_exporter`` or with ``TRACE_EXPORTER`` (``json`` or ``otlp``):
+
+- ``json`` appends one JSON object per finished span to ``TRACE_FILE``
+  (default ``logs/traces.jsonl``).
+- ``otlp`` posts OTLP/HTTP JSON batches to ``OTEL_EXPORTER_OTLP_ENDPOINT``
+  (default ``http://localhost:4318``).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+TRACE_EXPORTER_ENV = "TRACE_EXPORTER"
+TRACE_FILE_ENV = "TRACE_FILE"
+OTLP_ENDPOINT_ENV = "OTEL_EXPORTER_OTLP_ENDPOINT"
+SERVICE_NAME = "devall"
+
+
+class Span:
+    """A timed operation with attributes and a parent link."""
+
+    __slots__ = (
+        "name", "trace_id", "span_id", "parent", "attributes",
+        "start_ns", "end_ns", "status", "error", "_lock",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent: Optional["Span"] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent = parent
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.status = "ok"
+        self.error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @property
+    def parent_id(self) -> Optional[str]:
+        return self.parent.span_id if self.parent else None
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        if self.end_ns is None:
+            return None
+        return (self.end_ns - self.start_ns) / 1_000_000
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        with self._lock:
+            self.attributes[key] = value
+
+    def add_to_attribute(self, key: str, amount: float) -> None:
+        """Accumulate a numeric attribute (e.g. token counts across callbacks)."""
+        with self._lock:
+            self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def nearest(self, name: str) -> Optional["Span"]:
+        """Return this span or the closest ancestor called ``name``."""
+        span: Optional[Span] = self
+        while span is not None:
+            if span.name == name:
+                return span
+            span = span.parent
+        return None
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.status = "error"
+        self.error = f"{exc.__class__.__name__}: {exc}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            attributes = dict(self.attributes)
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time_ns": self.start_ns,
+            "end_time_ns": self.end_ns,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "error": self.error,
+            "attributes": attributes,
+        }
+
+
+class SpanExporter:
+    """Receives finished spans."""
+
+    def export(self, span: Span) -> None:
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        """Push buffered spans; called whenever a root span finishes."""
+
+    def shutdown(self) -> None:
+        self.flush()
+
+
+class JsonFileSpanExporter(SpanExporter):
+    """Append finished spans as JSON lines to a local file."""
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), ensure_ascii=False, default=str)
+        with self._lock:
+            with self.path.open("a", encoding="utf-8") as handle:
+                handle.write(line + "\n")
+
+
+class OtlpHttpSpanExporter(SpanExporter):
+    """Batch spans and post them to an OTLP/HTTP collector as JSON."""
+
+    def __init__(self, endpoint: str, *, batch_size: int = 256, timeout: float = 5.0) -> None:
+        endpoint = endpoint.rstrip("/")
+        self.url = endpoint if endpoint.endswith("/v1/traces") else f"{endpoint}/v1/traces"
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self._buffer: List[Span] = []
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self._buffer.append(span)
+            should_flush = len(self._buffer) >= self.batch_size
+        if should_flush:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if not batch:
+            return
+        try:
+            import httpx
+
+            httpx.post(self.url, json=self._encode(batch), timeout=self.timeout)
+        except Exception as exc:
+            logger.warning("Failed to export %d spans to %s: %s", len(batch), self.url, exc)
+
+    @staticmethod
+    def _encode_value(value: Any) -> Dict[str, Any]:
+        if isinstance(value, bool):
+            return {"boolValue": value}
+        if isinstance(value, int):
+            return {"intValue": str(value)}
+        if isinstance(value, float):
+            return {"doubleValue": value}
+        return {"stringValue": str(value)}
+
+    def _encode(self, spans: List[Span]) -> Dict[str, Any]:
+        encoded = []
+        for span in spans:
+            data = span.to_dict()
+            item = {
+                "traceId": data["trace_id"],
+                "spanId": data["span_id"],
+                "name": data["name"],
+                "kind": 1,
+                "startTimeUnixNano": str(data["start_time_ns"]),
+                "endTimeUnixNano": str(data["end_time_ns"]),
+                "attributes": [
+                    {"key": key, "value": self._encode_value(value)}
+                    for key, value in data["attributes"].items()
+                ],
+                "status": {"code": 2, "message": data["error"] or ""} if data["status"] == "error" else {"code": 1},
+            }
+            if data["parent_id"]:
+                item["parentSpanId"] = data["parent_id"]
+            encoded.append(item)
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]
+                    },
+                    "scopeSpans": [{"scope": {"name": "devall.workflow"}, "spans": encoded}],
+                }
+            ]
+        }
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("devall_current_span", default=None)
+_exporter: Optional[SpanExporter] = None
+_exporter_configured = False
+_config_lock = threading.Lock()
+
+
+def _exporter_from_env() -> Optional[SpanExporter]:
+    name = os.getenv(TRACE_EXPORTER_ENV, "").strip().lower()
+    if name in ("", "none", "off"):
+        return None
+    if name == "json":
+        return JsonFileSpanExporter(os.getenv(TRACE_FILE_ENV, "logs/traces.jsonl"))
+    if name == "otlp":
+        return OtlpHttpSpanExporter(os.getenv(OTLP_ENDPOINT_ENV, "http://localhost:4318"))
+    logger.warning("Unknown %s=%s; tracing disabled", TRACE_EXPORTER_ENV, name)
+    return None
+
+
+def get_span_exporter() -> Optional[SpanExporter]:
+    global _exporter, _exporter_configured
+    if not _exporter_configured:
+        with _config_lock:
+            if not _exporter_configured:
+                _exporter = _exporter_from_env()
+                _exporter_configured = True
+    return _exporter
+
+
+def set_span_exporter(exporter: Optional[SpanExporter]) -> None:
+    """Install ``exporter`` (or disable tracing with ``None``), replacing env configuration."""
+    global _exporter, _exporter_configured
+    with _config_lock:
+        previous = _exporter
+        _exporter = exporter
+        _exporter_configured = True
+    if previous is not None and previous is not exporter:
+        previous.shutdown()
+
+
+def trace_id_for_session(session_id: str) -> str:
+    """Map a session id to a 32-hex-digit trace id (UUIDs map to themselves)."""
+    try:
+        return uuid.UUID(str(session_id)).hex
+    except ValueError:
+        return hashlib.sha256(str(session_id).encode("utf-8")).hexdigest()[:32]
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def start_span(
+    name: str,
+    attributes: Optional[Dict[str, Any]] = None,
+    *,
+    trace_id: Optional[str] = None,
+) -> Iterator[Optional[Span]]:
+    """Open a child of the active span; yields ``None`` when tracing is disabled.
+
+    ``trace_id`` only applies to root spans; nested spans always inherit their
+    parent's trace so subgraphs stay within the caller's trace.
+    """
+    exporter = get_span_exporter()
+    if exporter is None:
+        yield None
+        return
+
+    parent = _current_span.get()
+    if parent is not None:
+        resolved_trace_id = parent.trace_id
+    else:
+        resolved_trace_id = trace_id or secrets.token_hex(16)
+    span = Span(name, resolved_trace_id, parent, attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as exc:
+        span.record_exception(exc)
+        raise
+    finally:
+        span.end_ns = time.time_ns()
+        _current_span.reset(token)
+        try:
+            exporter.export(span)
+            if parent is None:
+                exporter.flush()
+        except Exception as exc:
+            logger.warning("Span export failed: %s", exc)
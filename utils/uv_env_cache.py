@@ -0,0 +1,201 @@
+"""Shared cache of uv project resolutions keyed by their dependency set.
+
+Every session gets its own ``code_workspace`` and, through the uv tools, its
+own ``.venv``; a workflow that needs ``pandas matplotlib`` would otherwise
+resolve the same dependency set again for every session. After a successful
+``uv add`` the workspace's ``pyproject.toml`` and ``uv.lock`` are kept under a
+key derived from the requested packages, the requested Python version and
+the platform. The next workspace asking for the same set gets those files
+and installs them with ``uv sync --frozen``, which skips resolution.
+
+The environment itself is not snapshotted: uv already keeps every wheel it
+installed in its own cache and, on Linux, installs from there by hardlink,
+so a frozen sync with a warm cache takes a fraction of a second and no extra
+disk, while copying a ``.venv`` snapshot per session took longer and used a
+full copy of the environment each time.
+
+Unpinned requests reuse whatever versions were resolved when the entry was
+stored. Entries are evicted least-recently-used once the cache exceeds its
+disk budget. The cache lives in ``WareHouse/.uv_envs`` (``UV_ENV_CACHE_DIR``)
+with a 64 MB budget (``UV_ENV_CACHE_BYTES``).
+"""
+
+import hashlib
+import json
+import os
+import platform
+import shutil
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+UV_ENV_CACHE_DIR_ENV = "UV_ENV_CACHE_DIR"
+UV_ENV_CACHE_BYTES_ENV = "UV_ENV_CACHE_BYTES"
+DEFAULT_CACHE_DIR = Path("WareHouse") / ".uv_envs"
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+PROJECT_FILES = ("pyproject.toml", "uv.lock")
+WORKSPACE_STATE_FILE = ".uv_env.json"
+_META_FILE = "meta.json"
+
+
+def environment_key(packages: Sequence[str], python_version: Optional[str]) -> str:
+    payload = {
+        "packages": sorted({package.strip() for package in packages}),
+        "python": (python_version or "").strip(),
+        "platform": [sys.platform, platform.machine()],
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def read_workspace_state(workspace: Path) -> Optional[Dict[str, Any]]:
+    """Return the dependency set recorded for ``workspace`` by the uv tools, if any."""
+    path = Path(workspace) / WORKSPACE_STATE_FILE
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict):
+        return None
+    packages = data.get("packages")
+    return {
+        "python": data.get("python"),
+        "packages": [str(item) for item in packages] if isinstance(packages, list) else [],
+    }
+
+
+def write_workspace_state(workspace: Path, *, python_version: Optional[str], packages: Sequence[str]) -> None:
+    path = Path(workspace) / WORKSPACE_STATE_FILE
+    payload = {"python": python_version, "packages": sorted(set(packages))}
+    path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+
+
+class UvEnvCache:
+    """Content-keyed copies of resolved uv project files."""
+
+    def __init__(self, root: Path | str, max_bytes: int = DEFAULT_CACHE_BYTES) -> None:
+        self.root = Path(root)
+        self.max_bytes = max(0, int(max_bytes))
+        self._lock = threading.Lock()
+
+    def entry_path(self, key: str) -> Path:
+        return self.root / key
+
+    def contains(self, key: str) -> bool:
+        return (self.entry_path(key) / _META_FILE).exists()
+
+    def attach(self, key: str, workspace: Path | str) -> bool:
+        """Write the project files of entry ``key`` into the workspace; False when absent.
+
+        The caller installs them with ``uv sync --frozen``.
+        """
+        workspace = Path(workspace)
+        entry = self.entry_path(key)
+        with self._lock:
+            if self._read_meta(entry) is None:
+                return False
+            files = {name: (entry / name).read_bytes() for name in PROJECT_FILES if (entry / name).exists()}
+            os.utime(entry / _META_FILE)
+        for name, data in files.items():
+            (workspace / name).write_bytes(data)
+        return True
+
+    def store(
+        self,
+        key: str,
+        workspace: Path | str,
+        *,
+        packages: Sequence[str],
+        python_version: Optional[str],
+    ) -> bool:
+        """Keep the workspace's resolved project files under ``key`` unless an entry exists."""
+        workspace = Path(workspace)
+        if not (workspace / "uv.lock").is_file() or self.contains(key):
+            return False
+        self.root.mkdir(parents=True, exist_ok=True)
+        staging = self.root / f".{key}.{uuid.uuid4().hex}.tmp"
+        try:
+            staging.mkdir()
+            size = 0
+            for name in PROJECT_FILES:
+                source = workspace / name
+                if source.exists():
+                    data = source.read_bytes()
+                    (staging / name).write_bytes(data)
+                    size += len(data)
+            meta = {
+                "packages": sorted(set(packages)),
+                "python": python_version,
+                "size": size,
+                "created_at": time.time(),
+            }
+            (staging / _META_FILE).write_text(json.dumps(meta, indent=2), encoding="utf-8")
+            with self._lock:
+                if self.contains(key):
+                    return False
+                _remove(self.entry_path(key))
+                os.replace(staging, self.entry_path(key))
+        finally:
+            if staging.exists():
+                _remove(staging)
+        self.evict()
+        return True
+
+    def evict(self) -> List[str]:
+        """Drop least-recently-used entries until the cache fits its budget."""
+        with self._lock:
+            entries: List[Tuple[float, int, Path]] = []
+            for entry in self.root.iterdir() if self.root.exists() else ():
+                meta_path = entry / _META_FILE
+                meta = self._read_meta(entry)
+                if meta is None:
+                    continue
+                entries.append((meta_path.stat().st_mtime, int(meta.get("size") or 0), entry))
+            total = sum(size for _, size, _ in entries)
+            removed: List[str] = []
+            for _, size, entry in sorted(entries, key=lambda item: item[0]):
+                if total <= self.max_bytes:
+                    break
+                _remove(entry)
+                total -= size
+                removed.append(entry.name)
+            return removed
+
+    @staticmethod
+    def _read_meta(entry: Path) -> Optional[Dict[str, Any]]:
+        try:
+            data = json.loads((entry / _META_FILE).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return data if isinstance(data, dict) else None
+
+
+def _remove(path: Path) -> None:
+    if path.is_dir() and not path.is_symlink():
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        path.unlink(missing_ok=True)
+
+
+def _default_budget() -> int:
+    raw = os.getenv(UV_ENV_CACHE_BYTES_ENV, "").strip()
+    try:
+        return int(raw) if raw else DEFAULT_CACHE_BYTES
+    except ValueError:
+        return DEFAULT_CACHE_BYTES
+
+
+_cache: Optional[UvEnvCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_uv_env_cache() -> UvEnvCache:
+    """Return the process-wide uv resolution cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            root = os.getenv(UV_ENV_CACHE_DIR_ENV, "").strip() or DEFAULT_CACHE_DIR
+            _cache = UvEnvCache(root, _default_budget())
+        return _cache
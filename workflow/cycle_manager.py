@@ -1,6 +1,6 @@
 """Cycle detection and management for workflow graphs."""
 
-from typing import Dict, List, Set, Optional, Any
+from typing import Dict, FrozenSet, List, Set, Optional, Any, Tuple
 from dataclasses import dataclass, field
 from entity.configs import Node
 
@@ -21,6 +21,15 @@ class CycleInfo:
     initial_node: Optional[str] = None  # The unique initial node when first entering the cycle
     configured_entry_node: Optional[str] = None  # User-configured entry node (if any)
     max_iterations_default: int = 100  # Default maximum iterations if max_iterations is None
+
+    # Scoped topology, filled by CycleExecutor the first time it is needed.
+    # inner_cycles is keyed by initial node; layer_plans by (initial node,
+    # None) for the first iteration and (initial node, triggered nodes) for
+    # later ones.
+    inner_cycles: Dict[str, List[Set[str]]] = field(default_factory=dict, repr=False)
+    layer_plans: Dict[Tuple[str, Optional[FrozenSet[str]]], List[List[Dict[str, Any]]]] = field(
+        default_factory=dict, repr=False
+    )
     
     def add_node(self, node_id: str) -> None:
         """Add a node to the cycle."""
@@ -2,11 +2,11 @@
 
 import copy
 import threading
-from typing import Dict, List, Callable, Any, Set, Optional
+from typing import Dict, FrozenSet, List, Callable, Any, Set, Optional
 
 from entity.configs import Node
 from utils.log_manager import LogManager
-from workflow.cycle_manager import CycleManager
+from workflow.cycle_manager import CycleInfo, CycleManager
 from workflow.executor.parallel_executor import ParallelExecutor
 from workflow.topology_builder import GraphTopologyBuilder
 
@@ -43,6 +43,10 @@ class CycleExecutor:
         self.cycle_manager = cycle_manager
         self.execute_node_func = execute_node_func
         self.parallel_executor = ParallelExecutor(log_manager, nodes)
+        # Nested cycles are discovered inside a scope and have no CycleInfo in
+        # the cycle manager; keep one per node set to hold their plans
+        self._nested_cycle_infos: Dict[FrozenSet[str], CycleInfo] = {}
+        self._nested_lock = threading.Lock()
     
     def execute(self) -> None:
         """Run the workflow that contains cycles."""
@@ -206,18 +210,18 @@ class CycleExecutor:
                   provided parent_cycle_nodes scope
         """
         iteration = 0
+        plan_info = self._get_plan_info(cycle_id, cycle_nodes)
 
         while iteration < max_iterations:
             self.log_manager.debug(
                 f"Cycle {cycle_id} iteration {iteration + 1}/{max_iterations}"
             )
 
-            # Step 1: Detect nested cycles in the scoped subgraph
-            inner_cycles = self._detect_cycles_in_scope(cycle_nodes, initial_node_id)
-
-            # Build topological layers (whether there are nested cycles or not)
-            execution_layers = self._build_topological_layers_in_scope(
-                cycle_nodes, initial_node_id, inner_cycles,
+            # Topological layers for this iteration (built once per variant)
+            execution_layers = self._get_execution_layers(
+                plan_info,
+                cycle_nodes,
+                initial_node_id,
                 is_first_iteration=(iteration == 0)
             )
 
@@ -250,6 +254,60 @@ class CycleExecutor:
                 f"Cycle {cycle_id} reached max iterations ({max_iterations})"
             )
         return set()
+
+    def _get_plan_info(self, cycle_id: str, cycle_nodes: List[str]) -> CycleInfo:
+        """Return the CycleInfo that caches the scoped topology of a cycle."""
+        cycle_info = self.cycle_manager.cycles.get(cycle_id)
+        if cycle_info is not None and cycle_info.nodes == set(cycle_nodes):
+            return cycle_info
+
+        key = frozenset(cycle_nodes)
+        with self._nested_lock:
+            cycle_info = self._nested_cycle_infos.get(key)
+            if cycle_info is None:
+                cycle_info = CycleInfo(
+                    cycle_id=cycle_id,
+                    nodes=set(cycle_nodes),
+                    entry_nodes=set(),
+                    exit_edges=[],
+                )
+                self._nested_cycle_infos[key] = cycle_info
+        return cycle_info
+
+    def _get_execution_layers(
+        self,
+        cycle_info: CycleInfo,
+        cycle_nodes: List[str],
+        initial_node_id: str,
+        is_first_iteration: bool,
+    ) -> List[List[Dict[str, Any]]]:
+        """Look up, or build and remember, the layer plan for one iteration.
+
+        The scoped subgraph never changes while the workflow runs, so the
+        nested cycles and layers only depend on the initial node and, after
+        the first iteration, on which scope nodes are triggered.
+        """
+        inner_cycles = cycle_info.inner_cycles.get(initial_node_id)
+        if inner_cycles is None:
+            inner_cycles = self._detect_cycles_in_scope(cycle_nodes, initial_node_id)
+            cycle_info.inner_cycles[initial_node_id] = inner_cycles
+
+        if is_first_iteration:
+            plan_key = (initial_node_id, None)
+        else:
+            plan_key = (
+                initial_node_id,
+                frozenset(node_id for node_id in cycle_nodes if self.nodes[node_id].is_triggered()),
+            )
+        layers = cycle_info.layer_plans.get(plan_key)
+        if layers is None:
+            layers = self._build_topological_layers_in_scope(
+                cycle_nodes, initial_node_id, inner_cycles,
+                is_first_iteration=is_first_iteration
+            )
+            cycle_info.layer_plans[plan_key] = layers
+        return layers
+
     def _detect_cycles_in_scope(
         self,
         scope_nodes: List[str],
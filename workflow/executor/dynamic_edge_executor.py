@@ -6,13 +6,56 @@ is virtually expanded into multiple instances based on split results.
 """
 
 import concurrent.futures
-from typing import Callable, Dict, List, Optional
+import contextlib
+import contextvars
+import itertools
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from entity.configs import Node
+from entity.configs.dynamic_base import MapDynamicConfig
 from entity.configs.edge.dynamic_edge_config import DynamicEdgeConfig
 from entity.messages import Message, MessageRole
+from runtime.node.executor.base import NODE_ERROR_KEY, abandon_scope
 from runtime.node.splitter import create_splitter_from_config, group_messages
+from utils.exceptions import WorkflowCancelledError, WorkflowExecutionError
 from utils.log_manager import LogManager
+from utils.metrics import submit_tracked
+from utils.tracing import start_span
+from workflow.executor.map_unit_store import MapUnitStore
+
+UnitCallback = Callable[[int, List[Message]], None]
+
+MAX_TREE_LAYERS = 100
+
+
+def _peek_units(units: Iterator[List[Message]]) -> Optional[Iterator[List[Message]]]:
+    """Return an iterator over ``units`` with nothing consumed, or None if it is empty."""
+    first = next(units, None)
+    if first is None:
+        return None
+    return itertools.chain((first,), units)
+
+
+@dataclass
+class UnitOutcome:
+    """How one map unit ended: ``ok``, ``cached`` (reused from disk) or ``failed``."""
+
+    index: int
+    status: str = "pending"
+    attempts: int = 0
+    error: Optional[str] = None
+
+
+@dataclass
+class _TreeItem:
+    """A message awaiting reduction, covering split indexes ``[lo, hi)``."""
+
+    message: Message
+    lo: int
+    hi: int
+    layer: int
 
 
 class DynamicEdgeExecutor:
@@ -28,15 +71,19 @@ class DynamicEdgeExecutor:
         self,
         log_manager: LogManager,
         node_executor_func: Callable[[Node, List[Message]], List[Message]],
+        unit_store: Optional[MapUnitStore] = None,
     ):
         """Initialize the dynamic edge executor.
         
         Args:
             log_manager: Logger instance
             node_executor_func: Function to execute a node with inputs
+            unit_store: Checkpoint store used by map edges with ``resume`` enabled
         """
         self.log_manager = log_manager
         self.node_executor_func = node_executor_func
+        self.unit_store = unit_store
+        self.unit_outcomes: List[UnitOutcome] = []
     
     def execute(
         self,
@@ -61,17 +108,17 @@ class DynamicEdgeExecutor:
         # Create splitter based on config
         splitter = create_splitter_from_config(split_config)
         
-        # Split the payload into execution units
-        execution_units = splitter.split([payload])
+        # Split the payload lazily; map units start while splitting continues
+        execution_units = _peek_units(splitter.iter_units([payload]))
         
-        if not execution_units:
+        if execution_units is None:
             self.log_manager.debug(
                 f"Dynamic edge -> {target_node.id}: no execution units after split"
             )
             return []
         
         self.log_manager.info(
-            f"Dynamic edge -> {target_node.id}: splitting into {len(execution_units)} parallel units"
+            f"Dynamic edge -> {target_node.id}: splitting payload into parallel units"
         )
         
         if dynamic_config.is_map():
@@ -91,6 +138,7 @@ class DynamicEdgeExecutor:
         inputs: List[Message],
         dynamic_config: DynamicEdgeConfig,
         static_inputs: Optional[List[Message]] = None,
+        on_unit_complete: Optional[UnitCallback] = None,
     ) -> List[Message]:
         """Execute dynamic expansion using all collected inputs.
         
@@ -102,6 +150,8 @@ class DynamicEdgeExecutor:
             inputs: Dynamic edge inputs to be split
             dynamic_config: Edge dynamic configuration
             static_inputs: Non-dynamic edge inputs to be replicated to all units
+            on_unit_complete: Map mode only. Called with ``(unit_index, outputs)``
+                as units finish, in the order requested by ``dynamic_config.ordered``
             
         Returns:
             List of output messages from all executions
@@ -112,27 +162,30 @@ class DynamicEdgeExecutor:
         # Create splitter based on config
         splitter = create_splitter_from_config(split_config)
         
-        # Split only dynamic inputs into execution units
-        execution_units = splitter.split(inputs)
+        # Split only dynamic inputs into execution units, lazily
+        execution_units = _peek_units(splitter.iter_units(inputs))
         
-        if not execution_units:
+        if execution_units is None:
             self.log_manager.debug(
                 f"Dynamic node {target_node.id}: no execution units after split"
             )
             # If no dynamic inputs but have static inputs, execute once with static inputs
             if static_inputs:
-                return self.node_executor_func(target_node, static_inputs)
+                outputs = self.node_executor_func(target_node, static_inputs)
+                if on_unit_complete is not None:
+                    on_unit_complete(0, outputs)
+                return outputs
             return []
         
         self.log_manager.info(
             f"Dynamic node {target_node.id}: splitting {len(inputs)} dynamic inputs into "
-            f"{len(execution_units)} parallel units ({dynamic_config.type} mode)"
+            f"parallel units ({dynamic_config.type} mode)"
             + (f", with {len(static_inputs)} static inputs replicated to each" if static_inputs else "")
         )
         
         if dynamic_config.is_map():
             return self._execute_map(
-                target_node, execution_units, dynamic_config, static_inputs
+                target_node, execution_units, dynamic_config, static_inputs, on_unit_complete
             )
         elif dynamic_config.is_tree():
             return self._execute_tree(
@@ -144,17 +197,24 @@ class DynamicEdgeExecutor:
     def _execute_map(
         self,
         target_node: Node,
-        execution_units: List[List[Message]],
+        execution_units: Iterable[List[Message]],
         dynamic_config: DynamicEdgeConfig,
         static_inputs: Optional[List[Message]] = None,
+        on_unit_complete: Optional[UnitCallback] = None,
     ) -> List[Message]:
         """Execute in Map mode (fan-out only).
         
+        Units are pulled from ``execution_units`` only when a worker is free,
+        so a lazy splitter never has more than ``max_parallel`` units in
+        memory ahead of the scheduler.
+        
         Args:
             target_node: Target node template
-            execution_units: Split message units
+            execution_units: Split message units (any iterable, consumed once)
             dynamic_config: Dynamic configuration
             static_inputs: Static inputs to copy to all units
+            on_unit_complete: Optional callback receiving each unit's outputs
+                as soon as it (and, when ordered, every earlier unit) finishes
             
         Returns:
             Flat list of all output messages
@@ -163,59 +223,207 @@ class DynamicEdgeExecutor:
         max_parallel = map_config.max_parallel
         all_outputs: List[Message] = []
         static_inputs = static_inputs or []
-        
-        if len(execution_units) == 1:
+        outcomes: List[UnitOutcome] = []
+        self.unit_outcomes = outcomes
+        units = iter(execution_units)
+        first_unit = next(units, None)
+        second_unit = next(units, None) if first_unit is not None else None
+        
+        if first_unit is None:
+            pass
+        elif second_unit is None:
             # Single unit - execute directly
-            unit_inputs = list(static_inputs) + execution_units[0]
-            outputs = self._execute_unit(target_node, unit_inputs, 0)
+            outcomes.append(UnitOutcome(index=0))
+            unit_inputs = list(static_inputs) + first_unit
+            outputs = self._run_map_unit(target_node, unit_inputs, 0, map_config, outcomes[0])
             all_outputs.extend(outputs)
+            if on_unit_complete is not None:
+                on_unit_complete(0, outputs)
         else:
             # Multiple units - parallel execution
-            effective_workers = min(len(execution_units), max_parallel)
-            
-            with concurrent.futures.ThreadPoolExecutor(max_workers=effective_workers) as executor:
-                futures: Dict[concurrent.futures.Future, int] = {}
-                
-                for idx, unit in enumerate(execution_units):
-                    unit_inputs = list(static_inputs) + unit
-                    future = executor.submit(
-                        self._execute_unit, target_node, unit_inputs, idx
-                    )
-                    futures[future] = idx
-                
-                results_by_idx: Dict[int, List[Message]] = {}
-                for future in concurrent.futures.as_completed(futures):
-                    idx = futures[future]
-                    try:
-                        result = future.result()
-                        results_by_idx[idx] = result
-                        self.log_manager.debug(
-                            f"Dynamic edge -> {target_node.id}#{idx}: "
-                            f"completed with {len(result)} outputs"
-                        )
-                    except Exception as e:
-                        self.log_manager.error(
-                            f"Dynamic edge -> {target_node.id}#{idx}: "
-                            f"failed with error: {e}"
+            units = itertools.chain((first_unit, second_unit), units)
+            executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_parallel)
+            futures: Dict[concurrent.futures.Future, int] = {}
+
+            def submit_next() -> bool:
+                unit = next(units, None)
+                if unit is None:
+                    return False
+                idx = len(outcomes)
+                outcomes.append(UnitOutcome(index=idx))
+                future = submit_tracked(
+                    executor,
+                    "dynamic",
+                    self._run_map_unit,
+                    target_node,
+                    list(static_inputs) + unit,
+                    idx,
+                    map_config,
+                    outcomes[idx],
+                )
+                futures[future] = idx
+                return True
+
+            results_by_idx: Dict[int, List[Message]] = {}
+            next_to_emit = 0
+            # Units copy this context on submit, so setting the event stops
+            # the ones already running at their next step
+            abandon = threading.Event()
+            try:
+                with abandon_scope(abandon):
+                    while len(futures) < max_parallel and submit_next():
+                        pass
+                    while futures:
+                        done, _ = concurrent.futures.wait(
+                            futures, return_when=concurrent.futures.FIRST_COMPLETED
                         )
-                        raise
-                
-                # Combine results in original order
-                for idx in range(len(execution_units)):
-                    if idx in results_by_idx:
-                        all_outputs.extend(results_by_idx[idx])
+                        for future in done:
+                            idx = futures.pop(future)
+                            try:
+                                result = future.result()
+                                self.log_manager.debug(
+                                    f"Dynamic edge -> {target_node.id}#{idx}: "
+                                    f"completed with {len(result)} outputs"
+                                )
+                            except Exception as e:
+                                if not self._should_skip_failure(map_config, e):
+                                    self.log_manager.error(
+                                        f"Dynamic edge -> {target_node.id}#{idx}: "
+                                        f"failed with error: {e}"
+                                    )
+                                    raise
+                                self.log_manager.warning(
+                                    f"Dynamic edge -> {target_node.id}#{idx}: "
+                                    f"failed with error: {e}; skipping unit"
+                                )
+                                result = []
+                            results_by_idx[idx] = result
+                            submit_next()
+
+                            if on_unit_complete is None:
+                                continue
+                            if not dynamic_config.ordered:
+                                on_unit_complete(idx, result)
+                                continue
+                            # Ordered streaming: release the contiguous prefix that is now complete
+                            while next_to_emit in results_by_idx:
+                                on_unit_complete(next_to_emit, results_by_idx[next_to_emit])
+                                next_to_emit += 1
+            except BaseException:
+                # Completed siblings are already checkpointed; drop the queued
+                # ones and stop the running ones
+                abandon.set()
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+            executor.shutdown(wait=True)
+            
+            # Combine results in original order
+            for idx in range(len(outcomes)):
+                if idx in results_by_idx:
+                    all_outputs.extend(results_by_idx[idx])
         
+        self._finish_map(target_node, outcomes)
         self.log_manager.info(
             f"Dynamic edge -> {target_node.id}: "
-            f"Map completed with {len(all_outputs)} total outputs"
+            f"Map completed {len(outcomes)} units with {len(all_outputs)} total outputs"
         )
         
         return all_outputs
+
+    def _run_map_unit(
+        self,
+        node: Node,
+        unit_inputs: List[Message],
+        unit_index: int,
+        map_config: MapDynamicConfig,
+        outcome: UnitOutcome,
+    ) -> List[Message]:
+        """Execute one map unit with checkpoint reuse and retries."""
+        key = None
+        if self.unit_store is not None and map_config.resume:
+            key = self.unit_store.unit_key(node, unit_inputs)
+            cached = self.unit_store.load(node, key)
+            if cached is not None:
+                outcome.status = "cached"
+                self.log_manager.debug(
+                    f"Dynamic edge -> {node.id}#{unit_index}: reused {len(cached)} checkpointed outputs"
+                )
+                for msg in cached:
+                    metadata = dict(msg.metadata_view)
+                    metadata["dynamic_edge_unit_index"] = unit_index
+                    msg.metadata = metadata
+                return cached
+
+        max_attempts = map_config.retry_n + 1
+        for attempt in range(1, max_attempts + 1):
+            outcome.attempts = attempt
+            try:
+                outputs = self._execute_unit(node, unit_inputs, unit_index)
+                self._raise_reported_error(node, outputs)
+            except WorkflowCancelledError:
+                outcome.status = "failed"
+                outcome.error = "cancelled"
+                raise
+            except Exception as e:
+                outcome.error = f"{e.__class__.__name__}: {e}"
+                if attempt == max_attempts:
+                    outcome.status = "failed"
+                    raise
+                self.log_manager.warning(
+                    f"Dynamic edge -> {node.id}#{unit_index}: attempt {attempt}/{max_attempts} "
+                    f"failed with error: {e}; retrying"
+                )
+                continue
+            outcome.status = "ok"
+            outcome.error = None
+            if key is not None:
+                self.unit_store.save(node, key, outputs)
+            return outputs
+
+    @staticmethod
+    def _raise_reported_error(node: Node, outputs: List[Message]) -> None:
+        """Fail a unit whose node returned an error message instead of raising.
+
+        Agent nodes report model errors as output text; such a unit must be
+        retried or skipped like a raising one, and never checkpointed.
+        """
+        for msg in outputs:
+            error = msg.get_metadata(NODE_ERROR_KEY)
+            if error:
+                raise WorkflowExecutionError(f"Node '{node.id}' failed: {error}")
+
+    @staticmethod
+    def _should_skip_failure(map_config: MapDynamicConfig, error: Exception) -> bool:
+        if isinstance(error, WorkflowCancelledError):
+            return False
+        return map_config.failure_policy == "skip_failed"
+
+    def _finish_map(self, node: Node, outcomes: List[UnitOutcome]) -> None:
+        """Log the unit outcome summary; raise if ``skip_failed`` left nothing."""
+        counts: Dict[str, int] = {}
+        for outcome in outcomes:
+            counts[outcome.status] = counts.get(outcome.status, 0) + 1
+        failed = [outcome for outcome in outcomes if outcome.status == "failed"]
+        self.log_manager.info(
+            f"Dynamic edge -> {node.id}: unit outcomes "
+            + ", ".join(f"{status}={count}" for status, count in sorted(counts.items())),
+            details={
+                "unit_outcomes": counts,
+                "failed_units": [
+                    {"index": outcome.index, "attempts": outcome.attempts, "error": outcome.error}
+                    for outcome in failed
+                ],
+            },
+        )
+        if outcomes and len(failed) == len(outcomes):
+            raise WorkflowExecutionError(
+                f"All {len(outcomes)} map units of node '{node.id}' failed; first error: {failed[0].error}"
+            )
     
     def _execute_tree(
         self,
         target_node: Node,
-        execution_units: List[List[Message]],
+        execution_units: Iterable[List[Message]],
         dynamic_config: DynamicEdgeConfig,
         static_inputs: Optional[List[Message]] = None,
     ) -> List[Message]:
@@ -251,6 +459,11 @@ class DynamicEdgeExecutor:
             f"Tree starting with {len(current_messages)} inputs, group_size={group_size}"
         )
         
+        if tree_config.eager:
+            return self._execute_tree_eager(
+                target_node, current_messages, dynamic_config, static_inputs
+            )
+
         layer = 0
         is_first_layer = True
         
@@ -286,8 +499,8 @@ class DynamicEdgeExecutor:
                         group_inputs = group
                         if is_first_layer:
                             group_inputs = list(static_inputs) + group_inputs
-                        future = executor.submit(
-                            self._execute_group, target_node, group_inputs, layer, idx
+                        future = submit_tracked(
+                            executor, "dynamic", self._execute_group, target_node, group_inputs, layer, idx
                         )
                         futures[future] = idx
                     
@@ -317,7 +530,7 @@ class DynamicEdgeExecutor:
             is_first_layer = False
             
             # Safety check
-            if layer > 100:
+            if layer > MAX_TREE_LAYERS:
                 self.log_manager.error(
                     f"Dynamic edge -> {target_node.id}: exceeded maximum layers"
                 )
@@ -330,6 +543,132 @@ class DynamicEdgeExecutor:
         
         return current_messages
     
+    def _execute_tree_eager(
+        self,
+        target_node: Node,
+        messages: List[Message],
+        dynamic_config: DynamicEdgeConfig,
+        static_inputs: List[Message],
+    ) -> List[Message]:
+        """Execute Tree mode without layer barriers.
+
+        Leaf groups are formed from the split messages up front. Afterwards a
+        reducer is launched whenever ``group_size`` results are ready, whatever
+        layer they came from. With ``dynamic_config.ordered`` only results
+        covering adjacent split ranges are merged, so non-commutative
+        reductions keep their order. Partial groups are only formed once
+        nothing else is running.
+
+        Returns:
+            The final reduced output(s), in split order
+        """
+        if len(messages) <= 1:
+            # Same as the layered loop: a single message needs no reduction
+            return list(messages)
+
+        tree_config = dynamic_config.as_tree_config()
+        group_size = tree_config.group_size
+        ordered = dynamic_config.ordered
+        effective_workers = max(1, min(tree_config.max_parallel, len(messages)))
+
+        ready: List[_TreeItem] = []
+        running: Dict[concurrent.futures.Future, Tuple[int, int, int]] = {}
+        group_counts: Dict[int, int] = {}
+        max_layer = 0
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=effective_workers) as executor:
+
+            def launch(items: List[_TreeItem]) -> None:
+                nonlocal max_layer
+                layer = max(item.layer for item in items) + 1
+                max_layer = max(max_layer, layer)
+                group_index = group_counts.get(layer, 0)
+                group_counts[layer] = group_index + 1
+                group_inputs = [item.message for item in items]
+                if layer == 1:
+                    group_inputs = list(static_inputs) + group_inputs
+                future = submit_tracked(
+                    executor, "dynamic", self._execute_group, target_node, group_inputs, layer, group_index
+                )
+                running[future] = (min(item.lo for item in items), max(item.hi for item in items), layer)
+
+            for start in range(0, len(messages), group_size):
+                chunk = messages[start:start + group_size]
+                launch([
+                    _TreeItem(message=msg, lo=start + offset, hi=start + offset + 1, layer=0)
+                    for offset, msg in enumerate(chunk)
+                ])
+
+            while running:
+                done, _ = concurrent.futures.wait(
+                    list(running), return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    lo, hi, layer = running.pop(future)
+                    try:
+                        outputs = future.result()
+                    except Exception as e:
+                        self.log_manager.error(
+                            f"Dynamic edge -> {target_node.id}#{layer}: failed with error: {e}"
+                        )
+                        raise
+                    ready.extend(_TreeItem(message=msg, lo=lo, hi=hi, layer=layer) for msg in outputs)
+
+                if max_layer > MAX_TREE_LAYERS:
+                    self.log_manager.error(
+                        f"Dynamic edge -> {target_node.id}: exceeded maximum layers"
+                    )
+                    break
+
+                for group in self._take_ready_groups(ready, running, group_size, ordered):
+                    launch(group)
+                if not running and len(ready) > 1:
+                    # Nothing left to wait for: reduce the remainder in partial groups
+                    ready.sort(key=lambda item: item.lo)
+                    remainder, ready[:] = list(ready), []
+                    for start in range(0, len(remainder), group_size):
+                        launch(remainder[start:start + group_size])
+
+        ready.sort(key=lambda item: item.lo)
+        self.log_manager.info(
+            f"Dynamic edge -> {target_node.id}: "
+            f"Eager tree completed after {max_layer} layers with {len(ready)} output(s)"
+        )
+        return [item.message for item in ready]
+
+    @staticmethod
+    def _take_ready_groups(
+        ready: List[_TreeItem],
+        running: Dict[concurrent.futures.Future, Tuple[int, int, int]],
+        group_size: int,
+        ordered: bool,
+    ) -> List[List[_TreeItem]]:
+        """Remove and return every full group that can be reduced now."""
+        if not ordered:
+            groups = []
+            while len(ready) >= group_size:
+                groups.append(ready[:group_size])
+                del ready[:group_size]
+            return groups
+
+        # Ordered: only merge neighbours with no in-flight range between them
+        ready.sort(key=lambda item: item.lo)
+        in_flight = [(lo, hi) for lo, hi, _ in running.values()]
+        groups: List[List[_TreeItem]] = []
+        remaining: List[_TreeItem] = []
+        run: List[_TreeItem] = []
+        for item in ready:
+            if run and any(run[-1].hi <= lo and hi <= item.lo for lo, hi in in_flight):
+                remaining.extend(run)
+                run = []
+            run.append(item)
+            if len(run) == group_size:
+                groups.append(run)
+                run = []
+        remaining.extend(run)
+        ready[:] = remaining
+        return groups
+
     def _execute_unit(
         self,
         node: Node,
@@ -346,16 +685,20 @@ class DynamicEdgeExecutor:
         # Clone messages first to avoid mutating shared inputs in parallel threads
         unit_inputs = [msg.clone() for msg in unit_inputs]
         for msg in unit_inputs:
-            metadata = dict(msg.metadata)
+            metadata = dict(msg.metadata_view)
             metadata["dynamic_edge_unit_index"] = unit_index
             msg.metadata = metadata
         
         # Execute using node executor
-        outputs = self.node_executor_func(node, unit_inputs)
+        with start_span(
+            "dynamic_unit",
+            {"node.id": node.id, "dynamic.mode": "map", "unit.index": unit_index, "input.count": len(unit_inputs)},
+        ):
+            outputs = self.node_executor_func(node, unit_inputs)
         
         # Tag outputs with unit index
         for msg in outputs:
-            metadata = dict(msg.metadata)
+            metadata = dict(msg.metadata_view)
             metadata["dynamic_edge_unit_index"] = unit_index
             msg.metadata = metadata
         
@@ -379,17 +722,27 @@ class DynamicEdgeExecutor:
         # Clone messages first to avoid mutating shared inputs in parallel threads
         group_inputs = [msg.clone() for msg in group_inputs]
         for msg in group_inputs:
-            metadata = dict(msg.metadata)
+            metadata = dict(msg.metadata_view)
             metadata["dynamic_edge_tree_layer"] = layer
             metadata["dynamic_edge_tree_group"] = group_index
             msg.metadata = metadata
         
         # Execute
-        outputs = self.node_executor_func(node, group_inputs)
+        with start_span(
+            "dynamic_unit",
+            {
+                "node.id": node.id,
+                "dynamic.mode": "tree",
+                "tree.layer": layer,
+                "unit.index": group_index,
+                "input.count": len(group_inputs),
+            },
+        ):
+            outputs = self.node_executor_func(node, group_inputs)
         
         # Tag outputs
         for msg in outputs:
-            metadata = dict(msg.metadata)
+            metadata = dict(msg.metadata_view)
             metadata["dynamic_edge_tree_layer"] = layer
             metadata["dynamic_edge_tree_group"] = group_index
             metadata["dynamic_edge_instance_id"] = instance_id
@@ -397,3 +750,133 @@ class DynamicEdgeExecutor:
             msg.role = MessageRole.USER  # Mark as user-generated
         
         return outputs
+
+
+class StreamingMapStage:
+    """Map units of one target node started ahead of the scheduler.
+
+    An upstream node running a streaming map feeds items in as its own units
+    finish; the units run on a private pool while the upstream stragglers are
+    still working. When the scheduler reaches the target node it calls
+    ``collect`` to wait for whatever is still in flight.
+
+    The stage stands in for the node's normal execution wrapper: it holds the
+    node's resources (acquired by the caller, released on ``close``) and its
+    node timer from the first unit until ``collect`` returns. The timer and
+    an abandon scope live in a private context that every unit copies, so a
+    failing unit stops its running siblings.
+    """
+
+    def __init__(
+        self,
+        dynamic_executor: DynamicEdgeExecutor,
+        target_node: Node,
+        dynamic_config: DynamicEdgeConfig,
+        resources: Optional[contextlib.ExitStack] = None,
+    ):
+        self.dynamic_executor = dynamic_executor
+        self.target_node = target_node
+        self.dynamic_config = dynamic_config
+        self.resources = resources or contextlib.ExitStack()
+        self._map_config = dynamic_config.as_map_config()
+        self._splitter = create_splitter_from_config(dynamic_config.split)
+        self._outcomes: List[UnitOutcome] = []
+        self._pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(1, dynamic_config.max_parallel),
+            thread_name_prefix=f"stream-{target_node.id}",
+        )
+        self._futures: List[concurrent.futures.Future] = []
+        self._abandon = threading.Event()
+        # A context can only be entered by one thread at a time
+        self._context_lock = threading.Lock()
+        self._context = contextvars.copy_context()
+        self._scope = contextlib.ExitStack()
+        self._in_context(self._enter_scope)
+
+    def _in_context(self, fn: Callable, *args):
+        with self._context_lock:
+            return self._context.run(fn, *args)
+
+    def _enter_scope(self) -> None:
+        self._scope.enter_context(abandon_scope(self._abandon))
+        self._scope.enter_context(self.dynamic_executor.log_manager.node_timer(self.target_node.id))
+
+    @property
+    def submitted(self) -> int:
+        return len(self._futures)
+
+    def submit(self, payload: Message, static_inputs: Optional[List[Message]] = None) -> int:
+        """Split ``payload`` and start one unit per split result.
+
+        Returns:
+            Number of units started
+        """
+        units = self._splitter.split([payload])
+        for unit in units:
+            unit_inputs = list(static_inputs or []) + unit
+            outcome = UnitOutcome(index=len(self._futures))
+            future = self._in_context(
+                submit_tracked,
+                self._pool,
+                "dynamic",
+                self.dynamic_executor._run_map_unit,
+                self.target_node,
+                unit_inputs,
+                outcome.index,
+                self._map_config,
+                outcome,
+            )
+            self._outcomes.append(outcome)
+            self._futures.append(future)
+        return len(units)
+
+    def collect(self, on_unit_complete: Optional[UnitCallback] = None) -> List[Message]:
+        """Wait for every started unit and return outputs in submission order."""
+        futures = {future: idx for idx, future in enumerate(self._futures)}
+        results_by_idx: Dict[int, List[Message]] = {}
+        next_to_emit = 0
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                idx = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    if not self.dynamic_executor._should_skip_failure(self._map_config, e):
+                        self.dynamic_executor.log_manager.error(
+                            f"Dynamic edge -> {self.target_node.id}#{idx}: "
+                            f"failed with error: {e}"
+                        )
+                        raise
+                    self.dynamic_executor.log_manager.warning(
+                        f"Dynamic edge -> {self.target_node.id}#{idx}: "
+                        f"failed with error: {e}; skipping unit"
+                    )
+                    result = []
+                results_by_idx[idx] = result
+                if on_unit_complete is None:
+                    continue
+                if not self.dynamic_config.ordered:
+                    on_unit_complete(idx, result)
+                    continue
+                while next_to_emit in results_by_idx:
+                    on_unit_complete(next_to_emit, results_by_idx[next_to_emit])
+                    next_to_emit += 1
+        except BaseException:
+            self.close()
+            raise
+        self._pool.shutdown(wait=True)
+        self._in_context(self._scope.close)
+
+        self.dynamic_executor.unit_outcomes = list(self._outcomes)
+        self.dynamic_executor._finish_map(self.target_node, self._outcomes)
+        all_outputs: List[Message] = []
+        for idx in range(len(self._futures)):
+            all_outputs.extend(results_by_idx.get(idx, []))
+        return all_outputs
+
+    def close(self) -> None:
+        """Stop running units, drop queued ones and release the node's resources."""
+        self._abandon.set()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._in_context(self._scope.close)
+        self.resources.close()
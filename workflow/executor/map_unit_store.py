@@ -0,0 +1,74 @@
+"""On-disk checkpoints for dynamic map units.
+
+Each completed unit's outputs are written to
+``<output root>/<project name>/map_units/<node id>/<input hash>.json`` as soon
+as the unit finishes. That directory is the same for every run of the
+project, including CLI runs whose output directory is timestamped, so when
+the same node runs again, units whose inputs (and node configuration) hash
+to an existing file are answered from disk instead of being executed again.
+Units that failed, including agent units that reported a model error, are
+never written.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import List, Optional
+
+from entity.configs import Node
+from entity.configs.base import config_fingerprint
+from entity.messages import Message
+
+STORE_DIRNAME = "map_units"
+
+
+class MapUnitStore:
+    """Persist and look up map unit outputs by input hash."""
+
+    def __init__(self, root: Path | str) -> None:
+        self.root = Path(root) / STORE_DIRNAME
+
+    def unit_key(self, node: Node, unit_inputs: List[Message]) -> str:
+        """Hash the node definition and the unit inputs (metadata excluded)."""
+        payload = {
+            "node": node.id,
+            "type": node.type,
+            "config": config_fingerprint(node.config),
+            "inputs": [
+                {key: value for key, value in msg.to_dict(include_data=False).items() if key != "metadata"}
+                for msg in unit_inputs
+            ],
+        }
+        encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def load(self, node: Node, key: str) -> Optional[List[Message]]:
+        path = self._path(node, key)
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            # A truncated or corrupt checkpoint is just a cache miss
+            return None
+        return [Message.from_dict(item) for item in raw.get("outputs", []) if isinstance(item, dict)]
+
+    def save(self, node: Node, key: str, outputs: List[Message]) -> None:
+        path = self._path(node, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"node_id": node.id, "outputs": [msg.to_dict() for msg in outputs]}
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".unit-", suffix=".json")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump(payload, handle, ensure_ascii=False, default=str)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    def _path(self, node: Node, key: str) -> Path:
+        safe_id = re.sub(r"[^A-Za-z0-9_.-]", "_", node.id)
+        return self.root / safe_id / f"{key}.json"
@@ -4,6 +4,7 @@ import concurrent.futures
 from typing import Any, Callable, List, Tuple
 
 from utils.log_manager import LogManager
+from utils.metrics import submit_tracked
 
 
 class ParallelExecutor:
@@ -106,7 +107,7 @@ class ParallelExecutor:
         with concurrent.futures.ThreadPoolExecutor(max_workers=len(items)) as executor:
             futures = []
             for item in items:
-                future = executor.submit(executor_func, item)
+                future = submit_tracked(executor, "layer", executor_func, item)
                 futures.append((item, future))
             
             # Wait for every future to finish
@@ -1,9 +1,9 @@
 """Resource coordination helpers for workflow node execution."""
 
 import threading
-from contextlib import contextmanager
+from contextlib import ExitStack, contextmanager
 from dataclasses import dataclass
-from typing import Dict, Iterable, List, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from entity.configs import Node
 from runtime.node.registry import get_node_registration
@@ -39,6 +39,26 @@ class ResourceManager:
         with self._acquire_resources(requests):
             yield
 
+    def try_hold_node(self, node: Node) -> Optional[ExitStack]:
+        """Acquire the node's resources without blocking.
+
+        Returns a stack that releases them when closed, or None (holding
+        nothing) if any of them is exhausted right now.
+        """
+        held = ExitStack()
+        for request in sorted(self._resolve_node_requests(node), key=lambda item: item.key):
+            semaphore = self._get_or_create_resource(request)
+            if not semaphore.acquire(blocking=False):
+                held.close()
+                return None
+            self._log_debug(f"Acquired resource {request.key}")
+            held.callback(self._release, request.key, semaphore)
+        return held
+
+    def _release(self, key: str, semaphore: threading.Semaphore) -> None:
+        semaphore.release()
+        self._log_debug(f"Released resource {key}")
+
     def _resolve_node_requests(self, node: Node) -> List[ResourceRequest]:
         registration = get_node_registration(node.node_type)
         caps = registration.capabilities
@@ -61,8 +81,7 @@ class ResourceManager:
             yield
         finally:
             for key, semaphore in reversed(acquired):
-                semaphore.release()
-                self._log_debug(f"Released resource {key}")
+                self._release(key, semaphore)
 
     def _get_or_create_resource(self, request: ResourceRequest) -> threading.Semaphore:
         with self._lock:
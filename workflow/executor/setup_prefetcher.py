@@ -0,0 +1,98 @@
+"""Background warm-up of node setup while upstream nodes execute."""
+
+import concurrent.futures
+import threading
+from typing import Callable, Dict, Iterable, Optional
+
+from entity.configs import Node
+from runtime.node.executor.base import NodeExecutor
+from utils.log_manager import LogManager
+from utils.metrics import SETUP_PREFETCHES, submit_tracked
+
+
+class SetupPrefetcher:
+    """Runs ``NodeExecutor.prefetch`` for nodes that are likely to run next.
+
+    When a node starts, the scheduler hands its successors to :meth:`schedule`
+    so their provider clients, tool specs and templates are ready by the time
+    they are triggered. Prefetching is only an optimisation: at most
+    ``max_pending`` prefetches are queued or running and further requests are
+    dropped, failures are left for ``execute`` to report, and a queued
+    prefetch is cancelled when the edge to its node is not triggered.
+    """
+
+    MAX_WORKERS = 2
+    MAX_PENDING = 8
+
+    def __init__(
+        self,
+        resolve_executor: Callable[[Node], Optional[NodeExecutor]],
+        log_manager: LogManager,
+        *,
+        max_workers: int = MAX_WORKERS,
+        max_pending: int = MAX_PENDING,
+    ) -> None:
+        self.resolve_executor = resolve_executor
+        self.log_manager = log_manager
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._futures: Dict[str, concurrent.futures.Future] = {}
+        self._pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def schedule(self, nodes: Iterable[Node]) -> None:
+        """Start prefetching ``nodes`` that have not been prefetched in this run."""
+        for node in nodes:
+            executor = self.resolve_executor(node)
+            if executor is None or type(executor).prefetch is NodeExecutor.prefetch:
+                continue
+            with self._lock:
+                if self._closed or node.id in self._futures:
+                    continue
+                pending = sum(1 for future in self._futures.values() if not future.done())
+                if pending >= self.max_pending:
+                    SETUP_PREFETCHES.inc(outcome="dropped")
+                    continue
+                if self._pool is None:
+                    self._pool = concurrent.futures.ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="prefetch"
+                    )
+                self._futures[node.id] = submit_tracked(self._pool, "prefetch", self._run, executor, node)
+
+    def cancel(self, node_id: str) -> None:
+        """Cancel a queued prefetch; one that already started is left to finish."""
+        with self._lock:
+            future = self._futures.get(node_id)
+            if future is not None and future.cancel():
+                del self._futures[node_id]
+                SETUP_PREFETCHES.inc(outcome="cancelled")
+
+    def claim(self, node_id: str) -> None:
+        """Called when the node starts: drop a queued prefetch or wait for a running one."""
+        with self._lock:
+            future = self._futures.get(node_id)
+            if future is None:
+                return
+            if future.cancel():
+                del self._futures[node_id]
+                return
+        # Running prefetches do the same work execute would; waiting avoids doing it twice
+        future.result()
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            pool, self._pool = self._pool, None
+            self._futures.clear()
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, executor: NodeExecutor, node: Node) -> None:
+        try:
+            executor.prefetch(node)
+        except Exception as exc:
+            SETUP_PREFETCHES.inc(outcome="failed")
+            self.log_manager.debug(f"Prefetch for node {node.id} failed: {exc}", node_id=node.id)
+        else:
+            SETUP_PREFETCHES.inc(outcome="completed")
@@ -0,0 +1,147 @@
+"""Incremental vote counting for majority-voting graphs.
+
+Votes are added one voter at a time as results arrive. Answers are grouped
+into clusters (identical text, normalized text or embedding similarity) and
+the tally can tell when the final winner can no longer change, which lets
+the caller stop waiting for the remaining voters.
+"""
+
+import math
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from utils.log_manager import LogManager
+
+EmbedFunc = Callable[[str], Sequence[float]]
+
+_TRAILING_PUNCTUATION = ".,;:!?。，；：！？"
+
+
+def normalize_answer(text: str) -> str:
+    """Case-fold, collapse whitespace and drop quotes and trailing punctuation."""
+    value = unicodedata.normalize("NFKC", text).casefold()
+    value = re.sub(r"\s+", " ", value).strip()
+    value = value.strip("\"'`").strip()
+    return value.rstrip(_TRAILING_PUNCTUATION).strip()
+
+
+def _cosine(left: Sequence[float], right: Sequence[float]) -> float:
+    dot = sum(a * b for a, b in zip(left, right))
+    norm = math.sqrt(sum(a * a for a in left)) * math.sqrt(sum(b * b for b in right))
+    return dot / norm if norm else 0.0
+
+
+@dataclass
+class _Cluster:
+    key: str
+    representative: str
+    order: int
+    voters: List[str] = field(default_factory=list)
+    embedding: Optional[Sequence[float]] = None
+
+
+class VoteTally:
+    """Count votes as they arrive and decide when the outcome is settled.
+
+    Ties are broken in favour of the cluster whose first member comes first in
+    ``voter_ids``, which matches counting every output at the end in node
+    order. Empty answers are abstentions.
+    """
+
+    def __init__(
+        self,
+        voter_ids: Sequence[str],
+        *,
+        quorum: int | None = None,
+        clustering: str = "exact",
+        similarity_threshold: float = 0.9,
+        embed: EmbedFunc | None = None,
+        log_manager: LogManager | None = None,
+    ) -> None:
+        self.voter_ids = list(voter_ids)
+        self._order = {voter_id: idx for idx, voter_id in enumerate(self.voter_ids)}
+        self.quorum = quorum if quorum is not None else len(self.voter_ids) // 2 + 1
+        self.clustering = clustering
+        self.similarity_threshold = similarity_threshold
+        self.embed = embed
+        self.log_manager = log_manager
+        self.clusters: List[_Cluster] = []
+        self.answers: Dict[str, str] = {}
+
+    @property
+    def remaining(self) -> int:
+        return len(self.voter_ids) - len(self.answers)
+
+    def add(self, voter_id: str, text: str) -> None:
+        """Record the answer of one voter."""
+        self.answers[voter_id] = text
+        if not text.strip():
+            return
+        order = self._order.get(voter_id, len(self.voter_ids))
+        key = self._key(text)
+        cluster = next((item for item in self.clusters if item.key == key), None)
+        embedding = None
+        if cluster is None and self.clustering == "embedding":
+            embedding = self._embed(text)
+            if embedding is not None:
+                cluster = self._nearest_cluster(embedding)
+        if cluster is None:
+            cluster = _Cluster(key=key, representative=text, order=order, embedding=embedding)
+            self.clusters.append(cluster)
+        elif order < cluster.order:
+            cluster.order = order
+            cluster.representative = text
+        cluster.voters.append(voter_id)
+
+    def standings(self) -> List[Tuple[str, int]]:
+        """Return ``(representative, votes)`` pairs, winner first."""
+        ranked = sorted(self.clusters, key=lambda item: (-len(item.voters), item.order))
+        return [(cluster.representative, len(cluster.voters)) for cluster in ranked]
+
+    def is_decided(self) -> bool:
+        """True once the remaining voters cannot change the winner.
+
+        ``quorum`` is validated to be at least a strict majority, so a leader
+        reaching it has already won.
+        """
+        if self.remaining == 0:
+            return True
+        standings = self.standings()
+        if not standings:
+            return False
+        leader = standings[0][1]
+        runner_up = standings[1][1] if len(standings) > 1 else 0
+        return leader >= self.quorum or leader > runner_up + self.remaining
+
+    def result(self) -> str:
+        """Return the winning answer, or an empty string when nobody answered."""
+        standings = self.standings()
+        return standings[0][0] if standings else ""
+
+    def _key(self, text: str) -> str:
+        if self.clustering == "exact":
+            return text
+        return normalize_answer(text)
+
+    def _nearest_cluster(self, embedding: Sequence[float]) -> _Cluster | None:
+        best, best_score = None, self.similarity_threshold
+        for cluster in self.clusters:
+            if cluster.embedding is None:
+                continue
+            score = _cosine(embedding, cluster.embedding)
+            if score >= best_score:
+                best, best_score = cluster, score
+        return best
+
+    def _embed(self, text: str) -> Sequence[float] | None:
+        if self.embed is None:
+            return None
+        try:
+            return self.embed(text)
+        except Exception as exc:
+            # Fall back to normalized-text matching for this answer
+            if self.log_manager:
+                self.log_manager.warning(f"Embedding vote clustering failed: {exc}")
+            return None
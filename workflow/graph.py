@@ -1,10 +1,12 @@
 """Graph orchestration adapted to ChatDev design_0.4.0 workflows."""
 
 import threading
+from contextlib import nullcontext
 from typing import Any, Callable, Dict, List, Optional
 from runtime.node.agent.memory.shared_rlm_environment import SharedRLMEnvironment
 
 from runtime.node.agent.memory import MemoryBase, MemoryFactory, MemoryManager
+from runtime.node.agent.memory.write_behind import MemoryWriteError, MemoryWriter
 from runtime.node.agent.thinking import ThinkingManagerBase, ThinkingManagerFactory
 from entity.configs import Node, EdgeLink, AgentConfig, ConfigError
 from entity.configs.edge import EdgeConditionConfig
@@ -19,6 +21,7 @@ from utils.exceptions import (
     WorkflowCancelledError,
 )
 from utils.structured_logger import get_server_logger
+from utils.tracing import start_span, trace_id_for_session
 from utils.human_prompt import (
     CliPromptChannel,
     HumanPromptService,
@@ -38,13 +41,17 @@ from workflow.runtime import (
 from workflow.runtime.runtime_context import RuntimeContext
 from runtime.edge.conditions import (
     ConditionFactoryContext,
+    KeywordEdgeConditionManager,
+    KeywordRouter,
     build_edge_condition_manager,
 )
 from runtime.edge.processors import (
     ProcessorFactoryContext as PayloadProcessorFactoryContext,
     build_edge_processor as build_edge_payload_processor,
 )
-from workflow.executor.dynamic_edge_executor import DynamicEdgeExecutor
+from workflow.executor.dynamic_edge_executor import DynamicEdgeExecutor, StreamingMapStage
+from workflow.executor.map_unit_store import MapUnitStore
+from workflow.executor.setup_prefetcher import SetupPrefetcher
 
 
 # ------------------------------------------------------------------
@@ -69,6 +76,7 @@ class GraphExecutor:
     ) -> None:
         """Initialize executor with graph context instance."""
         self.majority_result = None
+        self.majority_report = None
         self.graph: GraphContext = graph
         self.outputs = {}
         self.logger = self._create_logger()
@@ -88,6 +96,7 @@ class GraphExecutor:
         self.thinking_managers: Dict[str, ThinkingManagerBase] = {}
         self.global_memories: Dict[str, MemoryBase] = {}
         self.agent_memory_managers: Dict[str, MemoryManager] = {}
+        self.memory_writer: Optional[MemoryWriter] = None
         self.shared_rlm_environments: Dict[str, "SharedRLMEnvironment"] = {}
 
         # Token tracking
@@ -100,9 +109,17 @@ class GraphExecutor:
         # Cycle management
         self.cycle_manager: Optional[CycleManager] = None
 
+        # Map units started early by upstream streaming maps, keyed by target node id
+        self._map_streams: Dict[str, StreamingMapStage] = {}
+        # Checkpoints for map units with resume enabled
+        self.map_unit_store = MapUnitStore(graph.checkpoint_directory)
+
         # Node executors (new strategy pattern implementation)
         self.__execution_context: Optional[ExecutionContext] = None
         self.node_executors: Dict[str, Any] = {}
+        # Warms successor setup while their predecessors run
+        self.setup_prefetcher: Optional[SetupPrefetcher] = None
+        self._pseudo_edges: Dict[str, EdgeLink] = {}
         self._human_prompt_service: Optional[HumanPromptService] = None
 
         # for majority voting mode
@@ -129,6 +146,10 @@ class GraphExecutor:
         """Create and return a logger instance."""
         return WorkflowLogger(self.graph.name, self.graph.log_level)
 
+    def _create_delta_sink(self) -> Optional[Any]:
+        """Return the receiver for streamed model output, or None to disable streaming."""
+        return None
+
     @classmethod
     def execute_graph(
         cls,
@@ -249,13 +270,15 @@ class GraphExecutor:
 
     def _build_agent_memories(self) -> None:
         """Build memory managers for agent nodes referencing global stores."""
+        if self.memory_writer is None:
+            self.memory_writer = MemoryWriter(self.global_memories)
         for node_id, node in self.graph.nodes.items():
             agent_config = node.as_config(AgentConfig)
             if not (agent_config and agent_config.memories):
                 continue
             try:
                 self.agent_memory_managers[node_id] = MemoryManager(
-                    agent_config.memories, self.global_memories
+                    agent_config.memories, self.global_memories, self.memory_writer
                 )
                 self.log_manager.info(
                     f"Memory manager built for node {node_id}",
@@ -292,6 +315,7 @@ class GraphExecutor:
                 workspace_hook=self.runtime_context.workspace_hook,
                 human_prompt_service=prompt_service,
                 cancel_event=self._cancel_event,
+                delta_sink=self._create_delta_sink(),
             )
         return self.__execution_context
 
@@ -302,6 +326,9 @@ class GraphExecutor:
         self.node_executors = NodeExecutorFactory.create_executors(
             self._get_execution_context(), self.graph.subgraphs
         )
+        self.setup_prefetcher = SetupPrefetcher(
+            lambda node: self.node_executors.get(node.type), self.log_manager
+        )
 
     def _ensure_human_prompt_service(self) -> HumanPromptService:
         if self._human_prompt_service:
@@ -319,12 +346,55 @@ class GraphExecutor:
         return self._human_prompt_service
 
     def _save_memories(self) -> None:
-        """Save all memories after execution."""
-        for memory in self.global_memories.values():
-            memory.save()
+        """Save all memories after execution; failed background writes fail the run."""
+        try:
+            if self.memory_writer is not None:
+                self.memory_writer.flush()
+        finally:
+            for memory in self.global_memories.values():
+                memory.save()
 
     def run(self, task_prompt: Any) -> Dict[str, Any]:
         """Execute the graph based on topological layers structure or cycle-aware execution."""
+        session_id = self.runtime_context.session_id
+        with start_span(
+            "workflow",
+            {"workflow.name": self.graph.name, "session.id": session_id or ""},
+            trace_id=trace_id_for_session(session_id) if session_id else None,
+        ):
+            try:
+                return self._run_workflow(task_prompt)
+            finally:
+                self._close_map_streams()
+                self._close_memory_writer()
+                self._close_setup_prefetcher()
+
+    def _close_map_streams(self) -> None:
+        """Discard streamed map units whose target node never ran."""
+        while self._map_streams:
+            _, stage = self._map_streams.popitem()
+            stage.close()
+
+    def _close_memory_writer(self) -> None:
+        """Apply queued memory writes, including those of a failed or cancelled run.
+
+        A completed run already reported write failures when it saved its
+        memories, so failures left here belong to a run that is failing anyway
+        and are logged rather than raised over the original error.
+        """
+        if self.memory_writer is not None:
+            writer, self.memory_writer = self.memory_writer, None
+            try:
+                writer.close()
+            except MemoryWriteError as exc:
+                self.log_manager.error(str(exc))
+
+    def _close_setup_prefetcher(self) -> None:
+        if self.setup_prefetcher is not None:
+            self.setup_prefetcher.close()
+            self.setup_prefetcher = None
+
+    def _run_workflow(self, task_prompt: Any) -> Dict[str, Any]:
         self._raise_if_cancelled()
         graph_manager = GraphManager(self.graph)
         try:
@@ -375,8 +445,12 @@ class GraphExecutor:
                 initial_messages=self.initial_task_messages,
                 execute_node_func=self._execute_node,
                 payload_to_text_func=self._payload_to_text,
+                vote_config=self.graph.majority_vote,
+                node_tokens_func=lambda node_id: self.token_tracker.get_node_usage(node_id).total_tokens,
+                node_calls_func=self.token_tracker.get_node_execution_count,
             )
             self.majority_result = strategy.run()
+            self.majority_report = strategy.report
         elif self.graph.has_cycles:
             strategy = CycleExecutionStrategy(
                 log_manager=self.log_manager,
@@ -476,6 +550,49 @@ class GraphExecutor:
                     edge_link.payload_processor = None
                     edge_link.process_metadata = {}
                     edge_link.process_type = None
+            self._attach_keyword_router(node)
+
+    def _attach_keyword_router(self, node: Node) -> None:
+        """Share one compiled router among the keyword edges leaving ``node``.
+
+        A router node with many branches then scans each output once instead
+        of once per edge and keyword.
+        """
+        managers = [
+            edge_link.condition_manager
+            for edge_link in node.iter_outgoing_edges()
+            if isinstance(edge_link.condition_manager, KeywordEdgeConditionManager)
+        ]
+        keyword_count = sum(
+            len(manager.any_keywords) + len(manager.none_keywords) + len(manager.regex_patterns)
+            for manager in managers
+        )
+        if keyword_count < 2:
+            return
+        router = KeywordRouter([manager.config for manager in managers])
+        for index, manager in enumerate(managers):
+            manager.attach_router(router, index)
+
+    def _get_pseudo_edge(self, node: Node) -> EdgeLink:
+        """Return the cached always-true self edge that keeps a node's own outputs in context."""
+        pseudo_link = self._pseudo_edges.get(node.id)
+        if pseudo_link is None:
+            pseudo_condition = EdgeConditionConfig.from_dict(
+                "true", path=f"{node.path}.pseudo_edge"
+            )
+            pseudo_link = EdgeLink(target=node, trigger=False)
+            pseudo_link.condition_config = pseudo_condition
+            pseudo_context = ConditionFactoryContext(
+                function_manager=self.function_manager,
+                log_manager=self.log_manager,
+            )
+            pseudo_link.condition_manager = build_edge_condition_manager(
+                pseudo_condition, pseudo_context, self._get_execution_context()
+            )
+            pseudo_link.condition = pseudo_condition.display_label()
+            pseudo_link.condition_type = pseudo_condition.type
+            self._pseudo_edges[node.id] = pseudo_link
+        return pseudo_link
 
     def _process_edge_output(
         self, edge_link: EdgeLink, source_result: Message, from_node: Node
@@ -522,68 +639,19 @@ class GraphExecutor:
     def _get_dynamic_config_for_node(self, node: Node):
         """Get the dynamic configuration for a node from its incoming edges.
 
-        If multiple incoming edges have dynamic config, they must be identical
-        (same type and parameters). Otherwise raises an error.
+        The config is resolved when the graph is built; GraphManager has
+        already checked that all dynamic incoming edges agree.
 
         Returns the dynamic config if found, or None.
         """
-        
-        found_configs = []  # List of (source_node_id, dynamic_config)
-
-        for predecessor in node.predecessors:
-            for edge_link in predecessor.iter_outgoing_edges():
-                if edge_link.target is node and edge_link.dynamic_config is not None:
-                    found_configs.append((predecessor.id, edge_link.dynamic_config))
-
-        if not found_configs:
-            return None
-
-        if len(found_configs) == 1:
-            return found_configs[0][1]
-
-        # Multiple dynamic configs found - verify they are consistent
-        first_source, first_config = found_configs[0]
-        for source_id, config in found_configs[1:]:
-            # Check type consistency
-            if config.type != first_config.type:
-                raise WorkflowExecutionError(
-                    f"Node '{node.id}' has inconsistent dynamic configurations on incoming edges: "
-                    f"edge from '{first_source}' has type '{first_config.type}', "
-                    f"but edge from '{source_id}' has type '{config.type}'. "
-                    f"All dynamic edges to the same node must use the same configuration."
-                )
-            # Check split config consistency
-            if (
-                config.split.type != first_config.split.type
-                or config.split.pattern != first_config.split.pattern
-                or config.split.json_path != first_config.split.json_path
-            ):
-                raise WorkflowExecutionError(
-                    f"Node '{node.id}' has inconsistent split configurations on incoming edges: "
-                    f"edges from '{first_source}' and '{source_id}' have different split settings. "
-                    f"All dynamic edges to the same node must use the same configuration."
-                )
-            # Check mode-specific config consistency
-            if config.max_parallel != first_config.max_parallel:
-                raise WorkflowExecutionError(
-                    f"Node '{node.id}' has inconsistent max_parallel on incoming edges: "
-                    f"edge from '{first_source}' has max_parallel={first_config.max_parallel}, "
-                    f"but edge from '{source_id}' has max_parallel={config.max_parallel}."
-                )
-            if config.type == "tree" and config.group_size != first_config.group_size:
-                raise WorkflowExecutionError(
-                    f"Node '{node.id}' has inconsistent group_size on incoming edges: "
-                    f"edge from '{first_source}' has group_size={first_config.group_size}, "
-                    f"but edge from '{source_id}' has group_size={config.group_size}."
-                )
-
-        return first_config
+        return node.incoming_dynamic_config()
 
     def _execute_with_dynamic_config(
         self,
         node: Node,
         inputs: List[Message],
         dynamic_config,
+        on_unit_complete: Optional[Callable[[int, List[Message]], None]] = None,
     ) -> List[Message]:
         """Execute a node with dynamic configuration from incoming edges.
 
@@ -591,6 +659,7 @@ class GraphExecutor:
             node: Target node to execute
             inputs: All input messages collected for this node
             dynamic_config: Dynamic configuration from the incoming edge
+            on_unit_complete: Streaming callback for each finished map unit
 
         Returns:
             Output messages from dynamic execution
@@ -601,7 +670,7 @@ class GraphExecutor:
         static_inputs: List[Message] = []
 
         for msg in inputs:
-            if msg.metadata.get("_from_dynamic_edge"):
+            if msg.get_metadata("_from_dynamic_edge"):
                 dynamic_inputs.append(msg)
             else:
                 static_inputs.append(msg)
@@ -616,17 +685,125 @@ class GraphExecutor:
             return self._process_result(n, inp)
 
         # Execute with dynamic edge executor
-        dynamic_executor = DynamicEdgeExecutor(self.log_manager, node_executor_func)
+        dynamic_executor = DynamicEdgeExecutor(
+            self.log_manager, node_executor_func, unit_store=self.map_unit_store
+        )
+
+        # Units already started by an upstream streaming map only need collecting
+        stage = self._map_streams.pop(node.id, None)
+        if stage is not None:
+            self.log_manager.info(
+                f"Node {node.id}: collecting {stage.submitted} streamed map units"
+            )
+            outputs = stage.collect(on_unit_complete)
+            if dynamic_inputs:
+                outputs.extend(
+                    dynamic_executor.execute_from_inputs(
+                        node,
+                        dynamic_inputs,
+                        dynamic_config,
+                        static_inputs=static_inputs,
+                        on_unit_complete=on_unit_complete,
+                    )
+                )
+            return outputs
 
         # Pass dynamic inputs for splitting, static inputs for replication
         return dynamic_executor.execute_from_inputs(
-            node, dynamic_inputs, dynamic_config, static_inputs=static_inputs
+            node,
+            dynamic_inputs,
+            dynamic_config,
+            static_inputs=static_inputs,
+            on_unit_complete=on_unit_complete,
         )
 
+    def _forward_streamed_output(self, node: Node, message: Message) -> None:
+        """Pass one streamed map output through the node's outgoing edges.
+
+        Self-loops are left for the end of the node so the message is not
+        dropped by the node's own input cleanup.
+        """
+        for edge_link in node.iter_outgoing_edges():
+            if edge_link.target is node:
+                continue
+            self._process_edge_output(edge_link, message, node)
+            self._feed_map_stream(edge_link, node)
+
+    def _feed_map_stream(self, edge_link: EdgeLink, from_node: Node) -> None:
+        """Start the target's map units on freshly delivered items.
+
+        Only streaming map edges qualify, into a node whose sole predecessor
+        is ``from_node`` and whose every incoming edge is such an edge. Its
+        static inputs are then only what it kept from earlier runs, which
+        cannot change before it executes. Any other target keeps the items
+        queued and runs once the scheduler reaches it, which acts as the
+        barrier; so does a target whose resources are busy when the first
+        item arrives.
+        """
+        dynamic_config = edge_link.dynamic_config
+        if not self._is_streaming_map(edge_link) or not edge_link.trigger:
+            return
+        target = edge_link.target
+        if any(predecessor is not from_node for predecessor in target.predecessors):
+            return
+        if not all(
+            self._is_streaming_map(link)
+            for link in from_node.iter_outgoing_edges()
+            if link.target is target
+        ):
+            return
+
+        dynamic_inputs = [msg for msg in target.input if msg.get_metadata("_from_dynamic_edge")]
+        if not dynamic_inputs:
+            return
+
+        stage = self._map_streams.get(target.id)
+        if stage is None:
+            resources = self.resource_manager.try_hold_node(target)
+            if resources is None:
+                self.log_manager.debug(
+                    f"Streaming map {from_node.id} -> {target.id}: resources busy, waiting for the scheduler"
+                )
+                return
+            stage = StreamingMapStage(
+                DynamicEdgeExecutor(
+                    self.log_manager, self._process_result, unit_store=self.map_unit_store
+                ),
+                target,
+                dynamic_config,
+                resources=resources,
+            )
+            self._map_streams[target.id] = stage
+        static_inputs = [msg for msg in target.input if not msg.get_metadata("_from_dynamic_edge")]
+        target.input = static_inputs
+        for message in dynamic_inputs:
+            started = stage.submit(message, static_inputs)
+            self.log_manager.debug(
+                f"Streaming map {from_node.id} -> {target.id}: started {started} unit(s) early"
+            )
+
+    @staticmethod
+    def _is_streaming_map(edge_link: EdgeLink) -> bool:
+        dynamic_config = edge_link.dynamic_config
+        return dynamic_config is not None and dynamic_config.is_map() and dynamic_config.stream
+
     def _execute_node(self, node: Node) -> None:
         """Execute a single node."""
         self._raise_if_cancelled()
-        with self.resource_manager.guard_node(node):
+        prefetcher = self.setup_prefetcher
+        if prefetcher is not None:
+            prefetcher.schedule(
+                edge_link.target
+                for edge_link in node.iter_outgoing_edges()
+                if edge_link.trigger and edge_link.target is not node
+            )
+        # A streaming map stage already holds the node's resources and timer
+        # since its first unit; the timer stops once the units are collected
+        stage = self._map_streams.get(node.id)
+        guard = stage.resources if stage is not None else self.resource_manager.guard_node(node)
+        with guard:
+            if prefetcher is not None:
+                prefetcher.claim(node.id)
             input_results = node.input
 
             # Clear incoming triggers so future iterations wait for fresh signals
@@ -654,30 +831,46 @@ class GraphExecutor:
 
             # Check if any incoming edge has dynamic configuration
             dynamic_config = self._get_dynamic_config_for_node(node)
+            streaming = dynamic_config is not None and dynamic_config.stream
+            streamed_outputs: List[Message] = []
+
+            def emit_unit_outputs(unit_index: int, unit_outputs: List[Message]) -> None:
+                for raw_output in unit_outputs:
+                    msg = self._ensure_source_output(raw_output, node.id)
+                    node.append_output(msg)
+                    streamed_outputs.append(msg)
+                    self._forward_streamed_output(node, msg)
 
             # Process all inputs together in a single executor call
-            with self.log_manager.node_timer(node.id):
+            with nullcontext() if stage is not None else self.log_manager.node_timer(node.id):
                 if dynamic_config is not None:
                     raw_outputs = self._execute_with_dynamic_config(
-                        node, input_results, dynamic_config
+                        node,
+                        input_results,
+                        dynamic_config,
+                        on_unit_complete=emit_unit_outputs if streaming else None,
                     )
                 else:
                     raw_outputs = self._process_result(node, input_results)
 
             # Process all output messages
             output_messages: List[Message] = []
-            for raw_output in raw_outputs:
-                msg = self._ensure_source_output(raw_output, node.id)
-                node.append_output(msg)
-                output_messages.append(msg)
+            if streaming:
+                # Already recorded and forwarded unit by unit
+                output_messages = streamed_outputs
+            else:
+                for raw_output in raw_outputs:
+                    msg = self._ensure_source_output(raw_output, node.id)
+                    node.append_output(msg)
+                    output_messages.append(msg)
 
             # Use first output for context trace handling (backward compat)
             unified_output = output_messages[0] if output_messages else None
 
             context_trace_payload = None
             context_restored = False
-            if unified_output is not None and isinstance(unified_output.metadata, dict):
-                context_trace_payload = unified_output.metadata.get("context_trace")
+            if unified_output is not None:
+                context_trace_payload = unified_output.get_metadata("context_trace")
             if node.context_window != 0 and context_trace_payload:
                 context_restored = self._restore_context_trace(
                     node, context_trace_payload
@@ -718,7 +911,7 @@ class GraphExecutor:
                             + "\n\n"
                         )
                 output_role = unified_output.role.value
-                output_source = unified_output.metadata.get("source")
+                output_source = unified_output.get_metadata("source")
             else:
                 output_text = ""
                 output_role = "none"
@@ -739,24 +932,16 @@ class GraphExecutor:
             # For each output message, process all edges
             for output_msg in output_messages:
                 for edge_link in node.iter_outgoing_edges():
+                    if streaming and edge_link.target is not node:
+                        continue
                     self._process_edge_output(edge_link, output_msg, node)
+            if prefetcher is not None:
+                for edge_link in node.iter_outgoing_edges():
+                    if edge_link.trigger and not edge_link.triggered and edge_link.target is not node:
+                        prefetcher.cancel(edge_link.target.id)
 
             if output_messages and node.context_window != 0 and not context_restored:
-                # Use first output for pseudo edge
-                pseudo_condition = EdgeConditionConfig.from_dict(
-                    "true", path=f"{node.path}.pseudo_edge"
-                )
-                pseudo_link = EdgeLink(target=node, trigger=False)
-                pseudo_link.condition_config = pseudo_condition
-                pseudo_context = ConditionFactoryContext(
-                    function_manager=self.function_manager,
-                    log_manager=self.log_manager,
-                )
-                pseudo_link.condition_manager = build_edge_condition_manager(
-                    pseudo_condition, pseudo_context, self._get_execution_context()
-                )
-                pseudo_link.condition = pseudo_condition.display_label()
-                pseudo_link.condition_type = pseudo_condition.type
+                pseudo_link = self._get_pseudo_edge(node)
                 for output_msg in output_messages:
                     self._process_edge_output(pseudo_link, output_msg, node)
 
@@ -781,7 +966,8 @@ class GraphExecutor:
         workspace = self.runtime_context.code_workspace
         if hook:
             try:
-                hook.before_node(node, workspace)
+                with start_span("workspace_hook", {"node.id": node.id, "hook.phase": "before_node"}):
+                    hook.before_node(node, workspace)
             except Exception:
                 self.log_manager.warning(
                     "workspace hook before_node failed for %s", node.id
@@ -794,7 +980,8 @@ class GraphExecutor:
         finally:
             if hook:
                 try:
-                    hook.after_node(node, workspace, success=success)
+                    with start_span("workspace_hook", {"node.id": node.id, "hook.phase": "after_node"}):
+                        hook.after_node(node, workspace, success=success)
                 except Exception:
                     self.log_manager.warning(
                         "workspace hook after_node failed for %s", node.id
@@ -806,9 +993,11 @@ class GraphExecutor:
 
         # For majority voting, we might want to collect differently
         if self.graph.is_majority_voting:
-            # In majority voting mode, collect all outputs and the final majority result
+            # In majority voting mode, collect all outputs and the final majority result;
+            # voters abandoned by an early stop may still be finishing and are left out
+            skipped = set(self.majority_report.abandoned) if self.majority_report is not None else set()
             for node_id, node in self.graph.nodes.items():
-                if node.output:
+                if node.output and node_id not in skipped:
                     node_output = {
                         "node_id": node_id,
                         "node_type": node.node_type,
@@ -823,6 +1012,8 @@ class GraphExecutor:
             # Add the majority result
             if hasattr(self, "majority_result"):
                 all_outputs["majority_result"] = self.majority_result
+            if self.majority_report is not None:
+                all_outputs["majority_vote"] = self.majority_report.to_dict()
         else:
             # Collect outputs from all nodes normally
             for node_id, node in self.graph.nodes.items():
@@ -969,7 +1160,7 @@ class GraphExecutor:
 
     def _ensure_source(self, message: Message, default_source: str) -> Message:
         cloned = message.clone()
-        metadata = dict(cloned.metadata)
+        metadata = dict(cloned.metadata_view)
         metadata.setdefault("source", default_source)
         cloned.metadata = metadata
         return cloned
@@ -981,7 +1172,7 @@ class GraphExecutor:
         if not isinstance(message, Message):
             return self._create_message(MessageRole.ASSISTANT, str(message), node_id)
         cloned = message.clone()
-        metadata = dict(message.metadata)
+        metadata = dict(message.metadata_view)
         metadata.setdefault("source", node_id)
         cloned.metadata = metadata
         return cloned
@@ -67,8 +67,11 @@ class GraphContext:
         else:
             self.directory = config.output_root / f"{config.name}_{timestamp}"
         self.directory.mkdir(parents=True, exist_ok=True)
+        # Same for every run of this project name, unlike the timestamped directory
+        self.checkpoint_directory = config.output_root / config.name
         # Voting mode flag
         self.is_majority_voting: bool = config.is_majority_voting
+        self.majority_vote = config.majority_vote
     
     @property
     def name(self) -> str:
@@ -27,6 +27,7 @@ class GraphManager:
         """Build the complete graph structure including nodes, edges, and layers."""
         self._instantiate_nodes()
         self._initiate_edges()
+        self._index_incoming_edges()
         self._determine_start_nodes()
         self._warn_on_untriggerable_nodes()
         self._build_topology_and_metadata()
@@ -43,6 +44,10 @@ class GraphManager:
             node_instance.predecessors = []
             node_instance.successors = []
             node_instance._outgoing_edges = []
+            node_instance._incoming_edges = None
+            node_instance._passive_incoming_edges = ()
+            node_instance._trigger_flags = bytearray()
+            node_instance._incoming_dynamic_config = None
             node_instance.vars = dict(self.graph.vars)
             self.graph.nodes[node_id] = node_instance
 
@@ -327,20 +332,95 @@ class GraphManager:
             if node_id in start_nodes:
                 continue
 
-            has_triggerable_edge = False
-            for predecessor in node.predecessors:
-                for edge_link in predecessor.iter_outgoing_edges():
-                    if edge_link.target is node and edge_link.trigger:
-                        has_triggerable_edge = True
-                        break
-                if has_triggerable_edge:
-                    break
-
+            has_triggerable_edge = any(edge_link.trigger for edge_link in node.incoming_edges())
             if not has_triggerable_edge:
                 print(
                     f"Warning: node '{node_id}' has no triggerable incoming edges and will never execute."
                 )
     
+    def _index_incoming_edges(self) -> None:
+        """Build every node's incoming-edge index and validate its dynamic edges."""
+        for node in self.graph.nodes.values():
+            node.index_incoming_edges()
+            self._validate_incoming_dynamic_configs(node)
+
+    @staticmethod
+    def _validate_incoming_dynamic_configs(node) -> None:
+        """All dynamic edges into one node must share the same configuration."""
+        found_configs = [
+            (edge_link.source.id, edge_link.dynamic_config)
+            for edge_link in node.incoming_edges()
+            if edge_link.dynamic_config is not None
+        ]
+        if len(found_configs) < 2:
+            return
+
+        first_source, first_config = found_configs[0]
+        for source_id, config in found_configs[1:]:
+            # Check type consistency
+            if config.type != first_config.type:
+                raise ConfigError(
+                    f"Node '{node.id}' has inconsistent dynamic configurations on incoming edges: "
+                    f"edge from '{first_source}' has type '{first_config.type}', "
+                    f"but edge from '{source_id}' has type '{config.type}'. "
+                    f"All dynamic edges to the same node must use the same configuration.",
+                    node.path,
+                )
+            # Check split config consistency
+            if (
+                config.split.type != first_config.split.type
+                or config.split.pattern != first_config.split.pattern
+                or config.split.json_path != first_config.split.json_path
+            ):
+                raise ConfigError(
+                    f"Node '{node.id}' has inconsistent split configurations on incoming edges: "
+                    f"edges from '{first_source}' and '{source_id}' have different split settings. "
+                    f"All dynamic edges to the same node must use the same configuration.",
+                    node.path,
+                )
+            # Check mode-specific config consistency
+            if config.max_parallel != first_config.max_parallel:
+                raise ConfigError(
+                    f"Node '{node.id}' has inconsistent max_parallel on incoming edges: "
+                    f"edge from '{first_source}' has max_parallel={first_config.max_parallel}, "
+                    f"but edge from '{source_id}' has max_parallel={config.max_parallel}.",
+                    node.path,
+                )
+            if config.stream != first_config.stream or config.ordered != first_config.ordered:
+                raise ConfigError(
+                    f"Node '{node.id}' has inconsistent stream/ordered settings on incoming edges: "
+                    f"edges from '{first_source}' and '{source_id}' differ. "
+                    f"All dynamic edges to the same node must use the same configuration.",
+                    node.path,
+                )
+            if config.type == "map" and (
+                config.config.failure_policy,
+                config.config.retry_n,
+                config.config.resume,
+            ) != (
+                first_config.config.failure_policy,
+                first_config.config.retry_n,
+                first_config.config.resume,
+            ):
+                raise ConfigError(
+                    f"Node '{node.id}' has inconsistent failure_policy/retry_n/resume on incoming edges: "
+                    f"edges from '{first_source}' and '{source_id}' differ.",
+                    node.path,
+                )
+            if config.type == "tree" and config.group_size != first_config.group_size:
+                raise ConfigError(
+                    f"Node '{node.id}' has inconsistent group_size on incoming edges: "
+                    f"edge from '{first_source}' has group_size={first_config.group_size}, "
+                    f"but edge from '{source_id}' has group_size={config.group_size}.",
+                    node.path,
+                )
+            if config.type == "tree" and config.config.eager != first_config.config.eager:
+                raise ConfigError(
+                    f"Node '{node.id}' has inconsistent eager settings on incoming edges: "
+                    f"edges from '{first_source}' and '{source_id}' differ.",
+                    node.path,
+                )
+
     def get_cycle_manager(self) -> CycleManager:
         """Get the cycle manager instance."""
         return self.cycle_manager
@@ -1,14 +1,20 @@
 """Execution strategies for different graph topologies."""
 
-from collections import Counter
-from typing import Callable, Dict, List, Sequence
+import concurrent.futures
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Sequence
 
-from entity.configs import Node
+from entity.configs import MajorityVoteConfig, Node
 from entity.messages import Message
+from runtime.node.executor.base import abandon_scope
 from utils.log_manager import LogManager
+from utils.metrics import submit_tracked
 from workflow.executor.dag_executor import DAGExecutor
 from workflow.executor.cycle_executor import CycleExecutor
-from workflow.executor.parallel_executor import ParallelExecutor
+from workflow.executor.vote_tally import VoteTally
 
 
 class DagExecutionStrategy:
@@ -64,8 +70,45 @@ class CycleExecutionStrategy:
         cycle_executor.execute()
 
 
+@dataclass
+class VoteReport:
+    """Outcome of a majority vote, including what an early stop saved."""
+
+    votes: Dict[str, int] = field(default_factory=dict)
+    voters: int = 0
+    counted: List[str] = field(default_factory=list)
+    cancelled: List[str] = field(default_factory=list)
+    abandoned: List[str] = field(default_factory=list)
+    decided_early: bool = False
+    elapsed_ms: float = 0.0
+    latency_saved_ms: float = 0.0
+    estimated_tokens_saved: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "votes": dict(self.votes),
+            "voters": self.voters,
+            "counted": list(self.counted),
+            "cancelled": list(self.cancelled),
+            "abandoned": list(self.abandoned),
+            "decided_early": self.decided_early,
+            "elapsed_ms": round(self.elapsed_ms, 3),
+            "latency_saved_ms": round(self.latency_saved_ms, 3),
+            "estimated_tokens_saved": self.estimated_tokens_saved,
+        }
+
+
 class MajorityVoteStrategy:
-    """Executes graphs configured for majority voting (no edges)."""
+    """Executes graphs configured for majority voting (no edges).
+
+    Votes are tallied as voters finish. With ``early_stop`` the strategy
+    returns as soon as the winner is settled: queued voters are cancelled and
+    voters already running are abandoned, stopping before their next model or
+    tool step. They are not joined, so a model call in flight may finish after
+    ``run`` returns; their results are discarded explicitly (outputs cleared,
+    listed in ``report.abandoned``) and never counted. The latency and tokens
+    saved are estimated at that moment from the voters that were counted.
+    """
 
     def __init__(
         self,
@@ -74,12 +117,24 @@ class MajorityVoteStrategy:
         initial_messages: Sequence[Message],
         execute_node_func: Callable[[Node], None],
         payload_to_text_func: Callable[[object], str],
+        vote_config: MajorityVoteConfig | None = None,
+        node_tokens_func: Callable[[str], int] | None = None,
+        node_calls_func: Callable[[str], int] | None = None,
     ) -> None:
         self.log_manager = log_manager
         self.nodes = nodes
         self.initial_messages = initial_messages
         self.execute_node_func = execute_node_func
         self.payload_to_text = payload_to_text_func
+        self.vote_config = vote_config or MajorityVoteConfig(path="graph.majority_vote")
+        self.node_tokens = node_tokens_func
+        self.node_calls = node_calls_func
+        self.report = VoteReport()
+        self._abandon = threading.Event()
+        self._discard_lock = threading.Lock()
+        self._discarded: set[str] = set()
+        self._started_at: Dict[str, float] = {}
+        self._durations: Dict[str, float] = {}
 
     def run(self) -> str:
         self.log_manager.info("Executing graph with majority voting approach")
@@ -94,55 +149,150 @@ class MajorityVoteStrategy:
                 node.append_input(message.clone())
 
         node_ids = [node.id for node in all_nodes]
+        node_order = {node_id: idx for idx, node_id in enumerate(node_ids)}
+        config = self.vote_config
+        tally = VoteTally(
+            node_ids,
+            quorum=config.quorum,
+            clustering=config.clustering,
+            similarity_threshold=config.similarity_threshold,
+            embed=self._build_embedder(),
+            log_manager=self.log_manager,
+        )
+        self.report = VoteReport(voters=len(node_ids))
+
+        started = time.perf_counter()
+        max_workers = min(config.max_parallel or len(node_ids), len(node_ids))
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+        queued = list(node_ids)
+        futures: Dict[concurrent.futures.Future, str] = {}
+        pending: set = set()
+
+        def launch() -> None:
+            # Voters start only when a slot is free, so the ones still queued
+            # at an early stop never run
+            while queued and len(pending) < max_workers:
+                node_id = queued.pop(0)
+                self._started_at[node_id] = time.perf_counter()
+                future = submit_tracked(executor, "vote", self._run_voter, self.nodes[node_id])
+                futures[future] = node_id
+                pending.add(future)
+
+        try:
+            # Voters copy this context on submit, so setting the event stops them
+            with abandon_scope(self._abandon):
+                launch()
+                while pending:
+                    done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                    pending.difference_update(done)
+                    for future in sorted(done, key=lambda item: node_order[futures[item]]):
+                        node_id = futures[future]
+                        try:
+                            future.result()
+                        except Exception as exc:
+                            self.log_manager.error(f"node {node_id} failed: {exc}")
+                            raise
+                        tally.add(node_id, self._node_output_text(self.nodes[node_id]))
+                    if config.early_stop and tally.is_decided():
+                        break
+                    launch()
+        finally:
+            self._abandon.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+            self._discard([futures[future] for future in pending])
+
+        decided_at = time.perf_counter()
+        self.report.elapsed_ms = (decided_at - started) * 1000
+        self.report.counted = [node_id for node_id in node_ids if node_id in tally.answers]
+        self.report.votes = dict(tally.standings())
+        if pending or queued:
+            self._record_early_stop([futures[future] for future in pending], queued, max_workers, decided_at)
+
+        return self._finish(tally)
+
+    def _run_voter(self, node: Node) -> None:
+        try:
+            self.execute_node_func(node)
+        finally:
+            self._durations[node.id] = time.perf_counter() - self._started_at[node.id]
+            with self._discard_lock:
+                if node.id in self._discarded:
+                    node.output.clear()
+
+    def _discard(self, running: List[str]) -> None:
+        """Drop the results of voters that are still running after the vote ended."""
+        with self._discard_lock:
+            for node_id in running:
+                self._discarded.add(node_id)
+                self.nodes[node_id].output.clear()
+        if running:
+            self.log_manager.debug(f"Discarding results of abandoned voters: {', '.join(sorted(running))}")
+
+    def _record_early_stop(self, running: List[str], queued: List[str], slots: int, decided_at: float) -> None:
+        """Estimate what stopping now saves, from the voters counted so far."""
+        report = self.report
+        report.decided_early = True
+        report.cancelled = list(queued)
+        report.abandoned = sorted(running)
+        counted = [node_id for node_id in report.counted if node_id in self._durations]
+        if not counted:
+            return
+
+        # A full vote would have ended when the last running voter finished,
+        # or after the queued voters ran in waves as slots freed up
+        duration = sum(self._durations[node_id] for node_id in counted) / len(counted)
+        remaining = [max(0.0, self._started_at[node_id] + duration - decided_at) for node_id in running]
+        saved = max(remaining, default=0.0)
+        if queued:
+            saved = max(saved, min(remaining, default=0.0) + math.ceil(len(queued) / slots) * duration)
+        report.latency_saved_ms = saved * 1000
+
+        if self.node_tokens is None:
+            return
+        tokens = sum(self.node_tokens(node_id) for node_id in counted) / len(counted)
+        saved_tokens = tokens * len(queued)
+        if self.node_calls is not None:
+            calls = sum(self.node_calls(node_id) for node_id in counted) / len(counted)
+            if calls:
+                # A running voter still pays for the model call in flight, then skips the rest
+                per_call = tokens / calls
+                for node_id in running:
+                    skipped = calls - self.node_calls(node_id) - 1
+                    saved_tokens += max(0.0, skipped) * per_call
+        report.estimated_tokens_saved = int(saved_tokens)
+
+    def _build_embedder(self):
+        config = self.vote_config
+        if config.clustering != "embedding" or config.embedding is None:
+            return None
+        from runtime.node.agent.memory.embedding import EmbeddingFactory
+
+        return EmbeddingFactory.create_embedding(config.embedding).get_embedding
+
+    def _node_output_text(self, node: Node) -> str:
+        if node.output:
+            return self.payload_to_text(node.output[-1])
+        return ""
 
-        def _execute(node_id: str) -> None:
-            self.execute_node_func(self.nodes[node_id])
-
-        parallel_executor = ParallelExecutor(self.log_manager, self.nodes)
-        parallel_executor.execute_nodes_parallel(node_ids, _execute)
-
-        return self._collect_majority_result()
-
-    def _collect_majority_result(self) -> str:
-        node_outputs: List[Dict[str, str]] = []
-        for node_id, node in self.nodes.items():
-            if node.output:
-                output_text = self.payload_to_text(node.output[-1])
-            else:
-                output_text = ""
-            node_outputs.append(
-                {
-                    "node_id": node_id,
-                    "node_type": node.node_type,
-                    "output": output_text,
-                }
-            )
-
-        output_values = [item["output"] for item in node_outputs]
-        output_counts = Counter(output_values)
-
-        non_empty_outputs = [value for value in output_values if value.strip()]
-        if non_empty_outputs:
-            output_counts = Counter(non_empty_outputs)
-
-        if not output_counts:
+    def _finish(self, tally: VoteTally) -> str:
+        if not tally.clusters:
             self.log_manager.warning("No outputs available for majority voting")
             return ""
 
-        majority_output, count = output_counts.most_common(1)[0]
+        majority_output = tally.result()
         self.log_manager.info(
             "Majority output determined",
-            details={"result": majority_output, "votes": count},
+            details={"result": majority_output, **self.report.to_dict()},
         )
         self.log_manager.info(
             "All node outputs",
             details={
                 "outputs": [
                     (
-                        item["node_id"],
-                        item["output"][:50] + "..." if len(item["output"]) > 50 else item["output"],
+                        node_id,
+                        output[:50] + "..." if len(output) > 50 else output,
                     )
-                    for item in node_outputs
+                    for node_id, output in tally.answers.items()
                 ]
             },
         )
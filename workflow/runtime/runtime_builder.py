@@ -5,6 +5,7 @@ from typing import Any, Dict, Optional
 
 from runtime.node.agent import ToolManager
 from utils.attachments import AttachmentStore
+from utils.blob_store import get_blob_store
 from utils.function_manager import EDGE_FUNCTION_DIR, EDGE_PROCESSOR_FUNCTION_DIR, get_function_manager
 from utils.log_manager import LogManager
 from utils.logger import WorkflowLogger
@@ -32,7 +33,7 @@ class RuntimeBuilder:
         code_workspace.mkdir(parents=True, exist_ok=True)
         attachments_dir = code_workspace / "attachments"
         attachments_dir.mkdir(parents=True, exist_ok=True)
-        attachment_store = AttachmentStore(attachments_dir)
+        attachment_store = AttachmentStore(attachments_dir, blob_store=get_blob_store())
 
         global_state: Dict[str, Any] = {
             "graph_directory": self.graph.directory,
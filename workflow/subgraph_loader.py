@@ -1,8 +1,9 @@
 """Utilities for loading reusable subgraph YAML definitions."""
 
+from contextlib import contextmanager
 from copy import deepcopy
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, Iterator, List, Tuple
 
 from entity.configs import ConfigError
 from utils.io_utils import read_yaml
@@ -12,6 +13,22 @@ _DEFAULT_SUBGRAPH_ROOT = (_REPO_ROOT / "yaml_instance").resolve()
 _SUBGRAPH_CACHE: Dict[Path, Dict[str, Any]] = {}
 
 
+@contextmanager
+def subgraph_root(root: Path | str) -> Iterator[None]:
+    """Resolve relative subgraph ``file`` references against ``root`` inside the block.
+
+    Used by tooling that runs a rewritten copy of ``yaml_instance/`` so that
+    subgraphs load from the copy instead of the repository's originals.
+    """
+    global _DEFAULT_SUBGRAPH_ROOT
+    previous = _DEFAULT_SUBGRAPH_ROOT
+    _DEFAULT_SUBGRAPH_ROOT = Path(root).resolve()
+    try:
+        yield
+    finally:
+        _DEFAULT_SUBGRAPH_ROOT = previous
+
+
 def _resolve_candidate_paths(file_path: str, parent_source: str | None) -> List[Path]:
     path = Path(file_path)
     if path.is_absolute():
@@ -78,4 +95,4 @@ def load_subgraph_config(file_path: str, *, parent_source: str | None = None) ->
     return graph_dict, vars_dict, str(resolved_path)
 
 
-__all__ = ["load_subgraph_config"]
+__all__ = ["load_subgraph_config", "subgraph_root"]